@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for metadata updates in the pipeline run database.
+
+Compares the throughput of ``manage_database(operation="update")`` against
+the previous access pattern (a fresh rollback-journal connection per call),
+with one or more threads writing to the same database. Run from the
+repository root:
+
+    python scripts/benchmark_database.py --updates 500 --threads 4
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from autoclean.utils import database  # noqa: E402
+
+_legacy_lock = threading.Lock()
+
+
+def legacy_update(db_path: Path, run_id: str, metadata: dict) -> None:
+    """Update a record the way manage_database did before connection reuse."""
+    with _legacy_lock:
+        conn = sqlite3.connect(str(db_path))
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM pipeline_runs WHERE run_id = ?", (run_id,))
+        cursor.fetchone()
+        cursor.execute("SELECT metadata FROM pipeline_runs WHERE run_id = ?", (run_id,))
+        current = json.loads(cursor.fetchone()["metadata"] or "{}")
+        current.update(metadata)
+        cursor.execute(
+            "UPDATE pipeline_runs SET metadata = ? WHERE run_id = ?",
+            (json.dumps(current), run_id),
+        )
+        conn.commit()
+        conn.close()
+
+
+def current_update(db_path: Path, run_id: str, metadata: dict) -> None:
+    """Update a record through manage_database."""
+    database.manage_database(
+        operation="update", update_record={"run_id": run_id, "metadata": metadata}
+    )
+
+
+def run_benchmark(update_fn, n_updates: int, n_threads: int, journal_mode: str) -> float:
+    """Return updates per second for ``update_fn`` on a fresh database."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_dir = Path(tmp)
+        database.set_database_path(db_dir)
+        database.manage_database(operation="create_collection")
+        db_path = db_dir / "pipeline.db"
+
+        # The benchmark measures update cost, so pin the journal mode explicitly
+        database.close_database_connections()
+        conn = sqlite3.connect(str(db_path))
+        conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        conn.close()
+
+        run_ids = [f"bench_{i}" for i in range(n_threads)]
+        for run_id in run_ids:
+            database.manage_database(
+                operation="store",
+                run_record={"run_id": run_id, "status": "unprocessed", "metadata": {}},
+            )
+
+        def worker(run_id: str) -> None:
+            for i in range(n_updates):
+                update_fn(db_path, run_id, {f"step_{i}": {"value": i}})
+
+        threads = [threading.Thread(target=worker, args=(r,)) for r in run_ids]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        database.close_database_connections()
+
+    return n_updates * n_threads / elapsed
+
+
+def main() -> int:
+    """Run the benchmark and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--updates", type=int, default=300, help="Updates per thread")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent writers")
+    args = parser.parse_args()
+
+    legacy = run_benchmark(legacy_update, args.updates, args.threads, "DELETE")
+    current = run_benchmark(current_update, args.updates, args.threads, "WAL")
+
+    print(f"Updates: {args.updates} x {args.threads} threads")
+    print(f"  fresh connection, rollback journal: {legacy:10.1f} updates/s")
+    print(f"  pooled connection, WAL:             {current:10.1f} updates/s")
+    print(f"  speedup: {current / legacy:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
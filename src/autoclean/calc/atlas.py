@@ -0,0 +1,307 @@
+"""
+Sparse label-to-vertex index for extracting ROI time courses and spectra.
+
+Reading an annotation and matching every label against the vertices of a
+source estimate is repeated by each analysis in ``calc.source``. An
+``AtlasIndex`` does it once per (subject, parcellation, source space): it
+holds a sparse (n_rois, n_vertices) averaging matrix, so the mean time
+course or spectrum of every ROI comes from a single sparse product.
+
+Indices built from an annotation are kept in memory and cached on disk, so
+all ``calculate_*`` functions of a study share them.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import mne
+import numpy as np
+from mne.datasets import fetch_fsaverage
+from platformdirs import user_cache_dir
+from scipy import sparse
+
+from autoclean.calc.stc_store import STCStore
+
+# Indices built in this process, keyed like their cache files
+_ATLAS_INDICES = {}
+
+# Size of the float64 copies made while averaging single precision data
+_APPLY_BLOCK_BYTES = 64 * 1024**2
+
+
+class AtlasIndex:
+    """
+    Averaging matrix from source vertices to atlas ROIs.
+
+    Parameters
+    ----------
+    names : list of str
+        ROI names, e.g. 'precentral-lh'.
+    hemis : list of str
+        Hemisphere of each ROI ('lh' or 'rh').
+    vertices : list of array
+        Left and right hemisphere vertex numbers of the source space, in the
+        order of the rows of ``stc.data``.
+    matrix : scipy.sparse matrix, shape (n_rois, n_vertices)
+        Each row holds 1 / n for the n source vertices of the ROI.
+    centroids : array, shape (n_rois, 3) | None
+        Mean surface position of each ROI, NaN where a label has none.
+    """
+
+    def __init__(self, names, hemis, vertices, matrix, centroids=None):
+        self.names = list(names)
+        self.hemis = list(hemis)
+        self.vertices = [np.asarray(v) for v in vertices]
+        self.matrix = sparse.csr_matrix(matrix)
+        if centroids is None:
+            centroids = np.full((len(self.names), 3), np.nan)
+        self.centroids = np.asarray(centroids, dtype=float).reshape(-1, 3)
+
+    @classmethod
+    def from_labels(cls, labels, vertices):
+        """
+        Build the index of labels on a source space.
+
+        Labels without vertices in the source space are left out.
+
+        Parameters
+        ----------
+        labels : list of mne.Label
+            Atlas labels.
+        vertices : list of array
+            Left and right hemisphere vertex numbers of the source space.
+
+        Returns
+        -------
+        index : AtlasIndex
+            The index.
+        """
+        offsets = {"lh": 0, "rh": len(vertices[0])}
+        hemi_vertices = {"lh": vertices[0], "rh": vertices[1]}
+        names, hemis, centroids, rows, cols, weights = [], [], [], [], [], []
+        for label in labels:
+            idx = np.flatnonzero(np.isin(hemi_vertices[label.hemi], label.vertices))
+            if len(idx) == 0:
+                print(f"Warning: No vertices found for label {label.name}")
+                continue
+            rows.append(np.full(len(idx), len(names)))
+            cols.append(idx + offsets[label.hemi])
+            weights.append(np.full(len(idx), 1.0 / len(idx)))
+            names.append(label.name)
+            hemis.append(label.hemi)
+            if label.pos is not None and len(label.pos) > 0:
+                centroids.append(np.mean(label.pos, axis=0))
+            else:
+                centroids.append(np.full(3, np.nan))
+
+        n_vertices = len(vertices[0]) + len(vertices[1])
+        if names:
+            rows, cols = np.concatenate(rows), np.concatenate(cols)
+            matrix = sparse.csr_matrix(
+                (np.concatenate(weights), (rows, cols)),
+                shape=(len(names), n_vertices),
+            )
+        else:
+            matrix = sparse.csr_matrix((0, n_vertices))
+        return cls(names, hemis, vertices, matrix, centroids)
+
+    @property
+    def n_rois(self):
+        """Number of ROIs in the index."""
+        return len(self.names)
+
+    def roi_vertices(self, name):
+        """Row indices into ``stc.data`` of the vertices of an ROI."""
+        row = self.names.index(name)
+        start, stop = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        return self.matrix.indices[start:stop]
+
+    def select(self, names):
+        """
+        Restrict the index to some ROIs.
+
+        Parameters
+        ----------
+        names : list of str
+            ROIs to keep, in the order of the new index. Names not in the
+            index are skipped.
+
+        Returns
+        -------
+        index : AtlasIndex
+            Index of the selected ROIs.
+        """
+        rows = [self.names.index(name) for name in names if name in self.names]
+        return AtlasIndex(
+            [self.names[r] for r in rows],
+            [self.hemis[r] for r in rows],
+            self.vertices,
+            self.matrix[rows],
+            self.centroids[rows],
+        )
+
+    def check_vertices(self, stc):
+        """Raise a ValueError if source estimates use another source space."""
+        if len(stc.vertices) != 2 or not all(
+            np.array_equal(a, b) for a, b in zip(stc.vertices, self.vertices)
+        ):
+            raise ValueError(
+                "Source estimate vertices do not match the atlas index source space"
+            )
+
+    def apply(self, data):
+        """
+        Average vertex data within each ROI.
+
+        Parameters
+        ----------
+        data : SourceEstimate | array, shape (n_vertices, ...) | list | STCStore
+            Source estimate, vertex-wise values such as time courses or
+            spectra, or a list or store of source estimates.
+
+        Returns
+        -------
+        roi_data : array, shape (n_rois, ...) | (n_stcs, n_rois, n_times)
+            ROI averages, computed and returned in float64. A list or store
+            of source estimates gives one row per source estimate.
+        """
+        if isinstance(data, STCStore):
+            self.check_vertices(data)
+            return data.project(self.matrix)
+        if isinstance(data, (list, tuple)):
+            return np.stack([self.apply(stc) for stc in data])
+        if isinstance(data, mne.SourceEstimate):
+            self.check_vertices(data)
+            data = data.data
+        data = np.asarray(data)
+        flat = data.reshape(len(data), -1)
+        if flat.dtype == np.float64:
+            roi_data = self.matrix @ flat
+        else:
+            # Average single precision data in float64, a few columns at a time
+            step = max(1, _APPLY_BLOCK_BYTES // (8 * max(1, len(flat))))
+            roi_data = np.empty((self.n_rois, flat.shape[1]))
+            for start in range(0, flat.shape[1], step):
+                columns = slice(start, start + step)
+                roi_data[:, columns] = self.matrix @ flat[:, columns].astype(np.float64)
+        return roi_data.reshape((self.n_rois,) + data.shape[1:])
+
+    def save(self, fname):
+        """Save the index to a .npz file."""
+        np.savez(
+            fname,
+            names=np.array(self.names),
+            hemis=np.array(self.hemis),
+            lh_vertices=self.vertices[0],
+            rh_vertices=self.vertices[1],
+            data=self.matrix.data,
+            indices=self.matrix.indices,
+            indptr=self.matrix.indptr,
+            shape=np.array(self.matrix.shape),
+            centroids=self.centroids,
+        )
+
+    @classmethod
+    def load(cls, fname):
+        """Load an index saved with ``save``."""
+        with np.load(fname) as f:
+            matrix = sparse.csr_matrix(
+                (f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"])
+            )
+            return cls(
+                f["names"].tolist(),
+                f["hemis"].tolist(),
+                [f["lh_vertices"], f["rh_vertices"]],
+                matrix,
+                f["centroids"],
+            )
+
+
+def get_atlas_index(
+    vertices,
+    subject="fsaverage",
+    subjects_dir=None,
+    parc="aparc",
+    labels=None,
+    cache_dir=None,
+):
+    """
+    Get the atlas index of a parcellation on a source space.
+
+    Parameters
+    ----------
+    vertices : list of array | SourceEstimate | STCStore
+        Source space vertices, or source estimates defined on it.
+    subject : str
+        Subject name in the subjects_dir (default: 'fsaverage').
+    subjects_dir : str | None
+        Path to the freesurfer subjects directory. If None, uses fsaverage.
+    parc : str
+        Parcellation to read labels from (default: 'aparc', Desikan-Killiany).
+    labels : list of mne.Label | None
+        Labels to index instead of the parcellation. Such indices are not
+        cached.
+    cache_dir : str | None
+        Directory of the on-disk cache. Defaults to the user cache directory.
+        Cached indices are rebuilt when the annotation files change.
+
+    Returns
+    -------
+    index : AtlasIndex
+        Index of the parcellation labels, without 'unknown' labels.
+    """
+    if isinstance(vertices, (mne.SourceEstimate, STCStore)):
+        vertices = vertices.vertices
+    vertices = [np.asarray(v) for v in vertices]
+    if labels is not None:
+        return AtlasIndex.from_labels(labels, vertices)
+
+    if subjects_dir is None:
+        subjects_dir = os.path.dirname(fetch_fsaverage())
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{subject}|{parc}|{Path(subjects_dir).resolve()}".encode())
+    # Edited or replaced annotation files get a new index
+    for hemi in ("lh", "rh"):
+        annot = Path(subjects_dir) / subject / "label" / f"{hemi}.{parc}.annot"
+        try:
+            stat = annot.stat()
+            digest.update(f"|{stat.st_size}|{stat.st_mtime_ns}".encode())
+        except OSError:
+            digest.update(b"|missing")
+    for hemi_vertices in vertices:
+        digest.update(np.ascontiguousarray(hemi_vertices, dtype=np.int64).tobytes())
+    key = digest.hexdigest()
+
+    if key in _ATLAS_INDICES:
+        return _ATLAS_INDICES[key]
+
+    if cache_dir is None:
+        cache_dir = Path(user_cache_dir("autoclean")) / "atlas"
+    fname = Path(cache_dir) / f"{subject}-{parc}-{key}.npz"
+
+    index = None
+    if fname.exists():
+        try:
+            index = AtlasIndex.load(fname)
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"Warning: Ignoring unreadable atlas index {fname}: {e}")
+
+    if index is None:
+        print(f"Building {parc} atlas index for {subject}...")
+        labels = mne.read_labels_from_annot(
+            subject, parc=parc, subjects_dir=subjects_dir, verbose=False
+        )
+        labels = [label for label in labels if "unknown" not in label.name]
+        index = AtlasIndex.from_labels(labels, vertices)
+        try:
+            fname.parent.mkdir(parents=True, exist_ok=True)
+            tmp_fname = fname.with_name(f".{fname.stem}-{os.getpid()}.npz")
+            index.save(tmp_fname)
+            os.replace(tmp_fname, fname)
+        except OSError as e:
+            print(f"Warning: Could not cache atlas index: {e}")
+
+    _ATLAS_INDICES[key] = index
+    return index
@@ -0,0 +1,153 @@
+"""
+Cached sparse spatial smoothing operators for surface source estimates.
+
+Smoothing vertex-level values over the cortical surface repeats the same
+linear operation for every band and every recording on a given source
+space. ``get_smoothing_operator`` builds it once as a sparse matrix, the
+vertex adjacency (with self-loops) raised to ``n_steps`` and normalized so
+each row sums to one, so smoothing any number of maps is a single
+sparse-dense product.
+
+Operators are kept in memory and cached on disk, like the atlas indices of
+``calc.atlas``.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import mne
+import numpy as np
+from mne.datasets import fetch_fsaverage
+from platformdirs import user_cache_dir
+from scipy import sparse
+
+# Template source space whose triangulation defines the vertex neighbours
+_TEMPLATE_SRC = "fsaverage-ico-5-src.fif"
+
+# Operators built in this process, keyed like their cache files
+_SMOOTHING_OPERATORS = {}
+
+
+def make_smoothing_operator(adjacency, n_steps):
+    """
+    Row-normalized ``n_steps`` power of an adjacency matrix.
+
+    Each vertex becomes a weighted mean of the vertices within ``n_steps``
+    edges, weighted by the number of paths reaching them.
+
+    Parameters
+    ----------
+    adjacency : scipy.sparse matrix, shape (n_vertices, n_vertices)
+        Symmetric vertex adjacency. Self-loops are added.
+    n_steps : int
+        Number of neighbour steps each vertex is averaged over.
+
+    Returns
+    -------
+    operator : scipy.sparse.csr_matrix, shape (n_vertices, n_vertices)
+        Smoothing operator, each row summing to one.
+    """
+    step = sparse.csr_matrix(adjacency, dtype=float)
+    step = (step + sparse.identity(step.shape[0], format="csr")).sign()
+    operator = sparse.identity(step.shape[0], format="csr")
+    for _ in range(n_steps):
+        operator = operator @ step
+    row_sums = np.asarray(operator.sum(axis=1)).ravel()
+    return (sparse.diags(1.0 / row_sums) @ operator).tocsr()
+
+
+def _restrict_adjacency(src, vertices):
+    """Adjacency of the source space vertices present in ``vertices``."""
+    adjacency = mne.spatial_src_adjacency(src, verbose=False).tocsr()
+    rows = []
+    offset = 0
+    for hemi_src, hemi_vertices in zip(src, vertices):
+        idx = np.searchsorted(hemi_src["vertno"], hemi_vertices)
+        idx = np.minimum(idx, len(hemi_src["vertno"]) - 1)
+        if not np.array_equal(hemi_src["vertno"][idx], hemi_vertices):
+            raise ValueError("Source estimate vertices are not in the source space")
+        rows.append(idx + offset)
+        offset += len(hemi_src["vertno"])
+    rows = np.concatenate(rows)
+    return adjacency[rows][:, rows]
+
+
+def get_smoothing_operator(
+    vertices,
+    n_steps,
+    subject="fsaverage",
+    subjects_dir=None,
+    src=None,
+    cache_dir=None,
+):
+    """
+    Get the spatial smoothing operator of a surface source space.
+
+    Parameters
+    ----------
+    vertices : list of array | SourceEstimate
+        Left and right hemisphere vertex numbers of the data to smooth, or a
+        source estimate defined on them.
+    n_steps : int
+        Number of neighbour steps each vertex is averaged over.
+    subject : str
+        Subject of the template source space (default: 'fsaverage').
+    subjects_dir : str | None
+        Path to the freesurfer subjects directory. If None, uses fsaverage.
+    src : SourceSpaces | None
+        Source space defining the vertex neighbours. Defaults to the ico-5
+        source space of the subject. Operators of a given source space are
+        not cached.
+    cache_dir : str | None
+        Directory of the on-disk cache. Defaults to the user cache directory.
+
+    Returns
+    -------
+    operator : scipy.sparse.csr_matrix, shape (n_vertices, n_vertices)
+        Smoothing operator; ``operator @ values`` smooths vertex values.
+    """
+    if isinstance(vertices, mne.SourceEstimate):
+        vertices = vertices.vertices
+    vertices = [np.asarray(v) for v in vertices]
+    if src is not None:
+        return make_smoothing_operator(_restrict_adjacency(src, vertices), n_steps)
+
+    if subjects_dir is None:
+        subjects_dir = os.path.dirname(fetch_fsaverage())
+    src_fname = Path(subjects_dir) / subject / "bem" / _TEMPLATE_SRC
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{src_fname.resolve()}|{n_steps}".encode())
+    for hemi_vertices in vertices:
+        digest.update(np.ascontiguousarray(hemi_vertices, dtype=np.int64).tobytes())
+    key = digest.hexdigest()
+
+    if key in _SMOOTHING_OPERATORS:
+        return _SMOOTHING_OPERATORS[key]
+
+    if cache_dir is None:
+        cache_dir = Path(user_cache_dir("autoclean")) / "smoothing"
+    fname = Path(cache_dir) / f"{subject}-smooth{n_steps}-{key}.npz"
+
+    operator = None
+    if fname.exists():
+        try:
+            operator = sparse.load_npz(fname).tocsr()
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"Warning: Ignoring unreadable smoothing operator {fname}: {e}")
+
+    if operator is None:
+        print(f"Building {n_steps}-step smoothing operator for {subject}...")
+        src = mne.read_source_spaces(src_fname, verbose=False)
+        operator = make_smoothing_operator(_restrict_adjacency(src, vertices), n_steps)
+        try:
+            fname.parent.mkdir(parents=True, exist_ok=True)
+            tmp_fname = fname.with_name(f".{fname.stem}-{os.getpid()}.npz")
+            sparse.save_npz(tmp_fname, operator)
+            os.replace(tmp_fname, fname)
+        except OSError as e:
+            print(f"Warning: Could not cache smoothing operator: {e}")
+
+    _SMOOTHING_OPERATORS[key] = operator
+    return operator
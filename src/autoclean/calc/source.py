@@ -1,11 +1,10 @@
-import gc
 import itertools
 import logging
 import os
 import tempfile
 import time
 import traceback
-import warnings
+from pathlib import Path
 
 import h5py
 import matplotlib
@@ -21,10 +20,12 @@ from mne.datasets import fetch_fsaverage
 from mne.filter import filter_data
 from mne.source_estimate import SourceEstimate
 from mne_connectivity import spectral_connectivity_time
-from scipy import signal, stats
+from platformdirs import user_cache_dir
+from scipy import fft as sp_fft
+from scipy import signal
+from scipy.integrate import trapezoid
 from scipy.optimize import curve_fit
 from scipy.signal import find_peaks, hilbert, savgol_filter
-from tqdm import tqdm
 
 # Optional imports with availability flags
 try:
@@ -35,19 +36,147 @@ except ImportError:
     NETWORK_ANALYSIS_AVAILABLE = False
 
 try:
-    from fooof.analysis import get_band_peak_fm
+    from fooof import FOOOF
+    from fooof.analysis.periodic import get_band_peak
 
     FOOOF_AVAILABLE = True
 except ImportError:
     FOOOF_AVAILABLE = False
 
+from autoclean.calc.atlas import get_atlas_index
+from autoclean.calc.fooof_fit import fit_vertex_fooof
+from autoclean.calc.smoothing import get_smoothing_operator
+from autoclean.calc.stc_store import STCStore
 from autoclean.io.export import save_stc_to_file
+from autoclean.utils.step_cache import StepCache, get_step_cache
 
+# Forward model settings of the fsaverage template head
+_TEMPLATE_SRC = "fsaverage-ico-5-src.fif"
+_TEMPLATE_BEM = "fsaverage-5120-5120-5120-bem-sol.fif"
+_FORWARD_MINDIST = 5.0
 
-def estimate_source_function_raw(raw: mne.io.Raw, config: dict = None):
+
+def _source_model_key(info: mne.Info, noise_cov_type: str) -> dict:
+    """
+    Recording properties the template forward and inverse depend on.
+
+    Two recordings with the same channel set, montage, bad channels,
+    projectors, sampling rate and noise covariance share one forward solution
+    and inverse operator, whatever their data.
+    """
+    return {
+        "ch_names": list(info["ch_names"]),
+        "ch_types": info.get_channel_types(),
+        "ch_locs": np.array([ch["loc"][:3] for ch in info["chs"]]),
+        "bads": sorted(info["bads"]),
+        "projs": [(proj["desc"], bool(proj["active"])) for proj in info["projs"]],
+        "sfreq": float(info["sfreq"]),
+        "noise_cov": noise_cov_type,
+        "template": (_TEMPLATE_SRC, _TEMPLATE_BEM, _FORWARD_MINDIST),
+    }
+
+
+def _make_template_forward(info: mne.Info, n_jobs: int = 1) -> mne.Forward:
+    """Compute the forward solution of a recording on the fsaverage template."""
+    fs_dir = fetch_fsaverage()
+    src = mne.read_source_spaces(f"{fs_dir}/bem/{_TEMPLATE_SRC}")
+    bem = mne.read_bem_solution(f"{fs_dir}/bem/{_TEMPLATE_BEM}")
+
+    fwd = mne.make_forward_solution(
+        info,
+        trans="fsaverage",
+        src=src,
+        bem=bem,
+        eeg=True,
+        mindist=_FORWARD_MINDIST,
+        n_jobs=n_jobs,
+    )
+    print("Created forward solution")
+    return fwd
+
+
+def _make_template_inverse(info: mne.Info, fwd: mne.Forward):
+    """Compute the inverse operator with an identity noise covariance."""
+    noise_cov = mne.make_ad_hoc_cov(info)
+    inv = mne.minimum_norm.make_inverse_operator(info, fwd, noise_cov)
+    print("Created inverse operator with identity noise covariance")
+    return inv
+
+
+def get_template_inverse_operator(
+    info: mne.Info,
+    config: dict = None,
+    noise_cov_type: str = "ad_hoc",
+    n_jobs: int = 1,
+    cache_dir=None,
+):
+    """
+    Get the fsaverage inverse operator of a recording, computing it only once.
+
+    For a fixed montage and template head the forward solution and inverse
+    operator are the same for every recording of a study. Both are stored on
+    disk, keyed by channel set, montage, bad channels, projectors, sampling
+    rate and noise covariance type, and later recordings only load them.
+
+    Parameters
+    ----------
+    info : mne.Info
+        Measurement info of the recording, including the average reference
+        projector if one is used.
+    config : dict | None
+        Run configuration. When the run has a step cache
+        (``config["step_cache_dir"]``), the operators are stored there. A
+        run that disabled its step cache computes them every time.
+    noise_cov_type : str
+        Noise covariance of the inverse. Only 'ad_hoc' (identity matrix
+        scaled per channel type) is supported.
+    n_jobs : int
+        Number of jobs used to compute the forward solution.
+    cache_dir : str | Path | None
+        Directory of the cache used without a pipeline configuration.
+        Defaults to the user cache directory of autoclean.
+
+    Returns
+    -------
+    inv : mne.minimum_norm.InverseOperator
+        The inverse operator.
+    """
+    if noise_cov_type != "ad_hoc":
+        raise ValueError(f"Unsupported noise covariance type '{noise_cov_type}'")
+
+    cache = get_step_cache(config)
+    if cache is None and config is not None and "step_cache_dir" in config:
+        # The pipeline runs without a cache (use_cache=False)
+        return _make_template_inverse(info, _make_template_forward(info, n_jobs))
+    if cache is None:
+        if cache_dir is None:
+            cache_dir = Path(user_cache_dir("autoclean")) / "source"
+        cache = StepCache(cache_dir)
+
+    # Only the key fields are hashed, the closures read info itself
+    key = _source_model_key(info, noise_cov_type)
+
+    def make_inverse(**_):
+        fwd = cache.call(
+            "forward_solution",
+            lambda **_: _make_template_forward(info, n_jobs),
+            serializer="forward",
+            **key,
+        )
+        return _make_template_inverse(info, fwd)
+
+    return cache.call("inverse_operator", make_inverse, serializer="inverse", **key)
+
+
+def estimate_source_function_raw(
+    raw: mne.io.Raw, config: dict = None, dtype: str = "float64"
+):
     """
     Perform source localization on continuous resting-state EEG data using an identity matrix
     for noise covariance, keeping it as raw data.
+
+    With ``dtype="float32"`` the source time courses are kept in single
+    precision, halving the memory of the returned estimate.
     """
     # --------------------------------------------------------------------------
     # Preprocessing for Source Localization
@@ -57,28 +186,19 @@ def estimate_source_function_raw(raw: mne.io.Raw, config: dict = None):
     raw.set_eeg_reference("average", projection=True)
     print("Set EEG reference to average")
 
-    noise_cov = mne.make_ad_hoc_cov(raw.info)
     print("Using an identity matrix for noise covariance")
 
     # --------------------------------------------------------------------------
     # Source Localization Setup
     # --------------------------------------------------------------------------
-    fs_dir = fetch_fsaverage()
-    trans = "fsaverage"
-    src = mne.read_source_spaces(f"{fs_dir}/bem/fsaverage-ico-5-src.fif")
-    bem = mne.read_bem_solution(f"{fs_dir}/bem/fsaverage-5120-5120-5120-bem-sol.fif")
-
-    fwd = mne.make_forward_solution(
-        raw.info, trans=trans, src=src, bem=bem, eeg=True, mindist=5.0, n_jobs=10
-    )
-    print("Created forward solution")
-
-    inv = mne.minimum_norm.make_inverse_operator(raw.info, fwd, noise_cov)
-    print("Created inverse operator with identity noise covariance")
+    # Forward solution and inverse operator are shared by all recordings with
+    # the same montage and channel set, and cached across the study
+    inv = get_template_inverse_operator(raw.info, config, noise_cov_type="ad_hoc")
 
     stc = mne.minimum_norm.apply_inverse_raw(
         raw, inv, lambda2=1.0 / 9.0, method="MNE", pick_ori="normal", verbose=True
     )
+    stc.data = stc.data.astype(dtype, copy=False)
 
     # mne.viz.plot_alignment(
     #     raw.info,
@@ -100,10 +220,16 @@ def estimate_source_function_raw(raw: mne.io.Raw, config: dict = None):
     return stc
 
 
-def estimate_source_function_epochs(epochs: mne.Epochs, config: dict = None):
+def estimate_source_function_epochs(
+    epochs: mne.Epochs, config: dict = None, dtype: str = "float64"
+):
     """
     Perform source localization on epoched EEG data using an identity matrix
     for noise covariance.
+
+    With ``dtype="float32"`` each epoch is converted to single precision as
+    soon as it is computed, so the float64 estimates of all epochs are never
+    held at once.
     """
     # --------------------------------------------------------------------------
     # Preprocessing for Source Localization
@@ -113,28 +239,27 @@ def estimate_source_function_epochs(epochs: mne.Epochs, config: dict = None):
     epochs.set_eeg_reference("average", projection=True)
     print("Set EEG reference to average")
 
-    noise_cov = mne.make_ad_hoc_cov(epochs.info)
     print("Using an identity matrix for noise covariance")
 
     # --------------------------------------------------------------------------
     # Source Localization Setup
     # --------------------------------------------------------------------------
-    fs_dir = fetch_fsaverage()
-    trans = "fsaverage"
-    src = mne.read_source_spaces(f"{fs_dir}/bem/fsaverage-ico-5-src.fif")
-    bem = mne.read_bem_solution(f"{fs_dir}/bem/fsaverage-5120-5120-5120-bem-sol.fif")
-
-    fwd = mne.make_forward_solution(
-        epochs.info, trans=trans, src=src, bem=bem, eeg=True, mindist=5.0, n_jobs=10
-    )
-    print("Created forward solution")
-
-    inv = mne.minimum_norm.make_inverse_operator(epochs.info, fwd, noise_cov)
-    print("Created inverse operator with identity noise covariance")
-
-    stc = mne.minimum_norm.apply_inverse_epochs(
-        epochs, inv, lambda2=1.0 / 9.0, method="MNE", pick_ori="normal", verbose=True
-    )
+    # Forward solution and inverse operator are shared by all recordings with
+    # the same montage and channel set, and cached across the study
+    inv = get_template_inverse_operator(epochs.info, config, noise_cov_type="ad_hoc")
+
+    stc = []
+    for stc_epoch in mne.minimum_norm.apply_inverse_epochs(
+        epochs,
+        inv,
+        lambda2=1.0 / 9.0,
+        method="MNE",
+        pick_ori="normal",
+        return_generator=True,
+        verbose=True,
+    ):
+        stc_epoch.data = stc_epoch.data.astype(dtype, copy=False)
+        stc.append(stc_epoch)
 
     print(
         "Computed source estimates for epochs using MNE with identity noise covariance"
@@ -156,6 +281,198 @@ def estimate_source_function_epochs(epochs: mne.Epochs, config: dict = None):
     return stc
 
 
+# Bytes of working memory per vertex and time sample of float64 data while a
+# block is transformed (the block, its overlapping segments and their
+# spectra), used to size chunks of vertices
+_PSD_BYTES_PER_SAMPLE = {"welch": 8 * 8, "multitaper": 8 * 24}
+
+
+def _welch_psd(block, sfreq, nperseg, noverlap, window="hann", detrend="constant"):
+    """
+    Welch PSD of each row of a 2D array.
+
+    Matches ``scipy.signal.welch(block, axis=-1, scaling="density")`` for
+    real input, but works on a strided view of all segments at once instead
+    of going through scipy's short-time FFT machinery. A float32 block is
+    transformed in single precision; the power is summed over segments and
+    returned in float64.
+    """
+    step = nperseg - noverlap
+    segments = np.lib.stride_tricks.sliding_window_view(block, nperseg, axis=-1)[
+        :, ::step
+    ]
+    win = signal.get_window(window, nperseg).astype(
+        np.result_type(block.dtype, np.float32)
+    )
+
+    if detrend == "constant":
+        segments = segments - segments.mean(axis=-1, keepdims=True)
+    elif detrend:
+        segments = signal.detrend(segments, type=detrend, axis=-1)
+    else:
+        segments = segments.copy()
+    segments *= win
+
+    spectra = sp_fft.rfft(segments, axis=-1, overwrite_x=True)
+    del segments
+
+    # Mean over segments of the squared real and imaginary parts
+    parts = spectra.view(win.dtype)
+    power = np.einsum("vsk,vsk->vk", parts, parts, dtype=np.float64)
+    power = power.reshape(len(block), -1, 2).sum(-1)
+    psd = power / (spectra.shape[1] * sfreq * (win * win).sum())
+
+    # One-sided spectrum, DC and Nyquist are not doubled
+    if nperseg % 2:
+        psd[:, 1:] *= 2
+    else:
+        psd[:, 1:-1] *= 2
+
+    return sp_fft.rfftfreq(nperseg, 1 / sfreq), psd
+
+
+def compute_vertex_psd(
+    data,
+    sfreq,
+    fmin=None,
+    fmax=None,
+    method="welch",
+    nperseg=None,
+    noverlap=None,
+    window="hann",
+    detrend="constant",
+    preprocess=None,
+    n_jobs=1,
+    max_chunk_mb=256,
+    dtype=None,
+):
+    """
+    Compute power spectral densities of many vertices at once.
+
+    Spectra are computed on blocks of vertices with a single vectorized call
+    instead of one call per vertex. Blocks are sized so the working memory of
+    each job stays below ``max_chunk_mb``.
+
+    Parameters
+    ----------
+    data : array, shape (n_vertices, n_times) | list of arrays | STCStore
+        Source time courses. A list of arrays (e.g. one per epoch) or the
+        epochs of a store are concatenated along time, one block of vertices
+        at a time.
+    sfreq : float
+        Sampling frequency of the data.
+    fmin, fmax : float | None
+        Frequency range to return. None returns all frequencies.
+    method : str
+        'welch' (``scipy.signal.welch``) or 'multitaper'
+        (``mne.time_frequency.psd_array_multitaper``).
+    nperseg : int | None
+        Welch segment length in samples. Defaults to 4 seconds.
+    noverlap : int | None
+        Welch segment overlap in samples. Defaults to half a segment.
+    window : str
+        Welch window.
+    detrend : str | False
+        Welch per-segment detrending.
+    preprocess : callable | None
+        Function applied to each block of shape (n_block_vertices, n_times)
+        before the spectra are computed, returning the block to use.
+    n_jobs : int
+        Number of blocks processed in parallel (threads).
+    max_chunk_mb : float
+        Working memory per job in megabytes.
+    dtype : str | None
+        Precision of the transforms, 'float32' or 'float64'. Blocks are
+        converted as they are read. None uses float32 for float32 data and
+        float64 otherwise. The PSD is always returned in float64. Multitaper
+        transforms are computed in float64 regardless.
+
+    Returns
+    -------
+    freqs : array, shape (n_freqs,)
+        Frequencies of the PSD.
+    psd : array, shape (n_vertices, n_freqs)
+        Power spectral density of each vertex.
+    """
+    if method not in _PSD_BYTES_PER_SAMPLE:
+        raise ValueError(f"Unknown PSD method '{method}', use 'welch' or 'multitaper'")
+
+    if isinstance(data, STCStore):
+        segments = data
+        n_vertices = data.n_vertices
+        n_times = len(data) * data.n_times
+        data_dtype = data.dtype
+    else:
+        segments = data if isinstance(data, (list, tuple)) else [data]
+        n_vertices = segments[0].shape[0]
+        n_times = sum(segment.shape[1] for segment in segments)
+        data_dtype = np.asarray(segments[0][:0]).dtype
+    if dtype is None:
+        dtype = np.float32 if data_dtype == np.float32 else np.float64
+    dtype = np.dtype(dtype)
+
+    if nperseg is None:
+        nperseg = int(4 * sfreq)
+    nperseg = min(nperseg, n_times)
+    if noverlap is None:
+        noverlap = nperseg // 2
+
+    bytes_per_sample = _PSD_BYTES_PER_SAMPLE[method]
+    if method == "welch":
+        # Multitaper computes in float64 whatever the input precision
+        bytes_per_sample = bytes_per_sample * dtype.itemsize // 8
+    bytes_per_vertex = n_times * bytes_per_sample
+    chunk_size = int(
+        max(1, min(n_vertices, max_chunk_mb * 1024**2 // bytes_per_vertex))
+    )
+    chunks = [
+        slice(start, min(start + chunk_size, n_vertices))
+        for start in range(0, n_vertices, chunk_size)
+    ]
+
+    def process_chunk(chunk):
+        if isinstance(segments, STCStore):
+            block = segments.read_vertices(chunk)
+        elif len(segments) == 1:
+            block = segments[0][chunk]
+        else:
+            block = np.concatenate([segment[chunk] for segment in segments], axis=1)
+        block = block.astype(dtype, copy=False)
+        if preprocess is not None:
+            block = preprocess(block)
+
+        if method == "welch":
+            freqs, psd = _welch_psd(block, sfreq, nperseg, noverlap, window, detrend)
+            freq_mask = np.ones(len(freqs), dtype=bool)
+            if fmin is not None:
+                freq_mask &= freqs >= fmin
+            if fmax is not None:
+                freq_mask &= freqs <= fmax
+            return freqs[freq_mask], psd[:, freq_mask]
+
+        psd, freqs = mne.time_frequency.psd_array_multitaper(
+            block,
+            sfreq,
+            fmin=0 if fmin is None else fmin,
+            fmax=np.inf if fmax is None else fmax,
+            n_jobs=1,
+            verbose=False,
+        )
+        return freqs, psd
+
+    if n_jobs == 1 or len(chunks) == 1:
+        results = [process_chunk(chunk) for chunk in chunks]
+    else:
+        # FFTs release the GIL, threads avoid copying the data to workers
+        results = Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(process_chunk)(chunk) for chunk in chunks
+        )
+
+    freqs = results[0][0]
+    psd = np.concatenate([chunk_psd for _, chunk_psd in results], axis=0)
+    return freqs, psd
+
+
 def calculate_source_psd(
     stc,
     subjects_dir=None,
@@ -163,6 +480,7 @@ def calculate_source_psd(
     n_jobs=4,
     output_dir=None,
     subject_id=None,
+    dtype=None,
 ):
     """
     Calculate power spectral density (PSD) from resting-state source estimates using Welch's method,
@@ -182,6 +500,9 @@ def calculate_source_psd(
         Directory to save output files. If None, saves in current directory
     subject_id : str | None
         Subject identifier for file naming
+    dtype : str | None
+        Precision of the spectral transforms ('float32' or 'float64'), see
+        ``compute_vertex_psd``. None follows the source data.
 
     Returns
     -------
@@ -215,113 +536,35 @@ def calculate_source_psd(
     window_length = int(4 * sfreq)  # 4-second windows
     n_overlap = window_length // 2  # 50% overlap
 
-    # For multitaper, we'll use mne's implementation directly which handles this correctly
-
-    # First, calculate frequencies that will be generated
-    # We'll use a helper call to get the frequency axis
-    freqs = np.fft.rfftfreq(window_length, 1 / sfreq)
-    freq_mask = (freqs >= fmin) & (freqs <= fmax)
-    freqs = freqs[freq_mask]
-
-    # Initialize PSD array
-    n_vertices = data.shape[0]
-    psd = np.zeros((n_vertices, len(freqs)))
-
-    # Function to process a batch of vertices
-    def process_batch(vertices_idx):
-        batch_psd = np.zeros((len(vertices_idx), len(freqs)))
-
-        for i, vertex_idx in enumerate(vertices_idx):
-            # Use standard Welch method for stability
-            f, Pxx = signal.welch(
-                data[vertex_idx],
-                fs=sfreq,
-                window="hann",  # Hann window is more stable than multitaper for this
-                nperseg=window_length,
-                noverlap=n_overlap,
-                nfft=None,
-                scaling="density",
-            )
-
-            # Store PSD for frequencies in our range
-            batch_psd[i] = Pxx[freq_mask]
-
-        return batch_psd
-
-    # Process in batches to avoid memory issues with large source spaces
-    batch_size = 1000
-    n_batches = int(np.ceil(n_vertices / batch_size))
-
-    for batch_idx in range(n_batches):
-        start_idx = batch_idx * batch_size
-        end_idx = min((batch_idx + 1) * batch_size, n_vertices)
-
-        print(
-            f"Processing batch {batch_idx + 1}/{n_batches}, vertices {start_idx}-{end_idx}"
-        )
-
-        # Get vertices for this batch
-        vertices_idx = range(start_idx, end_idx)
-
-        # Process batch
-        batch_psd = process_batch(vertices_idx)
-
-        # Store in main PSD array
-        psd[start_idx:end_idx] = batch_psd
+    # Hann-window Welch on blocks of vertices
+    freqs, psd = compute_vertex_psd(
+        data,
+        sfreq,
+        fmin=fmin,
+        fmax=fmax,
+        nperseg=window_length,
+        noverlap=n_overlap,
+        n_jobs=n_jobs,
+        dtype=dtype,
+    )
 
     print(f"PSD calculation complete. Shape: {psd.shape}, frequencies: {freqs.shape}")
     print(f"Frequency range: {freqs[0]:.1f} - {freqs[-1]:.1f} Hz")
 
-    # Load Desikan-Killiany atlas labels
-    print("Loading Desikan-Killiany atlas labels...")
-    labels = mne.read_labels_from_annot(
-        subject, parc="aparc", subjects_dir=subjects_dir
-    )
-
-    # Remove 'unknown' labels
-    labels = [label for label in labels if "unknown" not in label.name]
-
-    # Initialize dataframe for ROI-averaged PSDs
-    roi_psds = []
-
-    # Process each label/ROI
+    # Average PSD within Desikan-Killiany ROIs with one sparse product
     print("Averaging PSD within anatomical ROIs...")
-    for label in labels:
-        # Get vertices in this label
-        label_verts = label.get_vertices_used()
-
-        # Find indices of these vertices in the stc
-        if label.hemi == "lh":
-            # Left hemisphere
-            stc_idx = np.where(np.in1d(stc.vertices[0], label_verts))[0]
-        else:
-            # Right hemisphere
-            stc_idx = np.where(np.in1d(stc.vertices[1], label_verts))[0] + len(
-                stc.vertices[0]
-            )
-
-        # Skip if no vertices found
-        if len(stc_idx) == 0:
-            print(f"Warning: No vertices found for label {label.name}")
-            continue
-
-        # Calculate mean PSD across vertices in this ROI
-        roi_psd = np.mean(psd[stc_idx, :], axis=0)
-
-        # Add to dataframe
-        for freq_idx, freq in enumerate(freqs):
-            roi_psds.append(
-                {
-                    "subject": subject_id,
-                    "roi": label.name,
-                    "hemisphere": label.hemi,
-                    "frequency": freq,
-                    "psd": roi_psd[freq_idx],
-                }
-            )
-
-    # Create dataframe
-    psd_df = pd.DataFrame(roi_psds)
+    atlas = get_atlas_index(stc, subject=subject, subjects_dir=subjects_dir)
+    roi_psd = atlas.apply(psd)
+
+    psd_df = pd.DataFrame(
+        {
+            "subject": subject_id,
+            "roi": np.repeat(atlas.names, len(freqs)),
+            "hemisphere": np.repeat(atlas.hemis, len(freqs)),
+            "frequency": np.tile(freqs, atlas.n_rois),
+            "psd": roi_psd.ravel(),
+        }
+    )
 
     # Save to file
     file_path = os.path.join(output_dir, f"{subject_id}_roi_psd.parquet")
@@ -375,6 +618,18 @@ def calculate_source_psd(
     return psd_df, file_path
 
 
+def _stc_template(stcs):
+    """Object holding the vertices and timing of a list or store of stcs."""
+    return stcs if isinstance(stcs, STCStore) else stcs[0]
+
+
+def _vertex_rows(data, rows):
+    """Rows of a list of (n_vertices, n_times) arrays or a store, over all time."""
+    if isinstance(data, STCStore):
+        return data.read_vertices(rows)
+    return np.concatenate([segment[rows] for segment in data], axis=1)
+
+
 def calculate_source_psd_list(
     stc_list,
     subjects_dir=None,
@@ -384,6 +639,7 @@ def calculate_source_psd_list(
     subject_id=None,
     generate_plots=True,
     segment_duration=80,
+    dtype=None,
 ):
     """
     Optimized function to calculate power spectral density (PSD) from source estimates.
@@ -391,8 +647,9 @@ def calculate_source_psd_list(
 
     Parameters
     ----------
-    stc_list : instance of SourceEstimate or list of SourceEstimates
-        The source time course(s) to calculate PSD from.
+    stc_list : instance of SourceEstimate, list of SourceEstimates or STCStore
+        The source time course(s) to calculate PSD from. A store is read one
+        block of vertices at a time instead of being loaded into memory.
     subjects_dir : str | None
         Path to the freesurfer subjects directory. If None, uses the environment variable
     subject : str
@@ -408,6 +665,9 @@ def calculate_source_psd_list(
     segment_duration : float or None
         Duration in seconds to process. If None, processes the entire data.
         Default is 80 seconds for optimal balance of accuracy and performance.
+    dtype : str | None
+        Precision of the spectral transforms ('float32' or 'float64'), see
+        ``compute_vertex_psd``. None follows the source data.
 
     Returns
     -------
@@ -435,13 +695,14 @@ def calculate_source_psd_list(
         subject_id = "unknown_subject"
 
     # Convert single stc to list for consistency
-    if not isinstance(stc_list, list):
+    if not isinstance(stc_list, (list, STCStore)):
         stc_list = [stc_list]
 
     # Determine the total available signal duration
-    epoch_duration = stc_list[0].times[-1] - stc_list[0].times[0]
+    template = _stc_template(stc_list)
+    epoch_duration = template.times[-1] - template.times[0]
     total_duration = epoch_duration * len(stc_list)
-    sfreq = stc_list[0].sfreq
+    sfreq = template.sfreq
 
     print(
         f"Total available signal: {total_duration:.1f} seconds ({len(stc_list)} epochs of {epoch_duration:.1f}s each)"
@@ -472,7 +733,12 @@ def calculate_source_psd_list(
     fmax = 45.0
 
     # Get data shape and sampling frequency
-    n_vertices = selected_stcs[0].data.shape[0]
+    if isinstance(selected_stcs, STCStore):
+        data = selected_stcs
+        n_vertices = data.n_vertices
+    else:
+        data = [stc.data for stc in selected_stcs]
+        n_vertices = data[0].shape[0]
 
     # Determine optimal window length - adaptive based on available data
     available_duration = len(selected_stcs) * epoch_duration
@@ -511,10 +777,9 @@ def calculate_source_psd_list(
     sample_size = min(1000, n_vertices)
     sample_indices = np.linspace(0, n_vertices - 1, sample_size, dtype=int)
 
-    vertex_variance = np.zeros(sample_size)
-    for i, vertex_idx in enumerate(sample_indices):
-        vertex_data = np.concatenate([stc.data[vertex_idx] for stc in selected_stcs])
-        vertex_variance[i] = np.var(vertex_data)
+    vertex_variance = np.var(
+        _vertex_rows(data, sample_indices), axis=1, dtype=np.float64
+    )
 
     # Set threshold at 10th percentile of non-zero variances
     non_zero_vars = vertex_variance[vertex_variance > 0]
@@ -525,95 +790,42 @@ def calculate_source_psd_list(
 
     print(f"Variance threshold set to {var_threshold:.3e}")
 
-    # Define batch processing function
-    def process_vertex_batch(batch_indices):
-        n_batch_vertices = len(batch_indices)
-        batch_psd = np.zeros((n_batch_vertices, len(freqs)))
-
-        # For visualization
-        viz_vertices = []
-        viz_psds = []
-
-        for i, vertex_idx in enumerate(batch_indices):
-            # Quick check for very large batches
-            if i % 1000 == 0 and i > 0:
-                print(f"  Processed {i}/{n_batch_vertices} vertices in current batch")
-
-            try:
-                # Concatenate data from all selected epochs for this vertex
-                vertex_data = np.concatenate(
-                    [stc.data[vertex_idx] for stc in selected_stcs]
-                )
-
-                # Skip if variance is below threshold
-                if np.var(vertex_data) < var_threshold:
-                    continue
-
-                # Detrend and apply window in-place to save memory
-                vertex_data = signal.detrend(vertex_data)
-                vertex_data *= np.hanning(len(vertex_data))
-
-                # Calculate PSD using Welch's method
-                f, Pxx = signal.welch(
-                    vertex_data,
-                    fs=sfreq,
-                    window="hann",
-                    nperseg=window_length,
-                    noverlap=n_overlap,
-                    nfft=None,
-                    scaling="density",
-                    detrend=False,  # Already detrended
-                )
-
-                # Store PSD for frequencies in our range
-                batch_psd[i] = Pxx[freq_mask]
-
-                # Store data for visualization (only for a few vertices)
-                if generate_plots and vertex_idx % 5000 == 0:
-                    viz_vertices.append(vertex_idx)
-                    viz_psds.append((f, Pxx))
+    def prepare_block(block):
+        # Detrend and taper the whole recording of each vertex, leaving
+        # low-variance vertices at zero power
+        inactive = np.var(block, axis=1, dtype=np.float64) < var_threshold
+        block = signal.detrend(block, axis=-1)
+        block *= np.hanning(block.shape[1])
+        block[inactive] = 0
+        return block
 
-            except Exception as e:
-                print(f"Error processing vertex {vertex_idx}: {str(e)}")
-
-        return batch_psd, viz_vertices, viz_psds
-
-    # Determine optimal batch size based on available memory and number of jobs
-    batch_size = min(5000, max(1000, n_vertices // (n_jobs * 2)))
-    n_batches = int(np.ceil(n_vertices / batch_size))
-
-    print(
-        f"Processing {n_vertices} vertices in {n_batches} batches of size {batch_size}..."
+    welch_kwargs = dict(
+        nperseg=window_length,
+        noverlap=n_overlap,
+        detrend=False,  # Already detrended
+        preprocess=prepare_block,
+        dtype=dtype,
     )
 
-    # Create batches
-    batch_indices = [
-        range(i * batch_size, min((i + 1) * batch_size, n_vertices))
-        for i in range(n_batches)
-    ]
-
-    # Process batches in parallel
+    print(f"Processing {n_vertices} vertices in blocks...")
     batch_start = time.time()
-    results = Parallel(n_jobs=n_jobs)(
-        delayed(process_vertex_batch)(indices) for indices in batch_indices
+    _, psd = compute_vertex_psd(
+        data, sfreq, fmin=fmin, fmax=fmax, n_jobs=n_jobs, **welch_kwargs
     )
     print(f"Batch processing completed in {time.time() - batch_start:.1f} seconds")
 
-    # Initialize PSD array
-    psd = np.zeros((n_vertices, len(freqs)))
-
-    # Collect visualization data
+    # Full spectra of a few active vertices for visualization
     all_viz_vertices = []
     all_viz_psds = []
-
-    # Combine results
-    for batch_idx, (batch_psd, viz_vertices, viz_psds) in enumerate(results):
-        start_idx = batch_idx * batch_size
-        end_idx = min((batch_idx + 1) * batch_size, n_vertices)
-        psd[start_idx:end_idx] = batch_psd
-
-        all_viz_vertices.extend(viz_vertices)
-        all_viz_psds.extend(viz_psds)
+    if generate_plots:
+        viz_candidates = np.arange(0, n_vertices, 5000)
+        viz_candidates = viz_candidates[np.any(psd[viz_candidates] != 0, axis=1)]
+        if len(viz_candidates):
+            f, viz_psd = compute_vertex_psd(
+                _vertex_rows(data, viz_candidates), sfreq, **welch_kwargs
+            )
+            all_viz_vertices = list(viz_candidates)
+            all_viz_psds = [(f, vertex_psd) for vertex_psd in viz_psd]
 
     print(f"PSD calculation complete in {time.time() - start_time:.1f} seconds")
 
@@ -646,96 +858,46 @@ def calculate_source_psd_list(
             for vertex_idx, f_pxx in zip(all_viz_vertices, all_viz_psds)
         )
 
-    # Load Desikan-Killiany atlas labels
-    print("Loading Desikan-Killiany atlas labels...")
-    labels = mne.read_labels_from_annot(
-        subject, parc="aparc", subjects_dir=subjects_dir
+    # Average PSD within Desikan-Killiany ROIs with one sparse product
+    print("Averaging PSD within anatomical ROIs...")
+    atlas = get_atlas_index(
+        _stc_template(selected_stcs), subject=subject, subjects_dir=subjects_dir
+    )
+    roi_psd = atlas.apply(psd)
+
+    psd_df = pd.DataFrame(
+        {
+            "subject": subject_id,
+            "roi": np.repeat(atlas.names, len(freqs)),
+            "hemisphere": np.repeat(atlas.hemis, len(freqs)),
+            "frequency": np.tile(freqs, atlas.n_rois),
+            "psd": roi_psd.ravel(),
+        }
     )
-    labels = [label for label in labels if "unknown" not in label.name]
-
-    # Function to process a single ROI/label
-    def process_label(label_idx):
-        label = labels[label_idx]
-
-        # Get vertices in this label
-        label_verts = label.get_vertices_used()
-
-        # Find indices of these vertices in the stc
-        if label.hemi == "lh":
-            # Left hemisphere
-            stc_idx = np.where(np.in1d(selected_stcs[0].vertices[0], label_verts))[0]
-        else:
-            # Right hemisphere
-            stc_idx = np.where(np.in1d(selected_stcs[0].vertices[1], label_verts))[
-                0
-            ] + len(selected_stcs[0].vertices[0])
-
-        # Skip if no vertices found
-        if len(stc_idx) == 0:
-            print(f"Warning: No vertices found for label {label.name}")
-            return None
-
-        # Calculate mean PSD across vertices in this ROI
-        roi_psd = np.mean(psd[stc_idx, :], axis=0)
-
-        # Directly calculate band powers
-        band_powers = {}
-        for band_name, indices in band_indices.items():
-            if len(indices) > 0:
-                band_powers[band_name] = np.mean(roi_psd[indices])
-            else:
-                band_powers[band_name] = 0
-
-        # Create row for PSD dataframe
-        roi_psd_data = []
-        for freq_idx, freq in enumerate(freqs):
-            roi_psd_data.append(
-                {
-                    "subject": subject_id,
-                    "roi": label.name,
-                    "hemisphere": label.hemi,
-                    "frequency": freq,
-                    "psd": roi_psd[freq_idx],
-                }
-            )
 
-        # Create rows for band power dataframe
-        band_data = []
-        for band_name, power in band_powers.items():
-            band_min, band_max = bands[band_name]
-            band_data.append(
+    # Band power is the mean ROI PSD over the band's frequencies
+    band_frames = []
+    for band_name, indices in band_indices.items():
+        band_min, band_max = bands[band_name]
+        band_frames.append(
+            pd.DataFrame(
                 {
                     "subject": subject_id,
-                    "roi": label.name,
-                    "hemisphere": label.hemi,
+                    "roi": atlas.names,
+                    "hemisphere": atlas.hemis,
                     "band": band_name,
                     "band_start_hz": band_min,
                     "band_end_hz": band_max,
-                    "power": power,
+                    "power": (
+                        roi_psd[:, indices].mean(axis=1)
+                        if len(indices) > 0
+                        else np.zeros(atlas.n_rois)
+                    ),
                 }
             )
-
-        return roi_psd_data, band_data
-
-    # Process all labels in parallel
-    print(f"Processing {len(labels)} ROIs in parallel...")
-    roi_results = Parallel(n_jobs=n_jobs)(
-        delayed(process_label)(i) for i in range(len(labels))
-    )
-
-    # Combine results
-    roi_psds = []
-    band_psds = []
-
-    for result in roi_results:
-        if result is not None:
-            roi_psd_data, band_data = result
-            roi_psds.extend(roi_psd_data)
-            band_psds.extend(band_data)
-
-    # Create dataframes
-    psd_df = pd.DataFrame(roi_psds)
-    band_df = pd.DataFrame(band_psds)
+        )
+    # Rows ordered by ROI, then band
+    band_df = pd.concat(band_frames).sort_index(kind="stable").reset_index(drop=True)
 
     # Save to files
     file_path = os.path.join(output_dir, f"{subject_id}_roi_psd.parquet")
@@ -1053,6 +1215,73 @@ def visualize_psd_results(psd_df, output_dir=None, subject_id=None):
     return fig
 
 
+def _zscore(x, axis=-1):
+    """Z-score along an axis (population standard deviation)."""
+    x = x - x.mean(axis=axis, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return x / np.sqrt((x * x).mean(axis=axis, keepdims=True))
+
+
+def compute_aec(data, sfreq, band_range, orthogonalize=False):
+    """
+    Amplitude envelope correlation between all pairs of signals.
+
+    The band-limited envelopes of every epoch are z-scored once, so the whole
+    correlation matrix of an epoch is a single matrix product instead of one
+    ``np.corrcoef`` call per pair.
+
+    Parameters
+    ----------
+    data : array, shape (n_epochs, n_signals, n_times) | (n_signals, n_times)
+        ROI time courses.
+    sfreq : float
+        Sampling frequency of the data.
+    band_range : tuple of float
+        Lower and upper edge of the frequency band.
+    orthogonalize : bool
+        If True, compute leakage-corrected AEC: each target signal is
+        orthogonalized to the seed (Hipp et al., 2012) before its envelope is
+        correlated with the seed envelope, and the matrix is averaged with its
+        transpose.
+
+    Returns
+    -------
+    aec : array, shape (n_epochs, n_signals, n_signals) | (n_signals, n_signals)
+        AEC matrices with a zero diagonal.
+    """
+    data = np.asarray(data)
+    single = data.ndim == 2
+    if single:
+        data = data[np.newaxis]
+    n_times = data.shape[-1]
+
+    filtered = filter_data(
+        data, sfreq=sfreq, l_freq=band_range[0], h_freq=band_range[1], verbose=False
+    )
+    analytic = hilbert(filtered, axis=-1)
+    envelope = _zscore(np.abs(analytic))
+
+    if not orthogonalize:
+        aec = np.matmul(envelope, envelope.transpose(0, 2, 1)) / n_times
+    else:
+        aec = np.empty(data.shape[:2] + data.shape[1:2])
+        for epoch_idx, epoch_analytic in enumerate(analytic):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                unit = epoch_analytic / np.abs(epoch_analytic)
+            # orth[i, j]: envelope of signal j orthogonalized to seed i
+            orth = np.abs(
+                np.imag(epoch_analytic[np.newaxis] * np.conj(unit)[:, np.newaxis])
+            )
+            aec[epoch_idx] = (
+                np.einsum("it,ijt->ij", envelope[epoch_idx], _zscore(orth)) / n_times
+            )
+        aec = (aec + aec.transpose(0, 2, 1)) / 2
+
+    diag = np.arange(aec.shape[-1])
+    aec[:, diag, diag] = 0
+    return aec[0] if single else aec
+
+
 def calculate_source_connectivity(
     stc,
     labels=None,
@@ -1146,12 +1375,10 @@ def calculate_source_connectivity(
     # For AEC we'll need to handle it separately since it's not part of spectral_connectivity_time
     include_aec = True
 
-    if labels is None:
-        logger.info("Loading Desikan-Killiany atlas labels...")
-        labels = mne.read_labels_from_annot(
-            subject, parc="aparc", subjects_dir=subjects_dir
-        )
-        labels = [label for label in labels if "unknown" not in label.name]
+    # Desikan-Killiany atlas unless labels are given
+    atlas = get_atlas_index(
+        stc, subject=subject, subjects_dir=subjects_dir, labels=labels
+    )
 
     selected_rois = [
         "precentral-lh",
@@ -1163,24 +1390,17 @@ def calculate_source_connectivity(
         "caudalmiddlefrontal-lh",
         "caudalmiddlefrontal-rh",
     ]
-    label_names = [label.name for label in labels]
-    selected_labels = [
-        labels[label_names.index(roi)] for roi in selected_rois if roi in label_names
-    ]
-    if not selected_labels:
+    roi_atlas = atlas.select(selected_rois)
+    if roi_atlas.n_rois == 0:
         logger.warning("No selected ROIs found, using all available labels")
-        selected_labels = labels
-        selected_rois = label_names
-    logger.info(f"Using {len(selected_labels)} selected ROIs: {selected_rois}")
+        roi_atlas = atlas
+    selected_rois = roi_atlas.names
+    logger.info(f"Using {roi_atlas.n_rois} selected ROIs: {selected_rois}")
 
     roi_pairs = list(itertools.combinations(range(len(selected_rois)), 2))
 
     logger.info("Extracting ROI time courses...")
-    roi_time_courses = [
-        stc.extract_label_time_course(label, src=None, mode="mean", verbose=False)[0]
-        for label in selected_labels
-    ]
-    roi_data = np.array(roi_time_courses)
+    roi_data = roi_atlas.apply(stc)
     logger.info(f"ROI data shape: {roi_data.shape}")
 
     n_times = roi_data.shape[1]
@@ -1204,35 +1424,6 @@ def calculate_source_connectivity(
     connectivity_data = []
     logger.info("Calculating connectivity metrics...")
 
-    # Function to calculate AEC
-    def calculate_aec(data, band_range, sfreq):
-        import numpy as np
-        from mne.filter import filter_data
-        from scipy.signal import hilbert
-
-        # Filter the data for the specific frequency band
-        filtered_data = filter_data(
-            data, sfreq=sfreq, l_freq=band_range[0], h_freq=band_range[1], verbose=False
-        )
-
-        # Get the amplitude envelope using Hilbert transform
-        analytic_signal = hilbert(filtered_data, axis=-1)
-        amplitude_envelope = np.abs(analytic_signal)
-
-        # Compute correlation between envelopes
-        n_signals = amplitude_envelope.shape[0]
-        aec_matrix = np.zeros((n_signals, n_signals))
-
-        for i in range(n_signals):
-            for j in range(n_signals):
-                if i != j:
-                    corr = np.corrcoef(amplitude_envelope[i], amplitude_envelope[j])[
-                        0, 1
-                    ]
-                    aec_matrix[i, j] = corr
-
-        return aec_matrix
-
     # Calculate spectral connectivity methods
     for method in conn_methods:
         for band_name, band_range in bands.items():
@@ -1309,15 +1500,8 @@ def calculate_source_connectivity(
         for band_name, band_range in bands.items():
             logger.info(f"Computing {method} connectivity in {band_name} band...")
             try:
-                # For each epoch, calculate AEC, then average
-                aec_matrices = []
-                for epoch_idx in range(epoched_data.shape[0]):
-                    epoch_data = epoched_data[epoch_idx]
-                    aec_matrix = calculate_aec(epoch_data, band_range, sfreq)
-                    aec_matrices.append(aec_matrix)
-
-                # Average across epochs
-                con_matrix = np.mean(aec_matrices, axis=0)
+                # AEC of every epoch, averaged across epochs
+                con_matrix = compute_aec(epoched_data, sfreq, band_range).mean(axis=0)
 
                 # Debug: Print con_matrix to verify
                 logger.info(
@@ -1641,7 +1825,7 @@ def calculate_source_connectivity_list(
 
     Parameters
     ----------
-    stc_list : instance of SourceEstimate or list of SourceEstimates
+    stc_list : instance of SourceEstimate, list of SourceEstimates or STCStore
         The source time course(s) to calculate connectivity from
     labels : list of Labels | None
         List of ROI labels to use. If None, will load Desikan-Killiany atlas
@@ -1701,14 +1885,15 @@ def calculate_source_connectivity_list(
         subject_id = "unknown_subject"
 
     # Convert stc to list if it's a single SourceEstimate
-    if not isinstance(stc_list, list):
+    if not isinstance(stc_list, (list, STCStore)):
         stc_list = [stc_list]
 
+    template = _stc_template(stc_list)
     if sfreq is None:
-        sfreq = stc_list[0].sfreq
+        sfreq = template.sfreq
 
     # Calculate available data duration
-    single_epoch_duration = stc_list[0].times[-1] - stc_list[0].times[0]
+    single_epoch_duration = template.times[-1] - template.times[0]
     total_duration = single_epoch_duration * len(stc_list)
     logger.info(
         f"Total available data: {total_duration:.1f} seconds ({len(stc_list)} epochs of {single_epoch_duration:.1f}s each)"
@@ -1747,12 +1932,10 @@ def calculate_source_connectivity_list(
     # For AEC we'll need to handle it separately since it's not part of spectral_connectivity_time
     include_aec = True
 
-    if labels is None:
-        logger.info("Loading Desikan-Killiany atlas labels...")
-        labels = mne.read_labels_from_annot(
-            subject, parc="aparc", subjects_dir=subjects_dir
-        )
-        labels = [label for label in labels if "unknown" not in label.name]
+    # Desikan-Killiany atlas unless labels are given
+    atlas = get_atlas_index(
+        template, subject=subject, subjects_dir=subjects_dir, labels=labels
+    )
 
     selected_rois = [
         "precentral-lh",
@@ -1764,33 +1947,22 @@ def calculate_source_connectivity_list(
         "caudalmiddlefrontal-lh",
         "caudalmiddlefrontal-rh",
     ]
-    label_names = [label.name for label in labels]
-    selected_labels = [
-        labels[label_names.index(roi)] for roi in selected_rois if roi in label_names
-    ]
-    if not selected_labels:
+    roi_atlas = atlas.select(selected_rois)
+    if roi_atlas.n_rois == 0:
         logger.warning("No selected ROIs found, using all available labels")
-        selected_labels = labels
-        selected_rois = label_names
-    logger.info(f"Using {len(selected_labels)} selected ROIs: {selected_rois}")
+        roi_atlas = atlas
+    selected_rois = roi_atlas.names
+    logger.info(f"Using {roi_atlas.n_rois} selected ROIs: {selected_rois}")
 
     roi_pairs = list(itertools.combinations(range(len(selected_rois)), 2))
 
     logger.info("Extracting ROI time courses...")
 
-    # Extract time courses from each stc in the list
-    roi_data_list = []
-    for stc in stc_list:
-        roi_time_courses = [
-            stc.extract_label_time_course(label, src=None, mode="mean", verbose=False)[
-                0
-            ]
-            for label in selected_labels
-        ]
-        roi_data_list.append(np.array(roi_time_courses))
-
-    # Concatenate all time courses
-    roi_data = np.hstack(roi_data_list) if len(roi_data_list) > 1 else roi_data_list[0]
+    # Time courses of all stcs, concatenated along time
+    if isinstance(stc_list, STCStore):
+        roi_data = np.concatenate(roi_atlas.apply(stc_list), axis=1)
+    else:
+        roi_data = np.concatenate([roi_atlas.apply(stc) for stc in stc_list], axis=1)
     logger.info(f"ROI data shape after concatenation: {roi_data.shape}")
 
     # Create epochs for connectivity calculation
@@ -1818,35 +1990,6 @@ def calculate_source_connectivity_list(
     connectivity_data = []
     logger.info("Calculating connectivity metrics...")
 
-    # Function to calculate AEC
-    def calculate_aec(data, band_range, sfreq):
-        import numpy as np
-        from mne.filter import filter_data
-        from scipy.signal import hilbert
-
-        # Filter the data for the specific frequency band
-        filtered_data = filter_data(
-            data, sfreq=sfreq, l_freq=band_range[0], h_freq=band_range[1], verbose=False
-        )
-
-        # Get the amplitude envelope using Hilbert transform
-        analytic_signal = hilbert(filtered_data, axis=-1)
-        amplitude_envelope = np.abs(analytic_signal)
-
-        # Compute correlation between envelopes
-        n_signals = amplitude_envelope.shape[0]
-        aec_matrix = np.zeros((n_signals, n_signals))
-
-        for i in range(n_signals):
-            for j in range(n_signals):
-                if i != j:
-                    corr = np.corrcoef(amplitude_envelope[i], amplitude_envelope[j])[
-                        0, 1
-                    ]
-                    aec_matrix[i, j] = corr
-
-        return aec_matrix
-
     # Calculate spectral connectivity methods
     for method in conn_methods:
         for band_name, band_range in bands.items():
@@ -1923,15 +2066,8 @@ def calculate_source_connectivity_list(
         for band_name, band_range in bands.items():
             logger.info(f"Computing {method} connectivity in {band_name} band...")
             try:
-                # For each epoch, calculate AEC, then average
-                aec_matrices = []
-                for epoch_idx in range(epoched_data.shape[0]):
-                    epoch_data = epoched_data[epoch_idx]
-                    aec_matrix = calculate_aec(epoch_data, band_range, sfreq)
-                    aec_matrices.append(aec_matrix)
-
-                # Average across epochs
-                con_matrix = np.mean(aec_matrices, axis=0)
+                # AEC of every epoch, averaged across epochs
+                con_matrix = compute_aec(epoched_data, sfreq, band_range).mean(axis=0)
 
                 # Debug: Print con_matrix to verify
                 logger.info(
@@ -2255,6 +2391,7 @@ def calculate_aec_connectivity(
     subject_id=None,
     epoch_length=2.0,
     n_epochs=40,
+    orthogonalize=False,
 ):
     """
     Calculate Amplitude Envelope Correlation (AEC) between all brain region labels.
@@ -2279,6 +2416,9 @@ def calculate_aec_connectivity(
         Length of epochs in seconds for connectivity calculation
     n_epochs : int
         Number of epochs to use for connectivity calculation
+    orthogonalize : bool
+        If True, compute leakage-corrected (orthogonalized) AEC. Results are
+        labeled 'aec_orth' instead of 'aec'.
 
     Returns
     -------
@@ -2290,7 +2430,6 @@ def calculate_aec_connectivity(
     import time
 
     import pandas as pd
-    from scipy.signal import hilbert
 
     # Set up basic logging
     logging.basicConfig(
@@ -2330,35 +2469,20 @@ def calculate_aec_connectivity(
         "gamma": (30, 45),
     }
 
-    # Load all labels if not provided
-    if labels is None:
-        logger.info("Loading Desikan-Killiany atlas labels...")
-        labels = mne.read_labels_from_annot(
-            subject, parc="aparc", subjects_dir=subjects_dir
-        )
-        labels = [label for label in labels if "unknown" not in label.name]
-
-    label_names = [label.name for label in labels]
-    logger.info(f"Using {len(labels)} ROIs")
+    # Desikan-Killiany atlas unless labels are given
+    atlas = get_atlas_index(
+        stc_list[0], subject=subject, subjects_dir=subjects_dir, labels=labels
+    )
+    label_names = atlas.names
+    logger.info(f"Using {atlas.n_rois} ROIs")
 
     # Create all possible pairs of regions
     roi_pairs = list(itertools.combinations(range(len(label_names)), 2))
 
     logger.info("Extracting ROI time courses...")
 
-    # Extract time courses from each stc in the list
-    roi_data_list = []
-    for stc in stc_list:
-        roi_time_courses = [
-            stc.extract_label_time_course(label, src=None, mode="mean", verbose=False)[
-                0
-            ]
-            for label in labels
-        ]
-        roi_data_list.append(np.array(roi_time_courses))
-
-    # Concatenate all time courses
-    roi_data = np.hstack(roi_data_list) if len(roi_data_list) > 1 else roi_data_list[0]
+    # Time courses of all stcs, concatenated along time
+    roi_data = np.concatenate([atlas.apply(stc) for stc in stc_list], axis=1)
     logger.info(f"ROI data shape after concatenation: {roi_data.shape}")
 
     # Create epochs for connectivity calculation
@@ -2383,29 +2507,7 @@ def calculate_aec_connectivity(
     )
     logger.info(f"Epoched data shape: {epoched_data.shape}")
 
-    # Function to calculate AEC
-    def calculate_aec(data, band_range, sfreq):
-        # Filter the data for the specific frequency band
-        filtered_data = filter_data(
-            data, sfreq=sfreq, l_freq=band_range[0], h_freq=band_range[1], verbose=False
-        )
-
-        # Get the amplitude envelope using Hilbert transform
-        analytic_signal = hilbert(filtered_data, axis=-1)
-        amplitude_envelope = np.abs(analytic_signal)
-
-        # Compute correlation between envelopes
-        n_signals = amplitude_envelope.shape[0]
-        aec_matrix = np.zeros((n_signals, n_signals))
-
-        for i in range(n_signals):
-            for j in range(i + 1, n_signals):  # Only compute upper triangle
-                corr = np.corrcoef(amplitude_envelope[i], amplitude_envelope[j])[0, 1]
-                aec_matrix[i, j] = corr
-                aec_matrix[j, i] = corr  # Mirror to lower triangle for convenience
-
-        return aec_matrix
-
+    method = "aec_orth" if orthogonalize else "aec"
     connectivity_data = []
     conn_matrices = {}
 
@@ -2414,21 +2516,16 @@ def calculate_aec_connectivity(
         start_band = time.time()
         logger.info(f"Computing AEC connectivity in {band_name} band...")
 
-        # For each epoch, calculate AEC, then average
-        aec_matrices = []
-        for epoch_idx in range(epoched_data.shape[0]):
-            epoch_data = epoched_data[epoch_idx]
-            aec_matrix = calculate_aec(epoch_data, band_range, sfreq)
-            aec_matrices.append(aec_matrix)
-
-        # Average across epochs
-        con_matrix = np.mean(aec_matrices, axis=0)
+        # AEC of every epoch, averaged across epochs
+        con_matrix = compute_aec(
+            epoched_data, sfreq, band_range, orthogonalize=orthogonalize
+        ).mean(axis=0)
         conn_matrices[band_name] = con_matrix
 
         # Save the full connectivity matrix
         con_df = pd.DataFrame(con_matrix, columns=label_names, index=label_names)
         matrix_filename = os.path.join(
-            output_dir, f"{subject_id}_aec_{band_name}_matrix.csv"
+            output_dir, f"{subject_id}_{method}_{band_name}_matrix.csv"
         )
         con_df.to_csv(matrix_filename)
         logger.info(f"Saved connectivity matrix to {matrix_filename}")
@@ -2439,7 +2536,7 @@ def calculate_aec_connectivity(
             connectivity_data.append(
                 {
                     "subject": subject_id,
-                    "method": "aec",
+                    "method": method,
                     "band": band_name,
                     "roi1": label_names[i],
                     "roi2": label_names[j],
@@ -2453,7 +2550,9 @@ def calculate_aec_connectivity(
     # Create and save summary dataframe
     conn_df = pd.DataFrame(connectivity_data)
     if not conn_df.empty:
-        summary_path = os.path.join(output_dir, f"{subject_id}_aec_connectivity.csv")
+        summary_path = os.path.join(
+            output_dir, f"{subject_id}_{method}_connectivity.csv"
+        )
         conn_df.to_csv(summary_path, index=False)
         logger.info(f"Saved connectivity summary to {summary_path}")
     else:
@@ -2462,15 +2561,127 @@ def calculate_aec_connectivity(
     return conn_df, conn_matrices
 
 
-def calculate_source_pac(
-    stc,
-    labels=None,
-    subjects_dir=None,
-    subject="fsaverage",
-    n_jobs=4,
-    output_dir=None,
-    subject_id=None,
+def _phase_bins(phase, n_bins):
+    """Flat (row, bin) indices of phase samples and sample counts per bin."""
+    edges = np.linspace(-np.pi, np.pi, n_bins + 1)
+    # Same bins as edges[b] <= phase < edges[b + 1]; phase == pi falls outside
+    bins = np.searchsorted(edges, phase, side="right") - 1
+    valid = bins < n_bins
+    rows = np.arange(np.prod(phase.shape[:-1])).reshape(phase.shape[:-1] + (1,))
+    flat = (rows * n_bins + bins)[valid]
+    counts = np.bincount(flat, minlength=rows.size * n_bins)
+    return flat, valid, counts.reshape(phase.shape[:-1] + (n_bins,))
+
+
+def _modulation_index(amplitude, flat, valid, counts):
+    """Tort modulation index of each row, averaged across epochs (axis 0)."""
+    n_bins = counts.shape[-1]
+    sums = np.bincount(flat, weights=amplitude[valid], minlength=counts.size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_amp = np.where(counts > 0, sums.reshape(counts.shape) / counts, 0.0)
+        total = mean_amp.sum(axis=-1, keepdims=True)
+        p = mean_amp / total
+        # KL divergence from the uniform distribution, log(0) avoided by epsilon
+        epsilon = 1e-10
+        mi = np.sum(p * np.log((p + epsilon) / (1 / n_bins + epsilon)), axis=-1)
+    mi = np.where(total[..., 0] > 0, mi, 0.0)
+    return mi.mean(axis=0)
+
+
+def compute_pac(
+    data,
+    sfreq,
+    bands,
+    coupling_pairs,
+    n_bins=18,
+    n_surrogates=0,
+    random_state=None,
+):
+    """
+    Phase-amplitude coupling modulation index of many signals at once.
+
+    Every band is filtered (IIR) and Hilbert transformed once for all epochs
+    and signals, and the phase binning of a phase band is shared by all its
+    amplitude bands. Mean amplitudes per phase bin come from ``np.bincount``
+    instead of one boolean mask per bin.
+
+    Parameters
+    ----------
+    data : array, shape (n_epochs, n_signals, n_times)
+        Epoched signals, e.g. ROI time courses.
+    sfreq : float
+        Sampling frequency of the data.
+    bands : dict
+        Frequency band name to (low, high) edges.
+    coupling_pairs : list of tuple
+        (phase band, amplitude band) names to compute.
+    n_bins : int
+        Number of phase bins.
+    n_surrogates : int
+        If > 0, the amplitude of each epoch is circularly shifted by a random
+        lag this many times, and the modulation index is z-scored against
+        these surrogates.
+    random_state : int | None
+        Seed of the surrogate time shifts.
+
+    Returns
+    -------
+    mi : array, shape (n_pairs, n_signals)
+        Modulation index averaged across epochs.
+    mi_z : array, shape (n_pairs, n_signals) | None
+        Surrogate z-scores, None without surrogates.
+    """
+    data = np.asarray(data, dtype=float)
+    n_epochs, _, n_times = data.shape
+
+    analytic = {}
+    for band_name in {band for pair in coupling_pairs for band in pair}:
+        l_freq, h_freq = bands[band_name]
+        filtered = mne.filter.filter_data(
+            data, sfreq, l_freq, h_freq, method="iir", verbose=False
+        )
+        analytic[band_name] = hilbert(filtered, axis=-1)
+
+    rng = np.random.default_rng(random_state)
+    lag_range = (max(1, n_times // 10), max(2, n_times - n_times // 10))
+
+    mi = np.zeros((len(coupling_pairs), data.shape[1]))
+    mi_z = np.zeros_like(mi) if n_surrogates else None
+    phase_bins = {}
+    for pair_idx, (phase_band, amp_band) in enumerate(coupling_pairs):
+        if phase_band not in phase_bins:
+            phase_bins[phase_band] = _phase_bins(np.angle(analytic[phase_band]), n_bins)
+        flat, valid, counts = phase_bins[phase_band]
+        amplitude = np.abs(analytic[amp_band])
+        mi[pair_idx] = _modulation_index(amplitude, flat, valid, counts)
+
+        if n_surrogates:
+            surrogates = np.empty((n_surrogates, data.shape[1]))
+            for surrogate_idx in range(n_surrogates):
+                lags = rng.integers(*lag_range, size=n_epochs)
+                idx = (np.arange(n_times) + lags[:, np.newaxis]) % n_times
+                shifted = np.take_along_axis(amplitude, idx[:, np.newaxis, :], axis=-1)
+                surrogates[surrogate_idx] = _modulation_index(
+                    shifted, flat, valid, counts
+                )
+            mean, std = surrogates.mean(axis=0), surrogates.std(axis=0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mi_z[pair_idx] = (mi[pair_idx] - mean) / std
+
+    return mi, mi_z
+
+
+def calculate_source_pac(
+    stc,
+    labels=None,
+    subjects_dir=None,
+    subject="fsaverage",
+    n_jobs=4,
+    output_dir=None,
+    subject_id=None,
     sfreq=None,
+    n_surrogates=0,
+    random_state=None,
 ):
     """
     Calculate phase-amplitude coupling (PAC) from source-localized data with specific focus
@@ -2487,13 +2698,19 @@ def calculate_source_pac(
     subject : str
         Subject name in the subjects_dir (default: 'fsaverage')
     n_jobs : int
-        Number of parallel jobs to use for computation
+        Unused, PAC of all ROIs is computed in one vectorized pass. Kept for
+        backward compatibility.
     output_dir : str | None
         Directory to save output files. If None, saves in current directory
     subject_id : str | None
         Subject identifier for file naming
     sfreq : float | None
         Sampling frequency. If None, will use stc.sfreq
+    n_surrogates : int
+        Number of time-shifted surrogates used to z-score the modulation
+        index. If > 0, an 'mi_z' column is added.
+    random_state : int | None
+        Seed of the surrogate time shifts.
 
     Returns
     -------
@@ -2538,13 +2755,10 @@ def calculate_source_pac(
         ("alpha", "lowbeta"),  # Changed from 'alpha', 'beta'
         ("theta", "lowbeta"),  # Changed from 'theta', 'beta'
     ]
-    # Load labels if not provided
-    if labels is None:
-        print("Loading Desikan-Killiany atlas labels...")
-        labels = mne.read_labels_from_annot(
-            subject, parc="aparc", subjects_dir=subjects_dir
-        )
-        labels = [label for label in labels if "unknown" not in label.name]
+    # Desikan-Killiany atlas unless labels are given
+    atlas = get_atlas_index(
+        stc, subject=subject, subjects_dir=subjects_dir, labels=labels
+    )
 
     # Focus on ALS-specific ROIs (motor network emphasis)
     selected_rois = [
@@ -2563,155 +2777,56 @@ def calculate_source_pac(
     ]
 
     # Filter labels to keep only selected ROIs
-    label_names = [label.name for label in labels]
-    selected_labels = []
-    selected_roi_names = []
-
     for roi in selected_rois:
-        if roi in label_names:
-            selected_labels.append(labels[label_names.index(roi)])
-            selected_roi_names.append(roi)
-        else:
+        if roi not in atlas.names:
             print(f"Warning: ROI {roi} not found in the available labels")
+    roi_atlas = atlas.select(selected_rois)
 
     # If no ROIs matched, use a subset of all labels
-    if not selected_labels:
+    if roi_atlas.n_rois == 0:
         print("No selected ROIs found, using a subset of available labels")
         # Take a reasonable subset to avoid excessive computation
-        selected_labels = labels[:16]  # First 16 labels
-        selected_roi_names = label_names[:16]
+        roi_atlas = atlas.select(atlas.names[:16])  # First 16 labels
     else:
-        print(
-            f"Using {len(selected_labels)} selected ROIs for ALS-focused PAC analysis"
-        )
-
-    # Function to segment data into epochs to speed up computation
-    def epoch_data(data, epoch_length=4, n_epochs=40, sfreq=250):
-        """Split continuous data into epochs"""
-        samples_per_epoch = int(epoch_length * sfreq)
-        total_samples = len(data)
-
-        # If we have enough data, take the first n_epochs
-        if total_samples >= n_epochs * samples_per_epoch:
-            epochs = data[: n_epochs * samples_per_epoch].reshape(
-                n_epochs, samples_per_epoch
-            )
-        else:
-            # If not enough data, use as many complete epochs as possible
-            max_complete_epochs = total_samples // samples_per_epoch
-            print(
-                f"Warning: Only {max_complete_epochs} complete epochs available (requested {n_epochs})"
-            )
-            epochs = data[: max_complete_epochs * samples_per_epoch].reshape(
-                max_complete_epochs, samples_per_epoch
-            )
-
-        return epochs
-
-    # Function to calculate PAC for a single time series
-    def phase_amplitude_coupling(signal, phase_band, amp_band, fs):
-        """Calculate phase-amplitude coupling between two frequency bands"""
-        # Segment into epochs for faster processing
-        epoch_length = 4  # seconds
-        n_epochs = (
-            40  # enough for reliable PAC estimate while keeping computation manageable
-        )
-
-        try:
-            signal_epochs = epoch_data(
-                signal, epoch_length=epoch_length, n_epochs=n_epochs, sfreq=fs
-            )
-            n_actual_epochs = signal_epochs.shape[0]
-
-            # Calculate PAC for each epoch and average
-            epoch_mis = []
-
-            for epoch_idx in range(n_actual_epochs):
-                epoch = signal_epochs[epoch_idx]
-
-                # Filter signal for phase frequency band
-                phase_signal = mne.filter.filter_data(
-                    epoch, fs, phase_band[0], phase_band[1], method="iir"
-                )
-
-                # Filter signal for amplitude frequency band
-                amp_signal = mne.filter.filter_data(
-                    epoch, fs, amp_band[0], amp_band[1], method="iir"
-                )
-
-                # Extract phase and amplitude using Hilbert transform
-                phase = np.angle(hilbert(phase_signal))
-                amplitude = np.abs(hilbert(amp_signal))
-
-                # Calculate modulation index (MI)
-                n_bins = 18
-                phase_bins = np.linspace(-np.pi, np.pi, n_bins + 1)
-                mean_amp = np.zeros(n_bins)
-
-                for bin_idx in range(n_bins):
-                    bin_mask = np.logical_and(
-                        phase >= phase_bins[bin_idx], phase < phase_bins[bin_idx + 1]
-                    )
-                    if np.any(bin_mask):  # Check if the bin has any data points
-                        mean_amp[bin_idx] = np.mean(amplitude[bin_mask])
-
-                # Normalize mean amplitude
-                if np.sum(mean_amp) > 0:  # Avoid division by zero
-                    mean_amp /= np.sum(mean_amp)
-
-                    # Calculate MI using Kullback-Leibler divergence
-                    uniform = np.ones(n_bins) / n_bins
-                    # Avoid log(0) by adding a small epsilon
-                    epsilon = 1e-10
-                    mi = np.sum(
-                        mean_amp * np.log((mean_amp + epsilon) / (uniform + epsilon))
-                    )
-                    epoch_mis.append(mi)
-                else:
-                    epoch_mis.append(0)
-
-            # Average MI across epochs
-            if epoch_mis:
-                return np.mean(epoch_mis)
-            else:
-                return 0
-
-        except Exception as e:
-            print(f"Error calculating PAC: {e}")
-            return 0
+        print(f"Using {roi_atlas.n_rois} selected ROIs for ALS-focused PAC analysis")
+    selected_roi_names = roi_atlas.names
 
     # Extract time courses for each ROI
     print("Extracting ROI time courses...")
-    roi_time_courses = {}
+    roi_data = roi_atlas.apply(stc)
+
+    # Segment into epochs: 40 epochs of 4 s give a reliable PAC estimate while
+    # keeping computation manageable
+    samples_per_epoch = int(4 * sfreq)
+    n_epochs = min(40, roi_data.shape[1] // samples_per_epoch)
+    if n_epochs < 40:
+        print(f"Warning: Only {n_epochs} complete epochs available (requested 40)")
+    epochs = (
+        roi_data[:, : n_epochs * samples_per_epoch]
+        .reshape(len(roi_data), n_epochs, samples_per_epoch)
+        .transpose(1, 0, 2)
+    )
 
-    for i, label in enumerate(selected_labels):
-        # Extract time course for this label
-        tc = stc.extract_label_time_course(label, src=None, mode="mean", verbose=False)
-        roi_time_courses[selected_roi_names[i]] = tc[0]
+    # All ROIs, epochs and coupling pairs in one pass
+    print("Calculating PAC for all ROIs and frequency band pairs...")
+    try:
+        mi, mi_z = compute_pac(
+            epochs,
+            sfreq,
+            bands,
+            coupling_pairs,
+            n_surrogates=n_surrogates,
+            random_state=random_state,
+        )
+    except Exception as e:
+        print(f"Error calculating PAC: {e}")
+        mi = np.zeros((len(coupling_pairs), len(selected_roi_names)))
+        mi_z = np.full(mi.shape, np.nan) if n_surrogates else None
 
     # Initialize data storage for PAC values
     pac_data = []
 
-    # Function to process a single ROI and coupling pair
-    def process_pac(roi, phase_band_name, amp_band_name):
-        signal = roi_time_courses[roi]
-        phase_range = bands[phase_band_name]
-        amp_range = bands[amp_band_name]
-
-        # Calculate PAC
-        mi = phase_amplitude_coupling(signal, phase_range, amp_range, sfreq)
-
-        return {
-            "roi": roi,
-            "phase_band": phase_band_name,
-            "amp_band": amp_band_name,
-            "mi": mi,
-        }
-
-    # Process all ROIs and coupling pairs in parallel
-    print("Calculating PAC for all ROIs and frequency band pairs...")
-
-    # Create task list for parallel processing with priority for motor regions and beta-gamma coupling
+    # Rows for motor regions and beta-gamma coupling come first
     tasks = []
 
     # Add high-priority tasks first (beta-gamma in motor areas)
@@ -2739,14 +2854,17 @@ def calculate_source_pac(
             ):
                 tasks.append((roi, phase_band, amp_band))
 
-    # Run tasks in parallel
-    results = Parallel(n_jobs=n_jobs)(
-        delayed(process_pac)(roi, phase_band, amp_band)
-        for roi, phase_band, amp_band in tasks
-    )
-
-    # Add all results to data storage
-    for result in results:
+    for roi, phase_band, amp_band in tasks:
+        pair_idx = coupling_pairs.index((phase_band, amp_band))
+        roi_idx = selected_roi_names.index(roi)
+        result = {
+            "roi": roi,
+            "phase_band": phase_band,
+            "amp_band": amp_band,
+            "mi": mi[pair_idx, roi_idx],
+        }
+        if mi_z is not None:
+            result["mi_z"] = mi_z[pair_idx, roi_idx]
         result["subject"] = subject_id
         pac_data.append(result)
 
@@ -2914,14 +3032,10 @@ def calculate_vertex_level_spectral_power_list(
 
     # Calculate variance for a subset of vertices (for efficiency)
     sample_indices = np.linspace(0, n_vertices - 1, 1000, dtype=int)
-    for vertex_idx in tqdm(sample_indices, desc="Sampling vertex variance"):
-        try:
-            vertex_data = np.concatenate([stc.data[vertex_idx] for stc in stc_list])
-            vertex_variance[vertex_idx] = np.var(vertex_data)
-        except Exception as e:
-            logging.error(
-                f"Error calculating variance for vertex {vertex_idx}: {str(e)}"
-            )
+    vertex_variance[sample_indices] = np.var(
+        np.concatenate([stc.data[sample_indices] for stc in stc_list], axis=1),
+        axis=1,
+    )
 
     # Determine threshold based on sampled vertices
     non_zero_vars = vertex_variance[sample_indices][vertex_variance[sample_indices] > 0]
@@ -2950,116 +3064,64 @@ def calculate_vertex_level_spectral_power_list(
     plt.savefig(os.path.join(output_dir, f"{subject_id}_vertex_variance_dist.png"))
     plt.close()
 
-    # Function to calculate power for a batch of vertices
-    def process_vertex_batch(vertex_indices):
-        batch_powers = {band: np.zeros(len(vertex_indices)) for band in bands}
-
-        for i, vertex_idx in enumerate(vertex_indices):
-            try:
-                # Concatenate data from all epochs for this vertex
-                vertex_data = np.concatenate([stc.data[vertex_idx] for stc in stc_list])
-
-                # Calculate variance for this vertex
-                v_var = np.var(vertex_data)
-
-                # Skip computation for low-variance vertices
-                if v_var < var_threshold:
-                    # Set powers to zero or NaN
-                    for band in bands:
-                        batch_powers[band][i] = 0  # or np.nan
-                    continue
-
-                # Detrend the data
-                vertex_data = signal.detrend(vertex_data)
-
-                # Apply window function
-                vertex_data = vertex_data * np.hamming(len(vertex_data))
-
-                # Calculate PSD using Welch's method
-                f, psd = signal.welch(
-                    vertex_data,
-                    fs=sfreq,
-                    window="hann",
-                    nperseg=min(
-                        len(vertex_data), int(4 * sfreq)
-                    ),  # 4-second windows or shorter
-                    noverlap=min(len(vertex_data), int(2 * sfreq)),  # 50% overlap
-                    nfft=None,
-                    detrend=None,  # Already detrended
-                )
-
-                # Visualize PSD for a few vertices (evenly spaced)
-                if vertex_idx % 2000 == 0:
-                    plt.figure(figsize=(10, 6))
-                    plt.semilogy(f, psd)
-                    plt.xlabel("Frequency (Hz)")
-                    plt.ylabel("PSD (V^2/Hz)")
-                    plt.title(f"Vertex {vertex_idx} - Variance: {v_var:.3e}")
-
-                    # Add band markers
-                    for band_name, (fmin, fmax) in bands.items():
-                        plt.axvspan(fmin, fmax, alpha=0.2, label=band_name)
-
-                    plt.grid(True)
-                    plt.legend()
-                    plt.tight_layout()
-                    plt.savefig(
-                        os.path.join(
-                            output_dir,
-                            "psd_plots",
-                            f"{subject_id}_vertex{vertex_idx}_psd.png",
-                        )
-                    )
-                    plt.close()
-
-                # Calculate power in each frequency band
-                for band, (fmin, fmax) in bands.items():
-                    freq_mask = (f >= fmin) & (f <= fmax)
-
-                    if np.any(freq_mask):
-                        # Calculate band power (area under the curve)
-                        band_freqs = f[freq_mask]
-                        band_psd = psd[freq_mask]
-
-                        # Use trapezoid rule for integration
-                        power = np.trapz(band_psd, band_freqs)
-                        batch_powers[band][i] = power
-                    else:
-                        logging.warning(
-                            f"No frequencies in band {band} ({fmin}-{fmax} Hz) for vertex {vertex_idx}"
-                        )
-                        batch_powers[band][i] = 0
-
-            except Exception as e:
-                logging.error(f"Error processing vertex {vertex_idx}: {str(e)}")
-                # Initialize with zeros
-                for band in bands:
-                    batch_powers[band][i] = 0
-
-        return batch_powers, vertex_indices
-
-    # Process vertices in batches to manage memory
-    batch_size = 1000
-    n_batches = int(np.ceil(n_vertices / batch_size))
-    all_vertex_batches = [
-        range(i * batch_size, min((i + 1) * batch_size, n_vertices))
-        for i in range(n_batches)
-    ]
-
-    logging.info(f"Processing {n_vertices} vertices in {n_batches} batches...")
-
-    # Run processing in parallel
-    results = Parallel(n_jobs=n_jobs)(
-        delayed(process_vertex_batch)(vertex_batch)
-        for vertex_batch in tqdm(all_vertex_batches, desc="Processing batches")
+    def prepare_block(block):
+        # Detrend and taper the whole recording of each vertex, leaving
+        # low-variance vertices at zero power
+        inactive = np.var(block, axis=1, dtype=np.float64) < var_threshold
+        block = signal.detrend(block, axis=-1)
+        block = block * np.hamming(block.shape[1])
+        block[inactive] = 0
+        return block
+
+    # 4-second windows (or shorter) with 50% overlap
+    n_times = sum(stc.data.shape[1] for stc in stc_list)
+    data = [stc.data for stc in stc_list]
+    welch_kwargs = dict(
+        nperseg=min(n_times, int(4 * sfreq)),
+        noverlap=min(n_times, int(2 * sfreq)),
+        detrend=False,  # Already detrended
+        preprocess=prepare_block,
     )
 
-    # Combine results
-    power_dict = {band: np.zeros(n_vertices) for band in bands}
+    logging.info(f"Processing {n_vertices} vertices in blocks...")
+    f, psd = compute_vertex_psd(data, sfreq, n_jobs=n_jobs, **welch_kwargs)
 
-    for batch_powers, vertex_indices in results:
-        for band in bands:
-            power_dict[band][vertex_indices] = batch_powers[band]
+    # Calculate power in each frequency band (area under the curve)
+    power_dict = {}
+    for band, (fmin, fmax) in bands.items():
+        freq_mask = (f >= fmin) & (f <= fmax)
+        if np.any(freq_mask):
+            power_dict[band] = trapezoid(psd[:, freq_mask], f[freq_mask], axis=1)
+        else:
+            logging.warning(f"No frequencies in band {band} ({fmin}-{fmax} Hz)")
+            power_dict[band] = np.zeros(n_vertices)
+
+    # Visualize PSD for a few active vertices (evenly spaced)
+    for vertex_idx in range(0, n_vertices, 2000):
+        if not np.any(psd[vertex_idx]):
+            continue
+        v_var = np.var(np.concatenate([stc.data[vertex_idx] for stc in stc_list]))
+        plt.figure(figsize=(10, 6))
+        plt.semilogy(f, psd[vertex_idx])
+        plt.xlabel("Frequency (Hz)")
+        plt.ylabel("PSD (V^2/Hz)")
+        plt.title(f"Vertex {vertex_idx} - Variance: {v_var:.3e}")
+
+        # Add band markers
+        for band_name, (fmin, fmax) in bands.items():
+            plt.axvspan(fmin, fmax, alpha=0.2, label=band_name)
+
+        plt.grid(True)
+        plt.legend()
+        plt.tight_layout()
+        plt.savefig(
+            os.path.join(
+                output_dir,
+                "psd_plots",
+                f"{subject_id}_vertex{vertex_idx}_psd.png",
+            )
+        )
+        plt.close()
 
     # Save results to disk
     file_path = os.path.join(output_dir, f"{subject_id}_vertex_power.h5")
@@ -3201,57 +3263,25 @@ def calculate_vertex_level_spectral_power(
     window_length = int(4 * sfreq)  # 4-second windows
     n_overlap = window_length // 2  # 50% overlap
 
-    # Function to calculate power for a batch of vertices
-    def process_vertex_batch(vertex_indices):
-        # Initialize a dictionary to store power values for each band
-        batch_powers = {band: np.zeros(len(vertex_indices)) for band in bands}
-
-        for i, vertex_idx in enumerate(vertex_indices):
-            # Calculate PSD using Welch's method
-            f, psd = signal.welch(
-                data[vertex_idx],
-                fs=sfreq,
-                window="hann",
-                nperseg=window_length,
-                noverlap=n_overlap,
-                nfft=None,
-                scaling="density",
-            )
-
-            # Calculate average power in each frequency band
-            for band, (fmin, fmax) in bands.items():
-                freq_mask = (f >= fmin) & (f <= fmax)
-                if np.any(freq_mask):
-                    batch_powers[band][i] = np.mean(psd[freq_mask])
-                else:
-                    batch_powers[band][i] = 0
-
-        return batch_powers, vertex_indices
-
-    # Process vertices in batches to manage memory
-    batch_size = 1000
-    n_batches = int(np.ceil(n_vertices / batch_size))
-    all_vertex_batches = []
-
-    for batch_idx in range(n_batches):
-        start_idx = batch_idx * batch_size
-        end_idx = min((batch_idx + 1) * batch_size, n_vertices)
-        all_vertex_batches.append(range(start_idx, end_idx))
-
-    print(f"Processing {n_vertices} vertices in {n_batches} batches...")
-
-    # Run processing in parallel
-    results = Parallel(n_jobs=n_jobs)(
-        delayed(process_vertex_batch)(vertex_batch)
-        for vertex_batch in all_vertex_batches
+    # Only keep the frequencies covered by the bands
+    f, psd = compute_vertex_psd(
+        data,
+        sfreq,
+        fmin=min(fmin for fmin, _ in bands.values()),
+        fmax=max(fmax for _, fmax in bands.values()),
+        nperseg=window_length,
+        noverlap=n_overlap,
+        n_jobs=n_jobs,
     )
 
-    # Combine results
-    power_dict = {band: np.zeros(n_vertices) for band in bands}
-
-    for batch_powers, vertex_indices in results:
-        for band in bands:
-            power_dict[band][vertex_indices] = batch_powers[band]
+    # Calculate average power in each frequency band
+    power_dict = {}
+    for band, (fmin, fmax) in bands.items():
+        freq_mask = (f >= fmin) & (f <= fmax)
+        if np.any(freq_mask):
+            power_dict[band] = np.mean(psd[:, freq_mask], axis=1)
+        else:
+            power_dict[band] = np.zeros(n_vertices)
 
     # Save results to disk
     # HDF5 format is good for large arrays and provides compression
@@ -3275,11 +3305,21 @@ def calculate_vertex_level_spectral_power(
 
 
 def apply_spatial_smoothing(
-    power_dict, stc, smoothing_steps=5, subject_id=None, output_dir=None
+    power_dict,
+    stc,
+    smoothing_steps=5,
+    subject_id=None,
+    output_dir=None,
+    subjects_dir=None,
+    compression_level=4,
 ):
     """
     Apply spatial smoothing to vertex-level power data.
 
+    All bands are smoothed at once with the cached sparse operator of the
+    source space (see ``get_smoothing_operator``): each vertex becomes a
+    weighted mean of its neighbours within ``smoothing_steps`` edges.
+
     Parameters
     ----------
     power_dict : dict
@@ -3292,6 +3332,10 @@ def apply_spatial_smoothing(
         Subject identifier for file naming
     output_dir : str | None
         Directory to save output files
+    subjects_dir : str | None
+        Path to the freesurfer subjects directory. If None, uses fsaverage.
+    compression_level : int | None
+        Gzip level (0-9) of the saved datasets, None to save uncompressed.
 
     Returns
     -------
@@ -3300,9 +3344,6 @@ def apply_spatial_smoothing(
     file_path : str
         Path to the saved smoothed data file
     """
-
-    import numpy as np
-
     if output_dir is None:
         output_dir = os.getcwd()
 
@@ -3311,54 +3352,30 @@ def apply_spatial_smoothing(
 
     print(f"Applying spatial smoothing (steps={smoothing_steps}) to vertex data...")
 
-    # Create a source space for smoothing
-    # We need the same source space that was used to create the stc
-    src = mne.source_space.SourceSpaces(
-        [
-            mne.source_space.SourceSpace(
-                vertices=stc.vertices[0], hemisphere=0, coord_frame=5
-            ),
-            mne.source_space.SourceSpace(
-                vertices=stc.vertices[1], hemisphere=1, coord_frame=5
-            ),
-        ]
-    )
-
-    smoothed_dict = {}
+    operator = get_smoothing_operator(stc, smoothing_steps, subjects_dir=subjects_dir)
 
-    # Apply smoothing to each frequency band
-    for band, power_values in power_dict.items():
-        print(f"Smoothing {band} band data...")
-
-        # Create a temporary SourceEstimate to use MNE's smoothing function
-        temp_stc = mne.SourceEstimate(
-            power_values[:, np.newaxis],  # Add a time dimension
-            vertices=stc.vertices,
-            tmin=0,
-            tstep=1,
-        )
-
-        # Apply spatial smoothing
-        smoothed_stc = mne.spatial_src_adjacency(temp_stc, src, n_steps=smoothing_steps)
-
-        # Store the smoothed data
-        smoothed_dict[band] = smoothed_stc.data[:, 0]  # Remove the time dimension
+    # One sparse product smooths every band
+    bands = list(power_dict)
+    smoothed = operator @ np.column_stack([power_dict[band] for band in bands])
+    smoothed_dict = {band: smoothed[:, i] for i, band in enumerate(bands)}
 
     # Save the smoothed data
     file_path = os.path.join(output_dir, f"{subject_id}_smoothed_vertex_power.h5")
 
+    compression = {}
+    if compression_level is not None:
+        compression = {"compression": "gzip", "compression_opts": compression_level}
+
     with h5py.File(file_path, "w") as f:
         # Store vertex information
-        f.attrs["n_vertices"] = len(smoothed_dict[next(iter(smoothed_dict))])
+        f.attrs["n_vertices"] = len(smoothed)
         f.attrs["lh_vertices"] = len(stc.vertices[0])
         f.attrs["rh_vertices"] = len(stc.vertices[1])
         f.attrs["smoothing_steps"] = smoothing_steps
 
         # Create a group for each frequency band
         for band, power_values in smoothed_dict.items():
-            f.create_dataset(
-                band, data=power_values, compression="gzip", compression_opts=9
-            )
+            f.create_dataset(band, data=power_values, **compression)
 
     print(f"Saved smoothed vertex-level spectral power to {file_path}")
 
@@ -3366,7 +3383,7 @@ def apply_spatial_smoothing(
 
 
 def calculate_vertex_psd_for_fooof(
-    stc, fmin=1.0, fmax=45.0, n_jobs=10, output_dir=None, subject_id=None
+    stc, fmin=1.0, fmax=45.0, n_jobs=10, output_dir=None, subject_id=None, dtype=None
 ):
     """
     Calculate full power spectral density at the vertex level for FOOOF analysis.
@@ -3385,6 +3402,9 @@ def calculate_vertex_psd_for_fooof(
         Directory to save output files
     subject_id : str | None
         Subject identifier for file naming
+    dtype : str | None
+        Precision of the spectral transforms ('float32' or 'float64'), see
+        ``compute_vertex_psd``. None follows the source data.
 
     Returns
     -------
@@ -3413,65 +3433,20 @@ def calculate_vertex_psd_for_fooof(
     window_length = int(4 * sfreq)  # 4-second windows
     n_overlap = window_length // 2  # 50% overlap
 
-    # First, calculate the frequency axis (same for all vertices)
-    f, _ = signal.welch(
-        data[0],
-        fs=sfreq,
-        window="hann",
+    print(f"Processing {n_vertices} vertices in blocks...")
+    freqs, all_psds = compute_vertex_psd(
+        data,
+        sfreq,
+        fmin=fmin,
+        fmax=fmax,
         nperseg=window_length,
         noverlap=n_overlap,
-        nfft=None,
+        n_jobs=n_jobs,
+        dtype=dtype,
     )
-
-    # Filter to frequency range of interest
-    freq_mask = (f >= fmin) & (f <= fmax)
-    freqs = f[freq_mask]
     n_freqs = len(freqs)
 
-    print(f"Calculating PSD for {n_freqs} frequency points from {fmin} to {fmax} Hz")
-
-    # Function to calculate PSD for a batch of vertices
-    def process_vertex_batch(vertex_indices):
-        batch_psd = np.zeros((len(vertex_indices), n_freqs))
-
-        for i, vertex_idx in enumerate(vertex_indices):
-            # Calculate PSD using Welch's method
-            _, psd = signal.welch(
-                data[vertex_idx],
-                fs=sfreq,
-                window="hann",
-                nperseg=window_length,
-                noverlap=n_overlap,
-                nfft=None,
-                scaling="density",
-            )
-
-            # Store PSD for frequencies in our range
-            batch_psd[i] = psd[freq_mask]
-
-        return batch_psd
-
-    # Process vertices in batches to manage memory
-    batch_size = 4000
-    n_batches = int(np.ceil(n_vertices / batch_size))
-    all_psds = np.zeros((n_vertices, n_freqs))
-
-    print(f"Processing {n_vertices} vertices in {n_batches} batches...")
-
-    for batch_idx in range(n_batches):
-        start_idx = batch_idx * batch_size
-        end_idx = min((batch_idx + 1) * batch_size, n_vertices)
-        vertex_batch = range(start_idx, end_idx)
-
-        print(
-            f"Processing batch {batch_idx + 1}/{n_batches}, vertices {start_idx}-{end_idx}"
-        )
-
-        # Calculate PSD for this batch
-        batch_psd = process_vertex_batch(vertex_batch)
-
-        # Store in the full array
-        all_psds[start_idx:end_idx] = batch_psd
+    print(f"Calculated PSD for {n_freqs} frequency points from {fmin} to {fmax} Hz")
 
     # Create a source estimate with the PSD data
     # This uses frequencies as time points for easy manipulation
@@ -3495,7 +3470,7 @@ def calculate_vertex_psd_for_fooof(
 
 
 def calculate_fooof_aperiodic(
-    stc_psd, subject_id, output_dir, n_jobs=10, aperiodic_mode="knee"
+    stc_psd, subject_id, output_dir, n_jobs=10, aperiodic_mode="knee", seed=None
 ):
     """
     Run FOOOF to model aperiodic parameters for all vertices with robust error handling.
@@ -3512,6 +3487,8 @@ def calculate_fooof_aperiodic(
         Number of parallel jobs to use for computation
     aperiodic_mode : str
         Aperiodic mode for FOOOF ('fixed' or 'knee')
+    seed : None | 'neighbor' | 'mean'
+        Initial aperiodic guesses, see ``fit_vertex_fooof``
 
     Returns
     -------
@@ -3556,152 +3533,41 @@ def calculate_fooof_aperiodic(
         "verbose": False,
     }
 
-    # Function to process a batch of vertices with error handling
-    def process_batch(vertices):
-        batch_psds = psds[vertices, :]
-
-        # First attempt with primary parameters
-        with warnings.catch_warnings():
-            warnings.filterwarnings("ignore", category=RuntimeWarning)
-
-            try:
-                fg = FOOOFGroup(**fooof_params)
-                fg.fit(freqs, batch_psds)
-
-                # Check if fits were successful
-                if np.any(~fg.get_params("aperiodic_params")[:, 0].astype(bool)):
-                    # Some fits failed, try fallback parameters
-                    raise RuntimeError("Some fits failed with primary parameters")
-
-            except Exception:
-                # Try again with fallback parameters
-                try:
-                    fg = FOOOFGroup(**fallback_params)
-                    fg.fit(freqs, batch_psds)
-                except Exception:
-                    # Create dummy results for completely failed fits
-                    results = []
-                    for i, vertex_idx in enumerate(vertices):
-                        results.append(
-                            {
-                                "vertex": vertex_idx,
-                                "offset": np.nan,
-                                "knee": np.nan,
-                                "exponent": np.nan,
-                                "r_squared": np.nan,
-                                "error": np.nan,
-                                "status": "FITTING_FAILED",
-                            }
-                        )
-                    return results
-
-        # Extract aperiodic parameters
-        aperiodic_params = fg.get_params("aperiodic_params")
-        r_squared = fg.get_params("r_squared")
-        error = fg.get_params("error")
-
-        # Process results
-        results = []
-        for i, vertex_idx in enumerate(vertices):
-            # Check for valid parameters
-            if np.any(np.isnan(aperiodic_params[i])) or np.any(
-                np.isinf(aperiodic_params[i])
-            ):
-                results.append(
-                    {
-                        "vertex": vertex_idx,
-                        "offset": np.nan,
-                        "knee": np.nan,
-                        "exponent": np.nan,
-                        "r_squared": np.nan,
-                        "error": np.nan,
-                        "status": "NAN_PARAMS",
-                    }
-                )
-                continue
-
-            # Extract parameters based on aperiodic mode
-            if aperiodic_mode == "knee":
-                offset = aperiodic_params[i, 0]
-                knee = aperiodic_params[i, 1]
-                exponent = aperiodic_params[i, 2]
-
-                # Additional validation for knee mode
-                if knee <= 0 or exponent <= 0:
-                    results.append(
-                        {
-                            "vertex": vertex_idx,
-                            "offset": np.nan,
-                            "knee": np.nan,
-                            "exponent": np.nan,
-                            "r_squared": np.nan,
-                            "error": np.nan,
-                            "status": "INVALID_PARAMS",
-                        }
-                    )
-                    continue
-            else:  # fixed mode
-                offset = aperiodic_params[i, 0]
-                knee = np.nan
-                exponent = aperiodic_params[i, 1]
-
-                # Additional validation for fixed mode
-                if exponent <= 0:
-                    results.append(
-                        {
-                            "vertex": vertex_idx,
-                            "offset": np.nan,
-                            "knee": np.nan,
-                            "exponent": np.nan,
-                            "r_squared": np.nan,
-                            "error": np.nan,
-                            "status": "INVALID_EXPONENT",
-                        }
-                    )
-                    continue
-
-            # Add valid result
-            results.append(
-                {
-                    "vertex": vertex_idx,
-                    "offset": offset,
-                    "knee": knee,
-                    "exponent": exponent,
-                    "r_squared": r_squared[i],
-                    "error": error[i],
-                    "status": "SUCCESS",
-                }
-            )
-
-        # Clear memory
-        del fg, batch_psds
-        gc.collect()
-
-        return results
-
-    # Process in batches
-    batch_size = 2000
-    n_batches = int(np.ceil(n_vertices / batch_size))
-    vertex_batches = []
-
-    for i in range(0, n_vertices, batch_size):
-        vertex_batches.append(range(i, min(i + batch_size, n_vertices)))
-
-    print(f"Processing {n_batches} batches with {n_jobs} parallel jobs...")
-
-    # Run in parallel with warning suppression
-    with warnings.catch_warnings():
-        warnings.filterwarnings("ignore", category=RuntimeWarning)
-
-        all_results = Parallel(n_jobs=n_jobs)(
-            delayed(process_batch)(batch) for batch in vertex_batches
-        )
+    # Every vertex is fitted on its own, only failed vertices are refitted
+    # with the fallback parameters
+    print(f"Fitting vertices with {n_jobs} parallel jobs...")
+    fits = fit_vertex_fooof(
+        freqs,
+        psds,
+        fooof_params,
+        fallback_params=fallback_params,
+        seed=seed,
+        n_jobs=n_jobs,
+        batch_size=500,
+    )
+    offset, knee, exponent = fits["aperiodic_params"].T
+    fitted = np.array([mode is not None for mode in fits["fit_mode"]], dtype=bool)
+    knee_fit = fits["fit_mode"] == "knee"
 
-    # Flatten results
-    flat_results = [item for sublist in all_results for item in sublist]
+    status = np.full(n_vertices, "SUCCESS", dtype=object)
+    status[knee_fit & ((knee <= 0) | (exponent <= 0))] = "INVALID_PARAMS"
+    status[fitted & ~knee_fit & (exponent <= 0)] = "INVALID_EXPONENT"
+    status[fitted & ~(np.isfinite(offset) & np.isfinite(exponent))] = "NAN_PARAMS"
+    status[~fitted] = "FITTING_FAILED"
+    valid = status == "SUCCESS"
 
     # Create DataFrame
-    aperiodic_df = pd.DataFrame(flat_results)
+    aperiodic_df = pd.DataFrame(
+        {
+            "vertex": np.arange(n_vertices),
+            "offset": np.where(valid, offset, np.nan),
+            "knee": np.where(valid, knee, np.nan),
+            "exponent": np.where(valid, exponent, np.nan),
+            "r_squared": np.where(valid, fits["r_squared"], np.nan),
+            "error": np.where(valid, fits["error"], np.nan),
+            "status": status,
+        }
+    )
 
     # Add subject_id
     aperiodic_df.insert(0, "subject", subject_id)
@@ -4079,6 +3945,7 @@ def calculate_fooof_periodic(
     output_dir=None,
     subject_id=None,
     aperiodic_mode="knee",
+    seed=None,
 ):
     """
     Calculate FOOOF periodic parameters from source-localized data and save results.
@@ -4098,6 +3965,8 @@ def calculate_fooof_periodic(
         Subject identifier for file naming
     aperiodic_mode : str
         Aperiodic mode for FOOOF ('fixed' or 'knee')
+    seed : None | 'neighbor' | 'mean'
+        Initial aperiodic guesses, see ``fit_vertex_fooof``
 
     Returns
     -------
@@ -4172,63 +4041,25 @@ def calculate_fooof_periodic(
         "verbose": False,
     }
 
-    # Function to process a batch of vertices
-    def process_batch(vertices):
-        # Extract data for these vertices
-        batch_psds = psds_to_fit[vertices, :]
-
-        # Create FOOOF model and fit
-        fg = FOOOFGroup(**fooof_params)
-        fg.fit(freqs_to_fit, batch_psds)
-
-        # Extract periodic parameters for each frequency band
-        results = []
-
-        for i, vertex_idx in enumerate(vertices):
-            for band_name, band_range in freq_bands.items():
-                # Get FOOOF model for this vertex
-                fm = fg.get_fooof(i)
-
-                # Extract peak in this band
-                peak_params = get_band_peak_fm(fm, band_range, select_highest=True)
-
-                if peak_params is not None:
-                    cf, pw, bw = peak_params
-                else:
-                    cf, pw, bw = np.nan, np.nan, np.nan
-
-                results.append(
-                    {
-                        "vertex": vertex_idx,
-                        "band": band_name,
-                        "center_frequency": cf,
-                        "power": pw,
-                        "bandwidth": bw,
-                    }
-                )
-
-        # Clear memory
-        del fg, batch_psds
-        gc.collect()
-
-        return results
-
-    # Process in batches to manage memory
-    batch_size = 2000  # Adjust based on memory constraints
-    vertex_batches = []
-
-    for i in range(0, n_vertices, batch_size):
-        vertex_batches.append(range(i, min(i + batch_size, n_vertices)))
-
-    print(f"Processing {len(vertex_batches)} batches with {n_jobs} parallel jobs...")
-
-    # Run in parallel
-    all_results = Parallel(n_jobs=n_jobs)(
-        delayed(process_batch)(batch) for batch in vertex_batches
+    print(f"Fitting vertices with {n_jobs} parallel jobs...")
+    fits = fit_vertex_fooof(
+        freqs_to_fit, psds_to_fit, fooof_params, seed=seed, n_jobs=n_jobs
     )
 
-    # Flatten results
-    flat_results = [item for sublist in all_results for item in sublist]
+    # Extract the highest peak of each frequency band
+    flat_results = []
+    for vertex_idx, peak_params in enumerate(fits["peak_params"]):
+        for band_name, band_range in freq_bands.items():
+            cf, pw, bw = get_band_peak(peak_params, band_range, select_highest=True)
+            flat_results.append(
+                {
+                    "vertex": vertex_idx,
+                    "band": band_name,
+                    "center_frequency": cf,
+                    "power": pw,
+                    "bandwidth": bw,
+                }
+            )
 
     # Convert to DataFrame
     periodic_df = pd.DataFrame(flat_results)
@@ -4248,6 +4079,235 @@ def calculate_fooof_periodic(
     return periodic_df, file_path
 
 
+def _gaussian(x, a, x0, sigma):
+    return a * np.exp(-((x - x0) ** 2) / (2 * sigma**2))
+
+
+def _smooth_spectra(spectra, method="savitzky_golay"):
+    """Smooth each row of ``spectra`` along frequencies."""
+    if method == "moving_average":
+        kernel = np.ones(3) / 3
+    elif method == "gaussian":
+        kernel = np.exp(-((np.arange(3) - 1) ** 2) / 2.0)
+        kernel /= np.sum(kernel)
+    elif method == "savitzky_golay":
+        return savgol_filter(spectra, 5, 2, axis=-1)
+    elif method == "median":
+        # Windows shrink at the edges instead of padding
+        padded = np.pad(spectra, [(0, 0), (1, 1)], constant_values=np.nan)
+        windows = np.lib.stride_tricks.sliding_window_view(padded, 3, axis=-1)
+        return np.nanmedian(windows, axis=-1)
+    else:
+        return spectra
+    # Same as np.convolve(..., mode="same") with zero padding
+    padded = np.pad(spectra, [(0, 0), (1, 1)])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 3, axis=-1)
+    return windows @ kernel[::-1]
+
+
+def _detrended_log_spectra(freqs, psds, smoothing_method):
+    """Log spectra minus their 1/f fit, for all vertices with one solve."""
+    log_freqs = np.log10(freqs)
+    log_psds = np.log10(psds)
+    design = np.column_stack([log_freqs, np.ones_like(log_freqs)])
+    coefs, *_ = np.linalg.lstsq(design, log_psds.T, rcond=None)
+    return _smooth_spectra(log_psds - (design @ coefs).T, smoothing_method)
+
+
+def _gaussian_peak_closed_form(freqs, spectra, alpha_range):
+    """
+    Gaussian peak estimate of many spectra without nonlinear fitting.
+
+    The estimate uses the highest local maximum inside
+    ``alpha_range`` and is only accepted when no other local maximum exceeds
+    half its height. The Gaussian is fitted to the log of the positive lobe
+    around that maximum by a weighted parabola (Caruana's method with Guo's
+    y**2 weights).
+
+    Returns
+    -------
+    peak_freq, peak_power, peak_width, r_squared : array, shape (n_spectra,)
+        Gaussian parameters and R² over all ``freqs``.
+    ok : array of bool, shape (n_spectra,)
+        Spectra whose estimate is unambiguous.
+    """
+    n_spectra, n_freqs = spectra.shape
+    nan = np.full(n_spectra, np.nan)
+    if n_freqs < 3:
+        return nan, nan, nan, nan, np.zeros(n_spectra, dtype=bool)
+
+    inner = spectra[:, 1:-1]
+    is_max = np.zeros(spectra.shape, dtype=bool)
+    # Plateaus count once, at their first sample
+    is_max[:, 1:-1] = (inner > spectra[:, :-2]) & (inner >= spectra[:, 2:])
+    in_range = (freqs >= alpha_range[0]) & (freqs <= alpha_range[1])
+    peak = np.argmax(np.where(is_max & in_range, spectra, -np.inf), axis=1)
+    rows = np.arange(n_spectra)
+    peak_freq_bin = freqs[peak]
+    peak_height = spectra[rows, peak]
+    # Other maxima above half the peak height compete with it
+    rivals = is_max & (spectra > peak_height[:, None] / 2)
+    ok = (
+        is_max[rows, peak]
+        & in_range[peak]
+        & (peak_height > 0)
+        & (rivals.sum(axis=1) == 1)
+    )
+
+    # Positive lobe around the maximum
+    idx = np.arange(n_freqs)
+    nonpositive = spectra <= 0
+    left = np.max(np.where(nonpositive & (idx < peak[:, None]), idx, -1), axis=1)
+    right = np.min(np.where(nonpositive & (idx > peak[:, None]), idx, n_freqs), axis=1)
+    lobe = (idx > left[:, None]) & (idx < right[:, None])
+    ok &= lobe.sum(axis=1) >= 3
+
+    # Weighted least squares of log(y) = c0 + c1 x + c2 x**2, x centred on the peak
+    x = freqs[None, :] - peak_freq_bin[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_y = np.where(lobe, np.log(np.where(lobe, spectra, 1.0)), 0.0)
+    weights = np.where(lobe, spectra, 0.0) ** 2
+    moments = np.stack([np.sum(weights * x**k, axis=1) for k in range(5)], axis=1)
+    normal = moments[:, [[0, 1, 2], [1, 2, 3], [2, 3, 4]]]
+    rhs = np.stack([np.sum(weights * x**k * log_y, axis=1) for k in range(3)], axis=1)
+    normal[~ok] = np.eye(3)
+    c0, c1, c2 = np.linalg.solve(normal, rhs[..., None])[..., 0].T
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        centre = -c1 / (2 * c2)
+        peak_width = np.sqrt(-1 / (2 * c2))
+        peak_power = np.exp(c0 - c1**2 / (4 * c2))
+        peak_freq = peak_freq_bin + centre
+        fitted = _gaussian(
+            freqs[None, :], peak_power[:, None], peak_freq[:, None], peak_width[:, None]
+        )
+        ss_res = np.sum((spectra - fitted) ** 2, axis=1)
+        ss_tot = np.sum((spectra - spectra.mean(axis=1, keepdims=True)) ** 2, axis=1)
+        r_squared = np.where(ss_tot > 0, 1 - ss_res / ss_tot, 0.0)
+
+    ok &= (
+        (c2 < 0)
+        & np.isfinite(peak_power)
+        & (peak_freq >= alpha_range[0])
+        & (peak_freq <= alpha_range[1])
+    )
+    return peak_freq, peak_power, peak_width, r_squared, ok
+
+
+def _gaussian_peak_curve_fit(freqs, spectrum, alpha_range):
+    """Gaussian fit of the most prominent usable peak of one spectrum."""
+    peaks, _ = find_peaks(spectrum, width=1)
+    if len(peaks) == 0:
+        return np.nan, np.nan, np.nan, np.nan, "NO_PEAKS_FOUND"
+
+    # Try to fit a Gaussian to each peak, starting with the most prominent
+    for peak_idx in peaks[np.argsort(spectrum[peaks], kind="stable")[::-1]]:
+        peak_freq = freqs[peak_idx]
+        if not alpha_range[0] <= peak_freq <= alpha_range[1]:
+            continue
+        try:
+            p0 = [spectrum[peak_idx], peak_freq, 0.2]
+            popt, _ = curve_fit(_gaussian, freqs, spectrum, p0=p0, maxfev=1000)
+        except Exception:  # pylint: disable=broad-except
+            continue
+        if alpha_range[0] <= popt[1] <= alpha_range[1]:
+            ss_tot = np.sum((spectrum - np.mean(spectrum)) ** 2)
+            ss_res = np.sum((spectrum - _gaussian(freqs, *popt)) ** 2)
+            r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
+            return popt[1], popt[0], popt[2], r_squared, "SUCCESS"
+
+    # If no valid fit found, use the max peak in the alpha range
+    in_range = (freqs >= alpha_range[0]) & (freqs <= alpha_range[1])
+    if np.any(in_range):
+        max_idx = np.argmax(spectrum[in_range])
+        return (
+            freqs[in_range][max_idx],
+            spectrum[in_range][max_idx],
+            np.nan,
+            np.nan,
+            "MAX_PEAK_USED",
+        )
+    return np.nan, np.nan, np.nan, np.nan, "NO_VALID_PEAK"
+
+
+def _curve_fit_peaks(freqs, spectra, alpha_range):
+    """``_gaussian_peak_curve_fit`` for each row of ``spectra``."""
+    return [
+        _gaussian_peak_curve_fit(freqs, spectrum, alpha_range) for spectrum in spectra
+    ]
+
+
+def compute_peak_frequencies(
+    freqs,
+    psds,
+    freq_range=(6, 12),
+    alpha_range=(6, 12),
+    smoothing_method="savitzky_golay",
+    n_jobs=1,
+):
+    """
+    Dickinson peak frequencies of many spectra at once.
+
+    The 1/f trend of all spectra is removed with a single least-squares
+    solve and the detrended log spectra are smoothed as one array. Peaks
+    are then estimated in closed form (see ``_gaussian_peak_closed_form``);
+    only spectra where that estimate is ambiguous (no or several local
+    maxima, a maximum outside ``alpha_range`` or an invalid Gaussian) are
+    fitted one by one with ``curve_fit``.
+
+    Parameters
+    ----------
+    freqs : array, shape (n_freqs,)
+        Frequencies of the spectra, all positive.
+    psds : array, shape (n_spectra, n_freqs)
+        Power spectra, in linear scale.
+    freq_range : tuple
+        Frequency range of the peak search.
+    alpha_range : tuple
+        Range the peak frequency must fall into.
+    smoothing_method : str
+        Smoothing of the detrended spectra ('savitzky_golay',
+        'moving_average', 'gaussian', 'median'); anything else disables it.
+    n_jobs : int
+        Number of parallel jobs for the ``curve_fit`` fallback.
+
+    Returns
+    -------
+    results : dict
+        'peak_freq', 'peak_power', 'peak_width' and 'r_squared' arrays of
+        shape (n_spectra,), 'status' as in
+        ``calculate_vertex_peak_frequencies`` and 'fit_path', which is
+        'closed_form' or 'curve_fit'.
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    freq_mask = (freqs >= freq_range[0]) & (freqs <= freq_range[1])
+    psds = np.asarray(psds, dtype=float)
+    spectra = _detrended_log_spectra(freqs, psds, smoothing_method)
+    alpha_freqs = freqs[freq_mask]
+    alpha_powers = spectra[:, freq_mask]
+
+    *estimates, ok = _gaussian_peak_closed_form(alpha_freqs, alpha_powers, alpha_range)
+    results = dict(
+        zip(("peak_freq", "peak_power", "peak_width", "r_squared"), estimates)
+    )
+    results["status"] = np.full(len(spectra), "SUCCESS", dtype=object)
+    results["fit_path"] = np.where(ok, "closed_form", "curve_fit").astype(object)
+
+    fallback = np.flatnonzero(~ok)
+    batches = [fallback[i : i + 2000] for i in range(0, len(fallback), 2000)]
+    fits = Parallel(n_jobs=n_jobs)(
+        delayed(_curve_fit_peaks)(alpha_freqs, alpha_powers[batch], alpha_range)
+        for batch in batches
+    )
+    fits = [fit for batch_fits in fits for fit in batch_fits]
+    for key, values in zip(
+        ("peak_freq", "peak_power", "peak_width", "r_squared", "status"),
+        zip(*fits) if fits else [()] * 5,
+    ):
+        results[key][fallback] = values
+    return results
+
+
 def calculate_vertex_peak_frequencies(
     stc,
     freq_range=(6, 12),
@@ -4260,6 +4320,10 @@ def calculate_vertex_peak_frequencies(
     """
     Calculate peak frequencies at the vertex level across the source space.
 
+    Peaks are found with the Dickinson method (1/f detrending, smoothing and
+    a Gaussian fit), using ``compute_peak_frequencies``. The 'fit_path'
+    column tells which vertices needed a per-vertex ``curve_fit``.
+
     Parameters
     ----------
     stc : instance of SourceEstimate
@@ -4284,8 +4348,6 @@ def calculate_vertex_peak_frequencies(
     file_path : str
         Path to the saved data file
     """
-
-
     if output_dir is None:
         output_dir = os.getcwd()
     os.makedirs(output_dir, exist_ok=True)
@@ -4312,177 +4374,35 @@ def calculate_vertex_peak_frequencies(
             f"No frequencies found within the specified range {freq_range}"
         )
 
-    # Define Gaussian function for peak fitting
-    def gaussian(x, a, x0, sigma):
-        return a * np.exp(-((x - x0) ** 2) / (2 * sigma**2))
-
-    # Define function to model 1/f trend
-    def model_1f_trend(frequencies, powers):
-        log_freq = np.log10(frequencies)
-        log_power = np.log10(powers)
-        slope, intercept, _, _, _ = stats.linregress(log_freq, log_power)
-        return slope * log_freq + intercept
-
-    # Define smoothing function
-    def enhanced_smooth_spectrum(spectrum, method=smoothing_method):
-        if method == "moving_average":
-            window_size = 3
-            return np.convolve(
-                spectrum, np.ones(window_size) / window_size, mode="same"
-            )
-
-        elif method == "gaussian":
-            window_size = 3
-            sigma = 1.0
-            gaussian_window = np.exp(
-                -((np.arange(window_size) - window_size // 2) ** 2) / (2 * sigma**2)
-            )
-            gaussian_window /= np.sum(gaussian_window)
-            return np.convolve(spectrum, gaussian_window, mode="same")
-
-        elif method == "savitzky_golay":
-            window_length = 5
-            poly_order = 2
-            return savgol_filter(spectrum, window_length, poly_order)
-
-        elif method == "median":
-            window_size = 3
-            return np.array(
-                [
-                    np.median(
-                        spectrum[
-                            max(0, i - window_size // 2) : min(
-                                len(spectrum), i + window_size // 2 + 1
-                            )
-                        ]
-                    )
-                    for i in range(len(spectrum))
-                ]
-            )
-
-        else:
-            return spectrum
-
-    # Define function to find alpha peak using Dickinson method for a single vertex
-    def dickinson_method_vertex(powers, vertex_idx):
-        log_powers = np.log10(powers)
-        log_trend = model_1f_trend(freqs, powers)
-        detrended_log_powers = enhanced_smooth_spectrum(log_powers - log_trend)
-
-        # Focus on alpha range
-        alpha_mask = (freqs >= freq_range[0]) & (freqs <= freq_range[1])
-        alpha_freqs = freqs[alpha_mask]
-        alpha_powers = detrended_log_powers[alpha_mask]
-
-        if len(alpha_freqs) == 0:
-            return {
-                "vertex": vertex_idx,
-                "peak_freq": np.nan,
-                "peak_power": np.nan,
-                "r_squared": np.nan,
-                "status": "NO_DATA_IN_RANGE",
-            }
-
-        # Find peaks in the detrended spectrum
-        peaks, _ = find_peaks(alpha_powers, width=1)
-
-        if len(peaks) == 0:
-            return {
-                "vertex": vertex_idx,
-                "peak_freq": np.nan,
-                "peak_power": np.nan,
-                "r_squared": np.nan,
-                "status": "NO_PEAKS_FOUND",
-            }
-
-        # Sort peaks by prominence
-        peak_prominences = alpha_powers[peaks] - np.min(alpha_powers)
-        sorted_peaks = [
-            p for _, p in sorted(zip(peak_prominences, peaks), reverse=True)
-        ]
-
-        # Try to fit Gaussian to each peak, starting with the most prominent
-        for peak_idx in sorted_peaks:
-            peak_freq = alpha_freqs[peak_idx]
-            if alpha_range[0] <= peak_freq <= alpha_range[1]:
-                try:
-                    p0 = [alpha_powers[peak_idx], peak_freq, 0.2]
-                    popt, pcov = curve_fit(
-                        gaussian, alpha_freqs, alpha_powers, p0=p0, maxfev=1000
-                    )
-
-                    if alpha_range[0] <= popt[1] <= alpha_range[1]:
-                        # Calculate R-squared for the fit
-                        fitted_curve = gaussian(alpha_freqs, *popt)
-                        ss_tot = np.sum((alpha_powers - np.mean(alpha_powers)) ** 2)
-                        ss_res = np.sum((alpha_powers - fitted_curve) ** 2)
-                        r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
-
-                        return {
-                            "vertex": vertex_idx,
-                            "peak_freq": popt[1],
-                            "peak_power": popt[0],
-                            "peak_width": popt[2],
-                            "r_squared": r_squared,
-                            "status": "SUCCESS",
-                        }
-                except Exception:
-                    continue
-
-        # If no valid fit found, use the max peak in the alpha range
-        alpha_range_mask = (alpha_freqs >= alpha_range[0]) & (
-            alpha_freqs <= alpha_range[1]
-        )
-        if np.any(alpha_range_mask):
-            max_idx = np.argmax(alpha_powers[alpha_range_mask])
-            max_peak_freq = alpha_freqs[alpha_range_mask][max_idx]
-            max_peak_power = alpha_powers[alpha_range_mask][max_idx]
-
-            return {
-                "vertex": vertex_idx,
-                "peak_freq": max_peak_freq,
-                "peak_power": max_peak_power,
-                "peak_width": np.nan,
-                "r_squared": np.nan,
-                "status": "MAX_PEAK_USED",
-            }
-        else:
-            return {
-                "vertex": vertex_idx,
-                "peak_freq": np.nan,
-                "peak_power": np.nan,
-                "r_squared": np.nan,
-                "status": "NO_VALID_PEAK",
-            }
-
-    # Process vertices in batches for memory efficiency
-    def process_batch(vertex_indices):
-        batch_results = []
-        for i in vertex_indices:
-            result = dickinson_method_vertex(psds[i], i)
-            batch_results.append(result)
-        return batch_results
-
     n_vertices = psds.shape[0]
     print(f"Processing peak frequencies for {n_vertices} vertices...")
 
-    # Create batches of vertices
-    batch_size = 2000  # Adjust based on memory constraints
-    vertex_batches = []
-
-    for i in range(0, n_vertices, batch_size):
-        vertex_batches.append(range(i, min(i + batch_size, n_vertices)))
-
-    # Process batches in parallel
-    all_results = Parallel(n_jobs=n_jobs)(
-        delayed(process_batch)(batch) for batch in vertex_batches
+    results = compute_peak_frequencies(
+        freqs,
+        psds,
+        freq_range=freq_range,
+        alpha_range=alpha_range,
+        smoothing_method=smoothing_method,
+        n_jobs=n_jobs,
+    )
+    n_fallback = int(np.sum(results["fit_path"] == "curve_fit"))
+    print(
+        f"Closed-form peak estimates: {n_vertices - n_fallback}, "
+        f"curve_fit fallbacks: {n_fallback}"
     )
-
-    # Flatten results
-    flat_results = [item for sublist in all_results for item in sublist]
 
     # Create DataFrame
-    peaks_df = pd.DataFrame(flat_results)
+    peaks_df = pd.DataFrame(
+        {
+            "vertex": np.arange(n_vertices),
+            "peak_freq": results["peak_freq"],
+            "peak_power": results["peak_power"],
+            "peak_width": results["peak_width"],
+            "r_squared": results["r_squared"],
+            "status": results["status"],
+            "fit_path": results["fit_path"],
+        }
+    )
 
     # Add metadata
     peaks_df["subject"] = subject_id
@@ -4639,31 +4559,24 @@ def convert_stc_to_eeg(
 
     print(f"Converting stc to EEG format for {subject_id}...")
 
-    # Load the parcellation labels from DK atlas
-    labels = mne.read_labels_from_annot(
-        subject, parc="aparc", subjects_dir=subjects_dir
-    )
-    labels = [label for label in labels if "unknown" not in label.name]
-
-    # Extract time series for each label
-    label_ts = mne.extract_label_time_course(
-        stc, labels, src=None, mode="mean", verbose=True
-    )
+    # Extract time series for each label of the DK atlas
+    atlas = get_atlas_index(stc, subject=subject, subjects_dir=subjects_dir)
+    label_ts = atlas.apply(stc)
 
     # Get data properties
-    n_regions = len(labels)
+    n_regions = atlas.n_rois
     sfreq = (
         1.0 / stc.tstep if hasattr(stc, "tstep") else 1000.0
     )  # Default 1000Hz if not available
-    ch_names = [label.name for label in labels]
+    ch_names = atlas.names
 
     # Create an array of channel positions - we'll use spherical coordinates
     # based on region centroids
     ch_pos = {}
-    for i, label in enumerate(labels):
-        # Extract centroid of the label
-        if hasattr(label, "pos") and len(label.pos) > 0:
-            centroid = np.mean(label.pos, axis=0)
+    for i, ch_name in enumerate(ch_names):
+        # Centroid of the label
+        if not np.isnan(atlas.centroids[i]).any():
+            centroid = atlas.centroids[i]
         else:
             # If no positions available, create a point on a unit sphere
             # We'll distribute them evenly by using golden ratio
@@ -4683,7 +4596,7 @@ def convert_stc_to_eeg(
             )  # Scaled to approximate head radius
 
         # Store in dictionary
-        ch_pos[label.name] = centroid
+        ch_pos[ch_name] = centroid
 
     # Create MNE Info object with channel information
     info = mne.create_info(ch_names=ch_names, sfreq=sfreq, ch_types=["eeg"] * n_regions)
@@ -4724,7 +4637,7 @@ def convert_stc_list_to_eeg(
 
     Parameters
     ----------
-    stc_list : list of SourceEstimate
+    stc_list : list of SourceEstimate | STCStore
         List of source time courses to convert, representing different trials or segments
     subject : str
         Subject name in FreeSurfer subjects directory (default: 'fsaverage')
@@ -4764,43 +4677,32 @@ def convert_stc_list_to_eeg(
         f"Converting {len(stc_list)} source estimates to EEG epochs format for {subject_id}..."
     )
 
-    # Check if all stc objects have the same structure
-    n_times_list = [stc.data.shape[1] for stc in stc_list]
-    if len(set(n_times_list)) > 1:
-        raise ValueError(
-            f"Source estimates have different time dimensions: {n_times_list}"
-        )
-
-    # Load the parcellation labels from DK atlas
-    labels = mne.read_labels_from_annot(
-        subject, parc="aparc", subjects_dir=subjects_dir
-    )
-    labels = [label for label in labels if "unknown" not in label.name]
-
-    # Extract time series for each label for each stc
-    all_label_ts = []
-    for stc in stc_list:
-        # Extract label time courses for this stc
-        label_ts = mne.extract_label_time_course(
-            stc, labels, src=None, mode="mean", verbose=False
-        )
-        all_label_ts.append(label_ts)
+    # Check if all stc objects have the same structure (a store ensures it)
+    if not isinstance(stc_list, STCStore):
+        n_times_list = [stc.data.shape[1] for stc in stc_list]
+        if len(set(n_times_list)) > 1:
+            raise ValueError(
+                f"Source estimates have different time dimensions: {n_times_list}"
+            )
+    template = _stc_template(stc_list)
 
-    # Stack to get 3D array (n_epochs, n_regions, n_times)
-    label_data = np.array(all_label_ts)
+    # Extract time series for each label of the DK atlas, as a 3D array
+    # (n_epochs, n_regions, n_times)
+    atlas = get_atlas_index(template, subject=subject, subjects_dir=subjects_dir)
+    label_data = atlas.apply(stc_list)
 
     # Get data properties from the first stc
     n_epochs = len(stc_list)
-    n_regions = len(labels)
-    sfreq = 1.0 / stc_list[0].tstep
-    ch_names = [label.name for label in labels]
+    n_regions = atlas.n_rois
+    sfreq = 1.0 / template.tstep
+    ch_names = atlas.names
 
     # Create an array of channel positions based on region centroids
     ch_pos = {}
-    for i, label in enumerate(labels):
-        # Extract centroid of the label
-        if hasattr(label, "pos") and len(label.pos) > 0:
-            centroid = np.mean(label.pos, axis=0)
+    for i, ch_name in enumerate(ch_names):
+        # Centroid of the label
+        if not np.isnan(atlas.centroids[i]).any():
+            centroid = atlas.centroids[i]
         else:
             # If no positions available, create a point on a unit sphere
             phi = (1 + np.sqrt(5)) / 2
@@ -4819,7 +4721,7 @@ def convert_stc_list_to_eeg(
             )  # Scaled to approximate head radius
 
         # Store in dictionary
-        ch_pos[label.name] = centroid
+        ch_pos[ch_name] = centroid
 
     # Create MNE Info object with channel information
     info = mne.create_info(ch_names=ch_names, sfreq=sfreq, ch_types=["eeg"] * n_regions)
@@ -4837,7 +4739,7 @@ def convert_stc_list_to_eeg(
         event_id = {"event": 1}
 
     # Create MNE Epochs object from the extracted label time courses
-    tmin = stc_list[0].tmin
+    tmin = template.tmin
     epochs = mne.EpochsArray(
         label_data, info, events=events, event_id=event_id, tmin=tmin
     )
@@ -0,0 +1,245 @@
+"""
+Chunked on-disk container for epoched source estimates.
+
+A list of epoched ``SourceEstimate`` objects on an ico-5 source space can
+take tens of GB per subject. ``STCStore`` keeps the epochs in an HDF5 file
+of shape (n_epochs, n_vertices, n_times), chunked by blocks of vertices, so
+analyses read one block of vertices across all epochs at a time instead of
+holding every epoch in memory.
+
+The list-based functions of ``calc.source`` (``calculate_source_psd_list``,
+``calculate_source_connectivity_list`` and ``convert_stc_list_to_eeg``)
+accept a store wherever they accept a list of source estimates.
+"""
+
+from pathlib import Path
+
+import h5py
+import mne
+import numpy as np
+
+
+class STCStore:
+    """
+    Epoched surface source estimates stored in an HDF5 file.
+
+    Behaves like a read-only list of ``SourceEstimate``: ``len(store)``,
+    ``store[i]`` (loads one epoch), ``store[start:stop]`` (a store restricted
+    to these epochs, nothing is loaded) and iteration.
+
+    Parameters
+    ----------
+    fname : str | Path
+        HDF5 file written by ``STCStore.create``.
+    """
+
+    def __init__(self, fname, _epochs=None, _file=None):
+        self.fname = Path(fname)
+        self._file = _file if _file is not None else h5py.File(self.fname, "r")
+        self._data = self._file["data"]
+        self.vertices = [self._file["lh_vertices"][:], self._file["rh_vertices"][:]]
+        self.tmin = float(self._file.attrs["tmin"])
+        self.tstep = float(self._file.attrs["tstep"])
+        self.subject = self._file.attrs.get("subject") or None
+        if _epochs is None:
+            _epochs = range(self._data.shape[0])
+        self._epochs = _epochs
+
+    @classmethod
+    def create(cls, fname, stcs, vertex_chunk=1024, dtype=None, overwrite=False):
+        """
+        Write source estimates to a new store.
+
+        Parameters
+        ----------
+        fname : str | Path
+            HDF5 file to create.
+        stcs : iterable of SourceEstimate
+            Epochs with the same vertices and number of times. Epochs are
+            written one at a time, so a generator (e.g.
+            ``mne.minimum_norm.apply_inverse_epochs(..., return_generator=True)``)
+            is never held in memory as a whole.
+        vertex_chunk : int
+            Number of vertices per HDF5 chunk.
+        dtype : numpy dtype | None
+            Data type on disk. Defaults to that of the first epoch.
+        overwrite : bool
+            Whether to replace an existing file.
+
+        Returns
+        -------
+        store : STCStore
+            The new store, opened for reading.
+        """
+        fname = Path(fname)
+        if fname.exists() and not overwrite:
+            raise FileExistsError(f"{fname} exists, use overwrite=True to replace it")
+
+        with h5py.File(fname, "w") as f:
+            data = None
+            for epoch_idx, stc in enumerate(stcs):
+                if not isinstance(stc, mne.SourceEstimate):
+                    raise TypeError(
+                        f"Only surface SourceEstimate objects can be stored, "
+                        f"got {type(stc).__name__}"
+                    )
+                if data is None:
+                    n_vertices, n_times = stc.data.shape
+                    data = f.create_dataset(
+                        "data",
+                        shape=(0, n_vertices, n_times),
+                        maxshape=(None, n_vertices, n_times),
+                        chunks=(1, min(vertex_chunk, n_vertices), n_times),
+                        dtype=stc.data.dtype if dtype is None else dtype,
+                    )
+                    f.create_dataset("lh_vertices", data=stc.vertices[0])
+                    f.create_dataset("rh_vertices", data=stc.vertices[1])
+                    f.attrs["tmin"] = stc.tmin
+                    f.attrs["tstep"] = stc.tstep
+                    f.attrs["subject"] = stc.subject or ""
+                    vertices = stc.vertices
+                elif stc.data.shape != data.shape[1:] or not all(
+                    np.array_equal(a, b) for a, b in zip(stc.vertices, vertices)
+                ):
+                    raise ValueError(
+                        f"Epoch {epoch_idx} does not match the vertices and "
+                        f"times of the first epoch"
+                    )
+                data.resize(epoch_idx + 1, axis=0)
+                data[epoch_idx] = stc.data
+            if data is None:
+                raise ValueError("No source estimates to store")
+        return cls(fname)
+
+    @property
+    def n_vertices(self):
+        """Number of source vertices."""
+        return self._data.shape[1]
+
+    @property
+    def dtype(self):
+        """Data type of the stored time courses."""
+        return self._data.dtype
+
+    @property
+    def n_times(self):
+        """Number of time samples per epoch."""
+        return self._data.shape[2]
+
+    @property
+    def sfreq(self):
+        """Sampling frequency."""
+        return 1.0 / self.tstep
+
+    @property
+    def times(self):
+        """Time of each sample of an epoch."""
+        return self.tmin + np.arange(self.n_times) * self.tstep
+
+    @property
+    def shape(self):
+        """(n_epochs, n_vertices, n_times) of the selected epochs."""
+        return (len(self),) + self._data.shape[1:]
+
+    def __len__(self):
+        return len(self._epochs)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            epochs = self._epochs[key]
+            if epochs.step < 1:
+                raise ValueError("Epoch slices must have a positive step")
+            return STCStore(self.fname, _epochs=epochs, _file=self._file)
+        return mne.SourceEstimate(
+            self._data[self._epochs[key]],
+            self.vertices,
+            self.tmin,
+            self.tstep,
+            subject=self.subject,
+        )
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the HDF5 file (shared by all stores sliced from this one)."""
+        self._file.close()
+
+    def _epoch_slice(self):
+        return slice(self._epochs.start, self._epochs.stop, self._epochs.step)
+
+    def read_vertices(self, vertices):
+        """
+        Read some vertices of all selected epochs, concatenated along time.
+
+        Parameters
+        ----------
+        vertices : slice | array of int
+            Row indices into the source space, increasing.
+
+        Returns
+        -------
+        data : array, shape (n_selected, n_epochs * n_times)
+            Time courses of the vertices.
+        """
+        if not isinstance(vertices, slice):
+            vertices = np.asarray(vertices)
+            unique, inverse = np.unique(vertices, return_inverse=True)
+            if len(unique) != len(vertices) or np.any(unique != vertices):
+                return self.read_vertices(unique)[inverse]
+        block = self._data[self._epoch_slice(), vertices, :]
+        return block.transpose(1, 0, 2).reshape(block.shape[1], -1)
+
+    def iter_vertex_blocks(self, block_size=None):
+        """
+        Iterate over blocks of vertices.
+
+        Parameters
+        ----------
+        block_size : int | None
+            Vertices per block. Defaults to the HDF5 chunk size.
+
+        Yields
+        ------
+        vertices : slice
+            Rows of the block in the source space.
+        data : array, shape (n_block, n_epochs, n_times)
+            Data of the block for the selected epochs.
+        """
+        if block_size is None:
+            block_size = self._data.chunks[1]
+        for start in range(0, self.n_vertices, block_size):
+            vertices = slice(start, min(start + block_size, self.n_vertices))
+            yield vertices, self._data[self._epoch_slice(), vertices, :].transpose(
+                1, 0, 2
+            )
+
+    def project(self, matrix):
+        """
+        Apply a (n_rows, n_vertices) matrix to every epoch, block by block.
+
+        Parameters
+        ----------
+        matrix : array | scipy.sparse matrix, shape (n_rows, n_vertices)
+            Linear map from vertices, e.g. an ROI averaging matrix.
+
+        Returns
+        -------
+        projected : array, shape (n_epochs, n_rows, n_times)
+            ``matrix @ stc.data`` of each selected epoch.
+        """
+        projected = np.zeros((len(self), matrix.shape[0], self.n_times))
+        for vertices, block in self.iter_vertex_blocks():
+            rows = matrix[:, vertices]
+            flat = block.reshape(block.shape[0], -1)
+            projected += (rows @ flat).reshape(matrix.shape[0], len(self), -1).transpose(
+                1, 0, 2
+            )
+        return projected
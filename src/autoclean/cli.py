@@ -165,7 +165,52 @@ For detailed help on any command: autocleaneeg-pipeline <command> --help
         "-p",
         type=int,
         metavar="N",
-        help="Process files in parallel (default: 3 concurrent files, max: 8)",
+        help="Process files in parallel (default: 3 concurrent files, max: 8 with thread executor)",
+    )
+    process_parser.add_argument(
+        "--executor",
+        choices=["thread", "process"],
+        default="thread",
+        help="Parallel execution backend: shared-interpreter threads or isolated worker processes (default: thread)",
+    )
+    process_parser.add_argument(
+        "--max-tasks-per-worker",
+        type=int,
+        metavar="N",
+        help="With --executor process, restart each worker after N files",
+    )
+    process_parser.add_argument(
+        "--max-worker-memory",
+        type=int,
+        metavar="MB",
+        help="With --executor process, cap each worker's memory in megabytes",
+    )
+    process_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip files already completed with the same task settings",
+    )
+    process_parser.add_argument(
+        "--hash-contents",
+        action="store_true",
+        help="With --resume, also match moved or copied files by content hash",
+    )
+    process_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Recompute ICA, bad-channel detection and AutoReject instead of reusing cached results",
+    )
+    process_parser.add_argument(
+        "--cache-size",
+        type=int,
+        metavar="MB",
+        help="Size limit of the step cache in megabytes (default: 4096)",
+    )
+    process_parser.add_argument(
+        "--intermediate-format",
+        choices=["eeglab", "fif", "npy", "none"],
+        default="eeglab",
+        help="File format of intermediate stage files, final files are always EEGLAB (default: eeglab)",
     )
     # List tasks command (alias for 'task list')
     list_tasks_parser = subparsers.add_parser(
@@ -426,6 +471,12 @@ def cmd_process(args) -> int:
         pipeline_kwargs = {"output_dir": args.output}
         if args.verbose:
             pipeline_kwargs["verbose"] = "debug"
+        if getattr(args, "no_cache", False):
+            pipeline_kwargs["use_cache"] = False
+        if getattr(args, "cache_size", None):
+            pipeline_kwargs["cache_size_mb"] = args.cache_size
+        if getattr(args, "intermediate_format", None):
+            pipeline_kwargs["intermediate_format"] = args.intermediate_format
 
         pipeline = Pipeline(**pipeline_kwargs)
 
@@ -475,14 +526,29 @@ def cmd_process(args) -> int:
             # Use parallel processing if requested
             if hasattr(args, 'parallel') and args.parallel:
                 import asyncio
-                max_concurrent = min(max(1, args.parallel), 8)  # Clamp between 1-8
-                message("info", f"Parallel processing: {max_concurrent} concurrent files")
+                import os
+
+                executor = getattr(args, "executor", "thread")
+                if executor == "process":
+                    # Worker processes do not share the GIL, allow one per core
+                    max_concurrent = min(max(1, args.parallel), os.cpu_count() or 1)
+                else:
+                    max_concurrent = min(max(1, args.parallel), 8)  # Clamp between 1-8
+                message(
+                    "info",
+                    f"Parallel processing: {max_concurrent} concurrent files ({executor} executor)",
+                )
                 asyncio.run(pipeline.process_directory_async(
                     directory_path=args.final_input,
                     task=task_name,
                     pattern=args.format,
                     sub_directories=args.recursive,
                     max_concurrent=max_concurrent,
+                    executor=executor,
+                    max_tasks_per_worker=getattr(args, "max_tasks_per_worker", None),
+                    max_worker_memory_mb=getattr(args, "max_worker_memory", None),
+                    skip_completed=getattr(args, "resume", False),
+                    content_hash=getattr(args, "hash_contents", False),
                 ))
             else:
                 pipeline.process_directory(
@@ -490,6 +556,8 @@ def cmd_process(args) -> int:
                     task=task_name,
                     pattern=args.format,
                     recursive=args.recursive,
+                    skip_completed=getattr(args, "resume", False),
+                    content_hash=getattr(args, "hash_contents", False),
                 )
         message("info", "Processing completed successfully!")
         return 0
@@ -46,19 +46,35 @@ Async processing of multiple files:
 ...     pattern="*.raw",
 ...     max_concurrent=5
 ... )
+
+Process-pool processing of multiple files (one interpreter per worker):
+
+>>> pipeline.process_directory_async(
+...     directory="/path/to/data",
+...     task="rest_eyesopen",
+...     pattern="*.raw",
+...     max_concurrent=16,
+...     executor="process",
+...     max_tasks_per_worker=10,
+...     max_worker_memory_mb=8000,
+... )
 """
 
 import asyncio
+import functools
 import importlib.util
 import inspect
 
 # Standard library imports
 import json
+import multiprocessing
 import sys
 import threading  # Add threading import
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Type, Union
+from typing import Dict, List, Optional, Type, Union
 
 import matplotlib
 
@@ -69,7 +85,13 @@ from ulid import ULID
 
 # IMPORT TASKS HERE
 from autoclean.core.task import Task
-from autoclean.io.export import copy_final_files, save_epochs_to_set, save_raw_to_set
+from autoclean.functions.preprocessing.chunked import preload_file_path
+from autoclean.io.export import (
+    STAGE_FORMATS,
+    copy_final_files,
+    save_epochs_to_set,
+    save_raw_to_set,
+)
 from autoclean.io.import_ import discover_event_processors, discover_plugins
 from autoclean.step_functions.reports import (
     create_json_summary,
@@ -87,13 +109,29 @@ from autoclean.utils.auth import (
 from autoclean.utils.config import (
     hash_and_encode_yaml,
 )
+from autoclean.utils.copy_tracker import (
+    begin_copy_tracking,
+    copied_bytes,
+    end_copy_tracking,
+)
 from autoclean.utils.database import (
+    begin_buffered_writes,
+    end_buffered_writes,
     get_run_record,
     manage_database_conditionally,
     set_database_path,
 )
-from autoclean.utils.file_system import step_prepare_directories
+from autoclean.utils.file_system import (
+    get_data_sidecars,
+    hash_input_file,
+    step_prepare_directories,
+)
 from autoclean.utils.logging import configure_logger, message
+from autoclean.utils.stage_writer import (
+    begin_background_writes,
+    end_background_writes,
+    wait_for_stage_writes,
+)
 from autoclean.utils.user_config import user_config
 
 # Try to import optional GUI dependencies
@@ -108,6 +146,9 @@ except ImportError:
 # This prevents GUI thread conflicts during parallel processing
 matplotlib.use("Agg")
 
+# Per-process pipeline used by process-pool workers (see _init_process_worker)
+_WORKER_PIPELINE: Optional["Pipeline"] = None
+
 
 class Pipeline:
     """Pipeline class for EEG processing.
@@ -155,6 +196,9 @@ class Pipeline:
         self,
         output_dir: Optional[str | Path] = None,
         verbose: Optional[Union[bool, str, int]] = None,
+        use_cache: bool = True,
+        cache_size_mb: Optional[int] = None,
+        intermediate_format: str = "eeglab",
     ):
         """Initialize a new processing pipeline.
 
@@ -171,6 +215,18 @@ class Pipeline:
             * str: One of 'debug', 'info', 'warning', 'error', or 'critical'.
             * int: Standard Python logging level (10=DEBUG, 20=INFO, etc.).
             * None: Reads MNE_LOGGING_LEVEL environment variable, defaults to INFO.
+        use_cache : bool, optional
+            If True (default), results of expensive deterministic steps (ICA
+            fitting, bad-channel detection, AutoReject fitting) are cached
+            under ``<output_dir>/.step_cache`` and reused when a step sees
+            the same data and parameters again.
+        cache_size_mb : int, optional
+            Size limit of the step cache in megabytes. Least recently used
+            entries are evicted beyond it. Defaults to 4096.
+        intermediate_format : str, optional
+            File format of intermediate stage files: "eeglab" (default),
+            "fif", "npy" (float32 array plus JSON sidecar) or "none" to skip
+            them. Final stages copied to final_files are always EEGLAB.
 
 
         Examples
@@ -207,6 +263,20 @@ class Pipeline:
         # Create session-specific task registry (copy of built-in + user tasks)
         self.session_task_registry: Dict[str, Type[Task]] = task_registry.copy()
 
+        # Task files registered via add_task, replayed in process-pool workers
+        self.task_files: List[Path] = []
+
+        # Memoization of expensive steps, shared by all runs in output_dir
+        self.use_cache = use_cache
+        self.cache_size_mb = cache_size_mb
+
+        if intermediate_format.lower() not in STAGE_FORMATS:
+            raise ValueError(
+                f"Unknown intermediate format '{intermediate_format}', "
+                f"expected one of {', '.join(STAGE_FORMATS)}"
+            )
+        self.intermediate_format = intermediate_format.lower()
+
         message("header", "Welcome to AutoClean!")
 
         # All configuration now comes from task files directly
@@ -230,7 +300,12 @@ class Pipeline:
         )
 
     def _entrypoint(
-        self, unprocessed_file: Path, task: str, run_id: Optional[str] = None
+        self,
+        unprocessed_file: Path,
+        task: str,
+        run_id: Optional[str] = None,
+        input_hash: Optional[str] = None,
+        backup_existing: bool = True,
     ) -> None:
         """Main processing entrypoint that orchestrates the complete pipeline.
 
@@ -243,6 +318,11 @@ class Pipeline:
         run_id : str, optional
             Optional identifier for the processing run, by default None.
             If not provided, a unique ID will be generated.
+        input_hash : str, optional
+            Fingerprint of the input file from ``hash_input_file``. Computed
+            from file size and modification time if not provided.
+        backup_existing : bool, optional
+            Passed to ``step_prepare_directories``, by default True.
 
         Returns
         -------
@@ -259,6 +339,7 @@ class Pipeline:
         if run_id is None:
             # Generate time-ordered unique ID for run tracking
             run_id = str(ULID())
+            stat_hash = self._hash_input(unprocessed_file)
             # Initialize run record with metadata
             run_record = {
                 "run_id": run_id,
@@ -272,6 +353,12 @@ class Pipeline:
                 "report_file": f"{unprocessed_file.stem}_autoclean_report.pdf",
                 "user_context": get_current_user_for_audit(),
                 "metadata": {},
+                # Fingerprints used to skip completed inputs on resumed batches.
+                # The stat fingerprint is always stored so that later batches
+                # match the run whichever fingerprint they use.
+                "input_hash": input_hash or stat_hash,
+                "input_stat_hash": stat_hash,
+                "task_hash": self._hash_task(task)[0],
             }
 
             # Store initial run record and get database ID with audit protection
@@ -290,6 +377,16 @@ class Pipeline:
         # Initialize run_dict early for error handling
         run_dict = None
 
+        # Hold metadata/status updates in memory and write them in batches at
+        # stage boundaries, before the record is read, on failure and at the end
+        begin_buffered_writes(run_id)
+
+        # Write stage files on a background thread while the next step runs
+        begin_background_writes(run_id)
+
+        # Count the bytes of data copied by processing steps
+        begin_copy_tracking(run_id)
+
         try:
             # Perform core validation steps
             self._validate_file(unprocessed_file)
@@ -299,6 +396,14 @@ class Pipeline:
 
             dataset_name = extract_config_from_task(task, "dataset_name")
 
+            # A backup would move the stage files an interrupted run of this
+            # file can resume from
+            input_hashes = {unprocessed_file: run_record.get("input_hash")}
+            if backup_existing and self._has_interrupted_run(
+                [unprocessed_file], task, input_hashes
+            ):
+                backup_existing = False
+
             # Prepare directory structure for processing outputs
             (
                 autoclean_dir,  # Root output directory
@@ -308,7 +413,9 @@ class Pipeline:
                 stage_dir,  # Intermediate processing stages
                 logs_dir,  # Debug information and logs
                 final_files_dir,  # Final processed files directory
-            ) = step_prepare_directories(task, self.output_dir, dataset_name)
+            ) = step_prepare_directories(
+                task, self.output_dir, dataset_name, backup_existing=backup_existing
+            )
 
             # Update database with directory structure using audit protection
             manage_database_conditionally(
@@ -329,11 +436,10 @@ class Pipeline:
             )
 
             # Create minimal config for Python task tracking
-            task_config = {"type": "python_task", "class_name": task}
-            b64_config, config_hash = hash_and_encode_yaml(
+            config_hash, b64_config = hash_and_encode_yaml(
                 {"version": "1.0", "type": "python_tasks_only"}, is_file=False
             )
-            b64_task, task_hash = hash_and_encode_yaml(task_config, is_file=False)
+            task_hash, b64_task = self._hash_task(task)
 
             # Prepare configuration for task execution
             run_dict = {
@@ -351,6 +457,12 @@ class Pipeline:
                 "config_b64": b64_config,
                 "task_hash": task_hash,
                 "task_b64": b64_task,
+                "input_hash": run_record.get("input_hash"),
+                "step_cache_dir": (
+                    self.output_dir / ".step_cache" if self.use_cache else None
+                ),
+                "step_cache_size_mb": self.cache_size_mb,
+                "intermediate_format": self.intermediate_format,
             }
             run_dict["participants_tsv_lock"] = self.participants_tsv_lock
 
@@ -384,7 +496,10 @@ class Pipeline:
                 update_record={"run_id": run_id, "task_file_info": task_file_info},
             )
 
-            task_object.run()
+            task_object.run_with_checkpoints()
+
+            # A failed stage write fails the run
+            wait_for_stage_writes(run_id)
 
             try:
                 flagged, flagged_reasons = task_object.get_flagged_status()
@@ -405,6 +520,8 @@ class Pipeline:
                         flagged=flagged,
                     )
 
+                wait_for_stage_writes(run_id)
+
                 # Copy final files to the dedicated final_files directory
                 if not flagged:  # Only copy if processing was successful
                     copy_final_files(run_dict)
@@ -412,6 +529,14 @@ class Pipeline:
             except Exception as e:  # pylint: disable=broad-except
                 message("error", f"Failed to save completion data: {str(e)}")
 
+            manage_database_conditionally(
+                operation="update",
+                update_record={
+                    "run_id": run_id,
+                    "metadata": {"copied_bytes": copied_bytes(run_id)},
+                },
+            )
+
             message("success", f"✓ Task {task} completed successfully")
 
             # Set success status FIRST so JSON summary can detect success correctly
@@ -482,6 +607,18 @@ class Pipeline:
             message("success", f"✓ Run record exported to {json_file}")
 
         except Exception as e:
+            # Let queued stage files land, they can serve as restart points
+            end_background_writes(run_id)
+
+            # Persist everything recorded before the failure, then write the
+            # failure path directly
+            try:
+                end_buffered_writes(run_id)
+            except Exception as flush_error:  # pylint: disable=broad-except
+                message(
+                    "error", f"Failed to flush buffered database writes: {flush_error}"
+                )
+
             # Get flagged status before creating summary for error case
             try:
                 flagged, error_flagged_reasons = task_object.get_flagged_status()
@@ -538,10 +675,43 @@ class Pipeline:
             message("error", f"Run {run_record['run_id']} Pipeline failed: {e}")
             raise
 
+        finally:
+            end_background_writes(run_id)
+            end_buffered_writes(run_id)
+
+            # Chunked processing preloads the recording into a file in the
+            # stage directory, which is not needed past the run
+            if run_dict is not None:
+                preload_file = preload_file_path(
+                    run_dict["stage_dir"], run_dict["unprocessed_file"]
+                )
+                try:
+                    preload_file.unlink(missing_ok=True)
+                except OSError as e:
+                    message("warning", f"Could not remove {preload_file}: {e}")
+
+            copied = end_copy_tracking(run_id)
+            if copied:
+                per_step = ", ".join(
+                    f"{step}: {nbytes / 1e6:.1f} MB"
+                    for step, nbytes in sorted(
+                        copied.items(), key=lambda item: item[1], reverse=True
+                    )
+                )
+                message(
+                    "debug",
+                    f"Copied {sum(copied.values()) / 1e6:.1f} MB of data ({per_step})",
+                )
+
         return run_record["run_id"]
 
     async def _entrypoint_async(
-        self, unprocessed_file: Path, task: str, run_id: Optional[str] = None
+        self,
+        unprocessed_file: Path,
+        task: str,
+        run_id: Optional[str] = None,
+        input_hash: Optional[str] = None,
+        backup_existing: bool = True,
     ) -> None:
         """Async version of _entrypoint for concurrent processing.
 
@@ -553,6 +723,10 @@ class Pipeline:
             Name of the processing task to run.
         run_id : str, optional
             Optional identifier for the processing run, by default None.
+        input_hash : str, optional
+            Fingerprint of the input file, see ``_entrypoint``.
+        backup_existing : bool, optional
+            Passed to ``step_prepare_directories``, by default True.
 
         Notes
         -----
@@ -562,7 +736,14 @@ class Pipeline:
         """
         try:
             # Run the processing in a thread to avoid blocking
-            await asyncio.to_thread(self._entrypoint, unprocessed_file, task, run_id)
+            await asyncio.to_thread(
+                self._entrypoint,
+                unprocessed_file,
+                task,
+                run_id,
+                input_hash=input_hash,
+                backup_existing=backup_existing,
+            )
         except Exception as e:
             message("error", f"Failed to process {unprocessed_file}: {str(e)}")
             raise
@@ -623,6 +804,8 @@ class Pipeline:
         task: str = "",
         pattern: str = "*.set",
         recursive: bool = False,
+        skip_completed: bool = False,
+        content_hash: bool = False,
     ) -> None:
         """Processes all files matching a pattern within a directory sequentially.
 
@@ -637,6 +820,15 @@ class Pipeline:
             Glob pattern to match files within the directory, default is `*.set`.
         recursive : bool, optional
             If True, searches subdirectories recursively, by default False.
+        skip_completed : bool, optional
+            If True, skip files that already have a completed run with the
+            same task and task settings, and keep the existing task directory
+            instead of backing it up. By default False.
+        content_hash : bool, optional
+            With ``skip_completed``, also identify files by a hash of their
+            contents when their path, size and modification time do not match
+            a completed run. Slower, but recognizes files that were moved or
+            copied. By default False.
 
         See Also
         --------
@@ -711,10 +903,25 @@ class Pipeline:
 
         message("info", f"Found {len(files)} files to process")
 
+        input_hashes = {}
+        if skip_completed:
+            files, input_hashes = self._filter_completed_files(
+                files, task, content_hash
+            )
+
+        backup_existing = not skip_completed and not self._has_interrupted_run(
+            files, task, input_hashes
+        )
+
         # Process each file
         for file_path in files:
             try:
-                self._entrypoint(file_path, task)
+                self._entrypoint(
+                    file_path,
+                    task,
+                    input_hash=input_hashes.get(file_path),
+                    backup_existing=backup_existing,
+                )
             except Exception as e:  # pylint: disable=broad-except
                 message("error", f"Failed to process {file_path}: {str(e)}")
                 continue
@@ -727,6 +934,12 @@ class Pipeline:
         pattern: str = "*.raw",
         sub_directories: bool = False,
         max_concurrent: int = 3,
+        executor: str = "thread",
+        max_tasks_per_worker: Optional[int] = None,
+        max_worker_memory_mb: Optional[int] = None,
+        largest_first: bool = True,
+        skip_completed: bool = False,
+        content_hash: bool = False,
     ) -> None:
         """Processes all files matching a pattern within a directory asynchronously.
 
@@ -743,6 +956,34 @@ class Pipeline:
             If True, searches subdirectories recursively, by default False.
         max_concurrent : int, optional
             Maximum number of files to process concurrently, by default 3.
+        executor : {"thread", "process"}, optional
+            How each file is executed, by default "thread".
+
+            * "thread": run in the event loop's thread pool (shared interpreter).
+            * "process": run in a spawn-based process pool with
+              ``max_concurrent`` workers, so files do not share the GIL and a
+              worker that crashes only fails the file it was processing.
+              Every file in flight when a worker dies is re-run alone on a
+              worker of its own, and fails only if it crashes that one too.
+        max_tasks_per_worker : int, optional
+            Process mode only. Recycle a worker after it has processed this many
+            files, releasing any memory it accumulated. Requires Python 3.11+.
+            By default workers live for the whole batch.
+        max_worker_memory_mb : int, optional
+            Process mode only. Cap the address space of each worker in megabytes
+            (POSIX only). A file exceeding the cap fails with ``MemoryError``
+            instead of taking down the machine. By default no cap is applied.
+        largest_first : bool, optional
+            If True (default), start the largest files first so that long
+            recordings do not end up as the tail of the batch.
+        skip_completed : bool, optional
+            If True, skip files that already have a completed run with the
+            same task and task settings, and keep the existing task directory
+            instead of backing it up. By default False.
+        content_hash : bool, optional
+            With ``skip_completed``, also identify files by a hash of their
+            contents when their path, size and modification time do not match
+            a completed run. By default False.
 
         See Also
         --------
@@ -751,10 +992,20 @@ class Pipeline:
 
         Notes
         -----
-        Implements concurrent batch processing using asyncio semaphores
-        for resource management. Processes files in optimized batches
-        while maintaining progress tracking and error isolation.
+        Files are fed through a work queue drained by ``max_concurrent``
+        workers, so a free worker picks up the next file as soon as it
+        finishes instead of waiting for a whole batch to complete. Progress
+        tracking and error isolation are per file.
+
+        In process mode every worker builds its own Pipeline for the same
+        output directory and re-registers task files added with ``add_task``.
+        Writes to participants.tsv are serialized with a cross-process lock.
         """
+        if executor not in ("thread", "process"):
+            raise ValueError(
+                f"Invalid executor '{executor}'. Must be 'thread' or 'process'"
+            )
+
         # Use input_path from task config if directory_path not provided
         if directory_path is None:
             from autoclean.utils.task_discovery import extract_config_from_task
@@ -807,48 +1058,186 @@ class Pipeline:
 
             return
 
+        input_hashes = {}
+        if skip_completed:
+            files, input_hashes = self._filter_completed_files(
+                files, task, content_hash
+            )
+            if not files:
+                message("info", "All matching files are already completed")
+                return
+
         message(
             "info",
             f"\nStarting processing of {len(files)} files with {max_concurrent} concurrent workers",
         )
 
-        # Create semaphore to prevent resource exhaustion
-        sem = asyncio.Semaphore(max_concurrent)
+        backup_existing = not skip_completed and not self._has_interrupted_run(
+            files, task, input_hashes
+        )
+
+        # Process pool is created lazily and replaced if a worker dies
+        pool_state: Dict[str, Optional[ProcessPoolExecutor]] = {"pool": None}
+        if executor == "process":
+            # Each worker is a fresh process, so the once-per-process backup
+            # in step_prepare_directories would run in every worker. Do it
+            # here once and let the workers reuse the directory.
+            if backup_existing:
+                from autoclean.utils.task_discovery import extract_config_from_task
+
+                step_prepare_directories(
+                    self._validate_task(task),
+                    self.output_dir,
+                    extract_config_from_task(task, "dataset_name"),
+                )
+            pool_state["pool"] = self._create_process_pool(
+                max_concurrent, max_tasks_per_worker, max_worker_memory_mb
+            )
+
+        async def run_file(file_path: Path) -> None:
+            """Run a single file on the configured executor."""
+            entry_kwargs = {
+                "input_hash": input_hashes.get(file_path),
+                "backup_existing": executor == "thread" and backup_existing,
+            }
+            if executor == "thread":
+                await self._entrypoint_async(file_path, task, **entry_kwargs)
+                return
+
+            loop = asyncio.get_running_loop()
+            process_file = functools.partial(
+                _process_file_in_worker, file_path, task, **entry_kwargs
+            )
+            pool = pool_state["pool"]
+            try:
+                await loop.run_in_executor(pool, process_file)
+                return
+            except BrokenProcessPool:
+                # A worker died (e.g. killed by the OOM killer). Replace the
+                # pool so the remaining files keep running.
+                if pool_state["pool"] is pool:
+                    message("warning", "Worker process died, restarting pool")
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool_state["pool"] = self._create_process_pool(
+                        max_concurrent, max_tasks_per_worker, max_worker_memory_mb
+                    )
+
+            # A dead worker breaks every file in flight on the pool, not just
+            # the one that crashed it. Re-run the file on a worker of its own,
+            # so it only fails if it crashes a worker by itself.
+            message("warning", f"Retrying {file_path.name} on a dedicated worker")
+            solo_pool = self._create_process_pool(1, None, max_worker_memory_mb)
+            try:
+                await loop.run_in_executor(solo_pool, process_file)
+            except BrokenProcessPool as e:
+                raise RuntimeError(f"Worker process terminated abruptly: {e}") from e
+            finally:
+                solo_pool.shutdown(wait=False)
 
         # Initialize progress tracking
         pbar = tqdm(total=len(files), desc="Processing files", unit="file")
 
-        async def process_with_semaphore(file_path: Path) -> None:
-            """Process a single file with semaphore control."""
-            async with sem:  # Limit overall concurrent processing
+        # Largest recordings first so a long file does not start last and
+        # leave the other workers idle while it finishes
+        if largest_first:
+            files.sort(key=_estimate_file_size, reverse=True)
+
+        # Work queue drained by a fixed number of workers (no batch barrier)
+        queue: asyncio.Queue = asyncio.Queue()
+        for file_path in files:
+            queue.put_nowait(file_path)
+
+        results = {"completed": 0, "failed": 0}
+
+        async def queue_worker() -> None:
+            """Process files from the queue until it is empty."""
+            while True:
                 try:
-                    # Pass the acquired lock information (implicitly via self if needed later,
-                    # but the lock is mainly for the bids step itself)
-                    await self._entrypoint_async(file_path, task)
+                    file_path = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    await run_file(file_path)
+                    results["completed"] += 1
                     pbar.write(f"✓ Completed: {file_path.name}")
                 except Exception as e:  # pylint: disable=broad-except
+                    results["failed"] += 1
                     pbar.write(f"✗ Failed: {file_path.name} - {str(e)}")
                 finally:
                     pbar.update(1)  # Update progress regardless of outcome
+                    queue.task_done()
 
         try:
-            # Process files in batches to optimize memory usage
-            # Batch size is double the concurrent limit to ensure worker saturation
-            batch_size = max_concurrent * 2
-            for i in range(0, len(files), batch_size):
-                batch = files[i : i + batch_size]
-                # Create task list for current batch
-                tasks = [process_with_semaphore(f) for f in batch]
-                # Process batch with error handling
-                await asyncio.gather(*tasks, return_exceptions=True)
+            workers = [
+                asyncio.create_task(queue_worker())
+                for _ in range(min(max_concurrent, len(files)))
+            ]
+            await asyncio.gather(*workers, return_exceptions=True)
         finally:
             pbar.close()
+            if pool_state["pool"] is not None:
+                pool_state["pool"].shutdown(wait=True)
 
         # Print processing summary
         message("info", "\nProcessing Summary:")
         message("info", f"Total files processed: {len(files)}")
+        message("info", f"Completed: {results['completed']}, Failed: {results['failed']}")
         message("info", "Check individual file logs for detailed status")
 
+    def _create_process_pool(
+        self,
+        max_workers: int,
+        max_tasks_per_worker: Optional[int] = None,
+        max_worker_memory_mb: Optional[int] = None,
+    ) -> ProcessPoolExecutor:
+        """Create a spawn-based process pool for process_directory_async.
+
+        Parameters
+        ----------
+        max_workers : int
+            Number of worker processes.
+        max_tasks_per_worker : int, optional
+            Number of files after which a worker is replaced.
+        max_worker_memory_mb : int, optional
+            Address-space cap applied to each worker, in megabytes.
+
+        Returns
+        -------
+        ProcessPoolExecutor
+            Pool whose workers each hold a Pipeline for this output directory.
+        """
+        # Spawn avoids inheriting MNE/matplotlib/SQLite state from the parent
+        ctx = multiprocessing.get_context("spawn")
+        if not hasattr(self, "_process_participants_lock"):
+            self._process_participants_lock = ctx.Lock()
+
+        pool_kwargs = {}
+        if max_tasks_per_worker:
+            if sys.version_info >= (3, 11):
+                pool_kwargs["max_tasks_per_child"] = max_tasks_per_worker
+            else:
+                message(
+                    "warning",
+                    "max_tasks_per_worker requires Python 3.11+, workers will not be recycled",
+                )
+
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=ctx,
+            initializer=_init_process_worker,
+            initargs=(
+                self.output_dir,
+                self.verbose,
+                list(self.task_files),
+                self._process_participants_lock,
+                max_worker_memory_mb,
+                self.use_cache,
+                self.cache_size_mb,
+                self.intermediate_format,
+            ),
+            **pool_kwargs,
+        )
+
     def list_tasks(self) -> list[str]:
         """Get a list of available processing tasks.
 
@@ -942,6 +1331,8 @@ class Pipeline:
         # Register in session registry (case-insensitive key)
         task_name = task_class.__name__.lower()
         self.session_task_registry[task_name] = task_class
+        if task_file_path.absolute() not in self.task_files:
+            self.task_files.append(task_file_path.absolute())
 
         message(
             "success",
@@ -1091,3 +1482,279 @@ class Pipeline:
 
         message("success", f"✓ File '{file_path}' found")
         return path
+
+    def _hash_task(self, task: str) -> tuple[str, str]:
+        """Hash a task's identity and settings for run tracking.
+
+        Parameters
+        ----------
+        task : str
+            Name of a task in the session registry.
+
+        Returns
+        -------
+        tuple of (str, str)
+            The SHA256 hash and the base64-encoded YAML of the task config.
+
+        Notes
+        -----
+        The hash covers the class name and the module-level ``config`` (or
+        ``settings`` attribute) of the task, so editing a task's settings
+        invalidates completed runs for ``skip_completed``.
+        """
+        task_class = self.session_task_registry.get(task.lower())
+        settings = getattr(task_class, "settings", None)
+        if settings is None and task_class is not None:
+            module = inspect.getmodule(task_class)
+            settings = getattr(module, "config", None)
+
+        task_config = {
+            "type": "python_task",
+            "class_name": task,
+            # Round-trip through JSON so tuples/paths serialize as plain YAML
+            "settings": json.loads(json.dumps(settings, default=str)),
+        }
+        return hash_and_encode_yaml(task_config, is_file=False)
+
+    def _hash_input(
+        self, file_path: Path, content_hash: bool = False
+    ) -> Optional[str]:
+        """Fingerprint an input file, returning None if it cannot be read.
+
+        Parameters
+        ----------
+        file_path : Path
+            Path to the raw EEG data file.
+        content_hash : bool, optional
+            Hash file contents instead of size and modification time.
+
+        Returns
+        -------
+        str or None
+            Fingerprint from ``hash_input_file``, or None on error.
+        """
+        try:
+            return hash_input_file(file_path, content_hash=content_hash)
+        except OSError as e:
+            message("warning", f"Could not fingerprint {file_path}: {e}")
+            return None
+
+    def _has_interrupted_run(
+        self,
+        files: List[Path],
+        task: str,
+        input_hashes: Optional[Dict[Path, Optional[str]]] = None,
+    ) -> bool:
+        """Check whether a file has stage checkpoints of an unfinished run.
+
+        Backing up the task directory moves the stage files these checkpoints
+        point to, so a plain rerun after a crash could not resume from them.
+
+        Parameters
+        ----------
+        files : list of Path
+            Input files about to be processed.
+        task : str
+            Name of the processing task to run.
+        input_hashes : dict, optional
+            Already computed fingerprints of the files.
+
+        Returns
+        -------
+        bool
+            True if a file has checkpoints newer than its last completed run.
+        """
+        task_hash, _ = self._hash_task(task)
+        input_hashes = input_hashes or {}
+        for file_path in files:
+            input_hash = input_hashes.get(file_path) or self._hash_input(file_path)
+            if input_hash is None:
+                continue
+            fingerprint = {"input_hash": input_hash, "task_hash": task_hash}
+            checkpoints = manage_database_conditionally(
+                operation="get_checkpoints", run_record=fingerprint
+            )
+            if not checkpoints:
+                continue
+            completed = manage_database_conditionally(
+                operation="find_completed_run", run_record=fingerprint
+            )
+            # Run IDs are ULIDs, which sort by creation time
+            if any(
+                completed is None or row["run_id"] > completed for row in checkpoints
+            ):
+                message(
+                    "info",
+                    f"Found checkpoints of an interrupted run of {file_path.name}, "
+                    "keeping the existing task directory",
+                )
+                return True
+        return False
+
+    def _filter_completed_files(
+        self, files: List[Path], task: str, content_hash: bool = False
+    ) -> tuple[List[Path], Dict[Path, Optional[str]]]:
+        """Drop files that already completed with the same task settings.
+
+        Parameters
+        ----------
+        files : list of Path
+            Candidate input files.
+        task : str
+            Name of the processing task to run.
+        content_hash : bool, optional
+            Also compare the contents of files whose size or modification
+            time did not match a completed run, e.g. moved or copied files.
+
+        Returns
+        -------
+        tuple of (list of Path, dict)
+            Files still to process, and the input fingerprint of every file
+            so it does not need to be recomputed when the run is stored.
+        """
+        task = self._validate_task(task)
+        task_hash, _ = self._hash_task(task)
+
+        def find_completed_run(input_hash):
+            if input_hash is None:
+                return None
+            return manage_database_conditionally(
+                operation="find_completed_run",
+                run_record={"input_hash": input_hash, "task_hash": task_hash},
+            )
+
+        pending = []
+        input_hashes = {}
+        for file_path in files:
+            # An unchanged file matches on its stat fingerprint, which every
+            # run stores, without reading its contents
+            input_hash = self._hash_input(file_path)
+            run_id = find_completed_run(input_hash)
+            if content_hash and not run_id:
+                input_hash = self._hash_input(file_path, content_hash=True)
+                run_id = find_completed_run(input_hash)
+            input_hashes[file_path] = input_hash
+            if run_id:
+                message(
+                    "debug", f"Skipping {file_path.name}: completed in run {run_id}"
+                )
+            else:
+                pending.append(file_path)
+
+        skipped = len(files) - len(pending)
+        if skipped:
+            message(
+                "info",
+                f"Skipping {skipped} of {len(files)} files already completed with this task",
+            )
+        return pending, input_hashes
+
+
+def _estimate_file_size(file_path: Path) -> int:
+    """Estimate the on-disk size of a recording, including data sidecars.
+
+    Parameters
+    ----------
+    file_path : Path
+        Path to the EEG file matched by the directory pattern.
+
+    Returns
+    -------
+    int
+        Size in bytes of the file plus any EEGLAB (.fdt) or BrainVision
+        (.eeg) data file next to it, or 0 if the file cannot be read.
+    """
+    candidates = [file_path] + get_data_sidecars(file_path)
+    size = 0
+    for candidate in candidates:
+        try:
+            size += candidate.stat().st_size
+        except OSError:
+            continue
+    return size
+
+
+def _init_process_worker(
+    output_dir: Path,
+    verbose: Optional[Union[bool, str, int]],
+    task_files: List[Path],
+    participants_tsv_lock,
+    max_memory_mb: Optional[int] = None,
+    use_cache: bool = True,
+    cache_size_mb: Optional[int] = None,
+    intermediate_format: str = "eeglab",
+) -> None:
+    """Initialize a process-pool worker with its own Pipeline.
+
+    Parameters
+    ----------
+    output_dir : Path
+        Output directory of the parent pipeline.
+    verbose : bool, str, int, or None
+        Verbosity of the parent pipeline.
+    task_files : list of Path
+        Task files registered on the parent pipeline with ``add_task``.
+    participants_tsv_lock : multiprocessing.Lock
+        Lock shared by all workers for participants.tsv writes.
+    max_memory_mb : int, optional
+        Address-space cap for this worker, in megabytes.
+    use_cache : bool, optional
+        Step cache setting of the parent pipeline.
+    cache_size_mb : int, optional
+        Step cache size limit of the parent pipeline.
+    intermediate_format : str, optional
+        Stage file format of the parent pipeline.
+    """
+    global _WORKER_PIPELINE  # pylint: disable=global-statement
+
+    if max_memory_mb:
+        try:
+            import resource  # pylint: disable=import-outside-toplevel
+
+            limit = int(max_memory_mb) * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            message("warning", f"Could not cap worker memory: {e}")
+
+    pipeline = Pipeline(
+        output_dir=output_dir,
+        verbose=verbose,
+        use_cache=use_cache,
+        cache_size_mb=cache_size_mb,
+        intermediate_format=intermediate_format,
+    )
+    for task_file in task_files:
+        pipeline.add_task(task_file)
+    pipeline.participants_tsv_lock = participants_tsv_lock
+    _WORKER_PIPELINE = pipeline
+
+
+def _process_file_in_worker(
+    file_path: Path,
+    task: str,
+    input_hash: Optional[str] = None,
+    backup_existing: bool = True,
+) -> str:
+    """Process a single file inside a process-pool worker.
+
+    Parameters
+    ----------
+    file_path : Path
+        Path to the raw EEG data file.
+    task : str
+        Name of the processing task to run.
+    input_hash : str, optional
+        Fingerprint of the input file, see ``Pipeline._entrypoint``.
+    backup_existing : bool, optional
+        Passed to ``step_prepare_directories``, by default True.
+
+    Returns
+    -------
+    str
+        The run identifier.
+    """
+    if _WORKER_PIPELINE is None:
+        raise RuntimeError("Process worker was not initialized")
+    return _WORKER_PIPELINE._entrypoint(  # pylint: disable=protected-access
+        file_path, task, input_hash=input_hash, backup_existing=backup_existing
+    )
@@ -9,6 +9,10 @@ from typing import Any, Dict, Optional
 # Third-party imports
 import mne  # Core EEG processing library for data containers and processing
 
+from autoclean.functions.preprocessing.chunked import (
+    preload_file_path,
+    preload_to_file,
+)
 from autoclean.io.export import save_epochs_to_set, save_raw_to_set
 from autoclean.io.import_ import import_eeg
 
@@ -43,6 +47,12 @@ except ImportError as e:
     DISCOVERED_MIXINS = (_ImportErrorMixinFallback,)
 
 from autoclean.utils.auth import require_authentication
+from autoclean.utils.checkpoint import (
+    CheckpointMismatch,
+    StageCheckpoints,
+    reset_raw_stage,
+)
+from autoclean.utils.logging import message
 
 
 class Task(ABC, *DISCOVERED_MIXINS):
@@ -63,8 +73,15 @@ class Task(ABC, *DISCOVERED_MIXINS):
     Abstract base class that enforces a consistent interface across all EEG processing
     tasks through abstract methods and strict type checking. Manages state through
     MNE objects (Raw and Epochs) while maintaining processing history in a dictionary.
+
+    When the pipeline provides ``input_hash`` and ``task_hash`` in the config,
+    raw stage files written by the mixin steps are recorded as checkpoints and
+    a restarted run of the same file skips the steps before the latest one.
+    Set ``CHECKPOINTS_ENABLED = False`` on a subclass to opt out.
     """
 
+    CHECKPOINTS_ENABLED = True
+
     def __init__(self, config: Dict[str, Any]):
         """Initialize a new task instance.
 
@@ -116,6 +133,17 @@ class Task(ABC, *DISCOVERED_MIXINS):
         self.final_ica: Optional[mne.ICA] = None
         self.ica_flags = None
 
+        # Stage checkpoints, keyed on the input file and task fingerprints
+        self.checkpoints: Optional[StageCheckpoints] = None
+        if (
+            self.CHECKPOINTS_ENABLED
+            and self.config.get("input_hash")
+            and self.config.get("task_hash")
+        ):
+            self.checkpoints = StageCheckpoints(
+                self, self.config["input_hash"], self.config["task_hash"]
+            )
+
     def _extract_eeg_system(self) -> str:
         """Extract EEG system/montage from task settings.
 
@@ -141,9 +169,22 @@ class Task(ABC, *DISCOVERED_MIXINS):
         duration less than 60 seconds. Saves the imported data as a post-import
         stage file.
 
+        With the ``chunked_processing`` setting enabled, the data is read
+        lazily, so the import plugin's channel picks do not copy it, then
+        preloaded into a memory-mapped file in the stage directory instead of
+        memory. The pipeline removes the file at the end of the run.
+
         """
 
-        self.raw = import_eeg(self.config)
+        chunked = self._get_chunk_duration() is not None
+        self.raw = import_eeg(self.config, preload=not chunked)
+        if chunked:
+            preload_to_file(
+                self.raw,
+                preload_file_path(
+                    self.config["stage_dir"], self.config["unprocessed_file"]
+                ),
+            )
         if self.raw.duration < 60:
             self.flagged = True
             self.flagged_reasons = [
@@ -194,6 +235,31 @@ class Task(ABC, *DISCOVERED_MIXINS):
         defined in the task configuration and validated before use.
         """
 
+    def run_with_checkpoints(self) -> None:
+        """Run the task, resuming from the latest valid stage checkpoint.
+
+        Notes
+        -----
+        If the restarted run calls a step that differs from the checkpointed
+        run before its state could be restored, the task state is reset and
+        ``run`` starts over without checkpoints.
+        """
+        try:
+            self.run()
+        except CheckpointMismatch as e:
+            message("warning", f"{e}, rerunning all steps")
+            self.checkpoints.disable()
+            self.raw = None
+            self.original_raw = None
+            self.epochs = None
+            self.flagged = False
+            self.flagged_reasons = []
+            self.final_ica = None
+            self.ica_flags = None
+            self.run()
+        finally:
+            reset_raw_stage(self.config["run_id"])
+
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Validate the complete task configuration.
 
@@ -68,6 +68,7 @@ from .preprocessing import (
     crop_data,
     drop_channels,
     filter_data,
+    filter_data_chunked,
     rereference_data,
     resample_data,
     trim_edges,
@@ -93,6 +94,7 @@ from .visualization import (
 __all__ = [
     # Preprocessing functions
     "filter_data",
+    "filter_data_chunked",
     "resample_data",
     "rereference_data",
     "drop_channels",
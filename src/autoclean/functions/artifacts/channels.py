@@ -4,11 +4,16 @@ This module provides standalone functions for detecting and handling bad channel
 in EEG data using various statistical and correlation-based methods.
 """
 
+import warnings
 from typing import Dict, List, Optional, Tuple, Union
 
 import mne
+import numpy as np
 from pyprep.find_noisy_channels import NoisyChannels
 
+from autoclean.utils.copy_tracker import copy_data
+from autoclean.utils.montage import get_channel_geometry
+
 
 def detect_bad_channels(
     data: mne.io.BaseRaw,
@@ -118,11 +123,12 @@ def detect_bad_channels(
         exclude_channels = []
 
     try:
-        # Create a copy to avoid modifying original data
-        data_copy = data.copy()
-
-        # Initialize NoisyChannels detector
-        noisy_detector = NoisyChannels(data_copy, random_state=random_state)
+        # Initialize NoisyChannels detector. It works on its own copy of the
+        # data and only modifies the input by loading it, so only data that is
+        # not loaded yet (and cheap to copy) is copied here
+        noisy_detector = NoisyChannels(
+            data if data.preload else data.copy(), random_state=random_state
+        )
 
         # Run correlation-based detection
         noisy_detector.find_bad_by_correlation(
@@ -188,6 +194,7 @@ def interpolate_bad_channels(
     reset_bads: bool = True,
     mode: str = "accurate",
     origin: Union[str, Tuple[float, float, float]] = "auto",
+    inplace: bool = False,
     verbose: Optional[bool] = None,
 ) -> Union[mne.io.BaseRaw, mne.Epochs]:
     """Interpolate bad channels using spherical spline interpolation.
@@ -222,13 +229,16 @@ def interpolate_bad_channels(
         - 'auto': Automatically determine origin (recommended)
         - tuple: (x, y, z) coordinates in meters
         - 'head': Use head origin from digitization
+    inplace : bool, default False
+        If True, interpolate the channels of ``data`` itself instead of a copy.
     verbose : bool or None, default None
         Control verbosity of interpolation output.
 
     Returns
     -------
     data_interpolated : mne.io.BaseRaw or mne.Epochs
-        Copy of input data with bad channels interpolated.
+        Copy of input data (``data`` itself if ``inplace`` is True) with bad
+        channels interpolated.
 
     Raises
     ------
@@ -324,7 +334,7 @@ def interpolate_bad_channels(
 
     if not bad_channels:
         # No bad channels to interpolate
-        return data.copy()
+        return data if inplace else copy_data(data, "interpolate_bad_channels")
 
     # Validate that bad channels exist in the data
     available_channels = data.ch_names
@@ -345,18 +355,72 @@ def interpolate_bad_channels(
         )
 
     try:
-        # Create a copy to avoid modifying original data
-        data_copy = data.copy()
+        # Work on a copy unless asked to modify the input
+        data_copy = data if inplace else copy_data(data, "interpolate_bad_channels")
 
         # Set the bad channels in the copy
         data_copy.info["bads"] = list(set(data_copy.info["bads"] + bad_channels))
 
-        # Perform interpolation
-        data_copy.interpolate_bads(
-            reset_bads=reset_bads, mode=mode, origin=origin, verbose=verbose
-        )
+        # Perform interpolation, reusing the montage's interpolation matrix
+        # when all bad channels are EEG channels
+        if not _interpolate_bads_eeg_cached(data_copy, origin, reset_bads):
+            data_copy.interpolate_bads(
+                reset_bads=reset_bads, mode=mode, origin=origin, verbose=verbose
+            )
 
         return data_copy
 
     except Exception as e:
         raise RuntimeError(f"Failed to interpolate bad channels: {str(e)}") from e
+
+
+def _interpolate_bads_eeg_cached(
+    data: Union[mne.io.BaseRaw, mne.Epochs],
+    origin: Union[str, Tuple[float, float, float]] = "auto",
+    reset_bads: bool = True,
+) -> bool:
+    """Interpolate bad EEG channels with the cached spline matrix of the montage.
+
+    Equivalent to ``data.interpolate_bads`` when all bad channels are EEG
+    channels with valid positions, but the interpolation matrix comes from
+    the channel geometry cache, so it is computed once per montage and set
+    of bad channels. Returns False, leaving ``data`` unchanged, for anything
+    else (other channel types, missing positions, data not loaded).
+    """
+    bads = set(data.info["bads"])
+    if not data.preload or not bads:
+        return False
+    picks = mne.pick_types(data.info, meg=False, eeg=True, exclude=[])
+    eeg_names = [data.ch_names[idx] for idx in picks]
+    if not bads <= set(eeg_names):
+        return False
+
+    pos = np.array([data.info["chs"][idx]["loc"][:3] for idx in picks])
+    bad = np.array([ch in bads for ch in eeg_names])
+    if np.isnan(pos[bad]).any() or np.all(np.abs(pos[bad]) <= 1e-16, axis=1).any():
+        return False
+
+    if isinstance(origin, str):
+        if origin != "auto":
+            return False
+        _, origin, _ = mne.bem.fit_sphere_to_headshape(
+            data.info, units="m", verbose=False
+        )
+    origin = np.asarray(origin, dtype=float)
+
+    distance = np.linalg.norm(pos - origin, axis=-1)
+    if np.abs(1.0 - np.mean(distance / np.mean(distance))) > 0.1:
+        warnings.warn(
+            "Your spherical fit is poor, interpolation results are likely to be "
+            "inaccurate.",
+            RuntimeWarning,
+        )
+
+    geometry = get_channel_geometry(eeg_names, pos)
+    interpolation = geometry.interpolation_matrix(np.flatnonzero(bad), origin)
+    values = data._data  # pylint: disable=protected-access
+    values[..., picks[bad], :] = np.matmul(interpolation, values[..., picks[~bad], :])
+
+    if reset_bads:
+        data.info["bads"] = []
+    return True
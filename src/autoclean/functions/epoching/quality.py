@@ -10,12 +10,15 @@ from typing import Optional
 import mne
 import numpy as np
 
+from autoclean.utils.copy_tracker import copy_data
+
 
 def detect_outlier_epochs(
     epochs: mne.Epochs,
     threshold: float = 3.0,
     measures: Optional[list] = None,
     return_scores: bool = False,
+    inplace: bool = False,
     verbose: Optional[bool] = None,
 ) -> mne.Epochs:
     """Detect and mark outlier epochs based on statistical measures.
@@ -52,13 +55,16 @@ def detect_outlier_epochs(
     return_scores : bool, default False
         If True, returns a tuple of (epochs, scores_dict) where scores_dict
         contains the computed z-scores for each measure.
+    inplace : bool, default False
+        If True, mark the outliers in ``epochs`` itself instead of a copy.
     verbose : bool or None, default None
         Control verbosity of output.
 
     Returns
     -------
     epochs_clean : mne.Epochs
-        Copy of input epochs with outlier epochs marked as bad.
+        Copy of input epochs (``epochs`` itself if ``inplace`` is True) with
+        outlier epochs marked as bad.
     scores : dict, optional
         Dictionary of z-scores for each measure (only if return_scores=True).
         Keys are measure names, values are arrays of z-scores for each epoch.
@@ -146,8 +152,8 @@ def detect_outlier_epochs(
         )
 
     try:
-        # Create a copy to avoid modifying the original
-        epochs_clean = epochs.copy()
+        # Work on a copy unless asked to modify the input
+        epochs_clean = epochs if inplace else copy_data(epochs, "detect_outlier_epochs")
 
         # Get epoch data
         data = epochs_clean.get_data()  # Shape: (n_epochs, n_channels, n_times)
@@ -224,6 +230,7 @@ def gfp_clean_epochs(
     number_of_epochs: Optional[int] = None,
     random_seed: Optional[int] = None,
     return_gfp_values: bool = False,
+    inplace: bool = False,
     verbose: Optional[bool] = None,
 ) -> mne.Epochs:
     """Clean epochs based on Global Field Power (GFP) outlier detection.
@@ -252,6 +259,8 @@ def gfp_clean_epochs(
     return_gfp_values : bool, default False
         If True, returns a tuple of (epochs_clean, gfp_values) where gfp_values
         contains the computed GFP z-scores for each original epoch.
+    inplace : bool, default False
+        If True, drop epochs from ``epochs`` itself instead of a copy.
     verbose : bool or None, default None
         Control verbosity of output.
 
@@ -345,8 +354,8 @@ def gfp_clean_epochs(
         raise ValueError(f"number_of_epochs must be positive, got {number_of_epochs}")
 
     try:
-        # Create a copy to avoid modifying the original
-        epochs_clean = epochs.copy()
+        # Work on a copy unless asked to modify the input
+        epochs_clean = epochs if inplace else copy_data(epochs, "gfp_clean_epochs")
 
         # Get epoch data
         data = epochs_clean.get_data()  # Shape: (n_epochs, n_channels, n_times)
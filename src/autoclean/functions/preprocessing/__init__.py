@@ -6,15 +6,18 @@ operations including filtering, resampling, referencing, and channel operations.
 Functions
 ---------
 filter_data : Apply digital filtering (highpass, lowpass, notch)
+filter_data_chunked : Filter a long recording in place, block by block
 resample_data : Change sampling frequency
 rereference_data : Apply referencing schemes
 drop_channels : Remove channels from data
 crop_data : Crop data to specific time range
+crop_copy : Copy a time span of a recording without copying the rest
 trim_edges : Remove data from beginning and end
 assign_channel_types : Set channel types (EEG, EOG, etc.)
 """
 
 from .basic_ops import assign_channel_types, crop_data, drop_channels, trim_edges
+from .chunked import crop_copy, filter_data_chunked, iter_raw_blocks
 
 # Import implemented functions
 from .filtering import filter_data
@@ -23,10 +26,13 @@ from .resampling import resample_data
 
 __all__ = [
     "filter_data",
+    "filter_data_chunked",
+    "iter_raw_blocks",
     "resample_data",
     "rereference_data",
     "drop_channels",
     "crop_data",
+    "crop_copy",
     "trim_edges",
     "assign_channel_types",
 ]
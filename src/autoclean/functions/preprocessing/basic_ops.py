@@ -9,11 +9,14 @@ from typing import Dict, List, Optional, Union
 
 import mne
 
+from autoclean.utils.copy_tracker import copy_data
+
 
 def drop_channels(
     data: Union[mne.io.BaseRaw, mne.Epochs],
     ch_names: Union[str, List[str]],
     on_missing: str = "raise",
+    inplace: bool = False,
 ) -> Union[mne.io.BaseRaw, mne.Epochs]:
     """Drop channels from EEG data.
 
@@ -31,6 +34,8 @@ def drop_channels(
         - 'raise': Raise an error
         - 'warn': Issue a warning and continue
         - 'ignore': Silently ignore missing channels
+    inplace : bool, default False
+        If True, drop the channels from ``data`` itself instead of a copy.
 
     Returns
     -------
@@ -78,9 +83,10 @@ def drop_channels(
             warnings.warn(f"Channels not found in data: {missing_channels}")
 
     if not existing_channels:
-        return data.copy()  # No channels to drop
+        # No channels to drop
+        return data if inplace else copy_data(data, "drop_channels")
 
-    result = data.copy()
+    result = data if inplace else copy_data(data, "drop_channels")
     result.drop_channels(existing_channels)
     return result
 
@@ -90,6 +96,7 @@ def crop_data(
     tmin: Optional[float] = None,
     tmax: Optional[float] = None,
     include_tmax: bool = True,
+    inplace: bool = False,
 ) -> Union[mne.io.BaseRaw, mne.Epochs]:
     """Crop EEG data to a specific time range.
 
@@ -106,6 +113,8 @@ def crop_data(
         End time in seconds. If None, uses the end of the data.
     include_tmax : bool, default True
         Whether to include the tmax time point.
+    inplace : bool, default False
+        If True, crop ``data`` itself instead of a copy.
 
     Returns
     -------
@@ -159,13 +168,13 @@ def crop_data(
             f"({data_tmin}-{data_tmax})"
         )
 
-    result = data.copy()
+    result = data if inplace else copy_data(data, "crop_data")
     result.crop(tmin=tmin, tmax=tmax, include_tmax=include_tmax)
     return result
 
 
 def trim_edges(
-    data: Union[mne.io.BaseRaw, mne.Epochs], duration: float
+    data: Union[mne.io.BaseRaw, mne.Epochs], duration: float, inplace: bool = False
 ) -> Union[mne.io.BaseRaw, mne.Epochs]:
     """Trim specified duration from both edges of EEG data.
 
@@ -179,6 +188,8 @@ def trim_edges(
         The EEG data to trim.
     duration : float
         Duration in seconds to remove from each edge.
+    inplace : bool, default False
+        If True, trim ``data`` itself instead of a copy.
 
     Returns
     -------
@@ -222,13 +233,15 @@ def trim_edges(
     tmin = data.times[0] + duration
     tmax = data.times[-1] - duration
 
-    result = data.copy()
+    result = data if inplace else copy_data(data, "trim_edges")
     result.crop(tmin=tmin, tmax=tmax)
     return result
 
 
 def assign_channel_types(
-    data: Union[mne.io.BaseRaw, mne.Epochs], channel_types: Dict[str, str]
+    data: Union[mne.io.BaseRaw, mne.Epochs],
+    channel_types: Dict[str, str],
+    inplace: bool = False,
 ) -> Union[mne.io.BaseRaw, mne.Epochs]:
     """Assign channel types to EEG data channels.
 
@@ -243,6 +256,8 @@ def assign_channel_types(
     channel_types : dict
         Dictionary mapping channel names to channel types.
         Common types: 'eeg', 'eog', 'ecg', 'emg', 'misc', 'stim', 'bad'.
+    inplace : bool, default False
+        If True, set the channel types of ``data`` itself instead of a copy.
 
     Returns
     -------
@@ -287,6 +302,6 @@ def assign_channel_types(
             f"Available channels: {data.ch_names}"
         )
 
-    result = data.copy()
+    result = data if inplace else copy_data(data, "assign_channel_types")
     result.set_channel_types(channel_types)
     return result
@@ -0,0 +1,349 @@
+"""Block-wise processing of long continuous recordings.
+
+Multi-hour recordings do not fit comfortably in memory several times over,
+yet most pipeline steps copy the whole Raw object or call ``raw.get_data()``
+on it. The functions in this module walk a Raw object in blocks of time,
+optionally overlapping, so only one block is copied at a time. Combined with
+data preloaded into a file (``preload="<file>"`` in MNE readers), the
+recording itself stays on disk.
+"""
+
+import warnings
+from copy import deepcopy
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+import mne
+import numpy as np
+
+from autoclean.utils.copy_tracker import record_copy
+
+
+def iter_raw_blocks(
+    raw: mne.io.BaseRaw,
+    block_size: int,
+    context_before: int = 0,
+    context_after: int = 0,
+    picks: Optional[np.ndarray] = None,
+) -> Iterator[Tuple[int, int, int, np.ndarray]]:
+    """Iterate over consecutive blocks of a continuous recording.
+
+    Parameters
+    ----------
+    raw : mne.io.BaseRaw
+        The recording, preloaded or not.
+    block_size : int
+        Number of samples per block (the last block may be shorter).
+    context_before, context_after : int, default 0
+        Samples of neighbouring data read before and after each block,
+        clipped to the recording.
+    picks : np.ndarray or None, default None
+        Channel indices to read. None reads all channels.
+
+    Yields
+    ------
+    start, stop : int
+        Sample range of the block.
+    first : int
+        First sample of ``data``, ``max(start - context_before, 0)``.
+    data : np.ndarray, shape (n_channels, n_samples)
+        Data of the block and its context.
+    """
+    if block_size < 1:
+        raise ValueError(f"block_size must be positive, got {block_size}")
+    n_times = raw.n_times
+    for start in range(0, n_times, block_size):
+        stop = min(start + block_size, n_times)
+        first = max(start - context_before, 0)
+        last = min(stop + context_after, n_times)
+        yield start, stop, first, raw.get_data(picks=picks, start=first, stop=last)
+
+
+def preload_file_path(
+    stage_dir: Union[str, Path], unprocessed_file: Union[str, Path]
+) -> Path:
+    """Path of the file a recording is preloaded into during chunked processing.
+
+    Parameters
+    ----------
+    stage_dir : str or Path
+        Stage directory of the run.
+    unprocessed_file : str or Path
+        The recording being processed.
+
+    Returns
+    -------
+    Path
+        ``<stage_dir>/<stem>_preload.dat``.
+    """
+    return Path(stage_dir) / f"{Path(unprocessed_file).stem}_preload.dat"
+
+
+def preload_to_file(raw: mne.io.BaseRaw, fname: Union[str, Path]) -> mne.io.BaseRaw:
+    """Load the data of a recording into a memory-mapped file.
+
+    Data not loaded yet is read straight into the file, only the channels
+    kept by earlier picks. Data already in memory (readers that cannot load
+    lazily, or picks made after preloading, which copy the data into memory)
+    is moved into the file.
+
+    Parameters
+    ----------
+    raw : mne.io.BaseRaw
+        The recording, modified in place.
+    fname : str or Path
+        File to hold the data, overwritten.
+
+    Returns
+    -------
+    raw : mne.io.BaseRaw
+        The input object, with its data backed by ``fname``.
+    """
+    if not raw.preload:
+        raw._preload_data(str(fname))  # pylint: disable=protected-access
+    elif getattr(raw._data, "_mmap", None) is None:  # pylint: disable=protected-access
+        data = raw._data  # pylint: disable=protected-access
+        mapped = np.memmap(str(fname), dtype=data.dtype, mode="w+", shape=data.shape)
+        mapped[:] = data
+        raw._data = mapped  # pylint: disable=protected-access
+    return raw
+
+
+def crop_copy(
+    raw: mne.io.BaseRaw,
+    tmin: float = 0.0,
+    tmax: Optional[float] = None,
+    include_tmax: bool = True,
+    step: str = "crop_copy",
+) -> mne.io.BaseRaw:
+    """Copy a time span of a recording without copying the rest of it.
+
+    Equivalent to ``raw.copy().crop(tmin, tmax, include_tmax)``, but the
+    data array is shared with ``raw`` until cropping slices the span out of
+    it, so only the span is copied.
+
+    Parameters
+    ----------
+    raw : mne.io.BaseRaw
+        The recording, left unchanged.
+    tmin, tmax, include_tmax
+        Time span to keep, as in :meth:`mne.io.Raw.crop`.
+    step : str, default "crop_copy"
+        Step name the copied bytes are recorded under (see
+        :mod:`autoclean.utils.copy_tracker`).
+
+    Returns
+    -------
+    raw_span : mne.io.BaseRaw
+        New Raw object holding the span.
+    """
+    data = getattr(raw, "_data", None) if raw.preload else None
+    memo = {} if data is None else {id(data): data}
+    raw_span = deepcopy(raw, memo).crop(tmin=tmin, tmax=tmax, include_tmax=include_tmax)
+    if data is not None:
+        record_copy(step, raw_span._data.nbytes)  # pylint: disable=protected-access
+    return raw_span
+
+
+def filter_data_chunked(
+    raw: mne.io.BaseRaw,
+    l_freq: Optional[float] = None,
+    h_freq: Optional[float] = None,
+    notch_freqs: Optional[List[float]] = None,
+    notch_widths: Union[float, List[float]] = 0.5,
+    method: str = "fir",
+    phase: str = "zero",
+    fir_window: str = "hamming",
+    block_sec: float = 60.0,
+    verbose: Optional[bool] = None,
+) -> mne.io.BaseRaw:
+    """Filter a preloaded recording in place, one block of time at a time.
+
+    Applies the same filters as :func:`filter_data`, but instead of
+    filtering a copy of the whole recording, each block is filtered together
+    with enough neighbouring samples on both sides that the filter edges fall
+    outside of it. The result matches whole-recording filtering to numerical
+    precision while only one block (plus context) is copied at a time.
+
+    Parameters
+    ----------
+    raw : mne.io.BaseRaw
+        Preloaded recording, modified in place. Data preloaded into a file
+        stays memory-mapped.
+    l_freq, h_freq, notch_freqs, notch_widths, method, phase, fir_window
+        Filter parameters, as in :func:`filter_data`.
+    block_sec : float, default 60.0
+        Block length in seconds.
+    verbose : bool or None, default None
+        Control verbosity of output.
+
+    Returns
+    -------
+    raw : mne.io.BaseRaw
+        The input object, filtered.
+
+    Notes
+    -----
+    The context needed on each side of a block is the support of the
+    filters' impulse response, measured once before filtering. When it is
+    not shorter than a block, or the recording contains acquisition skips
+    (``edge``/``bad_acq_skip`` annotations, filtered separately by MNE), the
+    whole recording is filtered in place instead.
+    """
+    if not isinstance(raw, mne.io.BaseRaw):
+        raise TypeError(f"Data must be an MNE Raw object, got {type(raw).__name__}")
+    if not raw.preload:
+        raise ValueError(
+            "Chunked filtering needs preloaded data, preload into a file to keep "
+            "the recording on disk"
+        )
+    if block_sec <= 0:
+        raise ValueError(f"block_sec must be positive, got {block_sec}")
+    if l_freq is None and h_freq is None and notch_freqs is None:
+        return raw
+    if notch_freqs is not None and not isinstance(notch_freqs, (list, tuple)):
+        notch_freqs = [notch_freqs]
+
+    sfreq = raw.info["sfreq"]
+    picks = mne.pick_types(
+        raw.info,
+        meg=True,
+        eeg=True,
+        csd=True,
+        seeg=True,
+        ecog=True,
+        dbs=True,
+        fnirs=True,
+        exclude=[],
+    )
+
+    def apply(x: np.ndarray, verbose: Optional[bool] = False) -> np.ndarray:
+        if l_freq is not None or h_freq is not None:
+            x = mne.filter.filter_data(
+                x,
+                sfreq,
+                l_freq,
+                h_freq,
+                method=method,
+                phase=phase,
+                fir_window=fir_window,
+                copy=False,
+                verbose=verbose,
+            )
+        if notch_freqs is not None:
+            x = mne.filter.notch_filter(
+                x,
+                sfreq,
+                notch_freqs,
+                notch_widths=notch_widths,
+                method=method,
+                phase=phase,
+                fir_window=fir_window,
+                copy=False,
+                verbose=verbose,
+            )
+        return x
+
+    block_size = max(int(round(block_sec * sfreq)), 1)
+    context = _filter_context(apply, raw.n_times)
+    skips = any(
+        desc.lower().startswith(("edge", "bad_acq_skip"))
+        for desc in raw.annotations.description
+    )
+    if context >= block_size or skips:
+        _filter_whole(
+            raw,
+            picks,
+            l_freq,
+            h_freq,
+            notch_freqs,
+            notch_widths,
+            method,
+            phase,
+            fir_window,
+            verbose,
+        )
+        return raw
+
+    # Blocks are overwritten in order, so the unfiltered samples preceding a
+    # block are carried over from the previous one
+    data = raw._data  # pylint: disable=protected-access
+    carry = np.empty((len(picks), 0))
+    for start, stop, first, block in iter_raw_blocks(
+        raw, block_size, context_after=context, picks=picks
+    ):
+        segment = np.concatenate([carry, block], axis=1)
+        first -= carry.shape[1]
+        carry = segment[:, max(stop - context, first) - first : stop - first].copy()
+        # Report the filter design once, not for every block
+        filtered = apply(segment, verbose=verbose if start == 0 else False)
+        data[picks, start:stop] = filtered[:, start - first : stop - first]
+
+    with raw.info._unlock():  # pylint: disable=protected-access
+        if l_freq is not None and (
+            raw.info["highpass"] is None or l_freq > raw.info["highpass"]
+        ):
+            raw.info["highpass"] = float(l_freq)
+        if h_freq is not None and (
+            raw.info["lowpass"] is None or h_freq < raw.info["lowpass"]
+        ):
+            raw.info["lowpass"] = float(h_freq)
+    return raw
+
+
+def _filter_whole(
+    raw,
+    picks,
+    l_freq,
+    h_freq,
+    notch_freqs,
+    notch_widths,
+    method,
+    phase,
+    fir_window,
+    verbose,
+) -> None:
+    """Filter the whole recording in place with the MNE Raw methods."""
+    if l_freq is not None or h_freq is not None:
+        raw.filter(
+            l_freq=l_freq,
+            h_freq=h_freq,
+            picks=picks,
+            method=method,
+            phase=phase,
+            fir_window=fir_window,
+            verbose=verbose,
+        )
+    if notch_freqs is not None:
+        raw.notch_filter(
+            freqs=notch_freqs,
+            picks=picks,
+            notch_widths=notch_widths,
+            method=method,
+            phase=phase,
+            fir_window=fir_window,
+            verbose=verbose,
+        )
+
+
+def _filter_context(apply: Callable[[np.ndarray], np.ndarray], n_max: int) -> int:
+    """Half-width in samples of the impulse response of a filter chain.
+
+    The response is measured on impulses of growing length until it fits
+    well inside one. Responses that never decay below 1e-10 of their peak
+    (IIR filters close to DC) end up as long as the recording.
+    """
+    n_half = 1024
+    while True:
+        n_half = min(n_half, n_max)
+        impulse = np.zeros((1, 2 * n_half + 1))
+        impulse[0, n_half] = 1.0
+        with warnings.catch_warnings():
+            # Short impulses are expected to be shorter than the filter
+            warnings.simplefilter("ignore", RuntimeWarning)
+            response = np.abs(apply(impulse)[0])
+        support = np.flatnonzero(response > 1e-10 * response.max())
+        half_width = int(max(n_half - support[0], support[-1] - n_half)) + 1
+        if half_width < n_half // 2 or n_half == n_max:
+            return half_width
+        n_half *= 4
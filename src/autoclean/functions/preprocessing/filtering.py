@@ -8,6 +8,8 @@ from typing import List, Optional, Union
 
 import mne
 
+from autoclean.utils.copy_tracker import copy_data
+
 
 def filter_data(
     data: Union[mne.io.BaseRaw, mne.Epochs],
@@ -18,6 +20,7 @@ def filter_data(
     method: str = "fir",
     phase: str = "zero",
     fir_window: str = "hamming",
+    inplace: bool = False,
     verbose: Optional[bool] = None,
 ) -> Union[mne.io.base.BaseRaw, mne.Epochs]:
     """Filter EEG data using highpass, lowpass, and/or notch filtering.
@@ -61,6 +64,9 @@ def filter_data(
     fir_window : str, default 'hamming'
         Window function for FIR filter design. Options: 'hamming', 'hann',
         'blackman'. Affects filter characteristics and artifacts.
+    inplace : bool, default False
+        If True, filter ``data`` itself instead of a copy. This avoids copying
+        the whole recording when the unfiltered data is not needed anymore.
     verbose : bool or None, default None
         Control verbosity of output. If None, uses MNE default.
 
@@ -68,7 +74,8 @@ def filter_data(
     -------
     filtered_data : mne.io.BaseRaw or mne.Epochs
         The filtered data object, same type as input. Contains identical
-        structure and metadata but with filtered time series data.
+        structure and metadata but with filtered time series data. This is
+        ``data`` itself if ``inplace`` is True.
 
     Examples
     --------
@@ -101,11 +108,11 @@ def filter_data(
 
     # Check if any filtering is requested
     if l_freq is None and h_freq is None and notch_freqs is None:
-        # No filtering requested, return copy of original data
-        return data.copy()
+        # No filtering requested, return the original data or a copy of it
+        return data if inplace else copy_data(data, "filter_data")
 
-    # Create a copy of the data to avoid modifying the original
-    filtered_data = data.copy()
+    # Work on a copy of the data unless asked to modify it
+    filtered_data = data if inplace else copy_data(data, "filter_data")
 
     # Apply highpass and/or lowpass filtering
     if l_freq is not None or h_freq is not None:
@@ -9,6 +9,8 @@ from typing import List, Optional, Union
 
 import mne
 
+from autoclean.utils.copy_tracker import copy_data
+
 
 def rereference_data(
     data: Union[mne.io.BaseRaw, mne.Epochs],
@@ -16,6 +18,7 @@ def rereference_data(
     projection: bool = False,
     ch_type: str = "auto",
     forward: Optional[mne.Forward] = None,
+    inplace: bool = False,
     verbose: Optional[bool] = None,
 ) -> Union[mne.io.BaseRaw, mne.Epochs]:
     """Apply referencing scheme to EEG data.
@@ -51,6 +54,8 @@ def rereference_data(
     forward : mne.Forward or None, default None
         Forward model for REST referencing. Required only when ref_channels='REST'.
         Should be computed for the same electrode montage as the data.
+    inplace : bool, default False
+        If True, re-reference ``data`` itself instead of a copy.
     verbose : bool or None, default None
         Control verbosity of output. If None, uses MNE default.
 
@@ -111,8 +116,8 @@ def rereference_data(
     if ref_channels == "REST" and forward is None:
         raise ValueError("Forward model is required for REST referencing")
 
-    # Create a copy to avoid modifying the original
-    rereferenced_data = data.copy()
+    # Work on a copy of the data unless asked to modify it
+    rereferenced_data = data if inplace else copy_data(data, "rereference_data")
 
     try:
         # Apply referencing using MNE's built-in method
@@ -8,6 +8,8 @@ from typing import Optional, Union
 
 import mne
 
+from autoclean.utils.copy_tracker import copy_data
+
 
 def resample_data(
     data: Union[mne.io.BaseRaw, mne.Epochs],
@@ -16,6 +18,7 @@ def resample_data(
     window: str = "auto",
     n_jobs: int = 1,
     pad: str = "auto",
+    inplace: bool = False,
     verbose: Optional[bool] = None,
 ) -> Union[mne.io.BaseRaw, mne.Epochs]:
     """Resample EEG data to a new sampling frequency.
@@ -51,6 +54,9 @@ def resample_data(
     pad : str, default 'auto'
         Padding mode. 'auto' selects appropriate padding. Other options include
         'reflect_limited', 'zero', 'constant', 'edge', 'wrap'.
+    inplace : bool, default False
+        If True, resample ``data`` itself instead of a copy, so the recording
+        at the original sampling frequency is not copied first.
     verbose : bool or None, default None
         Control verbosity of output. If None, uses MNE default.
 
@@ -138,11 +144,11 @@ def resample_data(
     # Check if resampling is actually needed
     current_sfreq = data.info["sfreq"]
     if abs(current_sfreq - sfreq) < 0.01:  # Tolerance for floating point comparison
-        # No resampling needed, return copy
-        return data.copy()
+        # No resampling needed, return the original data or a copy of it
+        return data if inplace else copy_data(data, "resample_data")
 
-    # Create a copy to avoid modifying the original
-    resampled_data = data.copy()
+    # Work on a copy of the data unless asked to modify it
+    resampled_data = data if inplace else copy_data(data, "resample_data")
 
     try:
         # Perform resampling using MNE's built-in method
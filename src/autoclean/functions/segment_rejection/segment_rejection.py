@@ -5,14 +5,14 @@ noisy or problematic segments in continuous EEG data using various statistical
 and correlation-based methods.
 """
 
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import mne
 import numpy as np
-import pandas as pd
-import scipy.stats
 import xarray as xr
-from scipy.spatial import distance_matrix
+
+from autoclean.utils.copy_tracker import copy_data
+from autoclean.utils.montage import get_channel_geometry
 
 
 def annotate_noisy_segments(
@@ -23,6 +23,8 @@ def annotate_noisy_segments(
     quantile_k: float = 3.0,
     quantile_flag_crit: float = 0.2,
     annotation_description: str = "BAD_noisy_segment",
+    block_sec: Optional[float] = None,
+    inplace: bool = False,
     verbose: Optional[bool] = None,
 ) -> mne.io.Raw:
     """Identify and annotate noisy segments in continuous EEG data.
@@ -67,14 +69,20 @@ def annotate_noisy_segments(
     annotation_description : str, default "BAD_noisy_segment"
         The description to use for MNE annotations marking noisy segments.
         Should start with "BAD_" to be recognized by MNE as artifact annotations.
+    block_sec : float or None, default None
+        Chunked mode for long recordings: epoch the data in blocks of about
+        this many seconds, so only one block of epochs is in memory at a
+        time. Results do not depend on the block length.
+    inplace : bool, default False
+        If True, annotate ``raw`` itself instead of a copy.
     verbose : bool or None, default None
         Control verbosity of output during processing.
 
     Returns
     -------
     raw_annotated : mne.io.Raw
-        Copy of input Raw object with added annotations for noisy segments.
-        Original data is not modified.
+        Copy of input Raw object with added annotations for noisy segments,
+        or ``raw`` itself if ``inplace`` is True.
 
     Raises
     ------
@@ -176,6 +184,9 @@ def annotate_noisy_segments(
     if quantile_k <= 0:
         raise ValueError(f"quantile_k must be positive, got {quantile_k}")
 
+    if block_sec is not None and block_sec <= 0:
+        raise ValueError(f"block_sec must be positive, got {block_sec}")
+
     # Set default picks
     if picks is None:
         picks = "eeg"
@@ -200,28 +211,11 @@ def annotate_noisy_segments(
             if events.shape[0] == 0:
                 raise ValueError("No valid epochs after boundary check")
 
-        # Create epochs
-        epochs = mne.Epochs(
-            raw,
-            events,
-            tmin=0.0,
-            tmax=epoch_duration - 1.0 / raw.info["sfreq"],
-            picks=picks,
-            preload=True,
-            baseline=None,  # No baseline correction for std calculation
-            reject=None,  # We are detecting bads, not rejecting yet
-            verbose=verbose,
+        # Standard deviation of each channel within each epoch
+        data_sd, epoch_events = _epoch_channel_std(
+            raw, events, epoch_duration, picks, block_sec=block_sec, verbose=verbose
         )
 
-        if len(epochs) == 0:
-            raise ValueError(f"No epochs left after picking channels: {picks}")
-
-        # Convert epochs to xarray DataArray (channels, epochs, time)
-        epochs_xr = _epochs_to_xr(epochs)
-
-        # Calculate standard deviation for each channel within each epoch
-        data_sd = epochs_xr.std("time")  # Shape: (channels, epochs)
-
         # Detect noisy epochs using outlier detection logic
         outliers_kwargs = {"k": quantile_k}
 
@@ -235,11 +229,11 @@ def annotate_noisy_segments(
         )
 
         if len(bad_epoch_indices) == 0:
-            # No noisy segments found, return copy of original
-            return raw.copy()
+            # No noisy segments found, return the original or a copy of it
+            return raw if inplace else copy_data(raw, "annotate_noisy_segments")
 
         # Add annotations to the original raw object
-        relative_onsets = epochs.events[bad_epoch_indices, 0] / raw.info["sfreq"]
+        relative_onsets = epoch_events[bad_epoch_indices, 0] / raw.info["sfreq"]
         onsets = relative_onsets - raw.first_samp / raw.info["sfreq"]
 
         # Duration of each annotation matches epoch_duration
@@ -254,8 +248,8 @@ def annotate_noisy_segments(
             orig_time=raw.annotations.orig_time,
         )
 
-        # Make a copy and add annotations
-        raw_annotated = raw.copy()
+        # Add the annotations to a copy unless asked to modify the input
+        raw_annotated = raw if inplace else copy_data(raw, "annotate_noisy_segments")
         raw_annotated.set_annotations(raw_annotated.annotations + new_annotations)
 
         return raw_annotated
@@ -275,6 +269,7 @@ def annotate_uncorrelated_segments(
     outlier_k: float = 4.0,
     outlier_flag_crit: float = 0.2,
     annotation_description: str = "BAD_uncorrelated_segment",
+    inplace: bool = False,
     verbose: Optional[bool] = None,
 ) -> mne.io.Raw:
     """Identify and annotate segments with poor channel-neighbor correlations.
@@ -324,13 +319,16 @@ def annotate_uncorrelated_segments(
         that epoch is flagged as uncorrelated.
     annotation_description : str, default "BAD_uncorrelated_segment"
         Description for MNE annotations marking these segments.
+    inplace : bool, default False
+        If True, annotate ``raw`` itself instead of a copy.
     verbose : bool or None, default None
         Control verbosity of output during processing.
 
     Returns
     -------
     raw_annotated : mne.io.Raw
-        Copy of input Raw object with added annotations for uncorrelated segments.
+        Copy of input Raw object with added annotations for uncorrelated segments,
+        or ``raw`` itself if ``inplace`` is True.
 
     Raises
     ------
@@ -511,7 +509,7 @@ def annotate_uncorrelated_segments(
 
         if len(bad_epoch_indices) == 0:
             # No uncorrelated segments found
-            return raw.copy()
+            return raw if inplace else copy_data(raw, "annotate_uncorrelated_segments")
 
         # Add annotations to the original raw object
         absolute_onsets = (
@@ -528,7 +526,9 @@ def annotate_uncorrelated_segments(
             orig_time=raw.annotations.orig_time,
         )
 
-        raw_annotated = raw.copy()
+        raw_annotated = (
+            raw if inplace else copy_data(raw, "annotate_uncorrelated_segments")
+        )
         raw_annotated.set_annotations(raw_annotated.annotations + new_annotations)
 
         return raw_annotated
@@ -538,14 +538,16 @@ def annotate_uncorrelated_segments(
 
 
 # Helper functions
-def _epochs_to_xr(epochs: mne.Epochs) -> xr.DataArray:
+def _epochs_to_xr(
+    epochs: mne.Epochs, picks: Optional[List[str]] = None
+) -> xr.DataArray:
     """Create an Xarray DataArray from MNE Epochs.
 
     Converts epochs data to xarray format for easier manipulation
     with dimensions (channels, epochs, time).
     """
-    data = epochs.get_data()  # n_epochs, n_channels, n_times
-    ch_names = epochs.ch_names
+    data = epochs.get_data(picks=picks)  # n_epochs, n_channels, n_times
+    ch_names = list(picks) if picks is not None else epochs.ch_names
     # Transpose to (n_channels, n_epochs, n_times)
     data_transposed = data.transpose(1, 0, 2)
     return xr.DataArray(
@@ -559,6 +561,57 @@ def _epochs_to_xr(epochs: mne.Epochs) -> xr.DataArray:
     )
 
 
+def _epoch_channel_std(
+    raw: mne.io.BaseRaw,
+    events: np.ndarray,
+    epoch_duration: float,
+    picks: Union[List[str], str],
+    block_sec: Optional[float] = None,
+    verbose: Optional[bool] = None,
+) -> Tuple[xr.DataArray, np.ndarray]:
+    """Standard deviation of each channel within fixed-length epochs.
+
+    Epochs overlapping bad annotations are dropped, as by ``mne.Epochs``.
+    With ``block_sec``, the epochs starting in each block of that many
+    seconds are loaded together instead of all at once.
+
+    Returns the standard deviations, dims ("ch", "epoch"), and the events
+    of the kept epochs.
+    """
+    if block_sec is None:
+        groups = [events]
+    else:
+        block_size = max(int(block_sec * raw.info["sfreq"]), 1)
+        block_idx = (events[:, 0] - raw.first_samp) // block_size
+        groups = np.split(events, np.flatnonzero(np.diff(block_idx)) + 1)
+
+    data_sd = []
+    kept_events = []
+    for group in groups:
+        epochs = mne.Epochs(
+            raw,
+            group,
+            tmin=0.0,
+            tmax=epoch_duration - 1.0 / raw.info["sfreq"],
+            picks=picks,
+            preload=True,
+            baseline=None,  # No baseline correction for std calculation
+            reject=None,  # We are detecting bads, not rejecting yet
+            verbose=verbose,
+        )
+        if len(epochs) == 0:
+            continue
+        # Convert epochs to xarray DataArray (channels, epochs, time)
+        data_sd.append(_epochs_to_xr(epochs).std("time"))
+        kept_events.append(epochs.events)
+
+    if not data_sd:
+        raise ValueError(f"No epochs left after picking channels: {picks}")
+    data_sd = xr.concat(data_sd, dim="epoch")
+    data_sd = data_sd.assign_coords(epoch=np.arange(data_sd.sizes["epoch"]))
+    return data_sd, np.concatenate(kept_events)
+
+
 def _get_outliers_quantile(
     array: xr.DataArray,
     dim: str,
@@ -636,100 +689,79 @@ def _calculate_neighbor_correlations(
             "No channel positions found for any channels in the epochs object"
         )
 
-    if len(valid_chs) <= n_nearest_neighbors:
-        actual_n_neighbors = max(0, len(valid_chs) - 1)
-    else:
-        actual_n_neighbors = n_nearest_neighbors
-
-    # Create distance matrix and find nearest neighbors
-    ch_locs_df = pd.DataFrame(ch_positions).T.loc[valid_chs]
-    dist_matrix_val = distance_matrix(ch_locs_df.values, ch_locs_df.values)
-    chan_dist_df = pd.DataFrame(
-        dist_matrix_val, columns=ch_locs_df.index, index=ch_locs_df.index
+    geometry = get_channel_geometry(valid_chs, ch_positions)
+    neighbors = geometry.neighbors(n_nearest_neighbors)
+    # Read only valid channels, without copying the epochs
+    data = epochs.get_data(picks=valid_chs)  # n_epochs, n_channels, n_times
+    corrs = _neighbor_correlations(data, neighbors, corr_method, corr_trim_percent)
+    return xr.DataArray(
+        corrs,
+        coords={"ch": valid_chs, "epoch": np.arange(data.shape[0])},
+        dims=("ch", "epoch"),
     )
 
-    rank = chan_dist_df.rank(axis="columns", method="first", ascending=True) - 1
-    rank[rank == 0] = np.nan
 
-    nearest_neighbor_df = pd.DataFrame(
-        index=ch_locs_df.index, columns=range(actual_n_neighbors), dtype=object
-    )
-    for ch_name_iter in ch_locs_df.index:
-        sorted_neighbors = rank.loc[ch_name_iter].dropna().sort_values()
-        nearest_neighbor_df.loc[ch_name_iter] = sorted_neighbors.index[
-            :actual_n_neighbors
-        ].values
-
-    # Pick only valid channels for epochs_xr
-    epochs_xr = _epochs_to_xr(epochs.copy().pick(valid_chs))
-
-    all_channel_corrs = []
-
-    for _, ch_name in enumerate(valid_chs):
-        neighbor_names_for_ch = [
-            n
-            for n in nearest_neighbor_df.loc[ch_name].values.tolist()
-            if pd.notna(n) and n != ch_name
-        ]
-
-        if not neighbor_names_for_ch:
-            # No valid neighbors
-            ch_neighbor_corr_aggregated = xr.DataArray(
-                np.full(epochs_xr.sizes["epoch"], np.nan),
-                coords={"epoch": epochs_xr.coords["epoch"]},
-                dims=["epoch"],
-            )
-        else:
-            # Data for the current reference channel
-            this_ch_data = epochs_xr.sel(ch=ch_name)
+def _neighbor_correlations(
+    data: np.ndarray,
+    neighbors: List[np.ndarray],
+    corr_method: str = "max",
+    corr_trim_percent: float = 10.0,
+) -> np.ndarray:
+    """Aggregated absolute correlation of each channel with its neighbors.
 
-            # Data for its neighbors
-            neighbor_chs_data = epochs_xr.sel(ch=neighbor_names_for_ch)
+    Each channel is z-scored once per epoch, so the Pearson correlation of
+    two channels is the mean of the product of their z-scores. Channels with
+    the same number of neighbors are correlated together, one neighbor rank
+    at a time, by gathering the neighbors' z-scores with the index table.
 
-            # Calculate Pearson correlation along the 'time' dimension
-            ch_to_neighbors_corr = xr.corr(this_ch_data, neighbor_chs_data, dim="time")
+    Parameters
+    ----------
+    data : np.ndarray, shape (n_epochs, n_channels, n_times)
+        Epoched data.
+    neighbors : list of np.ndarray
+        Indices of the neighbors of each channel.
+    corr_method : str, default "max"
+        Aggregation over neighbors: "max", "mean" or "trimmean".
+    corr_trim_percent : float, default 10.0
+        Percentage cut from each end for "trimmean".
 
-            # Aggregate correlations based on corr_method
+    Returns
+    -------
+    np.ndarray, shape (n_channels, n_epochs)
+        Aggregated correlations, NaN for channels without neighbors. Flat
+        channels have NaN correlations, which are ignored by "max" and
+        "mean" and sorted last by "trimmean", as in scipy.
+    """
+    if corr_method not in ("max", "mean", "trimmean"):
+        raise ValueError(f"Unknown corr_method: {corr_method}")
+    n_epochs, n_channels, n_times = data.shape
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = data - data.mean(axis=2, keepdims=True)
+        z /= np.sqrt(np.einsum("ect,ect->ec", z, z) / n_times)[:, :, np.newaxis]
+
+    result = np.full((n_channels, n_epochs), np.nan)
+    n_per_channel = np.array([len(nb) for nb in neighbors], dtype=int)
+    for n_nb in np.unique(n_per_channel[n_per_channel > 0]):
+        chans = np.flatnonzero(n_per_channel == n_nb)
+        table = np.array([neighbors[ch] for ch in chans])  # n_chans, n_nb
+        z_chans = z if len(chans) == n_channels else z[:, chans]
+        corr = np.empty((n_nb, len(chans), n_epochs))
+        for rank in range(n_nb):
+            corr[rank] = np.einsum("ect,ect->ce", z_chans, z[:, table[:, rank]])
+        corr = np.abs(corr / n_times)
+
+        with np.errstate(invalid="ignore"):
             if corr_method == "max":
-                ch_neighbor_corr_aggregated = np.abs(ch_to_neighbors_corr).max(dim="ch")
+                result[chans] = np.fmax.reduce(corr, axis=0)
             elif corr_method == "mean":
-                ch_neighbor_corr_aggregated = np.abs(ch_to_neighbors_corr).mean(
-                    dim="ch"
-                )
-            elif corr_method == "trimmean":
-                proportion_to_cut = corr_trim_percent / 100.0
-                np_data = np.abs(ch_to_neighbors_corr).transpose("epoch", "ch").data
-
-                trimmed_means_per_epoch = [
-                    (
-                        scipy.stats.trim_mean(
-                            epoch_data_for_trim, proportiontocut=proportion_to_cut
-                        )
-                        if not np.all(np.isnan(epoch_data_for_trim))
-                        and len(epoch_data_for_trim) > 0
-                        else np.nan
-                    )
-                    for epoch_data_for_trim in np_data
-                ]
-                ch_neighbor_corr_aggregated = xr.DataArray(
-                    trimmed_means_per_epoch,
-                    coords={"epoch": ch_to_neighbors_corr.coords["epoch"]},
-                    dims=["epoch"],
-                )
+                valid = ~np.isnan(corr)
+                result[chans] = np.where(valid, corr, 0).sum(axis=0) / valid.sum(0)
             else:
-                raise ValueError(f"Unknown corr_method: {corr_method}")
-
-        # Expand to add the reference channel's name as a new 'ch' dimension
-        expanded_corr = ch_neighbor_corr_aggregated.expand_dims(dim={"ch": [ch_name]})
-        all_channel_corrs.append(expanded_corr)
-
-    if not all_channel_corrs:
-        return xr.DataArray(
-            np.empty((0, epochs_xr.sizes.get("epoch", 0))),
-            coords={"ch": [], "epoch": epochs_xr.coords.get("epoch", [])},
-            dims=("ch", "epoch"),
-        )
-
-    # Concatenate results for all reference channels
-    concatenated_corrs = xr.concat(all_channel_corrs, dim="ch")
-    return concatenated_corrs
+                # As scipy.stats.trim_mean, with NaN propagated
+                lowercut = int(corr_trim_percent / 100.0 * n_nb)
+                if lowercut > n_nb - lowercut:
+                    raise ValueError("Proportion too big.")
+                kept = np.sort(corr, axis=0)[lowercut : n_nb - lowercut]
+                result[chans] = kept.sum(axis=0) / len(kept)
+    return result
@@ -1,5 +1,6 @@
 """Export functions for autoclean pipeline."""
 
+import json
 import shutil
 from datetime import datetime
 from pathlib import Path
@@ -10,17 +11,30 @@ import numpy as np
 import scipy.io as sio
 from eeglabio.epochs import export_set
 
+from autoclean.functions.preprocessing.chunked import iter_raw_blocks
+from autoclean.utils.checkpoint import record_raw_stage
+from autoclean.utils.copy_tracker import copy_data
 from autoclean.utils.database import manage_database_conditionally
 from autoclean.utils.logging import message
+from autoclean.utils.stage_writer import background_writes_active, submit_stage_write
 
 __all__ = [
     "save_stc_to_file",
     "save_raw_to_set",
     "save_epochs_to_set",
     "copy_final_files",
+    "STAGE_FORMATS",
     "_get_stage_number",
 ]
 
+# File formats for intermediate stage files. "none" skips writing them.
+STAGE_FORMATS = ("eeglab", "fif", "npy", "none")
+
+_STAGE_EXTENSIONS = {"eeglab": ".set", "fif": ".fif", "npy": ".npy"}
+
+# Bytes of float64 data read per block when writing continuous NPY stages
+_NPY_BLOCK_BYTES = 64 * 1024 * 1024
+
 
 def save_stc_to_file(
     stc: mne.SourceEstimate,
@@ -113,10 +127,13 @@ def save_raw_to_set(
     stage: str = "post_import",
     output_path: Optional[Path] = None,
     flagged: bool = False,
-) -> Path:
+    fmt: Optional[str] = None,
+) -> Optional[Path]:
     """Save continuous EEG data to file.
 
-    This function saves raw EEG data at various processing stages.
+    This function saves raw EEG data at various processing stages. Final
+    stages are written in EEGLAB format, intermediate stages in the run's
+    ``intermediate_format`` (see ``STAGE_FORMATS``), EEGLAB by default.
 
     Parameters
     ----------
@@ -130,11 +147,14 @@ def save_raw_to_set(
             Optional custom output path. If None, uses config
         flagged : bool
             If True, appends FLAGGED_ to the stage file name
+        fmt : Optional[str]
+            File format overriding the run's configuration, one of
+            ``STAGE_FORMATS``
 
     Returns
     -------
-        Path: Path
-            Path to the saved file (stage path)
+        Path: Path or None
+            Path to the saved file (stage path), None if the format is "none"
 
     """
 
@@ -142,6 +162,7 @@ def save_raw_to_set(
     suffix = f"_{stage.replace('post_', '')}"
     basename = Path(autoclean_dict["unprocessed_file"]).stem
     stage_num = _get_stage_number(stage, autoclean_dict)
+    fmt = _get_stage_format(stage, autoclean_dict, fmt)
 
     # Save to BIDS-compliant intermediate directory structure
     if flagged:
@@ -152,47 +173,74 @@ def save_raw_to_set(
         subfolder = output_path / f"{stage_num}{suffix}"
     else:
         subfolder = output_path
-    subfolder.mkdir(parents=True, exist_ok=True)
-    stage_path = subfolder / f"{basename}{suffix}_raw.set"
+    if fmt == "none":
+        stage_path = None
+        paths = []
+    else:
+        subfolder.mkdir(parents=True, exist_ok=True)
+        stage_path = subfolder / f"{basename}{suffix}_raw{_STAGE_EXTENSIONS[fmt]}"
 
-    # Only save to stage directory - final files will be copied separately
-    paths = [stage_path]
+        # Only save to stage directory - final files will be copied separately
+        paths = [stage_path]
 
-    # Save to all paths
-    raw.info["description"] = autoclean_dict["run_id"]
-    for path in paths:
-        try:
-            # Ensure parent directory exists
-            path.parent.mkdir(parents=True, exist_ok=True)
-            raw.export(path, fmt="eeglab", overwrite=True)
-            message("success", f"✓ Saved {stage} file to: {path}")
-        except Exception as e:
-            error_msg = f"Failed to save {stage} file to {path}: {str(e)}"
-            message("error", error_msg)
-            # For dynamic stages, provide more helpful error information
-            if stage not in autoclean_dict["stage_files"]:
-                message(
-                    "info",
-                    f"Note: Stage '{stage}' was auto-generated. Check directory permissions and disk space.",
-                )
-            raise RuntimeError(error_msg) from e
+    run_id = autoclean_dict["run_id"]
+    raw.info["description"] = run_id
+
+    # Background writes get a snapshot, later steps may modify raw in place.
+    # File-backed data is written directly, a snapshot would load it all.
+    background = (
+        bool(paths) and background_writes_active(run_id) and not _is_file_backed(raw)
+    )
+    data = copy_data(raw, "stage_snapshot") if background else raw
+
+    def write() -> None:
+        # Save to all paths
+        for path in paths:
+            try:
+                # Ensure parent directory exists
+                path.parent.mkdir(parents=True, exist_ok=True)
+                if fmt == "fif":
+                    data.save(path, overwrite=True, verbose=False)
+                elif fmt == "npy":
+                    _save_npy_stage(data, path, run_id)
+                else:
+                    data.export(path, fmt="eeglab", overwrite=True)
+                message("success", f"✓ Saved {stage} file to: {path}")
+            except Exception as e:
+                error_msg = f"Failed to save {stage} file to {path}: {str(e)}"
+                message("error", error_msg)
+                # For dynamic stages, provide more helpful error information
+                if stage not in autoclean_dict.get("stage_files", {}):
+                    message(
+                        "info",
+                        f"Note: Stage '{stage}' was auto-generated. Check directory permissions and disk space.",
+                    )
+                raise RuntimeError(error_msg) from e
+
+    if paths and not (
+        background and submit_stage_write(run_id, write, f"{stage} file")
+    ):
+        write()
+
+    # The stage file can serve as a restart point for this run
+    if stage_path is not None:
+        record_raw_stage(run_id, raw, stage_path)
 
     metadata = {
         "save_raw_to_set": {
             "creationDateTime": datetime.now().isoformat(),
             "stage": stage,
             "stage_number": stage_num,
-            "outputPath": str(stage_path),
+            "outputPath": str(stage_path) if stage_path is not None else None,
             "suffix": suffix,
             "basename": basename,
-            "format": "eeglab",
+            "format": fmt,
             "n_channels": len(raw.ch_names),
             "actual_sfreq": raw.info["sfreq"],
             "actual_duration": raw.times[-1] - raw.times[0],
         }
     }
 
-    run_id = autoclean_dict["run_id"]
     manage_database_conditionally(
         operation="update", update_record={"run_id": run_id, "metadata": metadata}
     )
@@ -201,7 +249,7 @@ def save_raw_to_set(
         update_record={"run_id": run_id, "status": f"{stage} completed"},
     )
 
-    return paths[0]  # Return stage path for consistency
+    return stage_path
 
 
 def save_epochs_to_set(
@@ -210,9 +258,13 @@ def save_epochs_to_set(
     stage: str = "post_clean_epochs",
     output_path: Optional[Path] = None,
     flagged: bool = False,
-) -> Path:
+    fmt: Optional[str] = None,
+) -> Optional[Path]:
     """Save epoched EEG data to EEGLAB .set format with metadata preservation.
 
+    Intermediate stages are written in the run's ``intermediate_format``
+    instead (see ``STAGE_FORMATS``), EEGLAB by default.
+
     Parameters
     ----------
         epochs : mne.Epochs
@@ -225,11 +277,14 @@ def save_epochs_to_set(
             Custom output directory; if None, uses stage_dir from config
         flagged : bool, default=False
             If True, appends FLAGGED_ to the stage file name
+        fmt : Optional[str], default=None
+            File format overriding the run's configuration, one of
+            ``STAGE_FORMATS``
 
     Returns
     -------
-        Path: Path
-            Path to the saved file (stage path)
+        Path: Path or None
+            Path to the saved file (stage path), None if the format is "none"
 
     """
 
@@ -237,6 +292,7 @@ def save_epochs_to_set(
     suffix = f"_{stage.replace('post_', '')}"
     basename = Path(autoclean_dict["unprocessed_file"]).stem
     stage_num = _get_stage_number(stage, autoclean_dict)
+    fmt = _get_stage_format(stage, autoclean_dict, fmt)
 
     # Determine output directory based on flagged status - BIDS-compliant structure
     if flagged:
@@ -247,18 +303,23 @@ def save_epochs_to_set(
         subfolder = output_path / f"{stage_num}{suffix}"
     else:
         subfolder = output_path
-    subfolder.mkdir(parents=True, exist_ok=True)
-    stage_path = subfolder / f"{basename}{suffix}_epo.set"
+    if fmt == "none":
+        stage_path = None
+        paths = []
+    else:
+        subfolder.mkdir(parents=True, exist_ok=True)
+        stage_path = subfolder / f"{basename}{suffix}_epo{_STAGE_EXTENSIONS[fmt]}"
 
-    # Only save to stage directory - final files will be copied separately
-    paths = [stage_path]
+        # Only save to stage directory - final files will be copied separately
+        paths = [stage_path]
 
-    # Handle epoch metadata for event preservation
-    if epochs.metadata is None:
+    # Handle epoch metadata for event preservation. FIF and NPY stages keep
+    # events and metadata as they are.
+    events_in_epochs = None
+    event_id_rebuilt = None
+    if fmt == "eeglab" and epochs.metadata is None:
         message("warning", "No additional event metadata found for epochs")
-        events_in_epochs = None
-        event_id_rebuilt = None
-    else:
+    elif fmt == "eeglab":
         try:
             # Check for metadata-events alignment
             if len(epochs.metadata) != len(epochs.events):
@@ -407,42 +468,66 @@ def save_epochs_to_set(
         except Exception as e:  # pylint: disable=broad-exception-caught
             message("error", f"Failed to rebuild events_in_epochs: {str(e)}")
 
-    # Save to all target paths
-    epochs.info["description"] = autoclean_dict["run_id"]
+    run_id = autoclean_dict["run_id"]
+    epochs.info["description"] = run_id
     epochs.apply_proj()  # Apply projectors before saving
-    for path in paths:
-        try:
-            # Ensure parent directory exists
-            path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Use specialized export for preserving complex event structures
-            if events_in_epochs is not None and len(events_in_epochs) > 0:
-
-                export_set(
-                    fname=str(path),
-                    data=epochs.get_data(),
-                    sfreq=epochs.info["sfreq"],
-                    events=events_in_epochs,
-                    tmin=epochs.tmin,
-                    tmax=epochs.tmax,
-                    ch_names=epochs.ch_names,
-                    event_id=event_id_rebuilt,
-                    precision="single",
-                )
-            else:
-                # Use MNE's built-in exporter for simple cases
-                epochs.export(path, fmt="eeglab", overwrite=True)
-            # Add run_id to EEGLAB's etc field for tracking
-            # pylint: disable=invalid-name
-            EEG = sio.loadmat(path)
-            EEG["etc"] = {}
-            EEG["etc"]["run_id"] = autoclean_dict["run_id"]
-            sio.savemat(path, EEG, do_compression=False)
-            message("success", f"✓ Saved {stage} file to: {path}")
-        except Exception as e:
-            error_msg = f"Failed to save {stage} file to {path}: {str(e)}"
-            message("error", error_msg)
-            raise RuntimeError(error_msg) from e
+    # Background writes get a snapshot, later steps may modify epochs in place.
+    # File-backed data is written directly, a snapshot would load it all.
+    background = (
+        bool(paths) and background_writes_active(run_id) and not _is_file_backed(epochs)
+    )
+    data = copy_data(epochs, "stage_snapshot") if background else epochs
+
+    def write() -> None:
+        # Save to all target paths
+        for path in paths:
+            try:
+                # Ensure parent directory exists
+                path.parent.mkdir(parents=True, exist_ok=True)
+
+                if fmt == "fif":
+                    data.save(path, overwrite=True, verbose=False)
+                    message("success", f"✓ Saved {stage} file to: {path}")
+                    continue
+                if fmt == "npy":
+                    _save_npy_stage(data, path, run_id)
+                    message("success", f"✓ Saved {stage} file to: {path}")
+                    continue
+
+                # Use specialized export for preserving complex event structures
+                if events_in_epochs is not None and len(events_in_epochs) > 0:
+
+                    export_set(
+                        fname=str(path),
+                        data=data.get_data(),
+                        sfreq=data.info["sfreq"],
+                        events=events_in_epochs,
+                        tmin=data.tmin,
+                        tmax=data.tmax,
+                        ch_names=data.ch_names,
+                        event_id=event_id_rebuilt,
+                        precision="single",
+                    )
+                else:
+                    # Use MNE's built-in exporter for simple cases
+                    data.export(path, fmt="eeglab", overwrite=True)
+                # Add run_id to EEGLAB's etc field for tracking
+                # pylint: disable=invalid-name
+                EEG = sio.loadmat(path)
+                EEG["etc"] = {}
+                EEG["etc"]["run_id"] = run_id
+                sio.savemat(path, EEG, do_compression=False)
+                message("success", f"✓ Saved {stage} file to: {path}")
+            except Exception as e:
+                error_msg = f"Failed to save {stage} file to {path}: {str(e)}"
+                message("error", error_msg)
+                raise RuntimeError(error_msg) from e
+
+    if paths and not (
+        background and submit_stage_write(run_id, write, f"{stage} file")
+    ):
+        write()
 
     # Record save operation in database
     metadata = {
@@ -453,7 +538,7 @@ def save_epochs_to_set(
             "outputPaths": [str(p) for p in paths],
             "suffix": suffix,
             "basename": basename,
-            "format": "eeglab",
+            "format": fmt,
             "n_epochs": len(epochs),
             "n_channels": len(epochs.ch_names),
             "actual_sfreq": epochs.info["sfreq"],
@@ -464,7 +549,6 @@ def save_epochs_to_set(
     }
 
     # Update database with save metadata and status
-    run_id = autoclean_dict["run_id"]
     manage_database_conditionally(
         operation="update", update_record={"run_id": run_id, "metadata": metadata}
     )
@@ -473,7 +557,7 @@ def save_epochs_to_set(
         update_record={"run_id": run_id, "status": f"{stage} completed"},
     )
 
-    return paths[0]  # Return stage path for consistency
+    return stage_path
 
 
 def save_ica_to_fif(ica, autoclean_dict, pre_ica_raw):
@@ -510,7 +594,7 @@ def save_ica_to_fif(ica, autoclean_dict, pre_ica_raw):
             "creationDateTime": datetime.now().isoformat(),
             "components": components,
             "ica_path": ica_path.name,
-            "pre_ica_path": str(pre_ica_path),
+            "pre_ica_path": str(pre_ica_path) if pre_ica_path else None,
         }
     }
     run_id = autoclean_dict["run_id"]
@@ -543,6 +627,134 @@ def _get_stage_number(stage: str, autoclean_dict: Dict[str, Any]) -> str:
     return f"{autoclean_dict['_export_counter']:02d}"
 
 
+def _get_stage_format(
+    stage: str, autoclean_dict: Dict[str, Any], fmt: Optional[str] = None
+) -> str:
+    """Get the file format a stage is written in.
+
+    Final stages (the ones copy_final_files picks up) are always EEGLAB so
+    the delivered files do not depend on the intermediate format.
+
+    Args:
+        stage: Name of the stage
+        autoclean_dict: Configuration dictionary
+        fmt: Explicitly requested format, if any
+
+    Returns:
+        One of STAGE_FORMATS
+    """
+    if fmt is None:
+        if "comp" in stage.lower():
+            fmt = "eeglab"
+        else:
+            fmt = autoclean_dict.get("intermediate_format") or "eeglab"
+
+    fmt = fmt.lower()
+    if fmt not in STAGE_FORMATS:
+        raise ValueError(
+            f"Unknown stage format '{fmt}', expected one of {', '.join(STAGE_FORMATS)}"
+        )
+    return fmt
+
+
+def _is_file_backed(inst: mne.io.BaseRaw | mne.BaseEpochs) -> bool:
+    """Check whether the data of an object is a memory-mapped file.
+
+    Copying such data (e.g. the preload file of a chunked run) loads the
+    whole recording into memory.
+
+    Args:
+        inst: Raw or epochs object
+
+    Returns:
+        True if the data is backed by a file
+    """
+    return getattr(getattr(inst, "_data", None), "_mmap", None) is not None
+
+
+def _save_npy_stage(
+    data: mne.io.BaseRaw | mne.BaseEpochs, path: Path, run_id: str
+) -> None:
+    """Save data as a float32 .npy array with a JSON sidecar.
+
+    The sidecar holds what is needed to rebuild the object with
+    autoclean.io.read_stage_file: channel info, montage, annotations or
+    events and epoch metadata.
+
+    Args:
+        data: Raw or Epochs to save
+        path: Path of the .npy file, the sidecar gets the same stem
+        run_id: Run identifier stored in the sidecar
+    """
+    info = data.info
+    meas_date = info["meas_date"]
+    sidecar: Dict[str, Any] = {
+        "kind": "raw" if isinstance(data, mne.io.BaseRaw) else "epochs",
+        "run_id": run_id,
+        "ch_names": info["ch_names"],
+        "ch_types": data.get_channel_types(),
+        "sfreq": info["sfreq"],
+        "bads": list(info["bads"]),
+        "meas_date": meas_date.isoformat() if meas_date is not None else None,
+        "montage": None,
+    }
+
+    montage = data.get_montage()
+    if montage is not None:
+        positions = montage.get_positions()
+        sidecar["montage"] = {
+            "coord_frame": positions["coord_frame"],
+            "ch_pos": {ch: pos.tolist() for ch, pos in positions["ch_pos"].items()},
+            **{
+                fid: positions[fid].tolist()
+                for fid in ("nasion", "lpa", "rpa")
+                if positions[fid] is not None
+            },
+        }
+
+    if sidecar["kind"] == "raw":
+        annotations = data.annotations
+        sidecar["first_samp"] = int(data.first_samp)
+        sidecar["annotations"] = {
+            "onset": annotations.onset.tolist(),
+            "duration": annotations.duration.tolist(),
+            "description": list(annotations.description),
+            "orig_time": (
+                annotations.orig_time.isoformat()
+                if annotations.orig_time is not None
+                else None
+            ),
+        }
+    else:
+        sidecar["tmin"] = data.tmin
+        sidecar["events"] = data.events.tolist()
+        sidecar["event_id"] = {str(k): int(v) for k, v in data.event_id.items()}
+        sidecar["metadata"] = (
+            json.loads(data.metadata.to_json(orient="records"))
+            if data.metadata is not None
+            else None
+        )
+
+    if sidecar["kind"] == "raw":
+        # Write continuous data block by block, so long recordings are never
+        # copied as a whole
+        n_channels = len(info["ch_names"])
+        array = np.lib.format.open_memmap(
+            path, mode="w+", dtype=np.float32, shape=(n_channels, int(data.n_times))
+        )
+        block_size = max(_NPY_BLOCK_BYTES // (8 * max(n_channels, 1)), 1)
+        for start, stop, _, block in iter_raw_blocks(data, block_size):
+            array[:, start:stop] = block
+        array.flush()
+        del array
+    else:
+        # Cast the loaded array directly instead of copying it via get_data() first
+        array = data._data if data.preload else data.get_data()  # pylint: disable=protected-access
+        np.save(path, np.asarray(array, dtype=np.float32))
+    with open(path.with_suffix(".json"), "w", encoding="utf-8") as f:
+        json.dump(sidecar, f)
+
+
 def copy_final_files(autoclean_dict: Dict[str, Any]) -> None:
     """Copy final files from post_comp stage and processing log to the final_files directory.
 
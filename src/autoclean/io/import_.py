@@ -8,6 +8,7 @@ making it easier to extend functionality without modifying core code.
 
 import abc
 import importlib
+import json
 import pkgutil
 import threading
 from datetime import datetime
@@ -33,6 +34,7 @@ except ImportError:
 
 __all__ = [
     "import_eeg",
+    "read_stage_file",
     "register_plugin",
     "BaseEEGPlugin",
     "register_format",
@@ -300,7 +302,7 @@ def get_plugin_for_combination(format_id: str, montage_name: str) -> BaseEEGPlug
 
 
 def import_eeg(
-    autoclean_dict: dict, preload: bool = True
+    autoclean_dict: dict, preload: Union[bool, str] = True
 ) -> Union[mne.io.Raw, mne.Epochs]:
     """Import EEG data using the appropriate plugin.
 
@@ -310,8 +312,9 @@ def import_eeg(
     ----------
         autoclean_dict : dict
             Configuration dictionary
-        preload : bool
-            Whether to load data into memory
+        preload : bool or str
+            Whether to load data into memory, or the path of a file to
+            preload it into (memory-mapped)
 
     Returns
     -------
@@ -432,6 +435,94 @@ def import_eeg(
         raise
 
 
+def read_stage_file(
+    file_path: Union[str, Path], preload: bool = True
+) -> Union[mne.io.Raw, mne.Epochs]:
+    """Read a stage file written by save_raw_to_set or save_epochs_to_set.
+
+    Parameters
+    ----------
+        file_path : str or Path
+            Path to a .set, .fif or .npy stage file
+        preload : bool
+            Whether to load data into memory (.npy stages are always loaded)
+
+    Returns
+    -------
+        eeg_data : mne.io.Raw or mne.Epochs
+            The stage data
+    """
+    file_path = Path(file_path)
+    is_epochs = file_path.stem.endswith("_epo")
+    suffix = file_path.suffix.lower()
+
+    if suffix == ".set":
+        if is_epochs:
+            return mne.read_epochs_eeglab(file_path, verbose=False)
+        return mne.io.read_raw_eeglab(file_path, preload=preload, verbose=False)
+    if suffix == ".fif":
+        if is_epochs:
+            return mne.read_epochs(file_path, preload=preload, verbose=False)
+        return mne.io.read_raw_fif(file_path, preload=preload, verbose=False)
+    if suffix != ".npy":
+        raise ValueError(f"Unsupported stage file: {file_path}")
+
+    with open(file_path.with_suffix(".json"), "r", encoding="utf-8") as f:
+        sidecar = json.load(f)
+    # Keep float32 on disk, MNE works on float64
+    data = np.load(file_path).astype(np.float64)
+
+    info = mne.create_info(sidecar["ch_names"], sidecar["sfreq"], sidecar["ch_types"])
+    info["bads"] = list(sidecar["bads"])
+    info["description"] = sidecar.get("run_id")
+
+    if sidecar["kind"] == "raw":
+        eeg_data = mne.io.RawArray(
+            data, info, first_samp=sidecar["first_samp"], verbose=False
+        )
+    else:
+        metadata = sidecar.get("metadata")
+        eeg_data = mne.EpochsArray(
+            data,
+            info,
+            events=np.array(sidecar["events"], dtype=int).reshape(-1, 3),
+            tmin=sidecar["tmin"],
+            event_id=sidecar["event_id"] or None,
+            metadata=pd.DataFrame(metadata) if metadata is not None else None,
+            verbose=False,
+        )
+
+    if sidecar.get("meas_date"):
+        eeg_data.set_meas_date(datetime.fromisoformat(sidecar["meas_date"]))
+
+    if sidecar.get("montage"):
+        montage = dict(sidecar["montage"])
+        montage["ch_pos"] = {
+            ch: np.array(pos) for ch, pos in montage["ch_pos"].items()
+        }
+        eeg_data.set_montage(mne.channels.make_dig_montage(**montage), verbose=False)
+
+    annotations = sidecar.get("annotations")
+    if annotations and annotations["onset"]:
+        onset = np.array(annotations["onset"])
+        orig_time = annotations["orig_time"]
+        if orig_time is not None:
+            orig_time = datetime.fromisoformat(orig_time)
+        else:
+            # Without a reference time onsets are stored from the first sample
+            onset = onset - eeg_data.first_time
+        eeg_data.set_annotations(
+            mne.Annotations(
+                onset,
+                annotations["duration"],
+                annotations["description"],
+                orig_time=orig_time,
+            )
+        )
+
+    return eeg_data
+
+
 # Event processor plugin system
 _EVENT_PROCESSOR_REGISTRY = {}  # Maps task names to event processor classes
 _EVENT_PROCESSORS_DISCOVERED = False  # Track if event processor discovery has been run
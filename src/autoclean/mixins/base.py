@@ -14,14 +14,16 @@ functionality across different task types.
 import inspect
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 import mne
 from matplotlib import pyplot as plt
 
 from autoclean.io import save_epochs_to_set, save_raw_to_set
+from autoclean.utils.copy_tracker import copy_data
 from autoclean.utils.database import manage_database_conditionally
 from autoclean.utils.logging import message
+from autoclean.utils.step_cache import get_step_cache
 
 
 class BaseMixin:
@@ -108,6 +110,23 @@ class BaseMixin:
 
         return is_enabled, settings_copy
 
+    def _get_chunk_duration(self) -> Optional[float]:
+        """Get the block length of chunked processing, if it is enabled.
+
+        Chunked processing is enabled by the ``chunked_processing`` task
+        setting, e.g. ``{"enabled": True, "value": {"block_sec": 60}}``. Steps
+        supporting it then read continuous data block by block, and modify
+        the task's own data in place instead of copying the whole recording.
+
+        Returns:
+            Block length in seconds, or None if chunked processing is disabled
+        """
+        is_enabled, config_value = self._check_step_enabled("chunked_processing")
+        if not is_enabled or config_value is None:
+            return None
+        value = config_value.get("value") or {}
+        return float(value.get("block_sec", 60.0))
+
     def _report_step_status(self) -> None:
         """Report the enabled/disabled status of all processing steps in the configuration.
 
@@ -215,6 +234,39 @@ class BaseMixin:
         elif data is getattr(self, "epochs", None):
             self.epochs = result_data
 
+    def _can_modify_in_place(self, data: Union[mne.io.Raw, mne.Epochs]) -> bool:
+        """Check whether a step may modify its input instead of a copy.
+
+        Steps replace ``self.raw`` or ``self.epochs`` with their result, so
+        when they process the task's own data the input is not needed
+        afterwards. Data passed in by the caller is left untouched.
+
+        Args:
+            data: Data object the step processes
+
+        Returns:
+            True if data is the task's own raw or epochs object
+        """
+        return data is getattr(self, "raw", None) or data is getattr(
+            self, "epochs", None
+        )
+
+    def _copy_unless_in_place(
+        self, data: Union[mne.io.Raw, mne.Epochs], step: str
+    ) -> Union[mne.io.Raw, mne.Epochs]:
+        """Get the object a step should modify.
+
+        Args:
+            data: Data object the step processes
+            step: Step name the copy is recorded under
+
+        Returns:
+            data itself if it is the task's own data, otherwise a copy of it
+        """
+        if self._can_modify_in_place(data):
+            return data
+        return copy_data(data, step)
+
     def _update_metadata(self, operation: str, metadata_dict: Dict[str, Any]) -> None:
         """Update the database with metadata about an operation.
 
@@ -236,6 +288,26 @@ class BaseMixin:
             operation="update", update_record={"run_id": run_id, "metadata": metadata}
         )
 
+    def _cached_call(
+        self, step: str, func: Callable, *args, serializer: str = "pickle", **kwargs
+    ) -> Any:
+        """Call a deterministic function through the run's step cache.
+
+        Args:
+            step: Name of the step, used to group cache entries
+            func: Function computing the result from the data and parameters
+            *args: Positional arguments for func (data objects are hashed by content)
+            serializer: How the result is stored ("pickle", "json" or "ica")
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The cached or freshly computed result of func
+        """
+        cache = get_step_cache(getattr(self, "config", None))
+        if cache is None:
+            return func(*args, **kwargs)
+        return cache.call(step, func, *args, serializer=serializer, **kwargs)
+
     def _update_flagged_status(self, flagged: bool, reason: str) -> None:
         """Update the flagged status and reasons.
 
@@ -5,6 +5,10 @@ from typing import Optional, Union
 import mne
 import numpy as np
 
+from autoclean.functions.preprocessing.chunked import crop_copy
+from autoclean.functions.segment_rejection.dense_oscillatory import (
+    find_dense_oscillatory_runs,
+)
 from autoclean.utils.logging import message
 
 
@@ -19,6 +23,7 @@ class ArtifactsMixin:
         min_channels: int = 75,
         padding_ms: float = 500,
         annotation_label: str = "BAD_REF_AF",
+        hop_size_ms: Optional[float] = None,
     ) -> mne.io.Raw:
         """Detect smaller, dense oscillatory multichannel artifacts.
 
@@ -40,6 +45,9 @@ class ArtifactsMixin:
             by default 500.
         annotation_label : str, Optional
             Label to use for the annotations, by default "BAD_REF_AF".
+        hop_size_ms : float, Optional
+            Step between window starts in milliseconds. None (default) uses
+            non-overlapping windows; smaller values give overlapping windows.
         stage_name : str, Optional
             Name for saving and metadata, by default "detect_dense_oscillatory_artifacts".
 
@@ -61,6 +69,10 @@ class ArtifactsMixin:
         -----
         This method is intended to find reference artifacts
         but may also be triggered by other artifacts.
+
+        Consecutive flagged windows are merged into a single annotation.
+        ``artifacts_detected`` in the metadata counts flagged windows and
+        ``annotations_added`` the merged annotations.
         """
         # Determine which data to use
         data = self._get_data_object(data)
@@ -72,66 +84,43 @@ class ArtifactsMixin:
             raise TypeError("Data must be an MNE Raw object for artifact detection")
 
         try:
-            # Convert parameters to samples and volts
-            sfreq = data.info["sfreq"]
-            window_size = int(window_size_ms * sfreq / 1000)
-            channel_threshold = channel_threshold_uv * 1e-6  # Convert µV to V
-            padding_sec = padding_ms / 1000.0  # Convert padding to seconds
-
-            # Get data and times
-            raw_data, times = data.get_data(return_times=True)
-            _, n_samples = raw_data.shape
-
-            artifact_annotations = []
-
-            # Sliding window detection
-            for start_idx in range(0, n_samples - window_size, window_size):
-                window = raw_data[:, start_idx : start_idx + window_size]
-
-                # Compute peak-to-peak amplitude for each channel in the window
-                ptp_amplitudes = np.ptp(
-                    window, axis=1
-                )  # Peak-to-peak amplitude per channel
-
-                # Count channels exceeding the threshold
-                num_channels_exceeding = np.sum(ptp_amplitudes > channel_threshold)
-
-                # Check if artifact spans multiple channels with oscillatory behavior
-                if num_channels_exceeding >= min_channels:
-                    start_time = times[start_idx] - padding_sec  # Add padding before
-                    end_time = (
-                        times[start_idx + window_size] + padding_sec
-                    )  # Add padding after
-
-                    # Ensure we don't go beyond recording bounds
-                    start_time = max(start_time, times[0])
-                    end_time = min(end_time, times[-1])
-
-                    artifact_annotations.append(
-                        [start_time, end_time - start_time, annotation_label]
-                    )
-
-            # Create a copy of the raw data
-            result_raw = data.copy()
-
-            # Add annotations to the raw data
-            if artifact_annotations:
-                for annotation in artifact_annotations:
-                    result_raw.annotations.append(
-                        onset=annotation[0],
-                        duration=annotation[1],
-                        description=annotation[2],
-                    )
+            # In chunked mode the data is read block by block
+            block_sec = self._get_chunk_duration()
+            onsets, durations, n_windows = find_dense_oscillatory_runs(
+                data if block_sec is not None else data.get_data(),
+                data.times,
+                data.info["sfreq"],
+                window_size_ms=window_size_ms,
+                hop_size_ms=hop_size_ms,
+                channel_threshold_uv=channel_threshold_uv,
+                min_channels=min_channels,
+                padding_ms=padding_ms,
+                block_sec=block_sec,
+            )
+
+            # The task's own data is annotated in place
+            result_raw = self._copy_unless_in_place(
+                data, "detect_dense_oscillatory_artifacts"
+            )
+
+            # Add all merged runs to the raw data at once
+            if len(onsets):
+                result_raw.annotations.append(
+                    onset=onsets,
+                    duration=durations,
+                    description=[annotation_label] * len(onsets),
+                )
                 message(
                     "info",
-                    f"Added {len(artifact_annotations)} potential reference artifact annotations",
+                    f"Added {len(onsets)} potential reference artifact annotations "
+                    f"covering {n_windows} windows",
                 )
             else:
                 message("info", "No reference artifacts detected")
 
             # Add flags if needed
-            if len(artifact_annotations) > self.REFERENCE_ARTIFACT_THRESHOLD:
-                flagged_reason = f"WARNING: {len(artifact_annotations)} potential reference artifacts detected"  # pylint: disable=line-too-long
+            if n_windows > self.REFERENCE_ARTIFACT_THRESHOLD:
+                flagged_reason = f"WARNING: {n_windows} potential reference artifacts detected"  # pylint: disable=line-too-long
                 self._update_flagged_status(flagged=True, reason=flagged_reason)
 
             # Update metadata
@@ -141,7 +130,9 @@ class ArtifactsMixin:
                 "min_channels": min_channels,
                 "padding_ms": padding_ms,
                 "annotation_label": annotation_label,
-                "artifacts_detected": len(artifact_annotations),
+                "hop_size_ms": hop_size_ms,
+                "artifacts_detected": n_windows,
+                "annotations_added": len(onsets),
             }
 
             self._update_metadata("step_detect_dense_oscillatory_artifacts", metadata)
@@ -450,10 +441,12 @@ class ArtifactsMixin:
             # Crop and concatenate good intervals
             if not good_intervals:
                 message("warning", "No good segments found after rejection")
-                return data.copy()
+                return self._copy_unless_in_place(data, "reject_bad_segments")
 
+            # Copy only the good segments, not the whole recording for each
             raw_segments = [
-                data.copy().crop(tmin=start, tmax=end) for start, end in good_intervals
+                crop_copy(data, tmin=start, tmax=end, step="reject_bad_segments")
+                for start, end in good_intervals
             ]
 
             raw_cleaned = mne.concatenate_raws(raw_segments)
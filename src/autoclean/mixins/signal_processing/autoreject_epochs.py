@@ -15,6 +15,7 @@ reduces the need for manual inspection and rejection of artifacts, while maintai
 the quality of the data for subsequent analysis.
 """
 
+import functools
 from typing import List, Optional, Union
 
 import mne
@@ -118,16 +119,20 @@ class AutoRejectEpochsMixin:
         try:
             message("header", "Applying AutoReject for artifact rejection")
 
-            # Create AutoReject object with parameters if provided
-            if n_interpolate is not None and consensus is not None:
-                ar = AutoReject(
-                    n_interpolate=n_interpolate, consensus=consensus, n_jobs=n_jobs
-                )
-            else:
-                ar = AutoReject(n_jobs=n_jobs)
+            # Fit AutoReject, reusing the fitted thresholds if these epochs
+            # were already fitted with the same parameters. n_jobs does not
+            # change the fit, so it is kept out of the cache key.
+            ar = self._cached_call(
+                "apply_autoreject",
+                functools.partial(_fit_autoreject, n_jobs=n_jobs),
+                epochs,
+                n_interpolate=n_interpolate,
+                consensus=consensus,
+            )
+            ar.n_jobs = n_jobs
 
-            # Fit and transform epochs
-            epochs_clean = ar.fit_transform(epochs)
+            # Transform epochs
+            epochs_clean = ar.transform(epochs)
 
             # Calculate statistics
             rejected_epochs = len(epochs) - len(epochs_clean)
@@ -174,3 +179,17 @@ class AutoRejectEpochsMixin:
         except Exception as e:
             message("error", f"Error during AutoReject: {str(e)}")
             raise RuntimeError(f"Failed to apply AutoReject: {str(e)}") from e
+
+
+def _fit_autoreject(
+    epochs: mne.Epochs,
+    n_interpolate: Optional[List[int]] = None,
+    consensus: Optional[List[float]] = None,
+    n_jobs: int = 1,
+) -> AutoReject:
+    """Fit AutoReject, using the given grid if both parameters are provided."""
+    if n_interpolate is not None and consensus is not None:
+        ar = AutoReject(n_interpolate=n_interpolate, consensus=consensus, n_jobs=n_jobs)
+    else:
+        ar = AutoReject(n_jobs=n_jobs)
+    return ar.fit(epochs)
@@ -4,6 +4,7 @@ from typing import List, Optional, Union
 
 import mne
 
+from autoclean.functions.preprocessing.chunked import filter_data_chunked
 from autoclean.functions.preprocessing.filtering import (
     filter_data as standalone_filter_data,
 )
@@ -13,6 +14,7 @@ from autoclean.functions.preprocessing.referencing import (
 from autoclean.functions.preprocessing.resampling import (
     resample_data as standalone_resample_data,
 )
+from autoclean.utils.copy_tracker import copy_data
 from autoclean.utils.logging import message
 
 
@@ -87,7 +89,7 @@ class BasicStepsMixin:
         self._update_instance_data(data, processed_data, use_epochs)
 
         # Store a copy of the pre-cleaned raw data for comparison
-        self.original_raw = self.raw.copy()
+        self.original_raw = copy_data(self.raw, "original_raw")
 
         # Export if requested
         self._auto_export_if_enabled(processed_data, stage_name, export)
@@ -191,18 +193,38 @@ class BasicStepsMixin:
 
         message("header", "Filtering data...")
 
-        # Call standalone function
-        filtered_data = standalone_filter_data(
-            data=data,
-            l_freq=final_l_freq,
-            h_freq=final_h_freq,
-            notch_freqs=final_notch_freqs,
-            notch_widths=final_notch_widths,
-            method=final_method,
-            phase=final_phase,
-            fir_window=final_fir_window,
-            verbose=final_verbose,
+        filter_kwargs = {
+            "l_freq": final_l_freq,
+            "h_freq": final_h_freq,
+            "notch_freqs": final_notch_freqs,
+            "notch_widths": final_notch_widths,
+            "method": final_method,
+            "phase": final_phase,
+            "fir_window": final_fir_window,
+            "verbose": final_verbose,
+        }
+        # The task's own data is filtered in place
+        original_sfreq = data.info["sfreq"]
+        original_n_channels = len(data.ch_names)
+        inplace = self._can_modify_in_place(data)
+
+        block_sec = self._get_chunk_duration()
+        chunked = (
+            inplace
+            and block_sec is not None
+            and isinstance(data, mne.io.base.BaseRaw)
+            and data.preload
         )
+        if chunked:
+            # Filter in place block by block instead of filtering a full copy
+            filtered_data = filter_data_chunked(
+                data, block_sec=block_sec, **filter_kwargs
+            )
+        else:
+            # Call standalone function
+            filtered_data = standalone_filter_data(
+                data=data, inplace=inplace, **filter_kwargs
+            )
 
         # Pipeline integration with result-based metadata
         self._update_instance_data(data, filtered_data, use_epochs)
@@ -210,9 +232,9 @@ class BasicStepsMixin:
 
         # Use actual results in metadata
         metadata = {
-            "original_sfreq": data.info["sfreq"],
+            "original_sfreq": original_sfreq,
             "filtered_sfreq": filtered_data.info["sfreq"],
-            "original_n_channels": len(data.ch_names),
+            "original_n_channels": original_n_channels,
             "filtered_n_channels": len(filtered_data.ch_names),
             "applied_l_freq": final_l_freq,
             "applied_h_freq": final_h_freq,
@@ -223,6 +245,7 @@ class BasicStepsMixin:
             "fir_window": final_fir_window,
             "original_data_type": type(data).__name__,
             "result_data_type": type(filtered_data).__name__,
+            "chunked_block_sec": block_sec if chunked else None,
         }
         self._update_metadata("step_filter_data", metadata)
 
@@ -329,7 +352,8 @@ class BasicStepsMixin:
             "header", f"Resampling data from {current_sfreq} Hz to {target_sfreq} Hz..."
         )
 
-        # Call standalone function
+        # Call standalone function, resampling the task's own data in place
+        original_n_samples = len(data.times)
         resampled_data = standalone_resample_data(
             data=data,
             sfreq=target_sfreq,
@@ -337,6 +361,7 @@ class BasicStepsMixin:
             window=final_window,
             n_jobs=final_n_jobs,
             pad=final_pad,
+            inplace=self._can_modify_in_place(data),
             verbose=final_verbose,
         )
 
@@ -351,16 +376,8 @@ class BasicStepsMixin:
             "original_sfreq": current_sfreq,
             "target_sfreq": target_sfreq,
             "actual_sfreq": resampled_data.info["sfreq"],
-            "original_n_samples": (
-                data.get_data().shape[1]
-                if hasattr(data, "get_data")
-                else len(data.times)
-            ),
-            "resampled_n_samples": (
-                resampled_data.get_data().shape[1]
-                if hasattr(resampled_data, "get_data")
-                else len(resampled_data.times)
-            ),
+            "original_n_samples": original_n_samples,
+            "resampled_n_samples": len(resampled_data.times),
             "npad": final_npad,
             "window": final_window,
             "n_jobs": final_n_jobs,
@@ -441,6 +458,7 @@ class BasicStepsMixin:
             data=data,
             ref_channels=ref_type,
             projection=False if ref_type == "average" else True,
+            inplace=self._can_modify_in_place(data),
             verbose=False,
         )
 
@@ -506,7 +524,9 @@ class BasicStepsMixin:
         message(
             "header", f"Dropping outer layer channels: {', '.join(channels_to_drop)}"
         )
-        processed_data = data.copy().drop_channels(channels_to_drop)
+        original_channel_count = len(data.ch_names)
+        processed_data = self._copy_unless_in_place(data, "drop_outer_layer")
+        processed_data.drop_channels(channels_to_drop)
         message("info", f"Channels dropped: {', '.join(channels_to_drop)}")
 
         if isinstance(processed_data, (mne.io.Raw, mne.io.base.BaseRaw)):
@@ -514,7 +534,7 @@ class BasicStepsMixin:
 
         metadata = {
             "dropped_outer_layer_channels": channels_to_drop,
-            "original_channel_count": len(data.ch_names),
+            "original_channel_count": original_channel_count,
             "new_channel_count": len(processed_data.ch_names),
         }
         self._update_metadata("step_drop_outerlayer", metadata)
@@ -583,23 +603,21 @@ class BasicStepsMixin:
             "header",
             f"Assigning EOG channel types for: {', '.join(eog_channels_map.keys())}",
         )
-        # Process a copy to avoid modifying the original data object directly
-        processed_data = data.copy()
+        # Process a copy unless working on the task's own data
+        processed_data = self._copy_unless_in_place(data, "assign_eog_channels")
         processed_data.set_channel_types(eog_channels_map)
         message(
             "info",
             f"EOG channel types assigned for: {', '.join(eog_channels_map.keys())}",
         )
 
-        # Note: set_channel_types modifies in place, but we operate on a copy.
         # No need to save intermediate step here unless explicitly required,
         # as channel type changes don't alter the data matrix itself.
 
         metadata = {"assigned_eog_channels": list(eog_channels_map.keys())}
         self._update_metadata("step_assign_eog_channels", metadata)
 
-        # Even though set_channel_types modifies inplace on the copy,
-        # we still call update_instance_data to potentially update self.raw/self.epochs
+        # Update self.raw/self.epochs in case a copy was processed
         self._update_instance_data(data, processed_data, use_epochs)
 
         return processed_data
@@ -666,7 +684,8 @@ class BasicStepsMixin:
             "header",
             f"Trimming {trim_duration_sec}s from each end (new range: {tmin:.3f}s to {tmax:.3f}s)",
         )
-        processed_data = data.copy().crop(tmin=tmin, tmax=tmax)
+        processed_data = self._copy_unless_in_place(data, "trim_edges")
+        processed_data.crop(tmin=tmin, tmax=tmax)
         new_duration = processed_data.times[-1] - processed_data.times[0]
         message("info", f"Data trimmed. New duration: {new_duration:.3f}s")
 
@@ -754,7 +773,8 @@ class BasicStepsMixin:
         message(
             "header", f"Cropping data duration to range: {tmin:.3f}s to {tmax:.3f}s"
         )
-        processed_data = data.copy().crop(tmin=tmin, tmax=tmax)
+        processed_data = self._copy_unless_in_place(data, "crop_duration")
+        processed_data.crop(tmin=tmin, tmax=tmax)
         new_duration = processed_data.times[-1] - processed_data.times[0]
         message("info", f"Data cropped. New duration: {new_duration:.3f}s")
 
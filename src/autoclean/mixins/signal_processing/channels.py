@@ -4,7 +4,10 @@ from typing import Dict, List, Union
 
 import mne
 
-from autoclean.functions.artifacts.channels import detect_bad_channels
+from autoclean.functions.artifacts.channels import (
+    _interpolate_bads_eeg_cached,
+    detect_bad_channels,
+)
 from autoclean.utils.logging import message
 
 
@@ -94,8 +97,8 @@ class ChannelsMixin:
                     eog_ch_names = [data.ch_names[idx] for idx in eog_picks]
                     data.set_channel_types({ch: "eeg" for ch in eog_ch_names})
 
-            # Create a copy of the data
-            result_raw = data.copy()
+            # Work on the task's own data in place, or on a copy
+            result_raw = self._copy_unless_in_place(data, "clean_bad_channels")
 
             # Setup options
             options = {
@@ -109,7 +112,10 @@ class ChannelsMixin:
             }
 
             # Call standalone function for bad channel detection
-            bad_channels = detect_bad_channels(
+            bad_channels = self._cached_call(
+                "clean_bad_channels",
+                detect_bad_channels,
+                serializer="json",
                 data=result_raw,
                 correlation_thresh=options["correlation_thresh"],
                 deviation_thresh=options["deviation_thresh"],
@@ -158,7 +164,8 @@ class ChannelsMixin:
             result_raw.info["bads"] = bads
 
             if cleaning_method == "interpolate":
-                result_raw.interpolate_bads(reset_bads=reset_bads)
+                if not _interpolate_bads_eeg_cached(result_raw, reset_bads=reset_bads):
+                    result_raw.interpolate_bads(reset_bads=reset_bads)
             if cleaning_method == "drop":
                 result_raw.drop_channels(result_raw.info["bads"])
                 result_raw.info["bads"] = []
@@ -272,7 +279,8 @@ class ChannelsMixin:
         try:
             # Drop channels
             message("header", "Dropping channels...")
-            result_data = data.copy().drop_channels(channels)
+            result_data = self._copy_unless_in_place(data, "drop_channels")
+            result_data.drop_channels(channels)
             message("info", f"Dropped {len(channels)} channels: {channels}")
 
             # Update metadata
@@ -354,7 +362,8 @@ class ChannelsMixin:
         try:
             # Set channel types
             message("header", "Setting channel types...")
-            result_data = data.copy().set_channel_types(ch_types_dict)
+            result_data = self._copy_unless_in_place(data, "set_channel_types")
+            result_data.set_channel_types(ch_types_dict)
             message("info", f"Set types for {len(ch_types_dict)} channels")
 
             # Update metadata
@@ -413,14 +422,14 @@ class ChannelsMixin:
 
             if not eog_ch_names:
                 message("info", "No EOG channels found to drop")
-                return data.copy()
+                return self._copy_unless_in_place(data, "drop_eog_channels")
 
             message(
                 "info", f"Dropping {len(eog_ch_names)} EOG channels: {eog_ch_names}"
             )
 
             # Drop the EOG channels
-            result_data = data.copy()
+            result_data = self._copy_unless_in_place(data, "drop_eog_channels")
             result_data.drop_channels(eog_ch_names, on_missing="ignore")
 
             # Export the result using standard pipeline saving
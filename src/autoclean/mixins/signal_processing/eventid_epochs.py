@@ -21,6 +21,7 @@ import numpy as np
 import pandas as pd
 
 from autoclean.functions.epoching import create_eventid_epochs as _create_eventid_epochs
+from autoclean.utils.copy_tracker import copy_data
 from autoclean.utils.logging import message
 
 
@@ -214,7 +215,7 @@ class EventIDEpochsMixin:
                 epochs.metadata = pd.DataFrame(metadata_rows)
 
             # Create a copy for potential dropping
-            epochs_clean = epochs.copy()
+            epochs_clean = copy_data(epochs, "create_eventid_epochs")
 
             # If we're keeping all epochs but still want to mark them, we need to apply additional logic
             if keep_all_epochs:
@@ -116,8 +116,8 @@ class GFPCleanEpochsMixin:
             if not epochs.preload:
                 epochs.load_data()
 
-            # Create a copy to work with
-            epochs_clean = epochs.copy()
+            # Only read here, the cleaned epochs are created by indexing below
+            epochs_clean = epochs
 
             # Define non-scalp electrodes to exclude
             channel_region_map = {
@@ -159,27 +159,18 @@ class GFPCleanEpochsMixin:
                 "info",
                 "Calculating Global Field Power (GFP) for each epoch using only scalp electrodes",
             )
-            gfp = np.sqrt(
-                np.mean(epochs_clean.get_data()[:, scalp_indices, :] ** 2, axis=(1, 2))
-            )  # Shape: (n_epochs,)
+            scalp_data = epochs_clean.get_data(picks=scalp_indices)
+            gfp = np.sqrt(np.mean(scalp_data**2, axis=(1, 2)))  # Shape: (n_epochs,)
 
             # Epoch Statistics
             epoch_stats = pd.DataFrame(
                 {
                     "epoch": np.arange(len(gfp)),
                     "gfp": gfp,
-                    "mean_amplitude": epochs_clean.get_data()[:, scalp_indices, :].mean(
-                        axis=(1, 2)
-                    ),
-                    "max_amplitude": epochs_clean.get_data()[:, scalp_indices, :].max(
-                        axis=(1, 2)
-                    ),
-                    "min_amplitude": epochs_clean.get_data()[:, scalp_indices, :].min(
-                        axis=(1, 2)
-                    ),
-                    "std_amplitude": epochs_clean.get_data()[:, scalp_indices, :].std(
-                        axis=(1, 2)
-                    ),
+                    "mean_amplitude": scalp_data.mean(axis=(1, 2)),
+                    "max_amplitude": scalp_data.max(axis=(1, 2)),
+                    "min_amplitude": scalp_data.min(axis=(1, 2)),
+                    "std_amplitude": scalp_data.std(axis=(1, 2)),
                 }
             )
 
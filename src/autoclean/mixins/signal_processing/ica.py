@@ -8,6 +8,7 @@ from autoclean.functions.ica.ica_processing import (
     fit_ica,
 )
 from autoclean.io.export import save_ica_to_fif
+from autoclean.utils.copy_tracker import copy_data
 from autoclean.utils.logging import message
 
 
@@ -90,7 +91,7 @@ class IcaMixin:
                 ica_kwargs["random_state"] = 97
 
             # Prepare data for ICA fitting - always copy to avoid modifying original
-            data_for_ica = data.copy()
+            data_for_ica = copy_data(data, "run_ica")
             if temp_highpass_for_ica is not None:
                 message(
                     "info",
@@ -103,7 +104,9 @@ class IcaMixin:
             message("debug", f"Fitting ICA with {ica_kwargs}")
 
             # Call standalone function for ICA fitting on (potentially filtered) data
-            self.final_ica = fit_ica(raw=data_for_ica, **ica_kwargs)
+            self.final_ica = self._cached_call(
+                "run_ica", fit_ica, serializer="ica", raw=data_for_ica, **ica_kwargs
+            )
 
             # No refit or matrix manipulation needed - MNE handles applying ICA
             # fitted on filtered data to original data seamlessly via ica.apply()
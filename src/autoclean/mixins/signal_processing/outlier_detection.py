@@ -111,8 +111,9 @@ class OutlierDetectionMixin:
             if not epochs.preload:
                 epochs.load_data()
 
-            # Create a copy to work with
-            epochs_clean = epochs.copy()
+            # Drop epochs from the task's own epochs in place, or from a copy
+            initial_epoch_count = len(epochs)
+            epochs_clean = self._copy_unless_in_place(epochs, "detect_outlier_epochs")
 
             # Get the data and reshape to channels x timepoints
             data = epochs.get_data()
@@ -160,7 +161,7 @@ class OutlierDetectionMixin:
 
             # Update metadata
             metadata = {
-                "initial_epoch_count": len(epochs),
+                "initial_epoch_count": initial_epoch_count,
                 "final_epoch_count": len(epochs_clean),
                 "dropped_epoch_count": len(bad_epochs),
                 "threshold": threshold,
@@ -19,6 +19,7 @@ from typing import Dict, Optional, Union
 import mne
 
 from autoclean.functions.epoching import create_regular_epochs as _create_regular_epochs
+from autoclean.utils.copy_tracker import copy_data
 from autoclean.utils.logging import message
 
 
@@ -138,7 +139,7 @@ class RegularEpochsMixin:
             # No additional metadata processing needed here since the standalone function handles it
 
             # Create a copy for dropping if using amplitude thresholds
-            epochs_clean = epochs.copy()
+            epochs_clean = copy_data(epochs, "create_regular_epochs")
 
             # If not using reject_by_annotation, manually track bad annotations
             if not reject_by_annotation:
@@ -6,12 +6,14 @@ This mixin provides functionality for rejecting segments of data based on user-d
 
 import mne
 import numpy as np
-import pandas as pd
-import scipy.stats
 import xarray as xr
-from scipy.spatial import distance_matrix
 
+from autoclean.functions.segment_rejection.segment_rejection import (
+    _epoch_channel_std,
+    _neighbor_correlations,
+)
 from autoclean.utils.logging import message
+from autoclean.utils.montage import get_channel_geometry
 
 
 class SegmentRejectionMixin:
@@ -102,7 +104,7 @@ class SegmentRejectionMixin:
         # Ensure events are within data boundaries
         if events.shape[0] == 0:
             message("error", "No epochs could be created with the given parameters.")
-            return raw.copy()
+            return self._copy_unless_in_place(raw, "annotate_noisy_epochs")
 
         max_event_time = events[-1, 0] + int(epoch_duration * raw.info["sfreq"])
         if max_event_time > len(raw.times):
@@ -113,31 +115,21 @@ class SegmentRejectionMixin:
             events = events[valid_events_mask]
             if events.shape[0] == 0:
                 message("error", "No valid epochs after boundary check.")
-                return raw.copy()
-
-        epochs = mne.Epochs(
-            raw,
-            events,
-            tmin=0.0,
-            tmax=epoch_duration - 1.0 / raw.info["sfreq"],  # tmax is exclusive endpoint
-            picks=picks,
-            preload=True,
-            baseline=None,  # No baseline correction for std calculation
-            reject=None,  # We are detecting bads, not rejecting yet
-        )
-
-        if len(epochs) == 0:
+                return self._copy_unless_in_place(raw, "annotate_noisy_epochs")
+
+        # 2-3. Standard deviation of each channel within each epoch, shape
+        # (channels, epochs). In chunked mode epochs are loaded block by block.
+        block_sec = self._get_chunk_duration()
+        try:
+            data_sd, epoch_events = _epoch_channel_std(
+                raw, events, epoch_duration, picks, block_sec=block_sec
+            )
+        except ValueError:
             message(
                 "error",
                 f"No epochs left after picking channels: {picks}. Cannot proceed.",
             )
-            return raw.copy()
-
-        # 2. Convert epochs to xarray DataArray (channels, epochs, time)
-        epochs_xr = self._epochs_to_xr(epochs)
-
-        # 3. Calculate standard deviation for each channel within each epoch
-        data_sd = epochs_xr.std("time")  # Shape: (channels, epochs)
+            return self._copy_unless_in_place(raw, "annotate_noisy_epochs")
 
         # 4. Detect noisy epochs using the adapted outlier detection logic
         outliers_kwargs_config = {
@@ -155,12 +147,12 @@ class SegmentRejectionMixin:
 
         if len(bad_epoch_indices) == 0:
             message("info", "No noisy epochs found.")
-            return raw.copy()
+            return self._copy_unless_in_place(raw, "annotate_noisy_epochs")
 
         # 5. Add annotations to the original raw object
         # Adapted from pylossless.pipeline.LosslessPipeline.add_pylossless_annotations
         message("debug", "Adding annotations to the original raw object.")
-        relative_onsets = epochs.events[bad_epoch_indices, 0] / raw.info["sfreq"]
+        relative_onsets = epoch_events[bad_epoch_indices, 0] / raw.info["sfreq"]
 
         onsets = relative_onsets - raw.first_samp / raw.info["sfreq"]
 
@@ -180,8 +172,8 @@ class SegmentRejectionMixin:
             orig_time=raw.annotations.orig_time,  # Preserve original time reference
         )
 
-        # Make a copy of the raw object to modify annotations
-        raw_annotated = raw.copy()
+        # Annotate the task's own raw object in place, or a copy of other data
+        raw_annotated = self._copy_unless_in_place(raw, "annotate_noisy_epochs")
         raw_annotated.set_annotations(raw_annotated.annotations + new_annotations)
 
         message(
@@ -286,7 +278,7 @@ class SegmentRejectionMixin:
         )
         if events.shape[0] == 0:
             message("error", "No epochs could be created with the given parameters.")
-            return raw.copy()
+            return self._copy_unless_in_place(raw, "annotate_uncorrelated_epochs")
 
         max_event_time = events[-1, 0] + int(epoch_duration * raw.info["sfreq"])
         if max_event_time > len(raw.times):
@@ -296,7 +288,7 @@ class SegmentRejectionMixin:
             events = events[valid_events_mask]
             if events.shape[0] == 0:
                 message("error", "No valid epochs after boundary check.")
-                return raw.copy()
+                return self._copy_unless_in_place(raw, "annotate_uncorrelated_epochs")
 
         epochs = mne.Epochs(
             raw,
@@ -314,7 +306,7 @@ class SegmentRejectionMixin:
                 "error",
                 f"No epochs left after picking channels: {picks}. Cannot proceed.",
             )
-            return raw.copy()
+            return self._copy_unless_in_place(raw, "annotate_uncorrelated_epochs")
 
         if epochs.get_montage() is None:
             raise ValueError(
@@ -344,7 +336,7 @@ class SegmentRejectionMixin:
 
         if len(bad_epoch_indices) == 0:
             message("info", "No uncorrelated epochs found.")
-            return raw.copy()
+            return self._copy_unless_in_place(raw, "annotate_uncorrelated_epochs")
 
         # 4. Add annotations to the original raw object
         # Correctly calculate onsets relative to raw.annotations.orig_time
@@ -364,7 +356,7 @@ class SegmentRejectionMixin:
             orig_time=raw.annotations.orig_time,
         )
 
-        raw_annotated = raw.copy()
+        raw_annotated = self._copy_unless_in_place(raw, "annotate_uncorrelated_epochs")
         raw_annotated.set_annotations(raw_annotated.annotations + new_annotations)
 
         message(
@@ -384,13 +376,13 @@ class SegmentRejectionMixin:
 
         return raw_annotated
 
-    def _epochs_to_xr(self, epochs):
+    def _epochs_to_xr(self, epochs, picks=None):
         """
         Create an Xarray DataArray from an instance of mne.Epochs.
         Adapted from pylossless.pipeline.epochs_to_xr.
         """
-        data = epochs.get_data()  # n_epochs, n_channels, n_times
-        ch_names = epochs.ch_names
+        data = epochs.get_data(picks=picks)  # n_epochs, n_channels, n_times
+        ch_names = list(picks) if picks is not None else epochs.ch_names
         # Transpose to (n_channels, n_epochs, n_times) for consistency with pylossless internal processing
         data_transposed = data.transpose(1, 0, 2)
         return xr.DataArray(
@@ -547,123 +539,17 @@ class SegmentRejectionMixin:
         else:
             actual_n_neighbors = n_nearest_neighbors
 
-        ch_locs_df = pd.DataFrame(ch_positions).T.loc[valid_chs]
-
-        dist_matrix_val = distance_matrix(ch_locs_df.values, ch_locs_df.values)
-        chan_dist_df = pd.DataFrame(
-            dist_matrix_val, columns=ch_locs_df.index, index=ch_locs_df.index
-        )
-
-        rank = chan_dist_df.rank(axis="columns", method="first", ascending=True) - 1
-        rank[rank == 0] = np.nan
-
-        nearest_neighbor_df = pd.DataFrame(
-            index=ch_locs_df.index, columns=range(actual_n_neighbors), dtype=object
-        )
-        for ch_name_iter in ch_locs_df.index:
-            sorted_neighbors = rank.loc[ch_name_iter].dropna().sort_values()
-            nearest_neighbor_df.loc[ch_name_iter] = sorted_neighbors.index[
-                :actual_n_neighbors
-            ].values
-
-        # Pick only valid channels for epochs_xr to avoid issues if some channels in epochs had no positions
-        epochs_xr = self._epochs_to_xr(epochs.copy().pick(valid_chs))
-
-        all_channel_corrs = []
+        geometry = get_channel_geometry(valid_chs, ch_positions)
+        neighbors = geometry.neighbors(actual_n_neighbors)
 
         print(
             f"Calculating neighbor correlations for {len(valid_chs)} channels using {actual_n_neighbors} nearest neighbors..."
         )
-        for _, ch_name in enumerate(valid_chs):  # ch_name is the reference channel
-            neighbor_names_for_ch = [
-                n
-                for n in nearest_neighbor_df.loc[ch_name].values.tolist()
-                if pd.notna(n) and n != ch_name
-            ]
-
-            if not neighbor_names_for_ch:
-                # Handle case with no valid neighbors (e.g. only 1 channel, or actual_n_neighbors is 0)
-                ch_neighbor_corr_aggregated = xr.DataArray(
-                    np.full(
-                        epochs_xr.sizes["epoch"], np.nan
-                    ),  # NaN correlation if no neighbors
-                    coords={"epoch": epochs_xr.coords["epoch"]},
-                    dims=["epoch"],
-                )
-            else:
-                # Data for the current reference channel
-                this_ch_data = epochs_xr.sel(
-                    ch=ch_name
-                )  # xr.DataArray with dims (epoch, time)
-
-                # Data for its neighbors
-                # neighbor_chs_data will have dims (ch, epoch, time) where 'ch' are the neighbor channels
-                neighbor_chs_data = epochs_xr.sel(ch=neighbor_names_for_ch)
-
-                # Calculate Pearson correlation along the 'time' dimension.
-                # this_ch_data (epoch, time) is broadcast against neighbor_chs_data (ch_neighbor, epoch, time).
-                # The result ch_to_neighbors_corr will have dims ('ch', 'epoch'),
-                # where 'ch' dimension contains coordinates from neighbor_names_for_ch.
-                ch_to_neighbors_corr = xr.corr(
-                    this_ch_data, neighbor_chs_data, dim="time"
-                )
-
-                # Aggregate correlations based on corr_method, reducing the 'ch' (neighbor) dimension
-                if corr_method == "max":
-                    ch_neighbor_corr_aggregated = np.abs(ch_to_neighbors_corr).max(
-                        dim="ch"
-                    )
-                elif corr_method == "mean":
-                    ch_neighbor_corr_aggregated = np.abs(ch_to_neighbors_corr).mean(
-                        dim="ch"
-                    )
-                elif corr_method == "trimmean":
-                    proportion_to_cut = corr_trim_percent / 100.0
-                    # np_data should be (epoch, ch_neighbors) for scipy.stats.trim_mean
-                    # Transpose ch_to_neighbors_corr (dims: ch, epoch) to (epoch, ch) for trim_mean input
-                    np_data = np.abs(ch_to_neighbors_corr).transpose("epoch", "ch").data
-
-                    trimmed_means_per_epoch = [
-                        (
-                            scipy.stats.trim_mean(
-                                epoch_data_for_trim, proportiontocut=proportion_to_cut
-                            )
-                            if not np.all(np.isnan(epoch_data_for_trim))
-                            and len(epoch_data_for_trim)
-                            > 0  # Check for non-empty and non-all-NaN
-                            else np.nan
-                        )
-                        for epoch_data_for_trim in np_data
-                    ]
-                    ch_neighbor_corr_aggregated = xr.DataArray(
-                        trimmed_means_per_epoch,
-                        coords={
-                            "epoch": ch_to_neighbors_corr.coords["epoch"]
-                        },  # Use original epoch coords
-                        dims=["epoch"],
-                    )
-                else:
-                    raise ValueError(f"Unknown corr_method: {corr_method}")
-
-            # At this point, ch_neighbor_corr_aggregated has only the 'epoch' dimension.
-            # Now, expand it to add the reference channel's name as a new 'ch' dimension.
-            expanded_corr = ch_neighbor_corr_aggregated.expand_dims(
-                dim={"ch": [ch_name]}
-            )
-            all_channel_corrs.append(expanded_corr)
-
-        if not all_channel_corrs:  # Should not happen if valid_chs is not empty
-            print("Warning: No channel correlations were computed.")
-            # Return an empty or appropriate DataArray to avoid errors downstream
-            return xr.DataArray(
-                np.empty((0, epochs_xr.sizes.get("epoch", 0))),  # (channels, epochs)
-                coords={"ch": [], "epoch": epochs_xr.coords.get("epoch", [])},
-                dims=("ch", "epoch"),
-            )
-
-        # Concatenate results for all reference channels along the new 'ch' dimension
-        concatenated_corrs = xr.concat(all_channel_corrs, dim="ch")
-        # The 'epoch' dimension name should be correct from ch_neighbor_corr_aggregated.
-        # No rename like 'epoch_dim_temp' should be needed if handled carefully above.
-
-        return concatenated_corrs  # Shape: (ch_reference, epochs)
+        # Read only valid channels, as some channels in epochs may have no positions
+        data = epochs.get_data(picks=valid_chs)  # n_epochs, n_channels, n_times
+        corrs = _neighbor_correlations(data, neighbors, corr_method, corr_trim_percent)
+        return xr.DataArray(
+            corrs,
+            coords={"ch": valid_chs, "epoch": np.arange(data.shape[0])},
+            dims=("ch", "epoch"),
+        )  # Shape: (ch_reference, epochs)
@@ -61,19 +61,21 @@ class SourceLocalizationMixin:
                 "`uv pip install autoclean-eeg2source`."
             ) from _IMPORT_ERR
 
-        # 1. Save the *input* we are about to localise
+        # 1. Save the *input* we are about to localise (the processor reads .set)
         stage_name = "pre_source_loc"
         if use_epochs and getattr(self, "epochs", None) is not None:
             input_path = save_epochs_to_set(
                 epochs=self.epochs,
                 autoclean_dict=self.config,
                 stage=stage_name,
+                fmt="eeglab",
             )
         elif getattr(self, "raw", None) is not None:
             input_path = save_raw_to_set(
                 raw=self.raw,
                 autoclean_dict=self.config,
                 stage=stage_name,
+                fmt="eeglab",
             )
         else:
             raise RuntimeError("No epochs or raw data available.")
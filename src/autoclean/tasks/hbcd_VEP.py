@@ -122,12 +122,10 @@ class HBCD_VEP(Task):  # pylint: disable=invalid-name
         # Import and save raw EEG data
         self.import_raw()
 
-        # Continue with other preprocessing steps
+        # Continue with other preprocessing steps, which also store a copy of
+        # the pre-cleaned raw data for comparison in reports
         self.run_basic_steps()
 
-        # Store a copy of the pre-cleaned raw data for comparison in reports
-        self.original_raw = self.raw.copy()
-
         # Create BIDS-compliant paths and filenames
         self.raw, self.config = step_create_bids_path(self.raw, self.config)
 
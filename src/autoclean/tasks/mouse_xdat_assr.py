@@ -152,10 +152,9 @@ class MouseXdatAssr(Task):
         if self.raw is None:
             raise RuntimeError("No data has been imported")
 
+        # Also stores the pre-cleaned raw data as self.original_raw
         self.run_basic_steps()
 
-        self.original_raw = self.raw.copy()
-
         self.raw, self.config = step_create_bids_path(self.raw, self.config)
 
         self.raw = self.step_clean_bad_channels_by_correlation(self.raw, self.config)
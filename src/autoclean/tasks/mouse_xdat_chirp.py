@@ -14,6 +14,7 @@ from autoclean.core.task import Task
 from autoclean.io.export import save_raw_to_set
 from autoclean.io.import_ import import_eeg
 from autoclean.step_functions.continuous import step_create_bids_path
+from autoclean.utils.copy_tracker import copy_data
 from autoclean.utils.database import manage_database_conditionally
 from autoclean.utils.logging import message
 
@@ -85,7 +86,7 @@ class MouseXdatChirp(Task):
 
         self.basic_steps()
 
-        self.original_raw = self.raw.copy()
+        self.original_raw = copy_data(self.raw, "original_raw")
 
         self.raw, self.config = step_create_bids_path(self.raw, self.config)
 
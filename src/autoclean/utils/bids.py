@@ -64,7 +64,8 @@ def step_convert_to_bids(
     study_name : str
         The name of the study for dataset_description.json.
     autoclean_dict : dict
-        The run configuration, MUST include 'participants_tsv_lock' (a threading.Lock) for concurrent safety.
+        The run configuration, MUST include 'participants_tsv_lock' (a threading or
+        multiprocessing Lock) for concurrent safety.
 
     Returns
     -------
@@ -80,11 +81,12 @@ def step_convert_to_bids(
     lock_valid = False
     if autoclean_dict and "participants_tsv_lock" in autoclean_dict:
         retrieved_lock = autoclean_dict["participants_tsv_lock"]
-        # Validate the lock object based on expected methods and type name ('lock').
+        # Validate the lock object based on expected methods and type name
+        # ('lock' for threading, 'Lock' for multiprocessing in process-pool mode).
         if (
             hasattr(retrieved_lock, "acquire")
             and hasattr(retrieved_lock, "release")
-            and retrieved_lock.__class__.__name__ == "lock"
+            and retrieved_lock.__class__.__name__ in ("lock", "Lock")
         ):
             lock = retrieved_lock
             lock_valid = True
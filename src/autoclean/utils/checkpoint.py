@@ -0,0 +1,368 @@
+"""Stage checkpoints for restarting interrupted task runs.
+
+Raw stage files written by ``save_raw_to_set`` double as restart points. Each
+top-level mixin step a task runs extends a hash chain that starts from the
+input file and task hashes and covers the step name and its arguments. When a
+step leaves the task's raw data in a freshly written stage file, the chain
+position, the stage file and the small amount of task state that is not in
+the file (bad channels, flags, the fitted ICA) are recorded in the
+``stage_checkpoints`` table.
+
+A later run of the same input and task follows the recorded chain: every
+step up to the latest valid checkpoint is skipped and the task state is
+restored from the checkpoints along the way, so the run continues where the
+previous attempt stopped.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import mne
+import pandas as pd
+
+from autoclean.utils.database import get_run_record, manage_database_conditionally
+from autoclean.utils.logging import message
+from autoclean.utils.stage_writer import submit_stage_write
+
+# Last raw stage file written per run: (sequence number, path, weakref to raw)
+_LAST_RAW_STAGE: Dict[str, tuple] = {}
+_LAST_RAW_STAGE_LOCK = threading.Lock()
+
+
+class CheckpointMismatch(Exception):
+    """Raised when a restarted run diverges from the checkpointed run."""
+
+
+def record_raw_stage(run_id: str, raw: mne.io.BaseRaw, stage_path: Path) -> None:
+    """Note the stage file that now holds a run's raw data.
+
+    Parameters
+    ----------
+    run_id : str
+        The run that saved the stage file.
+    raw : mne.io.BaseRaw
+        The data that was written.
+    stage_path : Path
+        Path of the written .set file.
+    """
+    with _LAST_RAW_STAGE_LOCK:
+        sequence = _LAST_RAW_STAGE.get(run_id, (0,))[0] + 1
+        _LAST_RAW_STAGE[run_id] = (sequence, str(stage_path), weakref.ref(raw))
+
+
+def get_step_names(task_class: type) -> List[str]:
+    """Get the checkpointable steps of a task class.
+
+    Parameters
+    ----------
+    task_class : type
+        A Task subclass.
+
+    Returns
+    -------
+    list of str
+        Public methods contributed by the signal processing mixins.
+    """
+    names = set()
+    for cls in task_class.__mro__:
+        if cls.__module__.startswith("autoclean.mixins.signal_processing"):
+            names.update(
+                name
+                for name, member in vars(cls).items()
+                if not name.startswith("_") and inspect.isfunction(member)
+            )
+    return sorted(names)
+
+
+def _describe(value: Any) -> Any:
+    """Reduce a step argument to a stable, JSON-serializable description."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_describe(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _describe(item) for key, item in value.items()}
+    # Data objects and other instances only contribute their type
+    return type(value).__name__
+
+
+def _file_signature(path: Path) -> List[int]:
+    """Size and modification time of a file."""
+    stat = Path(path).stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class StageCheckpoints:
+    """Record and replay stage checkpoints for one task run.
+
+    Parameters
+    ----------
+    task : Task
+        The task instance being run. Its checkpointable steps are wrapped.
+    input_hash : str
+        Fingerprint of the input file (see ``hash_input_file``).
+    task_hash : str
+        Hash of the task and its settings.
+    """
+
+    def __init__(self, task, input_hash: str, task_hash: str):
+        self.task = task
+        self.run_id = str(task.config["run_id"])
+        self.input_hash = input_hash
+        self.task_hash = task_hash
+        self.enabled = True
+
+        self._chain: List[str] = []
+        self._depth = 0
+        self._consistent = True
+        self._copied_runs = {self.run_id}
+
+        checkpoints = manage_database_conditionally(
+            operation="get_checkpoints",
+            run_record={"input_hash": input_hash, "task_hash": task_hash},
+        )
+        self._candidates = [row for row in checkpoints or [] if self._is_valid(row)]
+        self._by_chain = {row["chain_hash"]: row for row in self._candidates}
+        self._replaying = bool(self._candidates)
+        if self._replaying:
+            latest = self._candidates[-1]
+            message(
+                "info",
+                f"Found checkpoint after step {latest['step_index'] + 1} "
+                f"({latest['step']}), earlier steps will be skipped",
+            )
+
+        for name in get_step_names(type(task)):
+            setattr(task, name, self._wrap(name, getattr(task, name)))
+
+    def disable(self) -> None:
+        """Stop skipping and recording steps for the rest of the run."""
+        self.enabled = False
+        self._replaying = False
+
+    def _wrap(self, name: str, method):
+        """Wrap a step so top-level calls are chained, skipped or recorded."""
+
+        @functools.wraps(method)
+        def step(*args, **kwargs):
+            # Steps called from inside another step belong to the outer step
+            if not self.enabled or self._depth:
+                return method(*args, **kwargs)
+
+            chain_hash = self._next_chain_hash(name, args, kwargs)
+            if self._skip(chain_hash):
+                self._chain.append(chain_hash)
+                return None
+
+            with _LAST_RAW_STAGE_LOCK:
+                before = _LAST_RAW_STAGE.get(self.run_id, (0,))[0]
+            self._depth += 1
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                self._depth -= 1
+            self._chain.append(chain_hash)
+            self._record(name, chain_hash, before)
+            return result
+
+        return step
+
+    def _next_chain_hash(self, name: str, args: tuple, kwargs: dict) -> str:
+        """Hash of the chain extended by one step call."""
+        previous = (
+            self._chain[-1] if self._chain else f"{self.input_hash}|{self.task_hash}"
+        )
+        call = json.dumps(
+            [name, _describe(args), _describe(kwargs)], sort_keys=True, default=str
+        )
+        return hashlib.sha256(f"{previous}|{call}".encode()).hexdigest()
+
+    def _skip(self, chain_hash: str) -> bool:
+        """Decide whether a step is covered by a checkpoint, restoring if so."""
+        if not self._replaying:
+            return False
+
+        index = len(self._chain)
+        self._candidates = [
+            row
+            for row in self._candidates
+            if len(row["chain"]) > index and row["chain"][index] == chain_hash
+        ]
+        if not self._candidates:
+            self._replaying = False
+            if not self._consistent:
+                # Steps were skipped whose effect has not been restored yet
+                raise CheckpointMismatch(
+                    f"Step {index + 1} differs from the checkpointed run"
+                )
+            return False
+
+        row = self._by_chain.get(chain_hash)
+        if row is not None:
+            self._restore(row)
+        self._consistent = row is not None
+        if all(candidate["step_index"] == index for candidate in self._candidates):
+            self._replaying = False
+        return True
+
+    def _is_valid(self, row: Dict[str, Any]) -> bool:
+        """Check that a checkpoint's files still exist unchanged."""
+        state = row.get("state", {})
+        try:
+            if _file_signature(row["stage_file"]) != state.get("stage_file_signature"):
+                return False
+        except OSError:
+            return False
+        return all(
+            Path(state[key]).exists()
+            for key in ("ica_file", "ica_flags_file")
+            if state.get(key)
+        )
+
+    def _record(self, step: str, chain_hash: str, before: int) -> None:
+        """Record a checkpoint if the step left raw data in a new stage file."""
+        task = self.task
+        with _LAST_RAW_STAGE_LOCK:
+            sequence, stage_file, raw_ref = _LAST_RAW_STAGE.get(
+                self.run_id, (0, None, None)
+            )
+        if sequence == before or task.raw is None or raw_ref() is not task.raw:
+            return
+        if getattr(task, "epochs", None) is not None:
+            return  # Only continuous-data stages are restored
+
+        try:
+            state_dir = Path(task.config["stage_dir"]) / "checkpoints" / chain_hash[:16]
+            state_dir.mkdir(parents=True, exist_ok=True)
+            state = {
+                "stage_file_signature": None,
+                "bads": list(task.raw.info["bads"]),
+                "channel_types": dict(
+                    zip(task.raw.ch_names, task.raw.get_channel_types())
+                ),
+                "flagged": task.flagged,
+                "flagged_reasons": list(task.flagged_reasons),
+                "ica_file": None,
+                "ica_flags_file": None,
+            }
+            if getattr(task, "final_ica", None) is not None:
+                state["ica_file"] = str(state_dir / "checkpoint-ica.fif")
+                task.final_ica.save(state["ica_file"], overwrite=True, verbose=False)
+            if getattr(task, "ica_flags", None) is not None:
+                state["ica_flags_file"] = str(state_dir / "ica_flags.pkl")
+                pd.to_pickle(task.ica_flags, state["ica_flags_file"])
+        except Exception as e:  # pylint: disable=broad-except
+            message("warning", f"Could not record checkpoint after {step}: {e}")
+            return
+
+        checkpoint = {
+            "chain_hash": chain_hash,
+            "input_hash": self.input_hash,
+            "task_hash": self.task_hash,
+            "step_index": len(self._chain) - 1,
+            "step": step,
+            "chain": list(self._chain),
+            "run_id": self.run_id,
+            "stage_file": stage_file,
+            "state": state,
+        }
+
+        def store() -> None:
+            try:
+                state["stage_file_signature"] = _file_signature(stage_file)
+                manage_database_conditionally(
+                    operation="store_checkpoint", run_record=checkpoint
+                )
+                message("debug", f"Checkpoint recorded after {step}")
+            except Exception as e:  # pylint: disable=broad-except
+                message("warning", f"Could not record checkpoint after {step}: {e}")
+
+        # The stage file may still be queued for writing, store the
+        # checkpoint once it is on disk
+        if not submit_stage_write(self.run_id, store, f"checkpoint after {step}"):
+            store()
+
+    def _restore(self, row: Dict[str, Any]) -> None:
+        """Load a checkpoint into the task."""
+        task = self.task
+        state = row["state"]
+
+        # Imported here, autoclean.io records stages through this module
+        from autoclean.io.import_ import (  # pylint: disable=import-outside-toplevel
+            read_stage_file,
+        )
+
+        raw = read_stage_file(row["stage_file"])
+        raw.info["bads"] = [ch for ch in state.get("bads", []) if ch in raw.ch_names]
+        current_types = dict(zip(raw.ch_names, raw.get_channel_types()))
+        changed_types = {
+            ch: ch_type
+            for ch, ch_type in state.get("channel_types", {}).items()
+            if ch in current_types and current_types[ch] != ch_type
+        }
+        if changed_types:
+            raw.set_channel_types(changed_types, verbose=False)
+        raw.info["description"] = self.run_id
+
+        # run_basic_steps keeps the imported data for reports
+        if getattr(task, "original_raw", None) is None and task.raw is not None:
+            task.original_raw = task.raw
+        task.raw = raw
+        task.flagged = state.get("flagged", task.flagged)
+        task.flagged_reasons = list(state.get("flagged_reasons", task.flagged_reasons))
+        if state.get("ica_file"):
+            task.final_ica = mne.preprocessing.read_ica(
+                state["ica_file"], verbose=False
+            )
+        if state.get("ica_flags_file"):
+            task.ica_flags = pd.read_pickle(state["ica_flags_file"])
+
+        self._copy_metadata(row)
+        message(
+            "success",
+            f"✓ Restored checkpoint after {row['step']} from {Path(row['stage_file']).name}",
+        )
+
+    def _copy_metadata(self, row: Dict[str, Any]) -> None:
+        """Copy step metadata of the checkpointed run into this run."""
+        source_run_id = row["run_id"]
+        metadata: Dict[str, Any] = {
+            "stage_checkpoint": {
+                "source_run_id": source_run_id,
+                "step": row["step"],
+                "step_index": row["step_index"],
+                "stage_file": row["stage_file"],
+            }
+        }
+        if source_run_id not in self._copied_runs:
+            self._copied_runs.add(source_run_id)
+            try:
+                source = get_run_record(source_run_id) or {}
+                current = get_run_record(self.run_id) or {}
+                existing = current.get("metadata") or {}
+                for key, value in (source.get("metadata") or {}).items():
+                    if key not in existing:
+                        metadata[key] = value
+            except Exception as e:  # pylint: disable=broad-except
+                message(
+                    "warning", f"Could not copy metadata of run {source_run_id}: {e}"
+                )
+
+        manage_database_conditionally(
+            operation="update",
+            update_record={"run_id": self.run_id, "metadata": metadata},
+        )
+
+
+def reset_raw_stage(run_id: Optional[str]) -> None:
+    """Forget the last stage file written by a run."""
+    with _LAST_RAW_STAGE_LOCK:
+        _LAST_RAW_STAGE.pop(str(run_id), None)
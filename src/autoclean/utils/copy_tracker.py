@@ -0,0 +1,126 @@
+"""Accounting of data copies made while processing a run.
+
+Most processing steps return a modified copy of their input, and on long
+recordings each of these copies costs as much memory and time as the
+recording itself. Steps that copy an MNE object do so through ``copy_data``,
+which records the size of the copied data for the run being processed (see
+``begin_copy_tracking``), so the pipeline can report how many bytes each
+step copied.
+
+The current run is held in a context variable, so functions copying data do
+not need to know which run they belong to, and concurrent runs in separate
+threads or tasks are counted separately.
+"""
+
+import contextvars
+import threading
+from typing import Dict, Optional, TypeVar
+
+_T = TypeVar("_T")
+
+_current_run: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "autoclean_copy_tracking_run", default=None
+)
+
+_copied: Dict[str, Dict[str, int]] = {}
+_copied_lock = threading.Lock()
+
+
+def _data_nbytes(inst) -> int:
+    """Size of the data held in memory by an MNE object, 0 if not loaded."""
+    if not getattr(inst, "preload", True):
+        return 0
+    data = getattr(inst, "_data", None)
+    return int(getattr(data, "nbytes", 0))
+
+
+def begin_copy_tracking(run_id: str) -> None:
+    """Start counting the data copied while processing a run.
+
+    Copies made through ``copy_data`` in the current context (and in threads
+    or tasks started from it) are attributed to the run from now on.
+
+    Parameters
+    ----------
+    run_id : str
+        The run to count copies of.
+    """
+    with _copied_lock:
+        _copied.setdefault(str(run_id), {})
+    _current_run.set(str(run_id))
+
+
+def copied_bytes(run_id: str) -> Dict[str, int]:
+    """Bytes copied so far by each step of a run.
+
+    Parameters
+    ----------
+    run_id : str
+        The run to report.
+
+    Returns
+    -------
+    dict
+        Step name to number of bytes copied, empty if the run is not tracked.
+    """
+    with _copied_lock:
+        return dict(_copied.get(str(run_id), {}))
+
+
+def end_copy_tracking(run_id: str) -> Dict[str, int]:
+    """Stop counting the data copied for a run.
+
+    Parameters
+    ----------
+    run_id : str
+        The run to stop tracking.
+
+    Returns
+    -------
+    dict
+        Step name to number of bytes copied during the run.
+    """
+    with _copied_lock:
+        counts = _copied.pop(str(run_id), {})
+    if _current_run.get() == str(run_id):
+        _current_run.set(None)
+    return counts
+
+
+def record_copy(step: str, nbytes: int) -> None:
+    """Record bytes copied outside of ``copy_data`` for the current run.
+
+    Parameters
+    ----------
+    step : str
+        Name of the step the copy is attributed to.
+    nbytes : int
+        Number of bytes copied.
+    """
+    run_id = _current_run.get()
+    if run_id is None:
+        return
+    with _copied_lock:
+        counts = _copied.get(run_id)
+        if counts is not None:
+            counts[step] = counts.get(step, 0) + int(nbytes)
+
+
+def copy_data(inst: _T, step: str) -> _T:
+    """Copy an MNE object and record the copied bytes for the current run.
+
+    Parameters
+    ----------
+    inst : mne.io.BaseRaw | mne.BaseEpochs | mne.Evoked
+        The object to copy.
+    step : str
+        Name of the step the copy is attributed to.
+
+    Returns
+    -------
+    copy : same type as ``inst``
+        ``inst.copy()``.
+    """
+    if _current_run.get() is not None:
+        record_copy(step, _data_nbytes(inst))
+    return inst.copy()
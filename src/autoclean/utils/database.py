@@ -1,7 +1,9 @@
 # src/autoclean/utils/database.py
 """Database utilities for the autoclean package using SQLite."""
 
+import contextlib
 import json
+import os
 import sqlite3
 import threading
 from datetime import datetime
@@ -47,9 +49,30 @@ except ImportError:
         pass
 
 
-# Global lock for thread safety
+# Global lock serializing writes from threads of this process. Reads do not
+# take it; WAL mode lets them run alongside a writer.
 _db_lock = threading.Lock()
 
+# Per-thread cache of open connections, keyed by database path
+_local = threading.local()
+
+# Operations that only read and therefore never take _db_lock
+_READ_OPERATIONS = {
+    "get_collection",
+    "get_record",
+    "find_completed_run",
+    "get_checkpoints",
+    "get_authenticated_user",
+    "get_electronic_signatures",
+}
+
+# Seconds to wait for another process holding the write lock
+_BUSY_TIMEOUT = 30.0
+
+# Write-behind buffers of pending (operation, update_record) per run_id
+_write_buffers: Dict[str, list] = {}
+_buffer_lock = threading.Lock()
+
 # Global database path
 DB_PATH = None
 
@@ -112,6 +135,9 @@ def _serialize_for_json(obj: Any) -> Any:
 def get_run_record(run_id: str) -> dict:
     """Get a run record from the database by run ID.
 
+    Any writes still buffered for the run are flushed first, so the record
+    always reflects every update made so far.
+
     Parameters
     ----------
     run_id : str
@@ -122,10 +148,107 @@ def get_run_record(run_id: str) -> dict:
     run_record : dict
         The run record if found, None if not found
     """
+    flush_buffered_writes(run_id)
     run_record = manage_database(operation="get_record", run_record={"run_id": run_id})
     return run_record
 
 
+def begin_buffered_writes(run_id: str) -> None:
+    """Start buffering metadata and status updates for a run.
+
+    While buffering is active, ``update`` and ``update_status`` operations for
+    the run made through ``manage_database_conditionally`` are queued in memory
+    instead of being written immediately. The queue is written in a single
+    transaction when a stage completes (any ``update_status``), when the run
+    record is read with ``get_run_record``, or when ``flush_buffered_writes``
+    or ``end_buffered_writes`` is called.
+
+    Parameters
+    ----------
+    run_id : str
+        The run whose writes should be buffered.
+    """
+    with _buffer_lock:
+        _write_buffers.setdefault(str(run_id), [])
+
+
+def flush_buffered_writes(run_id: str) -> None:
+    """Write all buffered updates for a run in one transaction.
+
+    Does nothing if the run is not buffering or has nothing queued. In
+    compliance mode the batch goes through the audit-protected path, so it is
+    recorded in the access log hash chain like any other write.
+
+    Parameters
+    ----------
+    run_id : str
+        The run whose buffered writes should be flushed.
+    """
+    with _buffer_lock:
+        updates = _write_buffers.get(str(run_id))
+        if not updates:
+            return
+        _write_buffers[str(run_id)] = []
+
+    batch = {"run_id": str(run_id), "updates": updates}
+    if is_compliance_mode_enabled():
+        manage_database_with_audit_protection("apply_batch", update_record=batch)
+    else:
+        manage_database("apply_batch", update_record=batch)
+
+
+def end_buffered_writes(run_id: str) -> None:
+    """Flush any buffered updates for a run and stop buffering it.
+
+    Parameters
+    ----------
+    run_id : str
+        The run to stop buffering.
+    """
+    try:
+        flush_buffered_writes(run_id)
+    finally:
+        with _buffer_lock:
+            _write_buffers.pop(str(run_id), None)
+
+
+def _buffer_write(operation: str, update_record: Optional[Dict[str, Any]]) -> bool:
+    """Queue an update for a buffering run.
+
+    Parameters
+    ----------
+    operation : str
+        The database operation being requested.
+    update_record : dict, optional
+        The record updates.
+
+    Returns
+    -------
+    bool
+        True if the update was queued, False if it must be written directly.
+    """
+    if operation not in ("update", "update_status") or not update_record:
+        return False
+
+    run_id = str(update_record.get("run_id"))
+    with _buffer_lock:
+        if run_id not in _write_buffers:
+            return False
+        record = dict(update_record)
+        if operation == "update_status":
+            # Keep the time the stage actually completed, not the flush time
+            record.setdefault("timestamp", datetime.now().isoformat())
+        else:
+            # Snapshot metadata so later mutation by the caller is not written
+            record = _serialize_for_json(record)
+        _write_buffers[run_id].append((operation, record))
+
+    # A completed stage is a checkpoint, persist everything up to it
+    if operation == "update_status":
+        flush_buffered_writes(run_id)
+    return True
+
+
 def manage_database_conditionally(
     operation: str,
     run_record: Optional[Dict[str, Any]] = None,
@@ -149,8 +272,13 @@ def manage_database_conditionally(
     Returns
     -------
     Any
-        Operation result from underlying database function
+        Operation result from underlying database function. Updates queued
+        for a run that is buffering writes (see ``begin_buffered_writes``)
+        return None.
     """
+    if _buffer_write(operation, update_record):
+        return None
+
     if is_compliance_mode_enabled():
         return manage_database_with_audit_protection(
             operation, run_record, update_record
@@ -249,8 +377,80 @@ def _validate_metadata(metadata: dict) -> bool:
     return all(isinstance(k, str) for k in metadata.keys())
 
 
+def _upsert_run_metadata(
+    cursor: sqlite3.Cursor, run_id: str, metadata: Dict[str, Any]
+) -> None:
+    """Write each top-level metadata key as its own run_metadata row.
+
+    Only the fragments being updated are serialized, so the cost of an update
+    does not grow with the amount of metadata already stored for the run.
+
+    Parameters
+    ----------
+    cursor : sqlite3.Cursor
+        Cursor on the open write transaction.
+    run_id : str
+        The run the metadata belongs to.
+    metadata : dict
+        Mapping of step name to that step's metadata.
+    """
+    timestamp = datetime.now().isoformat()
+    cursor.executemany(
+        """
+        INSERT INTO run_metadata (run_id, step, payload, updated_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(run_id, step) DO UPDATE SET
+            payload = excluded.payload,
+            updated_at = excluded.updated_at
+        """,
+        [
+            (run_id, step, json.dumps(_serialize_for_json(payload)), timestamp)
+            for step, payload in metadata.items()
+        ],
+    )
+
+
+def _assemble_metadata(
+    cursor: sqlite3.Cursor, run_id: str, legacy_metadata: Optional[str]
+) -> Dict[str, Any]:
+    """Rebuild the full metadata dictionary of a run.
+
+    Parameters
+    ----------
+    cursor : sqlite3.Cursor
+        Database cursor.
+    run_id : str
+        The run to assemble metadata for.
+    legacy_metadata : str or None
+        The ``pipeline_runs.metadata`` blob, which holds all metadata for runs
+        recorded before run_metadata existed.
+
+    Returns
+    -------
+    dict
+        Metadata keyed by step, in the order the steps were first written.
+    """
+    metadata = json.loads(legacy_metadata or "{}")
+    try:
+        cursor.execute(
+            "SELECT step, payload FROM run_metadata WHERE run_id = ? ORDER BY rowid",
+            (run_id,),
+        )
+    except sqlite3.OperationalError:
+        # Database predates run_metadata and was never upgraded
+        return metadata
+    for row in cursor.fetchall():
+        metadata[row["step"]] = json.loads(row["payload"])
+    return metadata
+
+
 def _get_db_connection(db_path: Path) -> sqlite3.Connection:
-    """Get a database connection with proper configuration.
+    """Get this thread's persistent connection to the database.
+
+    Connections are opened once per thread and database path and reused for
+    every subsequent call. New connections are switched to WAL journaling
+    with ``synchronous=NORMAL`` so that readers never block the writer, and
+    keep a statement cache so repeated queries are only prepared once.
 
     Parameters
     ----------
@@ -262,11 +462,138 @@ def _get_db_connection(db_path: Path) -> sqlite3.Connection:
     sqlite3.Connection
         Configured database connection.
     """
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row  # Enable row factory for dict-like access
+    connections = getattr(_local, "connections", None)
+    # Connections must not cross a fork, start over in a child process
+    if connections is None or getattr(_local, "pid", None) != os.getpid():
+        connections = _local.connections = {}
+        _local.pid = os.getpid()
+
+    key = str(db_path)
+    conn = connections.get(key)
+    if conn is None:
+        conn = sqlite3.connect(key, timeout=_BUSY_TIMEOUT, cached_statements=256)
+        conn.row_factory = sqlite3.Row  # Enable row factory for dict-like access
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        connections[key] = conn
     return conn
 
 
+def close_database_connections() -> None:
+    """Close the calling thread's cached database connections.
+
+    Useful before deleting or moving an output directory, since an open
+    connection keeps the database (and its WAL files) in use.
+    """
+    connections = getattr(_local, "connections", None)
+    if not connections or getattr(_local, "pid", None) != os.getpid():
+        return
+    for conn in connections.values():
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    connections.clear()
+
+
+def _apply_update(
+    cursor: sqlite3.Cursor, operation: str, update_record: Optional[Dict[str, Any]]
+) -> str:
+    """Apply a single update or update_status operation on an open transaction.
+
+    Parameters
+    ----------
+    cursor : sqlite3.Cursor
+        Cursor on the open write transaction.
+    operation : str
+        Either "update" or "update_status".
+    update_record : dict
+        The record updates, including ``run_id``. For update_status an
+        optional ``timestamp`` records when the status was reached.
+
+    Returns
+    -------
+    str
+        The run ID that was updated.
+    """
+    if not update_record or "run_id" not in update_record:
+        raise ValueError("Missing run_id in update_record")
+
+    run_id = update_record["run_id"]
+
+    # Check if record exists
+    cursor.execute("SELECT 1 FROM pipeline_runs WHERE run_id = ?", (run_id,))
+    existing_record = cursor.fetchone()
+
+    if not existing_record:
+        raise RecordNotFoundError(f"No record found for run_id: {run_id}")
+
+    if operation == "update_status":
+        status_time = update_record.get("timestamp") or datetime.now().isoformat()
+        cursor.execute(
+            """
+            UPDATE pipeline_runs
+            SET status = ?
+            WHERE run_id = ?
+        """,
+            (f"{update_record['status']} at {status_time}", run_id),
+        )
+    else:
+        update_components = []
+        current_update_values = []  # Using a distinct name for clarity
+
+        # Handle metadata update if 'metadata' key exists in update_record.
+        # Written before the other fields so that a completing status
+        # in the same update does not lock out its own json_summary.
+        if "metadata" in update_record:
+            metadata_to_update = update_record["metadata"]
+            if not _validate_metadata(metadata_to_update):
+                raise ValueError("Invalid metadata structure for update")
+
+            # Only the updated steps are serialized and written
+            _upsert_run_metadata(cursor, run_id, metadata_to_update)
+
+        # Handle task_file_info serialization
+        if "task_file_info" in update_record:
+            task_file_info_json = json.dumps(
+                _serialize_for_json(update_record["task_file_info"])
+            )
+            update_components.append("task_file_info = ?")
+            current_update_values.append(task_file_info_json)
+
+        # Handle other fields present in update_record
+        for key, value in update_record.items():
+            if (
+                key == "run_id"
+                or key == "metadata"
+                or key == "task_file_info"
+            ):
+                continue
+
+            update_components.append(f"{key} = ?")
+            if isinstance(value, Path):
+                current_update_values.append(str(value))
+            else:
+                current_update_values.append(value)
+
+        # Only execute the UPDATE SQL statement if there are actual fields to set
+        if update_components:
+            # Add the run_id for the WHERE clause; it's the last parameter for the query
+            current_update_values.append(run_id)
+
+            set_clause_sql = ", ".join(update_components)
+            query = f"UPDATE pipeline_runs SET {set_clause_sql} WHERE run_id = ?"
+
+            cursor.execute(query, tuple(current_update_values))
+        else:
+            message(
+                "debug",
+                f"For 'update' operation on run_id '{run_id}', no non-metadata fields were identified for SET clause. update_record: {update_record}. Metadata might have been updated if processed.",
+            )
+
+    return run_id
+
+
 def manage_database(
     operation: str,
     run_record: Optional[Dict[str, Any]] = None,
@@ -274,6 +601,11 @@ def manage_database(
 ) -> Any:
     """Manage database operations with thread safety.
 
+    Each thread reuses a single WAL-mode connection (see ``_get_db_connection``).
+    Write operations are serialized across threads and take SQLite's write
+    lock up front, so read-modify-write updates stay atomic even with several
+    processes writing to the same database. Read operations take no lock.
+
     Parameters
     ----------
     operation : str
@@ -283,9 +615,20 @@ def manage_database(
         - **store**: Store a new record.
         - **update**: Update an existing record.
         - **update_status**: Update the status of an existing record.
+        - **apply_batch**: Apply a list of buffered update/update_status
+          operations (``update_record["updates"]``) in one transaction.
         - **drop_collection**: Drop the collection.
         - **get_collection**: Get the collection.
         - **get_record**: Get a record from the collection.
+        - **find_completed_run**: Get the run_id of the latest completed run
+          with the given ``input_hash`` and ``task_hash``, or None. The input
+          fingerprint matches a run's ``input_hash`` or its
+          ``input_stat_hash``, so stat fingerprints also find runs that were
+          fingerprinted by content.
+        - **store_checkpoint**: Record a stage checkpoint (see
+          ``autoclean.utils.checkpoint``).
+        - **get_checkpoints**: Get the stage checkpoints recorded for the
+          given ``input_hash`` and ``task_hash``, oldest first.
 
     run_record : dict
         The record to store.
@@ -300,11 +643,22 @@ def manage_database(
     db_path = DB_PATH / "pipeline.db"
     db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with _db_lock:  # Ensure only one thread can access the database at a time
+    if operation in _READ_OPERATIONS:
+        lock = contextlib.nullcontext()
+    else:
+        lock = _db_lock  # Ensure only one thread writes at a time
+
+    with lock:
+        conn = None
         try:
             conn = _get_db_connection(db_path)
             cursor = conn.cursor()
 
+            if operation in ("update", "update_status", "apply_batch", "add_access_log"):
+                # Take the write lock before reading so the read-modify-write
+                # cannot interleave with another process
+                cursor.execute("BEGIN IMMEDIATE")
+
             if operation == "create_collection":
                 # Create table only if it doesn't exist
                 cursor.execute(
@@ -407,6 +761,28 @@ def manage_database(
                     # Column already exists
                     pass
 
+                # Add input/task fingerprint columns for skip-if-done batches
+                for column in ("input_hash", "input_stat_hash", "task_hash"):
+                    try:
+                        cursor.execute(
+                            f"ALTER TABLE pipeline_runs ADD COLUMN {column} TEXT"
+                        )
+                    except sqlite3.OperationalError:
+                        # Column already exists
+                        pass
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_pipeline_runs_fingerprint
+                    ON pipeline_runs (input_hash, task_hash, status)
+                """
+                )
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_pipeline_runs_stat_fingerprint
+                    ON pipeline_runs (input_stat_hash, task_hash, status)
+                """
+                )
+
                 # Add auth0_user_id column to database_access_log for compliance mode
                 try:
                     cursor.execute(
@@ -503,6 +879,102 @@ def manage_database(
                 """
                 )
 
+                # Per-step metadata fragments, so updates only rewrite one step
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS run_metadata (
+                        run_id TEXT NOT NULL,
+                        step TEXT NOT NULL,
+                        payload TEXT,
+                        updated_at TEXT NOT NULL,
+                        PRIMARY KEY (run_id, step),
+                        FOREIGN KEY (run_id) REFERENCES pipeline_runs (run_id)
+                    )
+                """
+                )
+
+                # Metadata of finished runs is locked like the run record itself
+                for event in ("INSERT", "UPDATE"):
+                    cursor.execute(
+                        f"""
+                        CREATE TRIGGER IF NOT EXISTS prevent_completed_metadata_{event.lower()}s
+                        BEFORE {event} ON run_metadata
+                        FOR EACH ROW
+                        WHEN (
+                            (SELECT status FROM pipeline_runs WHERE run_id = NEW.run_id)
+                            IN ('completed', 'failed')
+                        )
+                        BEGIN
+                            SELECT RAISE(ABORT, 
+                                'Cannot modify audit record - run already completed'
+                            );
+                        END
+                    """
+                    )
+
+                    # Metadata writes no longer touch pipeline_runs, so log them here
+                    cursor.execute(
+                        f"""
+                        CREATE TRIGGER IF NOT EXISTS log_metadata_{event.lower()}s
+                        AFTER {event} ON run_metadata
+                        FOR EACH ROW
+                        BEGIN
+                            INSERT INTO update_audit_log (
+                                run_id, 
+                                timestamp, 
+                                old_status, 
+                                new_status,
+                                operation_type,
+                                user_context
+                            ) SELECT
+                                NEW.run_id,
+                                datetime('now'),
+                                status,
+                                status,
+                                'metadata_update',
+                                user_context
+                            FROM pipeline_runs WHERE run_id = NEW.run_id;
+                        END
+                    """
+                    )
+
+                cursor.execute(
+                    """
+                    CREATE TRIGGER IF NOT EXISTS prevent_metadata_deletions
+                    BEFORE DELETE ON run_metadata
+                    BEGIN
+                        SELECT RAISE(ABORT, 
+                            'Audit records cannot be deleted'
+                        );
+                    END
+                """
+                )
+
+                # Stage files a restarted run can resume from
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS stage_checkpoints (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        chain_hash TEXT UNIQUE NOT NULL,
+                        input_hash TEXT NOT NULL,
+                        task_hash TEXT NOT NULL,
+                        step_index INTEGER NOT NULL,
+                        step TEXT NOT NULL,
+                        chain TEXT NOT NULL,
+                        run_id TEXT NOT NULL,
+                        stage_file TEXT NOT NULL,
+                        state TEXT,
+                        created_at TEXT NOT NULL
+                    )
+                """
+                )
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_stage_checkpoints_fingerprint
+                    ON stage_checkpoints (input_hash, task_hash)
+                """
+                )
+
                 conn.commit()
 
                 # Initialize access log with genesis entry if empty
@@ -557,10 +1029,10 @@ def manage_database(
                 if not run_record:
                     raise ValueError("Missing run_record for store operation")
 
-                # Convert metadata to JSON string, handling Path objects
-                metadata_json = json.dumps(
-                    _serialize_for_json(run_record.get("metadata", {}))
-                )
+                # Metadata lives in run_metadata, one row per step
+                initial_metadata = run_record.get("metadata") or {}
+                if not _validate_metadata(initial_metadata):
+                    raise ValueError("Invalid metadata structure for store")
 
                 # Convert user_context to JSON string if present
                 user_context_json = None
@@ -573,8 +1045,9 @@ def manage_database(
                     """
                     INSERT INTO pipeline_runs (
                         run_id, created_at, task, unprocessed_file, status,
-                        success, json_file, report_file, user_context, metadata, task_file_info
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        success, json_file, report_file, user_context, metadata,
+                        task_file_info, input_hash, input_stat_hash, task_hash
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                     (
                         run_record["run_id"],
@@ -598,7 +1071,7 @@ def manage_database(
                             else None
                         ),
                         user_context_json,
-                        metadata_json,
+                        "{}",
                         (
                             json.dumps(
                                 _serialize_for_json(run_record["task_file_info"])
@@ -606,113 +1079,40 @@ def manage_database(
                             if run_record.get("task_file_info")
                             else None
                         ),
+                        run_record.get("input_hash"),
+                        run_record.get("input_stat_hash"),
+                        run_record.get("task_hash"),
                     ),
                 )
-                conn.commit()
                 record_id = cursor.lastrowid
+                if initial_metadata:
+                    _upsert_run_metadata(cursor, run_record["run_id"], initial_metadata)
+                conn.commit()
                 message("info", f"✓ Stored new record with ID: {record_id}")
                 return record_id
 
             elif operation in ["update", "update_status"]:
-                if not update_record or "run_id" not in update_record:
-                    raise ValueError("Missing run_id in update_record")
-
-                run_id = update_record["run_id"]
-
-                # Check if record exists
-                cursor.execute(
-                    "SELECT * FROM pipeline_runs WHERE run_id = ?", (run_id,)
-                )
-                existing_record = cursor.fetchone()
-
-                if not existing_record:
-                    raise RecordNotFoundError(f"No record found for run_id: {run_id}")
-
-                if operation == "update_status":
-                    cursor.execute(
-                        """
-                        UPDATE pipeline_runs
-                        SET status = ?
-                        WHERE run_id = ?
-                    """,
-                        (
-                            f"{update_record['status']} at {datetime.now().isoformat()}",
-                            run_id,
-                        ),
-                    )
-                else:
-                    update_components = []
-                    current_update_values = []  # Using a distinct name for clarity
-
-                    # Handle metadata update if 'metadata' key exists in update_record
-                    if "metadata" in update_record:
-                        metadata_to_update = update_record["metadata"]
-                        if not _validate_metadata(metadata_to_update):
-                            raise ValueError("Invalid metadata structure for update")
-
-                        # Fetch existing metadata
-                        cursor.execute(
-                            "SELECT metadata FROM pipeline_runs WHERE run_id = ?",
-                            (run_id,),
-                        )
-                        row_with_metadata = cursor.fetchone()
-                        existing_metadata_str = (
-                            row_with_metadata["metadata"] if row_with_metadata else "{}"
-                        )
-                        current_metadata = json.loads(existing_metadata_str or "{}")
-
-                        # Serialize the new metadata fragment and merge it
-                        serialized_new_metadata_fragment = _serialize_for_json(
-                            metadata_to_update
-                        )
-                        current_metadata.update(serialized_new_metadata_fragment)
-                        final_metadata_json = json.dumps(current_metadata)
-
-                        update_components.append("metadata = ?")
-                        current_update_values.append(final_metadata_json)
+                run_id = _apply_update(cursor, operation, update_record)
+                conn.commit()
+                message("debug", f"Record {operation} successful for run_id: {run_id}")
 
-                    # Handle task_file_info serialization
-                    if "task_file_info" in update_record:
-                        task_file_info_json = json.dumps(
-                            _serialize_for_json(update_record["task_file_info"])
-                        )
-                        update_components.append("task_file_info = ?")
-                        current_update_values.append(task_file_info_json)
-
-                    # Handle other fields present in update_record
-                    for key, value in update_record.items():
-                        if (
-                            key == "run_id"
-                            or key == "metadata"
-                            or key == "task_file_info"
-                        ):
-                            continue
-
-                        update_components.append(f"{key} = ?")
-                        if isinstance(value, Path):
-                            current_update_values.append(str(value))
-                        else:
-                            current_update_values.append(value)
-
-                    # Only execute the UPDATE SQL statement if there are actual fields to set
-                    if update_components:
-                        # Add the run_id for the WHERE clause; it's the last parameter for the query
-                        current_update_values.append(run_id)
-
-                        set_clause_sql = ", ".join(update_components)
-                        query = f"UPDATE pipeline_runs SET {set_clause_sql} WHERE run_id = ?"
-
-                        cursor.execute(query, tuple(current_update_values))
-                    else:
-                        message(
-                            "debug",
-                            f"For 'update' operation on run_id '{run_id}', no non-metadata fields were identified for SET clause. update_record: {update_record}. Metadata might have been updated if processed.",
-                        )
+            elif operation == "apply_batch":
+                if not update_record or "updates" not in update_record:
+                    raise ValueError("Missing updates in update_record")
 
+                # Replay buffered updates in order inside the one transaction
+                for buffered_operation, buffered_record in update_record["updates"]:
+                    _apply_update(cursor, buffered_operation, buffered_record)
                 conn.commit()
-                message("debug", f"Record {operation} successful for run_id: {run_id}")
+                message(
+                    "debug",
+                    f"Applied {len(update_record['updates'])} buffered updates "
+                    f"for run_id: {update_record.get('run_id')}",
+                )
 
             elif operation == "drop_collection":
+                cursor.execute("DROP TABLE IF EXISTS stage_checkpoints")
+                cursor.execute("DROP TABLE IF EXISTS run_metadata")
                 cursor.execute("DROP TABLE IF EXISTS pipeline_runs")
                 conn.commit()
                 message("warning", f"'pipeline_runs' table dropped from {db_path}")
@@ -720,6 +1120,25 @@ def manage_database(
             elif operation == "get_collection":
                 cursor.execute("SELECT * FROM pipeline_runs")
                 records = [dict(row) for row in cursor.fetchall()]
+
+                # Fold run_metadata rows back into each record's metadata text
+                fragments: Dict[str, Dict[str, Any]] = {}
+                try:
+                    cursor.execute(
+                        "SELECT run_id, step, payload FROM run_metadata ORDER BY rowid"
+                    )
+                    rows = cursor.fetchall()
+                except sqlite3.OperationalError:
+                    rows = []  # Database predates run_metadata
+                for row in rows:
+                    fragments.setdefault(row["run_id"], {})[row["step"]] = (
+                        json.loads(row["payload"])
+                    )
+                for record in records:
+                    if record["run_id"] in fragments:
+                        metadata = json.loads(record.get("metadata") or "{}")
+                        metadata.update(fragments[record["run_id"]])
+                        record["metadata"] = json.dumps(metadata)
                 return records
 
             elif operation == "get_record":
@@ -739,8 +1158,9 @@ def manage_database(
 
                 # Convert record to dict and parse JSON fields
                 record_dict = dict(record)
-                if record_dict.get("metadata"):
-                    record_dict["metadata"] = json.loads(record_dict["metadata"])
+                record_dict["metadata"] = _assemble_metadata(
+                    cursor, record_dict["run_id"], record_dict.get("metadata")
+                )
                 if record_dict.get("user_context"):
                     record_dict["user_context"] = json.loads(
                         record_dict["user_context"]
@@ -751,6 +1171,90 @@ def manage_database(
                     )
                 return record_dict
 
+            elif operation == "find_completed_run":
+                if (
+                    not run_record
+                    or "input_hash" not in run_record
+                    or "task_hash" not in run_record
+                ):
+                    raise ValueError("Missing input_hash or task_hash in run_record")
+
+                cursor.execute(
+                    """
+                    SELECT run_id FROM pipeline_runs
+                    WHERE (input_hash = ? OR input_stat_hash = ?)
+                        AND task_hash = ? AND status = 'completed'
+                    ORDER BY id DESC LIMIT 1
+                    """,
+                    (
+                        run_record["input_hash"],
+                        run_record["input_hash"],
+                        run_record["task_hash"],
+                    ),
+                )
+                row = cursor.fetchone()
+                return row["run_id"] if row else None
+
+            elif operation == "store_checkpoint":
+                required = ("chain_hash", "input_hash", "task_hash", "step_index")
+                if not run_record or any(key not in run_record for key in required):
+                    raise ValueError(
+                        "Missing chain_hash, input_hash, task_hash or step_index "
+                        "in run_record"
+                    )
+
+                # A re-run of the same chain points the checkpoint at the new files
+                cursor.execute(
+                    """
+                    INSERT OR REPLACE INTO stage_checkpoints (
+                        chain_hash, input_hash, task_hash, step_index, step,
+                        chain, run_id, stage_file, state, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        run_record["chain_hash"],
+                        run_record["input_hash"],
+                        run_record["task_hash"],
+                        run_record["step_index"],
+                        run_record["step"],
+                        json.dumps(run_record["chain"]),
+                        run_record["run_id"],
+                        run_record["stage_file"],
+                        json.dumps(_serialize_for_json(run_record.get("state", {}))),
+                        datetime.now().isoformat(),
+                    ),
+                )
+                conn.commit()
+                return cursor.lastrowid
+
+            elif operation == "get_checkpoints":
+                if (
+                    not run_record
+                    or "input_hash" not in run_record
+                    or "task_hash" not in run_record
+                ):
+                    raise ValueError("Missing input_hash or task_hash in run_record")
+
+                try:
+                    cursor.execute(
+                        """
+                        SELECT * FROM stage_checkpoints
+                        WHERE input_hash = ? AND task_hash = ?
+                        ORDER BY step_index, id
+                        """,
+                        (run_record["input_hash"], run_record["task_hash"]),
+                    )
+                except sqlite3.OperationalError:
+                    return []  # Database predates stage_checkpoints
+
+                checkpoints = []
+                for row in cursor.fetchall():
+                    checkpoint = dict(row)
+                    checkpoint["chain"] = json.loads(checkpoint["chain"])
+                    checkpoint["state"] = json.loads(checkpoint["state"] or "{}")
+                    checkpoints.append(checkpoint)
+                return checkpoints
+
             elif operation == "add_access_log":
                 if not run_record:
                     raise ValueError(
@@ -964,9 +1468,9 @@ def manage_database(
 
                 return signatures
 
-            conn.close()
-
         except Exception as e:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
             error_context = {
                 "operation": operation,
                 "timestamp": datetime.now().isoformat(),
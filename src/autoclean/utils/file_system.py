@@ -2,6 +2,7 @@
 """
 This module contains functions for setting up and validating directory structures.
 """
+import hashlib
 import os
 import shutil
 from datetime import datetime
@@ -10,6 +11,16 @@ from autoclean import __version__
 from autoclean.utils.logging import message
 import threading
 
+try:
+    import xxhash
+
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Data files that some formats keep next to the header file (EEGLAB, BrainVision)
+DATA_SIDECAR_SUFFIXES = (".fdt", ".eeg")
+
 # Cache to ensure we only perform a backup once per directory in a single
 # Python process. If the user aborts with Ctrl-C, the process ends and this
 # cache is cleared automatically on the next run.
@@ -18,7 +29,10 @@ _CACHE_LOCK = threading.Lock()
 
 
 def step_prepare_directories(
-    task: str, autoclean_dir_str: Path, dataset_name: str = None
+    task: str,
+    autoclean_dir_str: Path,
+    dataset_name: str = None,
+    backup_existing: bool = True,
 ) -> tuple[Path, Path, Path, Path, Path, Path, Path, Path]:
     """Set up and validate BIDS-compliant directory structure for processing pipeline.
 
@@ -31,6 +45,10 @@ def step_prepare_directories(
     dataset_name : str, optional
         Optional dataset name to use instead of task name for directory structure.
         If provided, creates directories using dataset_name + timestamp format.
+    backup_existing : bool, optional
+        If True (default), an existing task directory is moved to a timestamped
+        backup the first time it is prepared in this process. Resumed batches
+        pass False so outputs of already completed files stay in place.
 
     Returns
     -------
@@ -68,6 +86,7 @@ def step_prepare_directories(
         first_time = task_root not in _PREPARED_TASK_ROOTS
         if first_time:
             _PREPARED_TASK_ROOTS.add(task_root)
+    first_time = first_time and backup_existing
 
     # Perform backup only the first time we encounter this directory in
     # the current process.
@@ -120,3 +139,64 @@ def step_prepare_directories(
         dirs["logs"],
         dirs["final_files"],
     )
+
+
+def get_data_sidecars(file_path: Path) -> list[Path]:
+    """Get the data files stored next to an EEG header file.
+
+    Parameters
+    ----------
+    file_path : Path
+        Path to the EEG file (e.g. an EEGLAB .set or BrainVision .vhdr).
+
+    Returns
+    -------
+    list of Path
+        Existing .fdt/.eeg files sharing the file's stem.
+    """
+    file_path = Path(file_path)
+    return [
+        file_path.with_suffix(suffix)
+        for suffix in DATA_SIDECAR_SUFFIXES
+        if file_path.suffix.lower() != suffix and file_path.with_suffix(suffix).exists()
+    ]
+
+
+def hash_input_file(file_path: Path, content_hash: bool = False) -> str:
+    """Fingerprint an input recording for skip-if-done batch processing.
+
+    Parameters
+    ----------
+    file_path : Path
+        Path to the EEG file. Data sidecars (.fdt/.eeg) are included.
+    content_hash : bool, optional
+        If False (default), fingerprint the resolved path, size and
+        modification time of each file, which costs one stat call. If True,
+        hash the file contents (xxh3-128 when xxhash is installed, BLAKE2b
+        otherwise), which survives moves and copies but reads every byte.
+
+    Returns
+    -------
+    str
+        Fingerprint prefixed with the method used, e.g. ``"stat:..."``.
+        Fingerprints from different methods never compare equal.
+    """
+    file_path = Path(file_path)
+    files = [file_path] + get_data_sidecars(file_path)
+
+    if not content_hash:
+        digest = hashlib.sha256()
+        for path in files:
+            stat = path.stat()
+            digest.update(f"{path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+        return f"stat:{digest.hexdigest()}"
+
+    if XXHASH_AVAILABLE:
+        method, digest = "xxh3", xxhash.xxh3_128()
+    else:
+        method, digest = "blake2b", hashlib.blake2b()
+    for path in files:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return f"{method}:{digest.hexdigest()}"
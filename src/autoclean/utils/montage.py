@@ -1,9 +1,17 @@
 """Utility functions for handling EEG montage mappings and conversions."""
 
+import hashlib
 import os
-from typing import Dict, List
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Union
 
+import numpy as np
 import yaml
+from numpy.polynomial.legendre import legval
+from platformdirs import user_cache_dir
+from scipy import linalg
+from scipy.spatial import distance_matrix
 
 from autoclean.utils.logging import message
 
@@ -236,3 +244,282 @@ def validate_channel_set(
         message("warning", f"Some requested channels not found in data: {missing}")
 
     return valid_channels
+
+
+# Channel geometry computed in this process, keyed like their cache files
+_CHANNEL_GEOMETRY: Dict[str, "ChannelGeometry"] = {}
+
+# Interpolation matrices kept per geometry. Each set of bad channels has its
+# own matrix, so only the most recently used ones are kept.
+_INTERPOLATION_CACHE_SIZE = 32
+
+
+def nearest_neighbors(positions: np.ndarray, n_neighbors: int) -> List[np.ndarray]:
+    """Indices of the nearest neighbors of each channel, closest first.
+
+    Ties are broken by channel order. The closest position to each channel,
+    normally the channel itself, is skipped, and channels without a position
+    (NaN coordinates) have no neighbors and are nobody's neighbor.
+
+    Parameters
+    ----------
+    positions : np.ndarray, shape (n_channels, 3)
+        Channel positions.
+    n_neighbors : int
+        Number of neighbors per channel, at most ``n_channels - 1``.
+
+    Returns
+    -------
+    List[np.ndarray]
+        Neighbor indices of each channel.
+    """
+    n_neighbors = min(n_neighbors, max(len(positions) - 1, 0))
+    dist = distance_matrix(positions, positions)
+    neighbors = []
+    for ch, row in enumerate(dist):
+        ranked = np.flatnonzero(~np.isnan(row))
+        ranked = ranked[np.argsort(row[ranked], kind="stable")][1 : n_neighbors + 1]
+        neighbors.append(ranked[ranked != ch])
+    return neighbors
+
+
+def _digest(*arrays: np.ndarray) -> str:
+    """Short hex digest of the contents of arrays."""
+    digest = hashlib.blake2b(digest_size=8)
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class ChannelGeometry:
+    """Spatial tables of a set of channels, computed once and cached.
+
+    Nearest-neighbor tables, spherical spline matrices and interpolation
+    matrices only depend on the channel positions, which are the same for
+    every recording of a study. Neighbor and spline tables are computed on
+    first use, then kept in memory and saved to the on-disk cache.
+    Interpolation matrices differ for every set of bad channels and are
+    cheap to derive from the spline matrix, so only the
+    ``_INTERPOLATION_CACHE_SIZE`` most recently used ones are kept, in
+    memory. Use ``get_channel_geometry`` rather than creating instances
+    directly.
+
+    Parameters
+    ----------
+    ch_names : Sequence[str]
+        Channel names.
+    positions : np.ndarray, shape (n_channels, 3)
+        Channel positions, in meters.
+    key : str
+        Digest identifying the channels and their positions.
+    cache_file_prefix : Path or None
+        Prefix of the cache files, None to keep tables in memory only.
+    """
+
+    def __init__(
+        self,
+        ch_names: Sequence[str],
+        positions: np.ndarray,
+        key: str,
+        cache_file_prefix: Optional[Path] = None,
+    ):
+        self.ch_names = list(ch_names)
+        self.positions = positions
+        self.key = key
+        self._cache_file_prefix = cache_file_prefix
+        self._tables: Dict[str, np.ndarray] = {}
+        self._interpolation: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def _table(self, name: str, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """Get a table from memory or disk, computing and caching it if missing."""
+        table = self._tables.get(name)
+        if table is not None:
+            return table
+
+        fname = None
+        if self._cache_file_prefix is not None:
+            prefix = self._cache_file_prefix
+            fname = prefix.with_name(f"{prefix.name}-{name}.npy")
+            if fname.exists():
+                try:
+                    table = np.load(fname)
+                except Exception as e:  # pylint: disable=broad-except
+                    message(
+                        "warning", f"Ignoring unreadable geometry table {fname}: {e}"
+                    )
+
+        if table is None:
+            table = compute()
+            if fname is not None:
+                try:
+                    fname.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_fname = fname.with_name(f".{fname.stem}-{os.getpid()}.npy")
+                    np.save(tmp_fname, table)
+                    os.replace(tmp_fname, fname)
+                except OSError as e:
+                    message("warning", f"Could not cache geometry table: {e}")
+
+        table.setflags(write=False)
+        self._tables[name] = table
+        return table
+
+    def neighbors(self, n_neighbors: int) -> List[np.ndarray]:
+        """Nearest neighbors of each channel, as by ``nearest_neighbors``.
+
+        Parameters
+        ----------
+        n_neighbors : int
+            Number of neighbors per channel.
+
+        Returns
+        -------
+        List[np.ndarray]
+            Neighbor indices of each channel.
+        """
+
+        def compute() -> np.ndarray:
+            # Rows padded with -1, channels may have fewer neighbors
+            neighbors = nearest_neighbors(self.positions, n_neighbors)
+            table = np.full((len(neighbors), max(map(len, neighbors), default=0)), -1)
+            for row, nb in zip(table, neighbors):
+                row[: len(nb)] = nb
+            return table
+
+        table = self._table(f"knn{n_neighbors}", compute)
+        return [row[row >= 0] for row in table]
+
+    def spline_matrix(self, origin: Sequence[float]) -> np.ndarray:
+        """Spherical spline G matrix between all channels.
+
+        Positions are projected on the unit sphere around ``origin``, as in
+        MNE's spherical spline interpolation (Perrin et al., 1989).
+
+        Parameters
+        ----------
+        origin : Sequence[float]
+            Center of the sphere, in meters.
+
+        Returns
+        -------
+        np.ndarray, shape (n_channels, n_channels)
+            The G matrix, without regularization.
+        """
+        origin = np.asarray(origin, dtype=float)
+
+        def compute() -> np.ndarray:
+            pos = self.positions - origin
+            pos /= np.linalg.norm(pos, axis=1, keepdims=True)
+            factors = [
+                (2 * n + 1) / (n**4 * (n + 1) ** 4 * 4 * np.pi) for n in range(1, 51)
+            ]
+            return legval(pos @ pos.T, [0] + factors)
+
+        return self._table(f"spline-{_digest(origin)}", compute)
+
+    def interpolation_matrix(
+        self, bad_idx: Sequence[int], origin: Sequence[float], alpha: float = 1e-5
+    ) -> np.ndarray:
+        """Spherical spline interpolation of bad channels from the others.
+
+        Parameters
+        ----------
+        bad_idx : Sequence[int]
+            Indices of the channels to interpolate.
+        origin : Sequence[float]
+            Center of the sphere, in meters.
+        alpha : float, default 1e-5
+            Regularization parameter.
+
+        Returns
+        -------
+        np.ndarray, shape (n_bad, n_good)
+            Matrix mapping the good channels, in channel order, to the bad
+            ones.
+        """
+        bad = np.zeros(len(self.ch_names), dtype=bool)
+        bad[np.asarray(bad_idx, dtype=int)] = True
+        origin = np.asarray(origin, dtype=float)
+
+        def compute() -> np.ndarray:
+            g = self.spline_matrix(origin)
+            g_from = g[~bad][:, ~bad]
+            g_from.flat[:: len(g_from) + 1] += alpha
+            n_from = len(g_from)
+            c = np.block(
+                [
+                    [g_from, np.ones((n_from, 1))],
+                    [np.ones((1, n_from)), np.zeros((1, 1))],
+                ]
+            )
+            g_to_from = np.hstack([g[bad][:, ~bad], np.ones((bad.sum(), 1))])
+            return g_to_from @ linalg.pinv(c)[:, :-1]
+
+        name = _digest(origin, [alpha], np.flatnonzero(bad))
+        table = self._interpolation.get(name)
+        if table is not None:
+            self._interpolation.move_to_end(name)
+            return table
+
+        table = compute()
+        table.setflags(write=False)
+        self._interpolation[name] = table
+        if len(self._interpolation) > _INTERPOLATION_CACHE_SIZE:
+            self._interpolation.popitem(last=False)
+        return table
+
+
+def get_channel_geometry(
+    ch_names: Sequence[str],
+    positions: Union[np.ndarray, Dict[str, np.ndarray]],
+    montage_name: Optional[str] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
+    use_disk_cache: bool = True,
+) -> ChannelGeometry:
+    """Get the cached spatial tables of a set of channels.
+
+    Geometries are keyed by the channel names and positions, so the
+    channels of a montage kept after dropping bad ones share their tables
+    across recordings, and a montage edited in a later recording gets new
+    ones.
+
+    Parameters
+    ----------
+    ch_names : Sequence[str]
+        Channel names.
+    positions : np.ndarray or Dict[str, np.ndarray]
+        Positions of the channels, shape (n_channels, 3), or a mapping from
+        channel name to position like ``montage.get_positions()["ch_pos"]``.
+    montage_name : str or None, default None
+        Montage name, used to name the cache files.
+    cache_dir : str or Path or None, default None
+        Directory of the on-disk cache. Defaults to the user cache directory.
+    use_disk_cache : bool, default True
+        Whether to read and write tables on disk, or only keep them in
+        memory.
+
+    Returns
+    -------
+    ChannelGeometry
+        Spatial tables of the channels.
+    """
+    if isinstance(positions, dict):
+        positions = [positions[ch] for ch in ch_names]
+    positions = np.array(positions, dtype=float).reshape(len(ch_names), 3)
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\0".join(ch_names).encode())
+    digest.update(np.ascontiguousarray(positions).tobytes())
+    key = digest.hexdigest()
+
+    geometry = _CHANNEL_GEOMETRY.get(key)
+    if geometry is not None:
+        return geometry
+
+    prefix = None
+    if use_disk_cache:
+        if cache_dir is None:
+            cache_dir = Path(user_cache_dir("autoclean")) / "montage"
+        prefix = Path(cache_dir) / f"{montage_name or 'montage'}-{key}"
+    geometry = ChannelGeometry(ch_names, positions, key, prefix)
+    _CHANNEL_GEOMETRY[key] = geometry
+    return geometry
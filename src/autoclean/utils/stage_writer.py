@@ -0,0 +1,182 @@
+"""Background writing of stage files.
+
+Writing a stage file blocks processing until the whole recording is on disk,
+which on network filesystems can take as long as the step that produced it.
+While a run has background writes enabled (see ``begin_background_writes``),
+the export functions hand a snapshot of the data to a per-run writer thread
+and return immediately, so the next step runs while the file is written.
+
+Jobs of a run are executed in submission order. Once a job fails, the
+remaining jobs of that run are skipped, and ``wait_for_stage_writes`` raises
+``StageWriteError`` so the failure ends up in the run record.
+"""
+
+import queue
+import threading
+from typing import Callable, Dict, List
+
+from autoclean.utils.logging import message
+
+# Snapshots waiting for the writer, bounding the extra memory held per run
+DEFAULT_MAX_PENDING = 1
+
+_writers: Dict[str, "_StageWriter"] = {}
+_writers_lock = threading.Lock()
+
+
+class StageWriteError(Exception):
+    """Raised when background stage writes of a run failed."""
+
+    def __init__(self, run_id: str, errors: List[str]):
+        self.run_id = run_id
+        self.errors = errors
+        super().__init__(f"Failed to write stage files: {'; '.join(errors)}")
+
+
+class _StageWriter:
+    """Writer thread and job queue of one run."""
+
+    def __init__(self, run_id: str, max_pending: int):
+        self.run_id = run_id
+        self.errors: List[str] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+        self._thread = threading.Thread(
+            target=self._work, name=f"stage-writer-{run_id}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, job: Callable[[], None], description: str) -> None:
+        # Blocks while max_pending jobs are already waiting
+        self._queue.put((job, description))
+
+    def wait(self) -> List[str]:
+        self._queue.join()
+        return list(self.errors)
+
+    def close(self) -> List[str]:
+        errors = self.wait()
+        self._queue.put(None)
+        self._thread.join()
+        return errors
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                job, description = item
+                if self.errors:
+                    message("debug", f"Skipping {description} after a failed write")
+                    continue
+                try:
+                    job()
+                except Exception as e:  # pylint: disable=broad-except
+                    self.errors.append(f"{description}: {e}")
+                    message("error", f"Background write of {description} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+
+def begin_background_writes(
+    run_id: str, max_pending: int = DEFAULT_MAX_PENDING
+) -> None:
+    """Start writing stage files of a run in the background.
+
+    Parameters
+    ----------
+    run_id : str
+        The run whose stage files should be written in the background.
+    max_pending : int, optional
+        Number of submitted jobs that may wait for the writer before
+        ``submit_stage_write`` blocks, by default 1.
+    """
+    with _writers_lock:
+        if str(run_id) not in _writers:
+            _writers[str(run_id)] = _StageWriter(str(run_id), max_pending)
+
+
+def background_writes_active(run_id: str) -> bool:
+    """Check whether a run writes its stage files in the background.
+
+    Parameters
+    ----------
+    run_id : str
+        The run to check.
+
+    Returns
+    -------
+    bool
+        True if ``begin_background_writes`` was called for the run.
+    """
+    with _writers_lock:
+        return str(run_id) in _writers
+
+
+def submit_stage_write(run_id: str, job: Callable[[], None], description: str) -> bool:
+    """Queue a write job for a run.
+
+    Parameters
+    ----------
+    run_id : str
+        The run the job belongs to.
+    job : callable
+        Function performing the write. It must only use data that is not
+        modified by later processing steps.
+    description : str
+        Short description used in log and error messages.
+
+    Returns
+    -------
+    bool
+        True if the job was queued, False if the run does not write in the
+        background and the caller has to run the job itself.
+    """
+    with _writers_lock:
+        writer = _writers.get(str(run_id))
+    if writer is None:
+        return False
+    writer.submit(job, description)
+    return True
+
+
+def wait_for_stage_writes(run_id: str) -> None:
+    """Block until all queued writes of a run are done.
+
+    Parameters
+    ----------
+    run_id : str
+        The run to wait for.
+
+    Raises
+    ------
+    StageWriteError
+        If any write of the run failed.
+    """
+    with _writers_lock:
+        writer = _writers.get(str(run_id))
+    if writer is None:
+        return
+    errors = writer.wait()
+    if errors:
+        raise StageWriteError(str(run_id), errors)
+
+
+def end_background_writes(run_id: str) -> List[str]:
+    """Finish the queued writes of a run and stop its writer thread.
+
+    Parameters
+    ----------
+    run_id : str
+        The run to stop writing in the background.
+
+    Returns
+    -------
+    list of str
+        Errors of failed writes, empty if all writes succeeded.
+    """
+    with _writers_lock:
+        writer = _writers.pop(str(run_id), None)
+    if writer is None:
+        return []
+    return writer.close()
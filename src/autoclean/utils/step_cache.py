@@ -0,0 +1,296 @@
+"""On-disk memoization for expensive, deterministic processing steps.
+
+Results of steps such as ICA fitting, RANSAC bad-channel detection and
+AutoReject fitting depend only on the input data and the step parameters.
+``StepCache`` stores them under a content-addressed key (a hash of the data
+arrays, channel info, annotations and parameters), so re-running a study
+with only downstream parameters changed reuses them instead of recomputing.
+
+Entries are directories under ``<cache_dir>/<step>/<key>``. Reading an entry
+refreshes its modification time and the least recently used entries are
+evicted once the cache grows beyond its size limit.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import mne
+import numpy as np
+
+from autoclean import __version__
+from autoclean.utils.logging import message
+
+try:
+    import xxhash
+
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+DEFAULT_CACHE_SIZE_MB = 4096
+
+_EVICTION_LOCK = threading.Lock()
+
+
+def _new_digest():
+    """Fast non-cryptographic digest when available."""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def _update_digest(digest, value: Any) -> None:
+    """Feed a step argument into a digest."""
+    if isinstance(value, (mne.io.BaseRaw, mne.BaseEpochs)):
+        info = value.info
+        digest.update(type(value).__name__.encode())
+        digest.update(
+            json.dumps(
+                [
+                    info["ch_names"],
+                    value.get_channel_types(),
+                    info["sfreq"],
+                    sorted(info["bads"]),
+                ]
+            ).encode()
+        )
+        if isinstance(value, mne.io.BaseRaw):
+            annotations = value.annotations
+            digest.update(np.ascontiguousarray(annotations.onset).tobytes())
+            digest.update(np.ascontiguousarray(annotations.duration).tobytes())
+            digest.update("|".join(annotations.description).encode())
+        else:
+            digest.update(np.ascontiguousarray(value.events).tobytes())
+            digest.update(np.ascontiguousarray(value.times).tobytes())
+        # Hash the loaded array in place rather than a copy from get_data()
+        data = value._data if value.preload else value.get_data()  # pylint: disable=protected-access
+        digest.update(np.ascontiguousarray(data).tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(str((value.dtype, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _update_digest(digest, item)
+        digest.update(b"]")
+    elif isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value, key=str):
+            digest.update(f"{key}:".encode())
+            _update_digest(digest, value[key])
+        digest.update(b"}")
+    else:
+        digest.update(repr(value).encode())
+
+
+def _save_json(result: Any, entry: Path) -> None:
+    with open(entry / "result.json", "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def _load_json(entry: Path) -> Any:
+    with open(entry / "result.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_ica(result: mne.preprocessing.ICA, entry: Path) -> None:
+    result.save(entry / "result-ica.fif", overwrite=True, verbose=False)
+
+
+def _load_ica(entry: Path) -> mne.preprocessing.ICA:
+    return mne.preprocessing.read_ica(entry / "result-ica.fif", verbose=False)
+
+
+def _save_forward(result: mne.Forward, entry: Path) -> None:
+    mne.write_forward_solution(
+        entry / "result-fwd.fif", result, overwrite=True, verbose=False
+    )
+
+
+def _load_forward(entry: Path) -> mne.Forward:
+    return mne.read_forward_solution(entry / "result-fwd.fif", verbose=False)
+
+
+def _save_inverse(result: Any, entry: Path) -> None:
+    mne.minimum_norm.write_inverse_operator(
+        entry / "result-inv.fif", result, overwrite=True, verbose=False
+    )
+
+
+def _load_inverse(entry: Path) -> Any:
+    return mne.minimum_norm.read_inverse_operator(
+        entry / "result-inv.fif", verbose=False
+    )
+
+
+def _save_pickle(result: Any, entry: Path) -> None:
+    with open(entry / "result.pkl", "wb") as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load_pickle(entry: Path) -> Any:
+    with open(entry / "result.pkl", "rb") as f:
+        return pickle.load(f)
+
+
+# Result formats: ICA objects, forward solutions and inverse operators as FIF,
+# detection lists as JSON, fitted estimators (e.g. AutoReject with its reject
+# thresholds) as pickle
+SERIALIZERS: Dict[str, tuple] = {
+    "json": (_save_json, _load_json),
+    "ica": (_save_ica, _load_ica),
+    "forward": (_save_forward, _load_forward),
+    "inverse": (_save_inverse, _load_inverse),
+    "pickle": (_save_pickle, _load_pickle),
+}
+
+
+class StepCache:
+    """Content-addressed, size-bounded cache of step results.
+
+    Parameters
+    ----------
+    cache_dir : str or Path
+        Directory holding the cache entries.
+    max_size_mb : int, optional
+        Size limit in megabytes, by default ``DEFAULT_CACHE_SIZE_MB``.
+    """
+
+    def __init__(
+        self, cache_dir: str | Path, max_size_mb: Optional[int] = None
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_size_mb or DEFAULT_CACHE_SIZE_MB) * 1024 * 1024
+
+    def key(self, step: str, args: tuple, kwargs: dict) -> str:
+        """Compute the cache key of a step call.
+
+        Parameters
+        ----------
+        step : str
+            Name of the step.
+        args, kwargs
+            Arguments of the step call, including the data.
+
+        Returns
+        -------
+        str
+            Hex digest covering the step, the package version and arguments.
+        """
+        digest = _new_digest()
+        digest.update(f"{step}|{__version__}".encode())
+        _update_digest(digest, list(args))
+        _update_digest(digest, kwargs)
+        return digest.hexdigest()
+
+    def call(
+        self,
+        step: str,
+        func: Callable,
+        *args,
+        serializer: str = "pickle",
+        **kwargs,
+    ) -> Any:
+        """Return the cached result of ``func(*args, **kwargs)``, computing it if needed.
+
+        Parameters
+        ----------
+        step : str
+            Name of the step, used as the cache subdirectory.
+        func : callable
+            Deterministic function to memoize.
+        *args, **kwargs
+            Arguments passed to ``func``.
+        serializer : {"pickle", "json", "ica", "forward", "inverse"}, optional
+            How the result is stored on disk, by default "pickle".
+
+        Returns
+        -------
+        Any
+            The result of ``func``.
+        """
+        save, load = SERIALIZERS[serializer]
+        entry = self.cache_dir / step / self.key(step, args, kwargs)
+
+        if entry.is_dir():
+            try:
+                result = load(entry)
+                os.utime(entry)  # Mark as recently used
+                message("info", f"Using cached {step} result ({entry.name[:12]})")
+                return result
+            except Exception as e:  # pylint: disable=broad-except
+                message("warning", f"Ignoring unreadable cache entry for {step}: {e}")
+                shutil.rmtree(entry, ignore_errors=True)
+
+        result = func(*args, **kwargs)
+
+        # Write to a private directory and rename, so concurrent runs never
+        # see a partial entry
+        tmp_entry = entry.parent / f".tmp-{uuid.uuid4().hex}"
+        try:
+            tmp_entry.mkdir(parents=True)
+            save(result, tmp_entry)
+            os.replace(tmp_entry, entry)
+        except OSError as e:
+            # Usually another run stored the same entry first
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            message("debug", f"Did not cache {step} result: {e}")
+        except Exception as e:  # pylint: disable=broad-except
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            message("warning", f"Could not cache {step} result: {e}")
+        else:
+            self.evict()
+        return result
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits its limit."""
+        with _EVICTION_LOCK:
+            entries = []
+            total = 0
+            for entry in self.cache_dir.glob("*/*"):
+                if not entry.is_dir() or entry.name.startswith(".tmp-"):
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in entry.iterdir())
+                    entries.append((entry.stat().st_mtime, size, entry))
+                except OSError:
+                    continue
+                total += size
+
+            entries.sort(key=lambda item: item[0])
+            for _, size, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+                message("debug", f"Evicted cache entry {entry.parent.name}/{entry.name}")
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def get_step_cache(config: Optional[Dict[str, Any]]) -> Optional[StepCache]:
+    """Get the step cache configured for a run.
+
+    Parameters
+    ----------
+    config : dict or None
+        Task configuration (run_dict). Caching is enabled by the pipeline
+        through its ``step_cache_dir`` and ``step_cache_size_mb`` keys.
+
+    Returns
+    -------
+    StepCache or None
+        The cache, or None if caching is disabled for this run.
+    """
+    if not config or not config.get("step_cache_dir"):
+        return None
+    return StepCache(config["step_cache_dir"], config.get("step_cache_size_mb"))
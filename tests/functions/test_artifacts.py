@@ -223,6 +223,34 @@ class TestChannelInterpolation:
             # Bad channels should still be marked as bad
             assert bad_channels[0] in raw_interp.info['bads']
     
+    def test_interpolate_bad_channels_matches_mne(self, tmp_path, monkeypatch):
+        """Cached spline interpolation matches MNE, for raw and epochs."""
+        from autoclean.utils import montage as montage_utils
+
+        monkeypatch.setattr(montage_utils, "user_cache_dir", lambda *a: str(tmp_path))
+        monkeypatch.setattr(montage_utils, "_CHANNEL_GEOMETRY", {})
+        montage = make_standard_montage("GSN-HydroCel-129")
+        info = mne.create_info(
+            montage.ch_names + ["EOG"], 250.0, ["eeg"] * 129 + ["eog"]
+        )
+        data = np.random.default_rng(0).standard_normal((130, 1000)) * 1e-5
+        raw = mne.io.RawArray(data, info, verbose=False)
+        raw.set_montage(montage)
+        raw.info["bads"] = ["E5", "E40", "E100"]
+        epochs = mne.make_fixed_length_epochs(raw, 1.0, preload=True, verbose=False)
+
+        for inst in (raw, epochs):
+            expected = inst.copy().interpolate_bads(verbose=False)
+            result = interpolate_bad_channels(inst)
+            np.testing.assert_allclose(
+                result.get_data(), expected.get_data(), rtol=0, atol=1e-12
+            )
+            assert result.info["bads"] == []
+            assert inst.info["bads"] == ["E5", "E40", "E100"]
+        # Only the spline matrix is cached on disk, not per-bad-set matrices
+        assert len(list(tmp_path.glob("montage/*-spline-*.npy"))) == 1
+        assert not list(tmp_path.glob("montage/*-interp-*.npy"))
+
     def test_interpolate_bad_channels_no_montage(self):
         """Test interpolation fails without montage."""
         raw = create_synthetic_raw(duration=5.0, sfreq=250, n_channels=16)
@@ -0,0 +1,185 @@
+"""Tests for block-wise processing of long continuous recordings."""
+
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import mne
+from autoclean.functions.preprocessing import filter_data
+from autoclean.functions.preprocessing.chunked import (
+    crop_copy,
+    filter_data_chunked,
+    iter_raw_blocks,
+    preload_to_file,
+)
+from autoclean.functions.segment_rejection import (
+    annotate_noisy_segments,
+    detect_dense_oscillatory_artifacts,
+)
+
+SFREQ = 250.0
+
+
+def _raw(n_channels=16, n_seconds=120, seed=0):
+    rng = np.random.default_rng(seed)
+    n_times = int(n_seconds * SFREQ)
+    data = rng.standard_normal((n_channels, n_times)).cumsum(axis=1) * 1e-6
+    data += 20e-6 * np.sin(2 * np.pi * 60 * np.arange(n_times) / SFREQ)
+    # Bursts on most channels and a few noisy stretches
+    for start in rng.integers(0, n_times - 500, 8):
+        data[: n_channels - 2, start : start + 50] += 200e-6 * rng.standard_normal(50)
+    info = mne.create_info(
+        [f"EEG{i:03d}" for i in range(n_channels - 1)] + ["EOG"],
+        SFREQ,
+        ["eeg"] * (n_channels - 1) + ["eog"],
+    )
+    return mne.io.RawArray(data, info, verbose=False)
+
+
+class TestIterRawBlocks:
+    """Block iteration."""
+
+    def test_blocks_cover_recording(self):
+        raw = _raw(n_seconds=10)
+        blocks = list(iter_raw_blocks(raw, 700, context_before=30, context_after=20))
+        assert [b[0] for b in blocks] == list(range(0, raw.n_times, 700))
+        assert blocks[-1][1] == raw.n_times
+        for start, stop, first, data in blocks:
+            assert first == max(start - 30, 0)
+            np.testing.assert_array_equal(
+                data, raw.get_data(start=first, stop=min(stop + 20, raw.n_times))
+            )
+
+
+class TestCropCopy:
+    """Copying a time span."""
+
+    def test_matches_copy_and_crop(self):
+        raw = _raw(n_seconds=20)
+        raw.set_annotations(mne.Annotations([2.0, 12.0], [1.0, 1.0], ["a", "b"]))
+        original = raw.get_data()
+
+        span = crop_copy(raw, tmin=10.0, tmax=15.0)
+        expected = raw.copy().crop(tmin=10.0, tmax=15.0)
+
+        np.testing.assert_array_equal(span.get_data(), expected.get_data())
+        assert span.first_samp == expected.first_samp
+        np.testing.assert_allclose(span.annotations.onset, expected.annotations.onset)
+        # The original is untouched and does not share data with the span
+        span._data[:] = 0  # pylint: disable=protected-access
+        np.testing.assert_array_equal(raw.get_data(), original)
+        assert len(raw.annotations) == 2
+
+
+class TestPreloadToFile:
+    """Loading data into a memory-mapped file."""
+
+    @pytest.mark.parametrize("preload", [False, True])
+    def test_file_backed_after_pick(self, tmp_path, preload):
+        _raw(n_seconds=10).save(tmp_path / "raw.fif", verbose=False)
+        raw = mne.io.read_raw_fif(tmp_path / "raw.fif", preload=preload, verbose=False)
+        expected = raw.get_data(picks="eeg")
+        raw.pick("eeg")
+
+        preload_to_file(raw, tmp_path / "raw.dat")
+        data = raw._data  # pylint: disable=protected-access
+        assert isinstance(data, np.memmap) and data._mmap is not None
+        assert data.filename == str(tmp_path / "raw.dat")
+        np.testing.assert_array_equal(raw.get_data(), expected)
+
+
+class TestFilterDataChunked:
+    """Block-wise filtering against whole-recording filtering."""
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"l_freq": 1.0, "h_freq": 40.0},
+            {"l_freq": 0.5, "h_freq": None, "notch_freqs": [60.0]},
+        ],
+    )
+    def test_matches_filter_data(self, kwargs):
+        raw = _raw()
+        expected = filter_data(raw, verbose=False, **kwargs)
+        result = filter_data_chunked(raw, block_sec=20, verbose=False, **kwargs)
+        assert result is raw
+        scale = np.abs(expected.get_data()).max()
+        np.testing.assert_allclose(
+            result.get_data(), expected.get_data(), rtol=0, atol=1e-12 * scale
+        )
+        assert result.info["highpass"] == expected.info["highpass"]
+        assert result.info["lowpass"] == expected.info["lowpass"]
+
+    def test_iir_close_to_filter_data(self):
+        raw = _raw()
+        expected = filter_data(
+            raw, l_freq=1.0, h_freq=40.0, method="iir", verbose=False
+        )
+        filter_data_chunked(
+            raw, l_freq=1.0, h_freq=40.0, method="iir", block_sec=20, verbose=False
+        )
+        scale = np.abs(expected.get_data()).max()
+        np.testing.assert_allclose(
+            raw.get_data(), expected.get_data(), rtol=0, atol=1e-8 * scale
+        )
+
+    def test_memory_mapped_data(self, tmp_path):
+        raw = _raw()
+        raw.save(tmp_path / "raw.fif", verbose=False)
+        mapped = mne.io.read_raw_fif(
+            tmp_path / "raw.fif", preload=str(tmp_path / "raw.dat"), verbose=False
+        )
+        loaded = mne.io.read_raw_fif(tmp_path / "raw.fif", preload=True, verbose=False)
+        expected = filter_data(loaded, l_freq=1.0, h_freq=40.0, verbose=False)
+        filter_data_chunked(mapped, l_freq=1.0, h_freq=40.0, block_sec=20)
+        assert isinstance(mapped._data, np.memmap)  # pylint: disable=protected-access
+        scale = np.abs(expected.get_data()).max()
+        np.testing.assert_allclose(
+            mapped.get_data(), expected.get_data(), rtol=0, atol=1e-12 * scale
+        )
+
+    def test_peak_memory_bounded_by_block(self):
+        raw = _raw(n_channels=32, n_seconds=300)
+        data_bytes = raw.get_data().nbytes
+
+        tracemalloc.start()
+        filter_data_chunked(raw, l_freq=1.0, h_freq=40.0, block_sec=10, verbose=False)
+        _, chunked_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert chunked_peak < 0.25 * data_bytes
+
+    def test_needs_preloaded_data(self, tmp_path):
+        raw = _raw(n_seconds=10)
+        raw.save(tmp_path / "raw.fif", verbose=False)
+        lazy = mne.io.read_raw_fif(tmp_path / "raw.fif", verbose=False)
+        with pytest.raises(ValueError, match="preloaded"):
+            filter_data_chunked(lazy, l_freq=1.0)
+
+
+class TestChunkedSegmentRejection:
+    """Block-wise detection finds what whole-recording detection finds."""
+
+    def test_dense_oscillatory(self):
+        raw = _raw()
+        kwargs = {"min_channels": 10, "padding_ms": 200, "hop_size_ms": 60}
+        expected = detect_dense_oscillatory_artifacts(raw, **kwargs)
+        result = detect_dense_oscillatory_artifacts(
+            raw, block_sec=7, inplace=True, **kwargs
+        )
+        assert result is raw
+        assert len(expected.annotations) > 0
+        np.testing.assert_allclose(result.annotations.onset, expected.annotations.onset)
+        np.testing.assert_allclose(
+            result.annotations.duration, expected.annotations.duration
+        )
+
+    def test_noisy_segments(self):
+        raw = _raw()
+        kwargs = {"epoch_duration": 1.0, "quantile_k": 1.5, "verbose": False}
+        expected = annotate_noisy_segments(raw, **kwargs)
+        result = annotate_noisy_segments(raw, block_sec=9, inplace=True, **kwargs)
+        assert result is raw
+        assert len(expected.annotations) > 0
+        np.testing.assert_allclose(result.annotations.onset, expected.annotations.onset)
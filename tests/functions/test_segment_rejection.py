@@ -10,6 +10,9 @@ from autoclean.functions.segment_rejection import (
     annotate_noisy_segments,
     annotate_uncorrelated_segments
 )
+from autoclean.functions.segment_rejection.dense_oscillatory import (
+    find_dense_oscillatory_runs,
+)
 
 
 @pytest.fixture
@@ -96,6 +99,59 @@ class TestDetectDenseOscilatoryArtifacts:
         # Should detect the artifact
         assert isinstance(result, type(mock_raw))
 
+    def test_runs_match_window_loop(self):
+        """Merged runs cover exactly the padded windows of a per-window loop."""
+        rng = np.random.default_rng(0)
+        sfreq, n_samples = 250.0, 5000
+        data = rng.standard_normal((20, n_samples)) * 5e-6
+        for start in (500, 530, 1200, 3000, 4950):
+            data[:15, start : start + 40] += 100e-6 * np.sin(np.arange(40))
+        times = np.arange(n_samples) / sfreq
+
+        for hop_ms in (None, 100, 40):
+            window, hop = 25, 25 if hop_ms is None else int(hop_ms * sfreq / 1000)
+            expected = np.zeros(n_samples, dtype=bool)
+            n_expected = 0
+            for start in range(0, n_samples - window, hop):
+                ptp = np.ptp(data[:, start : start + window], axis=1)
+                if np.sum(ptp > 45e-6) >= 10:
+                    n_expected += 1
+                    lo = max(times[start] - 0.2, times[0])
+                    hi = min(times[start + window] + 0.2, times[-1])
+                    expected |= (times >= lo) & (times <= hi)
+
+            onsets, durations, n_windows = find_dense_oscillatory_runs(
+                data, times, sfreq, hop_size_ms=hop_ms, min_channels=10, padding_ms=200
+            )
+            covered = np.zeros(n_samples, dtype=bool)
+            for onset, duration in zip(onsets, durations):
+                covered |= (times >= onset) & (times <= onset + duration)
+            assert n_windows == n_expected
+            np.testing.assert_array_equal(covered, expected)
+            # Runs are disjoint and there are fewer of them than windows
+            assert np.all(onsets[1:] > onsets[:-1] + durations[:-1])
+            assert len(onsets) < n_windows
+
+    def test_bulk_annotations_on_raw(self):
+        """All runs are added to a real Raw object in a single annotation call."""
+        sfreq = 250.0
+        data = np.zeros((8, 2500))
+        data[:, 1000:1100] = 100e-6 * np.sin(np.arange(100))
+        info = mne.create_info(8, sfreq, "eeg")
+        raw = mne.io.RawArray(data, info, verbose=False)
+
+        result = detect_dense_oscillatory_artifacts(
+            raw, min_channels=8, padding_ms=100, hop_size_ms=20
+        )
+        assert len(raw.annotations) == 0
+        assert len(result.annotations) == 1
+        assert result.annotations.description[0] == "BAD_REF_AF"
+        # First flagged window starts at 3.92 s, padded by 0.1 s
+        assert result.annotations.onset[0] == pytest.approx(3.82)
+
+        with pytest.raises(ValueError):
+            detect_dense_oscillatory_artifacts(raw, hop_size_ms=0)
+
 
 class TestAnnotateNoisySegments:
     """Test noisy segment annotation (from moved functions)."""
@@ -199,6 +255,49 @@ class TestAnnotateUncorrelatedSegments:
         with pytest.raises(ValueError):
             annotate_uncorrelated_segments(raw, corr_trim_percent=60)
 
+    @pytest.mark.parametrize("corr_method", ["max", "mean", "trimmean"])
+    def test_neighbor_correlations_match_pairwise(self, corr_method):
+        """Batched neighbor correlations match per-channel xr.corr aggregation."""
+        import scipy.stats
+        import xarray as xr
+        from autoclean.functions.segment_rejection.segment_rejection import (
+            _calculate_neighbor_correlations,
+        )
+        from autoclean.utils.montage import nearest_neighbors
+
+        montage = mne.channels.make_standard_montage("standard_1020")
+        ch_names = montage.ch_names[:32]
+        rng = np.random.default_rng(0)
+        data = rng.standard_normal((12, 32, 200))
+        data[:, :6] += 3 * rng.standard_normal((12, 1, 200))
+        data[4, 10] = 0.0  # Flat channel in one epoch
+        epochs = mne.EpochsArray(
+            data, mne.create_info(ch_names, 250.0, "eeg"), verbose=False
+        )
+        epochs.set_montage(montage)
+
+        result = _calculate_neighbor_correlations(
+            epochs, n_nearest_neighbors=5, corr_method=corr_method
+        )
+
+        positions = montage.get_positions()["ch_pos"]
+        neighbors = nearest_neighbors(np.array([positions[ch] for ch in ch_names]), 5)
+        data_xr = xr.DataArray(data.transpose(1, 0, 2), dims=("ch", "epoch", "time"))
+        for ch in range(32):
+            corr = np.abs(
+                xr.corr(data_xr[ch], data_xr[neighbors[ch]], dim="time")
+            ).transpose("epoch", "ch")
+            if corr_method == "max":
+                expected = corr.max("ch").values
+            elif corr_method == "mean":
+                expected = corr.mean("ch").values
+            else:
+                expected = [scipy.stats.trim_mean(row, 0.1) for row in corr.values]
+            np.testing.assert_allclose(result.values[ch], expected, rtol=1e-12)
+        assert list(result.coords["ch"].values) == ch_names
+        assert result.dims == ("ch", "epoch")
+        assert np.isnan(result.values[10, 4])
+
     @patch('autoclean.functions.segment_rejection.segment_rejection.mne.make_fixed_length_events')
     @patch('autoclean.functions.segment_rejection.segment_rejection.mne.Epochs')
     def test_no_montage_error(self, mock_epochs_class, mock_make_events, mock_raw):
@@ -0,0 +1 @@
+"""Unit tests for AutoClean EEG calculation modules."""
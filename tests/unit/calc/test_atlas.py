@@ -0,0 +1,111 @@
+"""Unit tests for the sparse atlas index."""
+
+import mne
+import numpy as np
+import pytest
+
+try:
+    from autoclean.calc import atlas as atlas_module
+    from autoclean.calc.atlas import AtlasIndex, get_atlas_index
+    ATLAS_AVAILABLE = True
+except ImportError:
+    ATLAS_AVAILABLE = False
+
+
+VERTICES = [np.arange(0, 200, 2), np.arange(0, 200, 3)]
+
+
+def _make_labels():
+    rng = np.random.default_rng(0)
+    spans = [("a-lh", 10, 60), ("b-lh", 50, 150), ("a-rh", 0, 90)]
+    labels = [
+        mne.Label(
+            np.arange(start, stop),
+            pos=rng.random((stop - start, 3)),
+            hemi=name[-2:],
+            name=name,
+        )
+        for name, start, stop in spans
+    ]
+    # No vertex of the source space
+    labels.append(mne.Label(np.array([1, 5]), hemi="rh", name="empty-rh"))
+    return labels
+
+
+def _make_stc():
+    rng = np.random.default_rng(1)
+    n_vertices = len(VERTICES[0]) + len(VERTICES[1])
+    return mne.SourceEstimate(rng.standard_normal((n_vertices, 40)), VERTICES, 0, 0.004)
+
+
+@pytest.mark.skipif(not ATLAS_AVAILABLE, reason="Atlas index not available")
+class TestAtlasIndex:
+    """Test ROI averaging with AtlasIndex."""
+
+    def test_matches_label_time_courses(self):
+        labels = _make_labels()
+        stc = _make_stc()
+        index = AtlasIndex.from_labels(labels, VERTICES)
+
+        assert index.names == ["a-lh", "b-lh", "a-rh"]
+        expected = np.array(
+            [stc.in_label(label).data.mean(axis=0) for label in labels[:3]]
+        )
+        np.testing.assert_allclose(index.apply(stc), expected)
+        np.testing.assert_allclose(index.apply([stc, stc]), [expected, expected])
+
+    def test_select_and_roi_vertices(self):
+        index = AtlasIndex.from_labels(_make_labels(), VERTICES)
+        selected = index.select(["a-rh", "missing", "a-lh"])
+
+        assert selected.names == ["a-rh", "a-lh"]
+        in_label = (VERTICES[0] >= 10) & (VERTICES[0] < 60)
+        np.testing.assert_array_equal(
+            selected.roi_vertices("a-lh"), np.flatnonzero(in_label)
+        )
+        np.testing.assert_allclose(selected.centroids[1], index.centroids[0])
+
+    def test_rejects_other_source_space(self):
+        index = AtlasIndex.from_labels(_make_labels(), [VERTICES[0][:-1], VERTICES[1]])
+        with pytest.raises(ValueError, match="do not match"):
+            index.apply(_make_stc())
+
+    def test_index_is_cached_on_disk(self, tmp_path, monkeypatch):
+        calls = []
+
+        def read_labels(subject, parc, subjects_dir, verbose=None):
+            calls.append(parc)
+            return _make_labels()
+
+        monkeypatch.setattr(atlas_module.mne, "read_labels_from_annot", read_labels)
+        monkeypatch.setattr(atlas_module, "_ATLAS_INDICES", {})
+        first = get_atlas_index(VERTICES, subjects_dir=tmp_path, cache_dir=tmp_path)
+
+        # A new process only finds the file
+        monkeypatch.setattr(atlas_module, "_ATLAS_INDICES", {})
+        second = get_atlas_index(VERTICES, subjects_dir=tmp_path, cache_dir=tmp_path)
+
+        assert calls == ["aparc"]
+        assert second.names == first.names
+        np.testing.assert_allclose(second.matrix.toarray(), first.matrix.toarray())
+        np.testing.assert_allclose(second.centroids, first.centroids)
+
+    def test_edited_annotation_invalidates_cache(self, tmp_path, monkeypatch):
+        calls = []
+
+        def read_labels(subject, parc, subjects_dir, verbose=None):
+            calls.append(parc)
+            return _make_labels()
+
+        monkeypatch.setattr(atlas_module.mne, "read_labels_from_annot", read_labels)
+        monkeypatch.setattr(atlas_module, "_ATLAS_INDICES", {})
+        annot = tmp_path / "fsaverage" / "label" / "lh.aparc.annot"
+        annot.parent.mkdir(parents=True)
+        annot.write_bytes(b"old")
+        get_atlas_index(VERTICES, subjects_dir=tmp_path, cache_dir=tmp_path)
+        get_atlas_index(VERTICES, subjects_dir=tmp_path, cache_dir=tmp_path)
+
+        annot.write_bytes(b"edited")
+        get_atlas_index(VERTICES, subjects_dir=tmp_path, cache_dir=tmp_path)
+
+        assert calls == ["aparc", "aparc"]
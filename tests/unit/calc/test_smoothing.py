@@ -0,0 +1,113 @@
+"""Unit tests for the cached sparse spatial smoothing operators."""
+
+import h5py
+import numpy as np
+import pytest
+
+try:
+    import mne
+
+    from autoclean.calc import smoothing
+    from autoclean.calc.source import apply_spatial_smoothing
+    SOURCE_AVAILABLE = True
+except ImportError:
+    SOURCE_AVAILABLE = False
+
+
+def _grid_src(n=6):
+    """Two hemispheres of an n x n triangulated grid, like an ico source space."""
+    idx = np.arange(n * n).reshape(n, n)
+    tris = np.concatenate(
+        [
+            np.column_stack([idx[:-1, :-1].ravel(), idx[1:, :-1].ravel(), idx[:-1, 1:].ravel()]),
+            np.column_stack([idx[1:, :-1].ravel(), idx[1:, 1:].ravel(), idx[:-1, 1:].ravel()]),
+        ]
+    )
+    return [
+        {"type": "surf", "use_tris": tris, "vertno": np.arange(n * n)} for _ in range(2)
+    ]
+
+
+def _neighbour_mean(src, values):
+    """Mean over each vertex and its direct neighbours, vertex by vertex."""
+    adjacency = mne.spatial_src_adjacency(src, verbose=False).toarray() > 0
+    np.fill_diagonal(adjacency, True)
+    return np.array([values[row].mean() for row in adjacency])
+
+
+@pytest.mark.skipif(not SOURCE_AVAILABLE, reason="Source module not available")
+class TestSmoothingOperator:
+    """Operator construction, restriction and caching."""
+
+    def test_one_step_is_neighbour_mean(self):
+        src = _grid_src()
+        vertices = [s["vertno"] for s in src]
+        operator = smoothing.get_smoothing_operator(vertices, 1, src=src)
+        values = np.random.default_rng(0).random(operator.shape[0])
+        np.testing.assert_allclose(operator @ values, _neighbour_mean(src, values))
+
+    def test_rows_sum_to_one(self):
+        src = _grid_src()
+        vertices = [s["vertno"] for s in src]
+        operator = smoothing.get_smoothing_operator(vertices, 3, src=src)
+        np.testing.assert_allclose(operator.sum(axis=1), 1)
+        identity = smoothing.get_smoothing_operator(vertices, 0, src=src)
+        np.testing.assert_array_equal(identity.toarray(), np.eye(72))
+
+    def test_vertex_subset(self):
+        src = _grid_src()
+        vertices = [np.arange(0, 36, 2), np.arange(10, 30)]
+        operator = smoothing.get_smoothing_operator(vertices, 2, src=src)
+        assert operator.shape == (38, 38)
+        np.testing.assert_allclose(operator.sum(axis=1), 1)
+        with pytest.raises(ValueError, match="not in the source space"):
+            smoothing.get_smoothing_operator([np.array([40]), np.array([0])], 1, src=src)
+
+    def test_cached_on_disk(self, tmp_path, monkeypatch):
+        reads = []
+
+        def read_source_spaces(fname, verbose=None):
+            reads.append(fname)
+            return _grid_src()
+
+        monkeypatch.setattr(mne, "read_source_spaces", read_source_spaces)
+        monkeypatch.setattr(smoothing, "_SMOOTHING_OPERATORS", {})
+        vertices = [np.arange(36), np.arange(36)]
+        kwargs = dict(subjects_dir=tmp_path, cache_dir=tmp_path / "cache")
+
+        first = smoothing.get_smoothing_operator(vertices, 2, **kwargs)
+        assert smoothing.get_smoothing_operator(vertices, 2, **kwargs) is first
+        smoothing._SMOOTHING_OPERATORS.clear()
+        loaded = smoothing.get_smoothing_operator(vertices, 2, **kwargs)
+        assert len(reads) == 1
+        np.testing.assert_allclose(loaded.toarray(), first.toarray())
+
+        smoothing.get_smoothing_operator(vertices, 3, **kwargs)
+        assert len(reads) == 2
+
+    @pytest.mark.parametrize("level", [None, 1])
+    def test_apply_spatial_smoothing(self, tmp_path, monkeypatch, level):
+        src = _grid_src()
+        monkeypatch.setattr(mne, "read_source_spaces", lambda *a, **k: src)
+        monkeypatch.setattr(
+            smoothing, "user_cache_dir", lambda *a, **k: str(tmp_path / "cache")
+        )
+        vertices = [s["vertno"] for s in src]
+        stc = mne.SourceEstimate(np.zeros((72, 1)), vertices, 0, 1)
+        rng = np.random.default_rng(1)
+        power = {"alpha": rng.random(72), "beta": rng.random(72)}
+
+        smoothed, fname = apply_spatial_smoothing(
+            power,
+            stc,
+            smoothing_steps=1,
+            subject_id="s",
+            output_dir=tmp_path,
+            subjects_dir=tmp_path,
+            compression_level=level,
+        )
+        for band, values in power.items():
+            np.testing.assert_allclose(smoothed[band], _neighbour_mean(src, values))
+        with h5py.File(fname, "r") as f:
+            np.testing.assert_allclose(f["beta"][:], smoothed["beta"])
+            assert f["alpha"].compression == ("gzip" if level else None)
@@ -0,0 +1,80 @@
+"""Regression tests bounding the error of the float32 source analysis path."""
+
+import numpy as np
+import pytest
+
+try:
+    from scipy import sparse
+
+    from autoclean.calc.atlas import AtlasIndex
+    from autoclean.calc.source import compute_aec, compute_vertex_psd
+    SOURCE_AVAILABLE = True
+except ImportError:
+    SOURCE_AVAILABLE = False
+
+
+SFREQ = 250.0
+BANDS = {"theta": (4, 8), "alpha": (8, 13), "beta": (13, 30), "gamma": (30, 45)}
+
+
+def _source_data(n_vertices=200, n_seconds=60, seed=0):
+    """Source-scale (~1e-10) time courses with a shared alpha rhythm."""
+    rng = np.random.default_rng(seed)
+    times = np.arange(int(n_seconds * SFREQ)) / SFREQ
+    alpha = np.sin(2 * np.pi * 10 * times) * (1 + 0.5 * np.sin(2 * np.pi * 0.1 * times))
+    data = rng.standard_normal((n_vertices, len(times))).cumsum(axis=1) * 0.05
+    data += rng.uniform(0.5, 2, (n_vertices, 1)) * alpha
+    return 1e-10 * (data - data.mean(axis=1, keepdims=True))
+
+
+def _atlas(n_vertices, n_rois=8):
+    half = n_vertices // 2
+    vertices = [np.arange(half), np.arange(n_vertices - half)]
+    rows = np.arange(n_vertices) % n_rois
+    matrix = sparse.csr_matrix(
+        (np.ones(n_vertices), (rows, np.arange(n_vertices))), shape=(n_rois, n_vertices)
+    )
+    matrix = sparse.diags(1 / np.asarray(matrix.sum(axis=1)).ravel()) @ matrix
+    hemis = ["lh" if r % 2 else "rh" for r in range(n_rois)]
+    return AtlasIndex([f"roi{r}" for r in range(n_rois)], hemis, vertices, matrix)
+
+
+@pytest.mark.skipif(not SOURCE_AVAILABLE, reason="Source module not available")
+class TestFloat32Path:
+    """float32 results stay within tight bounds of the float64 ones."""
+
+    def test_band_power(self):
+        data = _source_data()
+        freqs, psd64 = compute_vertex_psd(data, SFREQ, fmin=1, fmax=45)
+        freqs32, psd32 = compute_vertex_psd(
+            data, SFREQ, fmin=1, fmax=45, dtype="float32"
+        )
+        assert psd32.dtype == np.float64
+        np.testing.assert_array_equal(freqs32, freqs)
+        # float32 input picks the float32 path by default
+        _, psd_auto = compute_vertex_psd(data.astype(np.float32), SFREQ, fmin=1, fmax=45)
+        np.testing.assert_allclose(psd_auto, psd32, rtol=1e-6)
+
+        for low, high in BANDS.values():
+            band = (freqs >= low) & (freqs < high)
+            power64 = psd64[:, band].mean(axis=1)
+            power32 = psd32[:, band].mean(axis=1)
+            np.testing.assert_allclose(power32, power64, rtol=1e-4)
+
+    def test_roi_time_courses_and_connectivity(self, monkeypatch):
+        data = _source_data(n_vertices=160)
+        atlas = _atlas(len(data))
+        # Force several float64 blocks in the float32 ROI average
+        monkeypatch.setattr("autoclean.calc.atlas._APPLY_BLOCK_BYTES", 8 * 160 * 1000)
+        roi64 = atlas.apply(data)
+        roi32 = atlas.apply(data.astype(np.float32))
+        assert roi32.dtype == np.float64
+        np.testing.assert_allclose(roi32, roi64, rtol=1e-6, atol=1e-7 * np.abs(roi64).max())
+
+        epochs64 = roi64.reshape(len(roi64), 15, -1).transpose(1, 0, 2)
+        epochs32 = roi32.reshape(len(roi32), 15, -1).transpose(1, 0, 2)
+        for band in BANDS.values():
+            for orthogonalize in (False, True):
+                aec64 = compute_aec(epochs64, SFREQ, band, orthogonalize)
+                aec32 = compute_aec(epochs32, SFREQ, band, orthogonalize)
+                np.testing.assert_allclose(aec32, aec64, atol=1e-5)
@@ -0,0 +1,112 @@
+"""Unit tests for the cached template forward and inverse operators."""
+
+import mne
+import numpy as np
+import pytest
+
+try:
+    from autoclean.calc import source
+    SOURCE_AVAILABLE = True
+except ImportError:
+    SOURCE_AVAILABLE = False
+
+
+def _make_info(sfreq=250.0):
+    montage = mne.channels.make_standard_montage("standard_1020")
+    ch_names = ["Fz", "Cz", "Pz", "C3", "C4", "F3", "F4", "P3", "P4", "Oz"]
+    info = mne.create_info(ch_names, sfreq, "eeg")
+    info.set_montage(montage)
+    raw = mne.io.RawArray(np.zeros((len(ch_names), 10)), info, verbose=False)
+    raw.set_eeg_reference("average", projection=True, verbose=False)
+    return raw.info
+
+
+def _sphere_forward(info, n_jobs=1):
+    """Small sphere-model forward standing in for the fsaverage template."""
+    sphere = mne.make_sphere_model((0.0, 0.0, 0.04), 0.09, info, verbose=False)
+    rng = np.random.default_rng(0)
+    pos = rng.uniform(-0.03, 0.03, (20, 3))
+    nn = np.tile([0.0, 0.0, 1.0], (20, 1))
+    src = mne.setup_volume_source_space(
+        pos={"rr": pos, "nn": nn}, sphere=sphere, verbose=False
+    )
+    return mne.make_forward_solution(
+        info, trans=None, src=src, bem=sphere, eeg=True, meg=False, verbose=False
+    )
+
+
+@pytest.mark.skipif(not SOURCE_AVAILABLE, reason="Source analysis dependencies not available")
+class TestTemplateInverseCache:
+    """Test get_template_inverse_operator with a step cache."""
+
+    @pytest.fixture
+    def forward_calls(self, monkeypatch):
+        calls = []
+
+        def fake_forward(info, n_jobs=1):
+            calls.append(info["ch_names"])
+            return _sphere_forward(info)
+
+        monkeypatch.setattr(source, "_make_template_forward", fake_forward)
+        return calls
+
+    def test_inverse_is_computed_once_per_montage(self, tmp_path, forward_calls):
+        config = {"step_cache_dir": tmp_path / "cache"}
+
+        first = source.get_template_inverse_operator(_make_info(), config)
+        second = source.get_template_inverse_operator(_make_info(), config)
+
+        assert len(forward_calls) == 1
+        assert second["info"]["ch_names"] == first["info"]["ch_names"]
+        np.testing.assert_allclose(
+            second["eigen_fields"]["data"], first["eigen_fields"]["data"]
+        )
+
+    def test_key_tracks_channels_and_sfreq(self, tmp_path, forward_calls):
+        config = {"step_cache_dir": tmp_path / "cache"}
+        source.get_template_inverse_operator(_make_info(), config)
+
+        info = _make_info()
+        info["bads"] = ["Oz"]
+        source.get_template_inverse_operator(info, config)
+        source.get_template_inverse_operator(_make_info(sfreq=500.0), config)
+
+        assert len(forward_calls) == 3
+
+    def test_without_step_cache_uses_cache_dir(self, tmp_path, forward_calls):
+        source.get_template_inverse_operator(
+            _make_info(), None, cache_dir=tmp_path / "source"
+        )
+        source.get_template_inverse_operator(
+            _make_info(), None, cache_dir=tmp_path / "source"
+        )
+
+        assert len(forward_calls) == 1
+        assert any((tmp_path / "source").iterdir())
+
+    def test_default_cache_dir(self, tmp_path, monkeypatch, forward_calls):
+        monkeypatch.setattr(source, "user_cache_dir", lambda _: str(tmp_path))
+
+        source.get_template_inverse_operator(_make_info(), None)
+        source.get_template_inverse_operator(_make_info(), None)
+
+        assert len(forward_calls) == 1
+        assert any((tmp_path / "source").iterdir())
+
+    def test_disabled_step_cache_always_computes(
+        self, tmp_path, monkeypatch, forward_calls
+    ):
+        monkeypatch.setattr(source, "user_cache_dir", lambda _: str(tmp_path))
+        config = {"step_cache_dir": None}
+
+        source.get_template_inverse_operator(_make_info(), config)
+        source.get_template_inverse_operator(_make_info(), config)
+
+        assert len(forward_calls) == 2
+        assert not (tmp_path / "source").exists()
+
+    def test_unknown_noise_covariance(self):
+        with pytest.raises(ValueError, match="noise covariance"):
+            source.get_template_inverse_operator(
+                _make_info(), None, noise_cov_type="empty"
+            )
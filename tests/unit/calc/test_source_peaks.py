@@ -0,0 +1,85 @@
+"""Unit tests for the batched Dickinson peak-frequency estimation."""
+
+import numpy as np
+import pytest
+
+try:
+    from autoclean.calc.source import (
+        _gaussian_peak_curve_fit,
+        _smooth_spectra,
+        compute_peak_frequencies,
+    )
+    SOURCE_AVAILABLE = True
+except ImportError:
+    SOURCE_AVAILABLE = False
+
+
+FREQS = np.arange(1, 45.25, 0.25)
+
+
+def _spectra(n, noise, seed=0):
+    """1/f spectra with an alpha peak, returned with the peak frequencies."""
+    rng = np.random.default_rng(seed)
+    center = rng.uniform(8, 11, (n, 1))
+    log_psds = (
+        1.0
+        - rng.uniform(1, 2, (n, 1)) * np.log10(FREQS)
+        + rng.uniform(0.3, 0.8, (n, 1))
+        * np.exp(-((FREQS - center) ** 2) / (2 * rng.uniform(0.7, 1.5, (n, 1)) ** 2))
+        + rng.normal(0, noise, (n, len(FREQS)))
+    )
+    return 10**log_psds, center[:, 0]
+
+
+@pytest.mark.skipif(not SOURCE_AVAILABLE, reason="Source module not available")
+class TestPeakFrequencies:
+    """Closed-form estimates and the curve_fit fallback."""
+
+    @pytest.mark.parametrize(
+        "method", ["savitzky_golay", "moving_average", "gaussian", "median"]
+    )
+    def test_smoothing_matches_per_spectrum(self, method):
+        spectra = np.random.default_rng(1).normal(size=(3, 20))
+        for spectrum, smoothed in zip(spectra, _smooth_spectra(spectra, method)):
+            if method == "median":
+                expected = [np.median(spectrum[max(0, i - 1) : i + 2]) for i in range(20)]
+            elif method == "savitzky_golay":
+                continue
+            else:
+                kernel = np.ones(3) / 3
+                if method == "gaussian":
+                    kernel = np.exp(-((np.arange(3) - 1) ** 2) / 2.0)
+                    kernel /= kernel.sum()
+                expected = np.convolve(spectrum, kernel, mode="same")
+            np.testing.assert_allclose(smoothed, expected)
+
+    def test_clean_peaks_use_closed_form(self):
+        psds, center = _spectra(50, noise=0.0)
+        results = compute_peak_frequencies(FREQS, psds)
+        assert np.all(results["fit_path"] == "closed_form")
+        assert np.all(results["status"] == "SUCCESS")
+        np.testing.assert_allclose(results["peak_freq"], center, atol=0.1)
+
+    def test_fallback_matches_curve_fit(self):
+        psds, center = _spectra(100, noise=0.08)
+        results = compute_peak_frequencies(FREQS, psds, smoothing_method="none")
+        fallback = np.flatnonzero(results["fit_path"] == "curve_fit")
+        assert 0 < len(fallback) < len(psds)
+        assert np.nanmedian(np.abs(results["peak_freq"] - center)) < 0.2
+
+        log_psds = np.log10(psds)
+        mask = (FREQS >= 6) & (FREQS <= 12)
+        for i in fallback[:10]:
+            trend = np.polyval(np.polyfit(np.log10(FREQS), log_psds[i], 1), np.log10(FREQS))
+            expected = _gaussian_peak_curve_fit(
+                FREQS[mask], (log_psds[i] - trend)[mask], (6, 12)
+            )
+            np.testing.assert_allclose(results["peak_freq"][i], expected[0], rtol=1e-6)
+            assert results["status"][i] == expected[4]
+
+    def test_dip_has_no_peak(self):
+        log_psd = -np.log10(FREQS) - 0.5 * np.exp(-((FREQS - 9) ** 2) / 2)
+        results = compute_peak_frequencies(FREQS, 10 ** log_psd[np.newaxis, :])
+        assert results["fit_path"][0] == "curve_fit"
+        assert results["status"][0] == "NO_PEAKS_FOUND"
+        assert np.isnan(results["peak_freq"][0])
@@ -0,0 +1,92 @@
+"""Unit tests for the on-disk source estimate store."""
+
+import numpy as np
+import pytest
+
+try:
+    import mne
+
+    from autoclean.calc.atlas import AtlasIndex
+    from autoclean.calc.source import compute_vertex_psd
+    from autoclean.calc.stc_store import STCStore
+    SOURCE_AVAILABLE = True
+except ImportError:
+    SOURCE_AVAILABLE = False
+
+
+SFREQ = 100.0
+VERTICES = [np.arange(0, 60, 2), np.arange(0, 50, 5)]
+
+
+def _stcs(n_epochs=6, n_times=200, seed=0):
+    rng = np.random.default_rng(seed)
+    n_vertices = sum(len(v) for v in VERTICES)
+    return [
+        mne.SourceEstimate(
+            rng.standard_normal((n_vertices, n_times)), VERTICES, -0.5, 1 / SFREQ
+        )
+        for _ in range(n_epochs)
+    ]
+
+
+@pytest.fixture
+def stcs_and_store(tmp_path):
+    stcs = _stcs()
+    store = STCStore.create(tmp_path / "stcs.h5", iter(stcs), vertex_chunk=8)
+    yield stcs, store
+    store.close()
+
+
+@pytest.mark.skipif(not SOURCE_AVAILABLE, reason="Source module not available")
+class TestSTCStore:
+    """Writing, indexing and streaming reads."""
+
+    def test_round_trip(self, stcs_and_store):
+        stcs, store = stcs_and_store
+        assert len(store) == len(stcs)
+        assert store.shape == (6, 40, 200)
+        assert store.sfreq == pytest.approx(SFREQ)
+        np.testing.assert_allclose(store.times, stcs[0].times)
+        for stc, stored in zip(stcs, store):
+            np.testing.assert_array_equal(stored.data, stc.data)
+            assert all(np.array_equal(a, b) for a, b in zip(stored.vertices, VERTICES))
+        np.testing.assert_array_equal(store[-1].data, stcs[-1].data)
+
+    def test_epoch_slices(self, stcs_and_store):
+        stcs, store = stcs_and_store
+        view = store[1:6:2]
+        assert len(view) == 3
+        np.testing.assert_array_equal(view[1].data, stcs[3].data)
+        rows = [7, 3, 3, 30]
+        expected = np.concatenate([stcs[i].data[rows] for i in (1, 3, 5)], axis=1)
+        np.testing.assert_array_equal(view.read_vertices(rows), expected)
+
+    def test_project_matches_per_epoch_product(self, stcs_and_store):
+        stcs, store = stcs_and_store
+        matrix = np.random.default_rng(1).random((3, store.n_vertices))
+        expected = np.stack([matrix @ stc.data for stc in stcs[2:]])
+        np.testing.assert_allclose(store[2:].project(matrix), expected)
+
+        atlas = AtlasIndex(["a", "b", "c"], ["lh", "lh", "rh"], VERTICES, matrix)
+        np.testing.assert_allclose(atlas.apply(store), atlas.apply(stcs))
+
+    def test_vertex_psd_matches_list(self, stcs_and_store):
+        stcs, store = stcs_and_store
+        freqs, psd = compute_vertex_psd(
+            [stc.data for stc in stcs], SFREQ, max_chunk_mb=0.1
+        )
+        store_freqs, store_psd = compute_vertex_psd(
+            store, SFREQ, max_chunk_mb=0.1, n_jobs=2
+        )
+        np.testing.assert_array_equal(store_freqs, freqs)
+        np.testing.assert_allclose(store_psd, psd)
+
+    def test_mismatched_epochs(self, tmp_path):
+        stcs = _stcs(2) + _stcs(1, n_times=150)
+        with pytest.raises(ValueError, match="Epoch 2"):
+            STCStore.create(tmp_path / "bad.h5", stcs)
+
+    def test_no_overwrite(self, stcs_and_store, tmp_path):
+        stcs, _ = stcs_and_store
+        with pytest.raises(FileExistsError):
+            STCStore.create(tmp_path / "stcs.h5", stcs)
@@ -246,3 +246,296 @@ class TestPipelineInterface:
         for attr in expected_attrs:
             assert hasattr(Pipeline, attr), f"Pipeline missing expected attribute: {attr}"
 
+
+
+@pytest.mark.skipif(not PIPELINE_AVAILABLE, reason="Pipeline module not available for import")
+class TestPipelineAsyncExecutors:
+    """Test executor selection for process_directory_async."""
+
+    @patch('autoclean.core.pipeline.manage_database_conditionally')
+    @patch('autoclean.core.pipeline.set_database_path')
+    @patch('autoclean.core.pipeline.configure_logger')
+    @patch('autoclean.core.pipeline.mne.set_log_level')
+    def test_invalid_executor_rejected(self, mock_mne_log, mock_logger, mock_set_db, mock_manage_db, tmp_path):
+        """Test that an unknown executor name raises ValueError."""
+        import asyncio
+
+        pipeline = Pipeline(output_dir=str(tmp_path / "output"))
+
+        with pytest.raises(ValueError, match="Invalid executor"):
+            asyncio.run(
+                pipeline.process_directory_async(
+                    directory_path=tmp_path, task="RestingEyesOpen", executor="gpu"
+                )
+            )
+
+    @patch('autoclean.core.pipeline.manage_database_conditionally')
+    @patch('autoclean.core.pipeline.set_database_path')
+    @patch('autoclean.core.pipeline.configure_logger')
+    @patch('autoclean.core.pipeline.mne.set_log_level')
+    def test_add_task_records_task_file(self, mock_mne_log, mock_logger, mock_set_db, mock_manage_db, tmp_path):
+        """Test that task files are recorded so process workers can re-register them."""
+        task_file = tmp_path / "my_task.py"
+        task_file.write_text(
+            "from autoclean.core.task import Task\n\n"
+            "class MyWorkerTask(Task):\n"
+            "    def run(self):\n"
+            "        pass\n"
+        )
+        pipeline = Pipeline(output_dir=str(tmp_path / "output"))
+
+        pipeline.add_task(task_file)
+        pipeline.add_task(task_file)
+
+        assert pipeline.task_files == [task_file.absolute()]
+
+
+    @pytest.mark.slow
+    def test_worker_crash_only_fails_its_file(self, tmp_path, capsys):
+        """Test that files in flight when a worker dies are re-run, not failed."""
+        import asyncio
+
+        task_file = tmp_path / "crashing_task.py"
+        task_file.write_text(
+            "import os\n"
+            "import time\n"
+            "from pathlib import Path\n\n"
+            "from autoclean.core.task import Task\n\n"
+            "class CrashingWorkerTask(Task):\n"
+            "    def run(self):\n"
+            "        source = Path(self.config['unprocessed_file'])\n"
+            "        if source.stem == 'crash':\n"
+            "            os._exit(1)\n"
+            "        time.sleep(3)\n"
+            "        source.with_suffix('.done').touch()\n"
+        )
+        input_dir = tmp_path / "input"
+        input_dir.mkdir()
+        for name in ("crash", "first", "second"):
+            (input_dir / f"{name}.set").write_bytes(b"x")
+
+        pipeline = Pipeline(output_dir=str(tmp_path / "output"))
+        pipeline.add_task(task_file)
+        asyncio.run(
+            pipeline.process_directory_async(
+                directory_path=input_dir,
+                task="CrashingWorkerTask",
+                pattern="*.set",
+                max_concurrent=3,
+                executor="process",
+            )
+        )
+
+        # The crashing file kills its worker twice, its peers still complete
+        assert sorted(f.name for f in input_dir.glob("*.done")) == [
+            "first.done",
+            "second.done",
+        ]
+        output = capsys.readouterr().out
+        assert "✗ Failed: crash.set" in output
+        assert "✓ Completed: first.set" in output
+        assert "✓ Completed: second.set" in output
+
+
+@pytest.mark.skipif(not PIPELINE_AVAILABLE, reason="Pipeline module not available for import")
+class TestPipelineWorkQueue:
+    """Test work-queue scheduling in process_directory_async."""
+
+    @patch('autoclean.core.pipeline.manage_database_conditionally')
+    @patch('autoclean.core.pipeline.set_database_path')
+    @patch('autoclean.core.pipeline.configure_logger')
+    @patch('autoclean.core.pipeline.mne.set_log_level')
+    def test_largest_files_start_first(self, mock_mne_log, mock_logger, mock_set_db, mock_manage_db, tmp_path):
+        """Test that files are dispatched largest-first and all are processed."""
+        import asyncio
+
+        input_dir = tmp_path / "input"
+        input_dir.mkdir()
+        for name, size in [("small.set", 10), ("large.set", 1000), ("medium.set", 100)]:
+            (input_dir / name).write_bytes(b"x" * size)
+        # EEGLAB data sidecar counts toward the recording size
+        (input_dir / "small.fdt").write_bytes(b"x" * 5000)
+
+        pipeline = Pipeline(output_dir=str(tmp_path / "output"))
+        started = []
+
+        async def fake_entrypoint(file_path, task, run_id=None, **kwargs):
+            started.append(file_path.name)
+            if file_path.name == "medium.set":
+                raise RuntimeError("boom")
+
+        with patch.object(pipeline, "_entrypoint_async", side_effect=fake_entrypoint):
+            asyncio.run(
+                pipeline.process_directory_async(
+                    directory_path=input_dir,
+                    task="RestingEyesOpen",
+                    pattern="*.set",
+                    max_concurrent=1,
+                )
+            )
+
+        assert started == ["small.set", "large.set", "medium.set"]
+
+
+@pytest.mark.skipif(not PIPELINE_AVAILABLE, reason="Pipeline module not available")
+class TestPipelineRestart:
+    """Test restarting a crashed run without --resume."""
+
+    def test_rerun_resumes_from_checkpoints(self, tmp_path):
+        """Test that a plain rerun restores completed steps instead of rerunning them."""
+        import numpy as np
+
+        from autoclean.utils import file_system
+
+        task_file = tmp_path / "checkpointed_task.py"
+        task_file.write_text(
+            "from pathlib import Path\n\n"
+            "import mne\n"
+            "import numpy as np\n\n"
+            "from autoclean.core.task import Task\n"
+            "from autoclean.io.export import save_raw_to_set\n\n"
+            "class ScaleMixin:\n"
+            "    def scale(self, factor):\n"
+            "        source = Path(self.config['unprocessed_file'])\n"
+            "        with open(source.with_suffix('.calls'), 'a') as f:\n"
+            "            f.write(f'scale {factor}\\n')\n"
+            "        raw = self.raw.copy()\n"
+            "        raw._data *= factor\n"
+            "        self.raw = raw\n"
+            "        save_raw_to_set(raw, self.config, stage=f'post_scale_{factor}')\n\n"
+            "ScaleMixin.__module__ = 'autoclean.mixins.signal_processing.scale'\n\n"
+            "class CheckpointedTask(ScaleMixin, Task):\n"
+            "    def run(self):\n"
+            "        source = Path(self.config['unprocessed_file'])\n"
+            "        info = mne.create_info(['Fz', 'Cz', 'Pz'], 100.0, 'eeg')\n"
+            "        self.raw = mne.io.RawArray(np.ones((3, 1000)), info)\n"
+            "        self.scale(2)\n"
+            "        if source.with_suffix('.crash').exists():\n"
+            "            raise RuntimeError('crash')\n"
+            "        self.scale(3)\n"
+            "        np.save(source.with_suffix('.npy'), self.raw.get_data())\n"
+        )
+        input_dir = tmp_path / "input"
+        input_dir.mkdir()
+        source = input_dir / "recording.set"
+        source.write_bytes(b"x")
+        source.with_suffix(".crash").touch()
+
+        pipeline = Pipeline(output_dir=str(tmp_path / "output"))
+        pipeline.add_task(task_file)
+        with pytest.raises(RuntimeError, match="crash"):
+            pipeline.process_file(source, task="CheckpointedTask")
+
+        # A new process would back up the task directory on its first run
+        source.with_suffix(".crash").unlink()
+        file_system._PREPARED_TASK_ROOTS.clear()
+        pipeline.process_file(source, task="CheckpointedTask")
+
+        assert source.with_suffix(".calls").read_text().split("\n") == [
+            "scale 2",
+            "scale 3",
+            "",
+        ]
+        np.testing.assert_allclose(np.load(source.with_suffix(".npy")), 6.0)
+        assert not list((tmp_path / "output").glob("*_backup_*"))
+
+
+@pytest.mark.skipif(not PIPELINE_AVAILABLE, reason="Pipeline module not available")
+class TestPipelineSkipCompleted:
+    """Test skip-if-done batch processing."""
+
+    @patch('autoclean.core.pipeline.manage_database_conditionally')
+    @patch('autoclean.core.pipeline.set_database_path')
+    @patch('autoclean.core.pipeline.configure_logger')
+    @patch('autoclean.core.pipeline.mne.set_log_level')
+    def test_completed_files_are_skipped(self, mock_mne_log, mock_logger, mock_set_db, mock_manage_db, tmp_path):
+        """Test that only files without a completed run are processed."""
+        input_dir = tmp_path / "input"
+        input_dir.mkdir()
+        for name in ["done.set", "new.set"]:
+            (input_dir / name).write_bytes(b"x")
+
+        pipeline = Pipeline(output_dir=str(tmp_path / "output"))
+        done_hash = pipeline._hash_input(input_dir / "done.set")
+
+        def fake_db(operation, run_record=None, update_record=None):
+            if operation == "find_completed_run":
+                return "run_1" if run_record["input_hash"] == done_hash else None
+            return None
+
+        mock_manage_db.side_effect = fake_db
+
+        with patch.object(pipeline, "_entrypoint") as mock_entrypoint:
+            pipeline.process_directory(
+                directory=input_dir,
+                task="RawToSet",
+                pattern="*.set",
+                skip_completed=True,
+            )
+
+        mock_entrypoint.assert_called_once()
+        args, kwargs = mock_entrypoint.call_args
+        assert args[0].name == "new.set"
+        assert kwargs["input_hash"] == pipeline._hash_input(input_dir / "new.set")
+        assert kwargs["backup_existing"] is False
+
+    @patch('autoclean.core.pipeline.manage_database_conditionally')
+    @patch('autoclean.core.pipeline.set_database_path')
+    @patch('autoclean.core.pipeline.configure_logger')
+    @patch('autoclean.core.pipeline.mne.set_log_level')
+    def test_content_hash_matches_stat_runs(self, mock_mne_log, mock_logger, mock_set_db, mock_manage_db, tmp_path):
+        """Test that content hashing skips files completed by a stat-hash run."""
+        input_dir = tmp_path / "input"
+        input_dir.mkdir()
+        for name in ["done.set", "moved.set", "new.set"]:
+            (input_dir / name).write_bytes(name.encode())
+
+        pipeline = Pipeline(output_dir=str(tmp_path / "output"))
+        completed = {
+            pipeline._hash_input(input_dir / "done.set"),
+            pipeline._hash_input(input_dir / "moved.set", content_hash=True),
+        }
+        lookups = []
+
+        def fake_db(operation, run_record=None, update_record=None):
+            if operation == "find_completed_run":
+                lookups.append(run_record["input_hash"].split(":")[0])
+                return "run_1" if run_record["input_hash"] in completed else None
+            return None
+
+        mock_manage_db.side_effect = fake_db
+
+        with patch.object(pipeline, "_entrypoint") as mock_entrypoint:
+            pipeline.process_directory(
+                directory=input_dir,
+                task="RawToSet",
+                pattern="*.set",
+                skip_completed=True,
+                content_hash=True,
+            )
+
+        mock_entrypoint.assert_called_once()
+        args, kwargs = mock_entrypoint.call_args
+        assert args[0].name == "new.set"
+        assert kwargs["input_hash"] == pipeline._hash_input(
+            input_dir / "new.set", content_hash=True
+        )
+        # done.set matched on its stat fingerprint without being read
+        assert lookups.count("stat") == 3
+        assert len(lookups) == 5
+
+    @patch('autoclean.core.pipeline.manage_database_conditionally')
+    @patch('autoclean.core.pipeline.set_database_path')
+    @patch('autoclean.core.pipeline.configure_logger')
+    @patch('autoclean.core.pipeline.mne.set_log_level')
+    def test_task_hash_tracks_settings(self, mock_mne_log, mock_logger, mock_set_db, mock_manage_db, tmp_path):
+        """Test that changing a task's settings changes its hash."""
+        pipeline = Pipeline(output_dir=str(tmp_path / "output"))
+        task_class = pipeline.session_task_registry["rawtoset"]
+        before, _ = pipeline._hash_task("RawToSet")
+
+        with patch.object(task_class, "settings", {"resample_step": {"value": 1}}, create=True):
+            after, _ = pipeline._hash_task("RawToSet")
+
+        assert before != after
+        assert pipeline._hash_task("RawToSet")[0] == before
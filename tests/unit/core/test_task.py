@@ -444,4 +444,66 @@ class TestTaskErrorHandling:
             # Should handle invalid config types appropriately
             # (should raise error for invalid config types)
             with pytest.raises((TypeError, ValueError)):
-                task = TestTask(invalid_config)
\ No newline at end of file
+                task = TestTask(invalid_config)
+
+@pytest.mark.skipif(not TASK_AVAILABLE, reason="Task module not available for import")
+class TestChunkedImport:
+    """Test importing data into a memory-mapped file for chunked processing."""
+
+    def test_import_raw_keeps_data_file_backed(self, tmp_path):
+        """Channels dropped by the import plugin do not copy the data to memory."""
+        import mne
+        import numpy as np
+
+        eeglab_raw = pytest.importorskip("eeglabio.raw")
+
+        ch_names = [f"E{i}" for i in range(1, 130)] + ["EOG"]
+        data = np.random.default_rng(0).standard_normal((130, 250 * 70)) * 1e-5
+        fname = tmp_path / "recording.set"
+        eeglab_raw.export_set(
+            str(fname), data, 250.0, ch_names, ch_types=["eeg"] * 129 + ["eog"]
+        )
+
+        class ChunkedTask(Task):
+            def run(self):
+                pass
+
+        task = ChunkedTask(
+            {
+                "run_id": "test_run",
+                "unprocessed_file": fname,
+                "task": "chunked",
+                "eeg_system": "GSN-HydroCel-129",
+                "stage_dir": tmp_path,
+                "tasks": {
+                    "chunked": {
+                        "mne_task": "chunked",
+                        "description": "Chunked import",
+                        "settings": {
+                            "chunked_processing": {
+                                "enabled": True,
+                                "value": {"block_sec": 30},
+                            }
+                        },
+                    }
+                },
+            }
+        )
+        with patch("autoclean.core.task.save_raw_to_set"), patch.object(
+            ChunkedTask, "create_bids_path"
+        ), patch("autoclean.io.import_.manage_database_conditionally"):
+            task.import_raw()
+
+        assert "EOG" not in task.raw.ch_names
+        mapped = task.raw._data  # pylint: disable=protected-access
+        assert isinstance(mapped, np.memmap) and mapped._mmap is not None
+        assert Path(mapped.filename) == tmp_path / "recording_preload.dat"
+        expected = mne.io.read_raw_eeglab(fname, preload=True, verbose=False)
+        np.testing.assert_allclose(
+            task.raw.get_data(),
+            # The plugin renames the reference channel
+            expected.get_data(
+                picks=["E129" if ch == "Cz" else ch for ch in task.raw.ch_names]
+            ),
+            rtol=1e-6,
+        )
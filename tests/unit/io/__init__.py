@@ -0,0 +1 @@
+"""Unit tests for AutoClean EEG input/output modules."""
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""Unit tests for intermediate stage file formats."""
+
+import mne
+import numpy as np
+import pandas as pd
+import pytest
+
+try:
+    from autoclean.io.export import save_epochs_to_set, save_raw_to_set
+    from autoclean.io.import_ import read_stage_file
+    from autoclean.utils.database import (
+        close_database_connections,
+        get_run_record,
+        manage_database,
+        set_database_path,
+    )
+    EXPORT_AVAILABLE = True
+except ImportError:
+    EXPORT_AVAILABLE = False
+
+
+def _make_raw():
+    info = mne.create_info(["Fz", "Cz", "Pz", "Oz"], 250.0, "eeg")
+    rng = np.random.default_rng(0)
+    raw = mne.io.RawArray(
+        rng.standard_normal((4, 2500)) * 1e-6, info, first_samp=100, verbose=False
+    )
+    raw.set_montage("standard_1020")
+    raw.set_annotations(mne.Annotations([1.0, 4.5], [0.5, 0.0], ["bad_blink", "stim"]))
+    raw.info["bads"] = ["Oz"]
+    return raw
+
+
+@pytest.fixture
+def autoclean_dict(tmp_path):
+    """Create a run and the configuration the export functions expect."""
+    set_database_path(tmp_path)
+    manage_database(operation="create_collection")
+    manage_database(
+        operation="store",
+        run_record={"run_id": "run_1", "status": "unprocessed", "metadata": {}},
+    )
+    stage_dir = tmp_path / "stage"
+    stage_dir.mkdir()
+    yield {
+        "run_id": "run_1",
+        "unprocessed_file": tmp_path / "sub-01_rest.raw",
+        "stage_dir": stage_dir,
+        "stage_files": {},
+    }
+    close_database_connections()
+
+
+@pytest.mark.skipif(not EXPORT_AVAILABLE, reason="Export module not available")
+class TestStageFormats:
+    """Test writing and reading stage files in each intermediate format."""
+
+    @pytest.mark.parametrize("fmt, suffix", [("fif", ".fif"), ("npy", ".npy")])
+    def test_raw_round_trip(self, autoclean_dict, fmt, suffix):
+        """Test that raw stages keep data, channels, montage and annotations."""
+        autoclean_dict["intermediate_format"] = fmt
+        raw = _make_raw()
+
+        path = save_raw_to_set(raw, autoclean_dict, stage="post_basic_steps")
+        loaded = read_stage_file(path)
+
+        assert path.name == f"sub-01_rest_basic_steps_raw{suffix}"
+        np.testing.assert_allclose(loaded.get_data(), raw.get_data(), rtol=1e-6)
+        assert loaded.ch_names == raw.ch_names
+        assert loaded.info["bads"] == ["Oz"]
+        assert loaded.get_montage() is not None
+        np.testing.assert_allclose(
+            loaded.annotations.onset - loaded.first_time,
+            raw.annotations.onset - raw.first_time,
+        )
+        assert list(loaded.annotations.description) == ["bad_blink", "stim"]
+
+    def test_npy_epochs_round_trip(self, autoclean_dict):
+        """Test that epoch stages keep events, event_id and metadata."""
+        autoclean_dict["intermediate_format"] = "npy"
+        raw = _make_raw()
+        events = np.array([[200, 0, 1], [700, 0, 2], [1200, 0, 1]])
+        epochs = mne.Epochs(
+            raw,
+            events,
+            {"a": 1, "b": 2},
+            tmin=-0.1,
+            tmax=0.5,
+            baseline=None,
+            preload=True,
+            verbose=False,
+        )
+        epochs.metadata = pd.DataFrame({"trial": [1, 2, 3]})
+
+        path = save_epochs_to_set(epochs, autoclean_dict, stage="post_epochs")
+        loaded = read_stage_file(path)
+
+        np.testing.assert_allclose(loaded.get_data(), epochs.get_data(), rtol=1e-6)
+        np.testing.assert_array_equal(loaded.events, epochs.events)
+        assert loaded.event_id == epochs.event_id
+        assert loaded.tmin == pytest.approx(epochs.tmin)
+        assert list(loaded.metadata["trial"]) == [1, 2, 3]
+
+    def test_none_skips_file_but_records_stage(self, autoclean_dict):
+        """Test that the "none" format writes nothing but still tracks the stage."""
+        autoclean_dict["intermediate_format"] = "none"
+
+        path = save_raw_to_set(_make_raw(), autoclean_dict, stage="post_import")
+
+        assert path is None
+        assert not any(autoclean_dict["stage_dir"].iterdir())
+        record = get_run_record("run_1")
+        assert record["metadata"]["save_raw_to_set"]["format"] == "none"
+        assert record["status"].startswith("post_import completed")
+
+    def test_final_stage_is_always_eeglab(self, autoclean_dict):
+        """Test that stages copied to final_files ignore the intermediate format."""
+        autoclean_dict["intermediate_format"] = "none"
+
+        path = save_raw_to_set(
+            _make_raw(), autoclean_dict, stage="post_component_removal"
+        )
+
+        assert path.suffix == ".set"
+        assert path.exists()
+
+    def test_unknown_format_is_rejected(self, autoclean_dict):
+        """Test that a misspelled format fails instead of silently falling back."""
+        autoclean_dict["intermediate_format"] = "hdf5"
+
+        with pytest.raises(ValueError, match="Unknown stage format"):
+            save_raw_to_set(_make_raw(), autoclean_dict, stage="post_import")
@@ -0,0 +1,133 @@
+"""Unit tests for stage checkpoints."""
+
+import mne
+import numpy as np
+import pytest
+
+try:
+    from autoclean.utils.checkpoint import (
+        CheckpointMismatch,
+        StageCheckpoints,
+        record_raw_stage,
+    )
+    from autoclean.utils.database import (
+        close_database_connections,
+        manage_database,
+        set_database_path,
+    )
+    CHECKPOINT_AVAILABLE = True
+except ImportError:
+    CHECKPOINT_AVAILABLE = False
+
+
+class FakeStepsMixin:
+    """Steps that scale the data and save a stage file."""
+
+    def scale(self, factor, export=True):
+        self.calls.append(("scale", factor))
+        raw = self.raw.copy()
+        raw._data *= factor
+        self.raw = raw
+        if export:
+            path = self.config["stage_dir"] / f"{len(self.calls)}_scale_raw.set"
+            raw.export(path, fmt="eeglab", overwrite=True)
+            record_raw_stage(self.config["run_id"], raw, path)
+
+    def crash(self):
+        self.calls.append(("crash",))
+        raise RuntimeError("crash")
+
+
+# Checkpoints only wrap steps contributed by the signal processing mixins
+FakeStepsMixin.__module__ = "autoclean.mixins.signal_processing.fake"
+
+
+class FakeTask(FakeStepsMixin):
+    """Minimal stand-in for a Task."""
+
+    def __init__(self, run_id, stage_dir):
+        self.config = {"run_id": run_id, "stage_dir": stage_dir}
+        info = mne.create_info(["Fz", "Cz", "Pz"], 100.0, "eeg")
+        self.raw = mne.io.RawArray(np.ones((3, 1000)) * 1e-6, info, verbose=False)
+        self.original_raw = None
+        self.epochs = None
+        self.flagged = False
+        self.flagged_reasons = []
+        self.final_ica = None
+        self.ica_flags = None
+        self.calls = []
+        self.checkpoints = StageCheckpoints(self, "stat:input", "task")
+
+
+@pytest.fixture
+def checkpoint_db(tmp_path):
+    """Create a database with two runs and a stage directory."""
+    set_database_path(tmp_path)
+    manage_database(operation="create_collection")
+    for run_id in ("run_1", "run_2"):
+        manage_database(
+            operation="store",
+            run_record={"run_id": run_id, "status": "unprocessed", "metadata": {}},
+        )
+    stage_dir = tmp_path / "stage"
+    stage_dir.mkdir()
+    yield stage_dir
+    close_database_connections()
+
+
+@pytest.mark.skipif(not CHECKPOINT_AVAILABLE, reason="Checkpoint module not available")
+class TestStageCheckpoints:
+    """Test recording and replaying stage checkpoints."""
+
+    def _crashed_run(self, stage_dir, first=2, second=3):
+        task = FakeTask("run_1", stage_dir)
+        task.scale(first)
+        task.scale(second)
+        with pytest.raises(RuntimeError):
+            task.crash()
+        return task
+
+    def test_restart_skips_checkpointed_steps(self, checkpoint_db):
+        """Test that a restarted run restores the latest stage and skips to it."""
+        self._crashed_run(checkpoint_db)
+
+        task = FakeTask("run_2", checkpoint_db)
+        task.scale(2)
+        task.scale(3)
+
+        assert task.calls == []
+        np.testing.assert_allclose(task.raw.get_data(), 6e-6, rtol=1e-6)
+        assert task.original_raw is not None
+
+    def test_changed_arguments_rerun_step(self, checkpoint_db):
+        """Test that a step called with other arguments is not skipped."""
+        self._crashed_run(checkpoint_db)
+
+        task = FakeTask("run_2", checkpoint_db)
+        task.scale(2)
+        task.scale(5)
+
+        assert task.calls == [("scale", 5)]
+        np.testing.assert_allclose(task.raw.get_data(), 10e-6, rtol=1e-6)
+
+    def test_divergence_after_unrestored_step_raises(self, checkpoint_db):
+        """Test that diverging after a skipped step without a stage file raises."""
+        task = FakeTask("run_1", checkpoint_db)
+        task.scale(2, export=False)
+        task.scale(3)
+
+        task = FakeTask("run_2", checkpoint_db)
+        task.scale(2, export=False)
+        with pytest.raises(CheckpointMismatch):
+            task.scale(4)
+
+    def test_modified_stage_file_is_ignored(self, checkpoint_db):
+        """Test that a checkpoint whose stage file changed is not used."""
+        self._crashed_run(checkpoint_db)
+        for path in checkpoint_db.glob("*.set"):
+            path.write_bytes(b"overwritten")
+
+        task = FakeTask("run_2", checkpoint_db)
+        task.scale(2)
+
+        assert task.calls == [("scale", 2)]
@@ -0,0 +1,79 @@
+"""Unit tests for per-run accounting of data copies."""
+
+import threading
+
+import mne
+import numpy as np
+import pytest
+
+try:
+    from autoclean.functions.preprocessing import filter_data
+    from autoclean.functions.preprocessing.chunked import crop_copy
+    from autoclean.utils.copy_tracker import (
+        begin_copy_tracking,
+        copied_bytes,
+        copy_data,
+        end_copy_tracking,
+    )
+    COPY_TRACKER_AVAILABLE = True
+except ImportError:
+    COPY_TRACKER_AVAILABLE = False
+
+
+def _raw(n_channels=4, n_seconds=10, sfreq=100.0):
+    data = np.random.default_rng(0).standard_normal(
+        (n_channels, int(n_seconds * sfreq))
+    )
+    info = mne.create_info(n_channels, sfreq, "eeg")
+    return mne.io.RawArray(data * 1e-6, info, verbose=False)
+
+
+@pytest.mark.skipif(not COPY_TRACKER_AVAILABLE, reason="Copy tracker not available")
+class TestCopyTracker:
+    """Test the per-run copy counters."""
+
+    def test_copies_counted_per_step(self):
+        """Test that copies are attributed to the run and step that made them."""
+        raw = _raw()
+        nbytes = raw.get_data().nbytes
+        begin_copy_tracking("run_1")
+        try:
+            copy = copy_data(raw, "step_a")
+            copy_data(raw, "step_a")
+            filter_data(raw, l_freq=1.0, verbose=False)
+            assert copied_bytes("run_1") == {
+                "step_a": 2 * nbytes,
+                "filter_data": nbytes,
+            }
+        finally:
+            counts = end_copy_tracking("run_1")
+        assert copy is not raw
+        assert counts["step_a"] == 2 * nbytes
+        assert copied_bytes("run_1") == {}
+
+    def test_inplace_does_not_copy(self):
+        """Test that inplace processing records no copies."""
+        raw = _raw()
+        begin_copy_tracking("run_1")
+        try:
+            filter_data(raw, l_freq=1.0, inplace=True, verbose=False)
+            span = crop_copy(raw, tmin=2.0, tmax=4.0, include_tmax=False)
+        finally:
+            counts = end_copy_tracking("run_1")
+        assert counts == {"crop_copy": span.get_data().nbytes}
+
+    def test_untracked_outside_run(self):
+        """Test that copies outside a tracked run are not recorded."""
+        raw = _raw()
+        copy_data(raw, "step_a")
+        assert copied_bytes("run_1") == {}
+
+        begin_copy_tracking("run_1")
+        try:
+            # Threads do not inherit the run of the thread starting them
+            thread = threading.Thread(target=copy_data, args=(raw, "step_b"))
+            thread.start()
+            thread.join()
+            assert copied_bytes("run_1") == {}
+        finally:
+            end_copy_tracking("run_1")
@@ -0,0 +1,350 @@
+"""Unit tests for database utilities."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+try:
+    from autoclean.utils import database
+    from autoclean.utils.database import (
+        begin_buffered_writes,
+        close_database_connections,
+        end_buffered_writes,
+        get_run_record,
+        manage_database,
+        manage_database_conditionally,
+        set_database_path,
+    )
+    DATABASE_AVAILABLE = True
+except ImportError:
+    DATABASE_AVAILABLE = False
+
+
+@pytest.fixture
+def run_db(tmp_path):
+    """Create a database with a single unprocessed run."""
+    set_database_path(tmp_path)
+    manage_database(operation="create_collection")
+    manage_database(
+        operation="store",
+        run_record={"run_id": "run_1", "status": "unprocessed", "metadata": {}},
+    )
+    yield tmp_path
+    close_database_connections()
+
+
+@pytest.mark.skipif(not DATABASE_AVAILABLE, reason="Database module not available")
+class TestDatabaseConnections:
+    """Test persistent WAL-mode connections."""
+
+    def test_wal_mode_enabled(self, run_db):
+        """Test that connections use WAL journaling with NORMAL sync."""
+        conn = database._get_db_connection(run_db / "pipeline.db")
+
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+    def test_connection_reused_within_thread(self, run_db):
+        """Test that the same thread gets the same connection back."""
+        db_path = run_db / "pipeline.db"
+
+        assert database._get_db_connection(db_path) is database._get_db_connection(
+            db_path
+        )
+
+    def test_threads_get_separate_connections(self, run_db):
+        """Test that each thread opens its own connection."""
+        db_path = run_db / "pipeline.db"
+        main_conn = database._get_db_connection(db_path)
+        other = {}
+
+        def worker():
+            other["conn"] = database._get_db_connection(db_path)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert other["conn"] is not main_conn
+
+    def test_reads_do_not_wait_for_writers(self, run_db):
+        """Test that get_run_record succeeds while the write lock is held."""
+        result = {}
+
+        def reader():
+            result["record"] = get_run_record("run_1")
+
+        with database._db_lock:
+            thread = threading.Thread(target=reader)
+            thread.start()
+            thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert result["record"]["run_id"] == "run_1"
+
+    def test_concurrent_metadata_updates_are_not_lost(self, run_db):
+        """Test that concurrent read-modify-write updates all land."""
+
+        def writer(index):
+            for step in range(10):
+                manage_database(
+                    operation="update",
+                    update_record={
+                        "run_id": "run_1",
+                        "metadata": {f"writer_{index}_step_{step}": step},
+                    },
+                )
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        metadata = get_run_record("run_1")["metadata"]
+        assert len(metadata) == 40
+
+    def test_failed_update_rolls_back(self, run_db):
+        """Test that a failed write leaves the connection usable."""
+        with pytest.raises(database.DatabaseError):
+            manage_database(
+                operation="update",
+                update_record={"run_id": "missing", "status": "failed"},
+            )
+
+        manage_database(
+            operation="update", update_record={"run_id": "run_1", "status": "done"}
+        )
+        assert get_run_record("run_1")["status"] == "done"
+
+
+@pytest.mark.skipif(not DATABASE_AVAILABLE, reason="Database module not available")
+class TestRunMetadata:
+    """Test per-step metadata storage in run_metadata."""
+
+    def _update(self, **metadata):
+        manage_database(
+            operation="update",
+            update_record={"run_id": "run_1", "metadata": metadata},
+        )
+
+    def test_updates_write_one_row_per_step(self, run_db):
+        """Test that each step is stored as its own fragment."""
+        self._update(import_eeg={"sfreq": 500})
+        self._update(run_ica={"n_components": 20})
+        self._update(import_eeg={"sfreq": 250})
+
+        conn = database._get_db_connection(run_db / "pipeline.db")
+        rows = conn.execute(
+            "SELECT step, payload FROM run_metadata WHERE run_id = 'run_1'"
+        ).fetchall()
+        blob = conn.execute(
+            "SELECT metadata FROM pipeline_runs WHERE run_id = 'run_1'"
+        ).fetchone()[0]
+
+        assert sorted(row["step"] for row in rows) == ["import_eeg", "run_ica"]
+        assert blob == "{}"
+
+    def test_get_record_assembles_in_first_write_order(self, run_db):
+        """Test that get_run_record merges fragments like the old blob update."""
+        self._update(import_eeg={"sfreq": 500})
+        self._update(run_ica={"n_components": 20})
+        self._update(import_eeg={"sfreq": 250})
+
+        metadata = get_run_record("run_1")["metadata"]
+
+        assert list(metadata) == ["import_eeg", "run_ica"]
+        assert metadata["import_eeg"] == {"sfreq": 250}
+
+    def test_legacy_blob_is_merged(self, run_db):
+        """Test that metadata stored in the old blob column is still returned."""
+        conn = database._get_db_connection(run_db / "pipeline.db")
+        conn.execute(
+            "UPDATE pipeline_runs SET metadata = ? WHERE run_id = 'run_1'",
+            ('{"entrypoint": {"task": "old"}, "import_eeg": {"sfreq": 1}}',),
+        )
+        conn.commit()
+
+        self._update(import_eeg={"sfreq": 500})
+        metadata = get_run_record("run_1")["metadata"]
+
+        assert metadata == {"entrypoint": {"task": "old"}, "import_eeg": {"sfreq": 500}}
+
+    def test_completed_run_metadata_is_locked(self, run_db):
+        """Test that metadata of a completed run cannot change."""
+        manage_database(
+            operation="update",
+            update_record={
+                "run_id": "run_1",
+                "status": "completed",
+                "metadata": {"json_summary": {"ok": True}},
+            },
+        )
+
+        with pytest.raises(database.DatabaseError, match="already completed"):
+            self._update(json_summary={"ok": False})
+        assert get_run_record("run_1")["metadata"]["json_summary"] == {"ok": True}
+
+    def test_metadata_updates_are_audited(self, run_db):
+        """Test that metadata writes still land in update_audit_log."""
+        self._update(import_eeg={"sfreq": 500})
+
+        conn = database._get_db_connection(run_db / "pipeline.db")
+        operations = [
+            row[0]
+            for row in conn.execute(
+                "SELECT operation_type FROM update_audit_log WHERE run_id = 'run_1'"
+            )
+        ]
+        assert operations == ["metadata_update"]
+
+
+@pytest.mark.skipif(not DATABASE_AVAILABLE, reason="Database module not available")
+class TestBufferedWrites:
+    """Test the per-run write-behind buffer."""
+
+    @pytest.fixture(autouse=True)
+    def buffering(self, run_db):
+        begin_buffered_writes("run_1")
+        yield
+        end_buffered_writes("run_1")
+
+    def _stored_steps(self, run_db):
+        conn = database._get_db_connection(run_db / "pipeline.db")
+        return [
+            row[0]
+            for row in conn.execute(
+                "SELECT step FROM run_metadata WHERE run_id = 'run_1' ORDER BY rowid"
+            )
+        ]
+
+    def _update(self, **metadata):
+        manage_database_conditionally(
+            operation="update",
+            update_record={"run_id": "run_1", "metadata": metadata},
+        )
+
+    def test_updates_are_held_until_flush(self, run_db):
+        """Test that metadata updates are not written immediately."""
+        self._update(import_eeg={"sfreq": 500})
+        self._update(run_ica={"n_components": 20})
+
+        assert self._stored_steps(run_db) == []
+
+        end_buffered_writes("run_1")
+        assert self._stored_steps(run_db) == ["import_eeg", "run_ica"]
+
+    def test_stage_completion_flushes(self, run_db):
+        """Test that update_status persists everything queued before it."""
+        self._update(import_eeg={"sfreq": 500})
+        manage_database_conditionally(
+            operation="update_status",
+            update_record={"run_id": "run_1", "status": "post_import completed"},
+        )
+
+        assert self._stored_steps(run_db) == ["import_eeg"]
+        assert get_run_record("run_1")["status"].startswith("post_import completed at")
+
+    def test_get_run_record_sees_buffered_updates(self, run_db):
+        """Test that reading the record flushes pending writes first."""
+        self._update(import_eeg={"sfreq": 500})
+
+        assert get_run_record("run_1")["metadata"] == {"import_eeg": {"sfreq": 500}}
+
+    def test_buffer_snapshots_metadata(self, run_db):
+        """Test that mutating metadata after queuing does not change what is written."""
+        step_metadata = {"sfreq": 500}
+        self._update(import_eeg=step_metadata)
+        step_metadata["sfreq"] = 1
+
+        assert get_run_record("run_1")["metadata"]["import_eeg"] == {"sfreq": 500}
+
+    def test_other_runs_are_not_buffered(self, run_db):
+        """Test that only runs that began buffering are deferred."""
+        manage_database(
+            operation="store",
+            run_record={"run_id": "run_2", "status": "unprocessed", "metadata": {}},
+        )
+        manage_database_conditionally(
+            operation="update",
+            update_record={"run_id": "run_2", "metadata": {"import_eeg": {}}},
+        )
+
+        conn = database._get_db_connection(run_db / "pipeline.db")
+        assert conn.execute(
+            "SELECT COUNT(*) FROM run_metadata WHERE run_id = 'run_2'"
+        ).fetchone()[0] == 1
+
+    def test_compliance_mode_flush_is_audited(self, run_db):
+        """Test that a flush in compliance mode goes through audit protection."""
+        self._update(import_eeg={"sfreq": 500})
+
+        with patch.object(
+            database, "is_compliance_mode_enabled", return_value=True
+        ), patch.object(
+            database,
+            "manage_database_with_audit_protection",
+            wraps=database.manage_database_with_audit_protection,
+        ) as audited:
+            end_buffered_writes("run_1")
+
+        audited.assert_called_once()
+        assert audited.call_args.args[0] == "apply_batch"
+        assert self._stored_steps(run_db) == ["import_eeg"]
+
+
+@pytest.mark.skipif(not DATABASE_AVAILABLE, reason="Database module not available")
+class TestFindCompletedRun:
+    """Test fingerprint lookups for skip-if-done batches."""
+
+    def _store(
+        self,
+        run_id,
+        status,
+        input_hash="stat:abc",
+        task_hash="task",
+        input_stat_hash=None,
+    ):
+        manage_database(
+            operation="store",
+            run_record={
+                "run_id": run_id,
+                "status": status,
+                "metadata": {},
+                "input_hash": input_hash,
+                "input_stat_hash": input_stat_hash or input_hash,
+                "task_hash": task_hash,
+            },
+        )
+
+    def _find(self, input_hash="stat:abc", task_hash="task"):
+        return manage_database(
+            operation="find_completed_run",
+            run_record={"input_hash": input_hash, "task_hash": task_hash},
+        )
+
+    def test_only_completed_runs_match(self, run_db):
+        """Test that failed runs with the same fingerprint are not returned."""
+        self._store("run_failed", "failed")
+        assert self._find() is None
+
+        self._store("run_done", "completed")
+        assert self._find() == "run_done"
+
+    def test_task_hash_must_match(self, run_db):
+        """Test that a completed run with other task settings does not match."""
+        self._store("run_done", "completed", task_hash="old_settings")
+
+        assert self._find() is None
+        assert self._find(task_hash="old_settings") == "run_done"
+
+    def test_matches_either_fingerprint(self, run_db):
+        """Test that a run fingerprinted by content is found by its stat hash."""
+        self._store(
+            "run_done", "completed", input_hash="xxh3:def", input_stat_hash="stat:abc"
+        )
+
+        assert self._find("stat:abc") == "run_done"
+        assert self._find("xxh3:def") == "run_done"
+        assert self._find("stat:other") is None
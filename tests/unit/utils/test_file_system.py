@@ -0,0 +1,51 @@
+"""Unit tests for file system utilities."""
+
+import os
+
+import pytest
+
+try:
+    from autoclean.utils.file_system import hash_input_file
+    FILE_SYSTEM_AVAILABLE = True
+except ImportError:
+    FILE_SYSTEM_AVAILABLE = False
+
+
+@pytest.mark.skipif(not FILE_SYSTEM_AVAILABLE, reason="File system module not available")
+class TestHashInputFile:
+    """Test input file fingerprints used by skip_completed."""
+
+    def test_stat_hash_changes_with_mtime(self, tmp_path):
+        """Test that touching a file changes its default fingerprint."""
+        path = tmp_path / "sub-01.raw"
+        path.write_bytes(b"data")
+        before = hash_input_file(path)
+
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert before.startswith("stat:")
+        assert hash_input_file(path) != before
+
+    def test_content_hash_ignores_location(self, tmp_path):
+        """Test that identical contents at different paths hash the same."""
+        first = tmp_path / "a.raw"
+        second = tmp_path / "b.raw"
+        first.write_bytes(b"data")
+        second.write_bytes(b"data")
+
+        assert hash_input_file(first) != hash_input_file(second)
+        assert hash_input_file(first, content_hash=True) == hash_input_file(
+            second, content_hash=True
+        )
+
+    def test_data_sidecar_is_included(self, tmp_path):
+        """Test that changing an EEGLAB .fdt changes the .set fingerprint."""
+        header = tmp_path / "sub-01.set"
+        header.write_bytes(b"header")
+        (tmp_path / "sub-01.fdt").write_bytes(b"samples")
+        before = hash_input_file(header, content_hash=True)
+
+        (tmp_path / "sub-01.fdt").write_bytes(b"other samples")
+
+        assert hash_input_file(header, content_hash=True) != before
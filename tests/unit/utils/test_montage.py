@@ -1,5 +1,6 @@
 """Unit tests for montage utilities."""
 
+import numpy as np
 import pytest
 from typing import Dict, List
 from unittest.mock import Mock, patch, mock_open
@@ -16,8 +17,11 @@ try:
         get_gsn_to_10_20_mapping,
         convert_channel_names,
         get_standard_set_in_montage,
-        validate_channel_set
+        validate_channel_set,
+        get_channel_geometry,
+        nearest_neighbors,
     )
+    from autoclean.utils import montage as montage_utils
     MONTAGE_AVAILABLE = True
 except ImportError:
     MONTAGE_AVAILABLE = False
@@ -448,4 +452,92 @@ class TestMontageErrorHandling:
             validate_channel_set(None, ["E1", "E2"])
         
         with pytest.raises((TypeError, AttributeError)):
-            validate_channel_set(["E1"], None)
\ No newline at end of file
+            validate_channel_set(["E1"], None)
+
+
+@pytest.mark.skipif(not MONTAGE_AVAILABLE, reason="Montage module not available")
+class TestChannelGeometry:
+    """Test the cached channel geometry tables."""
+
+    def test_nearest_neighbors(self):
+        """Neighbors are ranked by distance, ties in channel order."""
+        positions = np.array(
+            [[0.0, 0, 0], [1, 0, 0], [3, 0, 0], [np.nan] * 3, [-1, 0, 0]]
+        )
+        neighbors = nearest_neighbors(positions, 2)
+        expected = [[1, 4], [0, 2], [1, 0], [], [0, 1]]
+        for found, want in zip(neighbors, expected):
+            np.testing.assert_array_equal(found, want)
+
+    def test_tables_cached_in_memory_and_on_disk(self, tmp_path, monkeypatch):
+        """Tables are computed once, then read from memory or disk."""
+        monkeypatch.setattr(montage_utils, "_CHANNEL_GEOMETRY", {})
+        rng = np.random.default_rng(0)
+        positions = {f"E{i}": rng.standard_normal(3) for i in range(10)}
+        ch_names = list(positions)
+
+        geometry = get_channel_geometry(ch_names, positions, cache_dir=tmp_path)
+        assert get_channel_geometry(ch_names, positions, cache_dir=tmp_path) is geometry
+        neighbors = geometry.neighbors(3)
+        assert len(list(tmp_path.glob("montage-*-knn3.npy"))) == 1
+        for found, want in zip(neighbors, nearest_neighbors(geometry.positions, 3)):
+            np.testing.assert_array_equal(found, want)
+
+        montage_utils._CHANNEL_GEOMETRY.clear()
+        monkeypatch.setattr(
+            montage_utils,
+            "nearest_neighbors",
+            lambda *a: pytest.fail("Neighbors recomputed"),
+        )
+        reloaded = get_channel_geometry(ch_names, positions, cache_dir=tmp_path)
+        assert reloaded is not geometry
+        for found, want in zip(reloaded.neighbors(3), neighbors):
+            np.testing.assert_array_equal(found, want)
+
+        # Another channel set gets its own tables
+        other = get_channel_geometry(ch_names[:-1], positions, cache_dir=tmp_path)
+        assert other.key != geometry.key
+
+    def test_interpolation_matrix_matches_mne(self):
+        """Interpolation matrices match MNE's spherical splines."""
+        import mne
+        from mne.channels.interpolation import _make_interpolation_matrix
+
+        montage = mne.channels.make_standard_montage("standard_1020")
+        positions = montage.get_positions()["ch_pos"]
+        ch_names = montage.ch_names[:40]
+        geometry = get_channel_geometry(ch_names, positions, use_disk_cache=False)
+        origin = np.array([0.0, 0.01, 0.04])
+        bad = np.array([2, 11, 30])
+        good = np.setdiff1d(np.arange(40), bad)
+
+        pos = geometry.positions - origin
+        expected = _make_interpolation_matrix(pos[good], pos[bad])
+        result = geometry.interpolation_matrix(bad, origin)
+        np.testing.assert_allclose(result, expected, rtol=0, atol=1e-9)
+        assert geometry.interpolation_matrix(bad, origin) is result
+
+    def test_interpolation_matrices_are_bounded(self, tmp_path, monkeypatch):
+        """Only the most recent interpolation matrices are kept, in memory."""
+        monkeypatch.setattr(montage_utils, "_INTERPOLATION_CACHE_SIZE", 2)
+        rng = np.random.default_rng(0)
+        positions = {f"E{i}": rng.standard_normal(3) for i in range(10)}
+        geometry = montage_utils.ChannelGeometry(
+            list(positions),
+            np.array(list(positions.values())),
+            "key",
+            tmp_path / "montage",
+        )
+        origin = [0.0, 0.0, 0.0]
+
+        first = geometry.interpolation_matrix([0], origin)
+        second = geometry.interpolation_matrix([1], origin)
+        assert geometry.interpolation_matrix([0], origin) is first
+        geometry.interpolation_matrix([2], origin)
+
+        # [1] was the least recently used matrix
+        assert geometry.interpolation_matrix([0], origin) is first
+        assert geometry.interpolation_matrix([1], origin) is not second
+        assert [f.name for f in tmp_path.iterdir()] == [
+            f"montage-spline-{montage_utils._digest(np.array(origin))}.npy"
+        ]
@@ -0,0 +1,136 @@
+"""Unit tests for background stage writes."""
+
+import threading
+
+import mne
+import numpy as np
+import pytest
+
+try:
+    from autoclean.functions.preprocessing.chunked import preload_to_file
+    from autoclean.io.export import save_raw_to_set
+    from autoclean.io.import_ import read_stage_file
+    from autoclean.utils.copy_tracker import (
+        begin_copy_tracking,
+        copied_bytes,
+        end_copy_tracking,
+    )
+    from autoclean.utils.database import (
+        close_database_connections,
+        manage_database,
+        set_database_path,
+    )
+    from autoclean.utils.stage_writer import (
+        StageWriteError,
+        begin_background_writes,
+        end_background_writes,
+        submit_stage_write,
+        wait_for_stage_writes,
+    )
+    STAGE_WRITER_AVAILABLE = True
+except ImportError:
+    STAGE_WRITER_AVAILABLE = False
+
+
+@pytest.fixture
+def writer():
+    """Enable background writes for a run."""
+    begin_background_writes("run_1")
+    yield "run_1"
+    end_background_writes("run_1")
+
+
+@pytest.mark.skipif(not STAGE_WRITER_AVAILABLE, reason="Stage writer not available")
+class TestStageWriter:
+    """Test the per-run background writer."""
+
+    def test_jobs_run_in_order_on_writer_thread(self, writer):
+        """Test that jobs run in submission order off the calling thread."""
+        calls = []
+        for index in range(3):
+            submit_stage_write(
+                writer,
+                lambda index=index: calls.append((index, threading.current_thread())),
+                f"job {index}",
+            )
+        wait_for_stage_writes(writer)
+
+        assert [index for index, _ in calls] == [0, 1, 2]
+        assert all(thread is not threading.current_thread() for _, thread in calls)
+
+    def test_failure_is_raised_and_later_jobs_skipped(self, writer):
+        """Test that a failed write surfaces on wait and stops the queue."""
+        calls = []
+
+        def fail():
+            raise OSError("disk full")
+
+        submit_stage_write(writer, fail, "post_import file")
+        submit_stage_write(writer, lambda: calls.append("after"), "post_filter file")
+
+        with pytest.raises(StageWriteError, match="post_import file: disk full"):
+            wait_for_stage_writes(writer)
+        assert calls == []
+
+    def test_runs_without_writer_are_not_queued(self):
+        """Test that submitting for a run without a writer leaves the job to the caller."""
+        assert submit_stage_write("run_2", lambda: None, "job") is False
+        wait_for_stage_writes("run_2")  # Nothing to wait for
+
+    def test_stage_file_is_written_from_snapshot(self, writer, tmp_path):
+        """Test that modifying raw after saving does not change the stage file."""
+        set_database_path(tmp_path)
+        manage_database(operation="create_collection")
+        manage_database(
+            operation="store",
+            run_record={"run_id": "run_1", "status": "unprocessed", "metadata": {}},
+        )
+        info = mne.create_info(["Fz", "Cz"], 100.0, "eeg")
+        raw = mne.io.RawArray(np.ones((2, 500)) * 1e-6, info, verbose=False)
+        autoclean_dict = {
+            "run_id": "run_1",
+            "unprocessed_file": tmp_path / "sub-01.raw",
+            "stage_dir": tmp_path,
+            "intermediate_format": "fif",
+        }
+
+        try:
+            path = save_raw_to_set(raw, autoclean_dict, stage="post_import")
+            raw._data *= 2  # In-place change by the next step
+            wait_for_stage_writes(writer)
+        finally:
+            close_database_connections()
+
+        np.testing.assert_allclose(read_stage_file(path).get_data(), 1e-6)
+
+    def test_file_backed_stage_is_written_without_snapshot(self, writer, tmp_path):
+        """Test that saving a chunked run's memory-mapped data does not copy it."""
+        set_database_path(tmp_path)
+        manage_database(operation="create_collection")
+        manage_database(
+            operation="store",
+            run_record={"run_id": "run_1", "status": "unprocessed", "metadata": {}},
+        )
+        info = mne.create_info(["Fz", "Cz"], 100.0, "eeg")
+        raw = mne.io.RawArray(np.ones((2, 500)) * 1e-6, info, verbose=False)
+        raw = preload_to_file(raw, tmp_path / "sub-01_preload.dat")
+        autoclean_dict = {
+            "run_id": "run_1",
+            "unprocessed_file": tmp_path / "sub-01.raw",
+            "stage_dir": tmp_path,
+            "intermediate_format": "fif",
+        }
+
+        begin_copy_tracking("run_1")
+        try:
+            path = save_raw_to_set(raw, autoclean_dict, stage="post_import")
+            copies = copied_bytes("run_1")
+            raw._data *= 2  # Written synchronously, so not in the file
+            wait_for_stage_writes(writer)
+        finally:
+            end_copy_tracking("run_1")
+            close_database_connections()
+
+        assert "stage_snapshot" not in copies
+        assert raw._data._mmap is not None
+        np.testing.assert_allclose(read_stage_file(path).get_data(), 1e-6)
@@ -0,0 +1,96 @@
+"""Unit tests for the step result cache."""
+
+import os
+
+import mne
+import numpy as np
+import pytest
+
+try:
+    from autoclean.utils.step_cache import StepCache, get_step_cache
+    STEP_CACHE_AVAILABLE = True
+except ImportError:
+    STEP_CACHE_AVAILABLE = False
+
+
+def _make_raw(value=1.0):
+    info = mne.create_info(["Fz", "Cz", "Pz"], 100.0, "eeg")
+    return mne.io.RawArray(np.full((3, 500), value * 1e-6), info, verbose=False)
+
+
+@pytest.mark.skipif(not STEP_CACHE_AVAILABLE, reason="Step cache module not available")
+class TestStepCache:
+    """Test content-addressed memoization of step results."""
+
+    def _counting(self, calls):
+        def detect(data, threshold=1.0):
+            calls.append(threshold)
+            return {"bads": [data.ch_names[0]], "threshold": threshold}
+
+        return detect
+
+    def test_second_call_uses_cache(self, tmp_path):
+        """Test that identical data and parameters are only computed once."""
+        cache = StepCache(tmp_path)
+        calls = []
+        detect = self._counting(calls)
+
+        first = cache.call("detect", detect, _make_raw(), serializer="json", threshold=2)
+        second = cache.call("detect", detect, _make_raw(), serializer="json", threshold=2)
+
+        assert calls == [2]
+        assert first == second == {"bads": ["Fz"], "threshold": 2}
+
+    def test_key_tracks_data_bads_and_parameters(self, tmp_path):
+        """Test that changing the data, bads or parameters misses the cache."""
+        cache = StepCache(tmp_path)
+        raw = _make_raw()
+        bad_raw = _make_raw()
+        bad_raw.info["bads"] = ["Cz"]
+        keys = {
+            cache.key("detect", (raw,), {"threshold": 1}),
+            cache.key("detect", (raw,), {"threshold": 2}),
+            cache.key("detect", (_make_raw(2.0),), {"threshold": 1}),
+            cache.key("detect", (bad_raw,), {"threshold": 1}),
+            cache.key("other_step", (raw,), {"threshold": 1}),
+        }
+
+        assert len(keys) == 5
+        assert cache.key("detect", (_make_raw(),), {"threshold": 1}) in keys
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        """Test that eviction removes the oldest entries past the size limit."""
+        cache = StepCache(tmp_path, max_size_mb=1)
+        payload = "x" * 400_000
+
+        for index in range(2):
+            cache.call("step", lambda i: payload, index, serializer="json")
+            entry = tmp_path / "step" / cache.key("step", (index,), {})
+            os.utime(entry, (index, index))  # Deterministic recency order
+        # Reusing entry 0 makes it the most recently used one
+        cache.call("step", lambda i: payload, 0, serializer="json")
+        cache.call("step", lambda i: payload, 2, serializer="json")
+
+        remaining = {entry.name for entry in (tmp_path / "step").iterdir()}
+        assert cache.key("step", (0,), {}) in remaining
+        assert cache.key("step", (1,), {}) not in remaining
+        assert cache.key("step", (2,), {}) in remaining
+
+    def test_unreadable_entry_is_recomputed(self, tmp_path):
+        """Test that a corrupt entry is discarded and recomputed."""
+        cache = StepCache(tmp_path)
+        calls = []
+        detect = self._counting(calls)
+        cache.call("detect", detect, _make_raw(), serializer="json")
+        for entry in (tmp_path / "detect").iterdir():
+            (entry / "result.json").write_text("{not json")
+
+        result = cache.call("detect", detect, _make_raw(), serializer="json")
+
+        assert calls == [1.0, 1.0]
+        assert result["bads"] == ["Fz"]
+
+    def test_cache_disabled_without_cache_dir(self):
+        """Test that runs without step_cache_dir do not cache."""
+        assert get_step_cache({"run_id": "run_1"}) is None
+        assert get_step_cache(None) is None